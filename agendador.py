@@ -0,0 +1,483 @@
+"""
+Agendador de Tópicos Recorrentes
+================================
+
+Mantém em um único processo aquecido a atualização periódica de muitos
+tópicos, em vez de um processo do cron por tópico. Cada tópico tem seu
+intervalo e sua prioridade; as execuções ficam em uma fila de
+prioridade (heap) ordenada pelo próximo horário, e os tópicos vencidos
+passam a uma segunda fila ordenada pela prioridade, de onde saem só
+quando há vaga no pool de geração.
+
+Para não concentrar as chamadas no início de cada hora, o primeiro
+horário de cada tópico é espalhado dentro de uma janela proporcional ao
+seu intervalo e cada reagendamento recebe um desvio aleatório (jitter).
+Tópicos com versão ainda fresca no armazém (`armazem_briefings.py`)
+não são gerados: são reagendados para quando a versão vencer.
+
+A memória é limitada: cada tópico ocupa uma entrada pequena nas filas,
+os briefings gerados não são retidos (ficam no armazém, quando
+configurado) e nunca há mais gerações em andamento que a concorrência.
+
+Arquivo de tópicos (YAML, via `pyyaml` de requirements.txt; ou JSON):
+
+    padrao:
+      intervalo: 1h          # segundos ou número com s, m, h, d
+      incremental: true      # usa briefing_incremental.py (requer o armazém)
+    topicos:
+      - energia solar
+      - topico: juros nos EUA
+        intervalo: 15m
+        prioridade: 0        # menor sai primeiro entre os vencidos (padrão: 10)
+
+Configuração via variáveis de ambiente:
+    AGENDADOR_CONCORRENCIA: Gerações simultâneas (padrão: 4)
+    AGENDADOR_JITTER: Desvio relativo de cada intervalo (padrão: 0.1)
+    AGENDADOR_ESPERA_FALHA: Segundos até nova tentativa após falha (padrão: 300)
+
+Inicie com: python run.py --schedule topicos.yaml
+"""
+
+import heapq
+import itertools
+import json
+import logging
+import os
+import random
+import re
+import threading
+import time
+from concurrent.futures import Future, ThreadPoolExecutor
+from dataclasses import dataclass
+from typing import Any, Callable, Dict, Iterable, List, Optional, Tuple
+
+from cache_briefing import normalizar_topico
+from instrumentacao import obter_metricas
+
+try:
+    import yaml
+except ImportError:  # pragma: no cover - depende do ambiente
+    yaml = None
+
+logger = logging.getLogger(__name__)
+
+INTERVALO_PADRAO = 3600.0
+PRIORIDADE_PADRAO = 10
+CONCORRENCIA_PADRAO = 4
+JITTER_PADRAO = 0.1
+ESPERA_FALHA_PADRAO = 300.0
+# Teto da espera do laço, para perceber mudanças do relógio do sistema
+ESPERA_MAXIMA_LACO = 60.0
+
+_UNIDADES = {"s": 1, "m": 60, "h": 3600, "d": 86400}
+_PADRAO_INTERVALO = re.compile(r"^\s*(\d+(?:\.\d+)?)\s*([smhd]?)\s*$")
+
+
+def interpretar_intervalo(valor: Any) -> float:
+    """
+    Converte um intervalo em segundos.
+
+    Args:
+        valor: Número de segundos ou texto como '90s', '15m', '2h', '1d'
+
+    Returns:
+        float: Intervalo em segundos
+
+    Raises:
+        ValueError: Se o valor for inválido ou não positivo
+    """
+    if isinstance(valor, (int, float)) and not isinstance(valor, bool):
+        segundos = float(valor)
+    else:
+        correspondencia = _PADRAO_INTERVALO.match(str(valor).lower())
+        if correspondencia is None:
+            raise ValueError(f"Intervalo inválido: {valor!r} (use segundos ou um número com s, m, h, d)")
+        numero, unidade = correspondencia.groups()
+        segundos = float(numero) * _UNIDADES[unidade or "s"]
+    if segundos <= 0:
+        raise ValueError(f"O intervalo deve ser positivo: {valor!r}")
+    return segundos
+
+
+@dataclass
+class TopicoAgendado:
+    """
+    Tópico com atualização periódica.
+
+    Attributes:
+        topico: Tópico a pesquisar
+        intervalo: Segundos entre duas atualizações
+        prioridade: Ordem entre tópicos vencidos ao mesmo tempo (menor primeiro)
+        incremental: Atualiza a última versão em vez de gerar do zero
+    """
+    topico: str
+    intervalo: float = INTERVALO_PADRAO
+    prioridade: int = PRIORIDADE_PADRAO
+    incremental: bool = False
+
+
+class _Entrada:
+    """Estado de um tópico dentro do agendador."""
+
+    __slots__ = ("agendado", "proximo")
+
+    def __init__(self, agendado: TopicoAgendado, proximo: float):
+        self.agendado = agendado
+        self.proximo = proximo
+
+
+def carregar_topicos(caminho: str) -> List[TopicoAgendado]:
+    """
+    Lê o arquivo de tópicos agendados (YAML ou JSON).
+
+    Args:
+        caminho: Arquivo com as chaves `topicos` e, opcionalmente, `padrao`
+
+    Returns:
+        List[TopicoAgendado]: Tópicos na ordem do arquivo
+
+    Raises:
+        ValueError: Se o arquivo tiver tópicos vazios, repetidos ou campos inválidos
+        RuntimeError: Se for YAML e o pyyaml não estiver instalado
+    """
+    with open(caminho, "r", encoding="utf-8") as arquivo:
+        conteudo = arquivo.read()
+
+    if caminho.lower().endswith(".json"):
+        dados = json.loads(conteudo)
+    elif yaml is None:
+        raise RuntimeError("Arquivos YAML requerem o pacote pyyaml (pip install pyyaml); ou use JSON")
+    else:
+        dados = yaml.safe_load(conteudo)
+
+    if isinstance(dados, list):
+        dados = {"topicos": dados}
+    if not isinstance(dados, dict) or not isinstance(dados.get("topicos"), list):
+        raise ValueError(f"'{caminho}' deve conter uma lista 'topicos'")
+
+    padrao = dados.get("padrao") or {}
+    topicos = []
+    vistos = set()
+    for item in dados["topicos"]:
+        campos = dict(padrao)
+        campos.update(item if isinstance(item, dict) else {"topico": item})
+        topico = str(campos.get("topico") or "").strip()
+        if not topico:
+            raise ValueError(f"Tópico vazio em '{caminho}'")
+        chave = normalizar_topico(topico)
+        if chave in vistos:
+            raise ValueError(f"Tópico repetido em '{caminho}': {topico!r}")
+        vistos.add(chave)
+        topicos.append(TopicoAgendado(
+            topico=topico,
+            intervalo=interpretar_intervalo(campos.get("intervalo", INTERVALO_PADRAO)),
+            prioridade=int(campos.get("prioridade", PRIORIDADE_PADRAO)),
+            incremental=bool(campos.get("incremental", False)),
+        ))
+    return topicos
+
+
+class AgendadorDeTopicos:
+    """
+    Executa a atualização periódica de tópicos em um pool limitado.
+
+    Attributes:
+        max_concorrencia: Número máximo de gerações simultâneas
+        jitter: Desvio relativo aplicado a cada intervalo (0.1 = ±10%)
+        espera_falha: Segundos até nova tentativa de um tópico que falhou
+    """
+
+    def __init__(
+        self,
+        topicos: Iterable[TopicoAgendado] = (),
+        gerador: Optional[Callable[[str], Any]] = None,
+        max_concorrencia: int = CONCORRENCIA_PADRAO,
+        armazem: Optional[Any] = None,
+        jitter: float = JITTER_PADRAO,
+        espera_falha: float = ESPERA_FALHA_PADRAO,
+        relogio: Callable[[], float] = time.time,
+        semente: Optional[int] = None,
+    ):
+        """
+        Args:
+            topicos: Tópicos iniciais
+            gerador: Função que recebe um tópico e devolve um briefing (ou None).
+                Padrão: v2 com deduplicação, ou o modo incremental nos
+                tópicos marcados como `incremental`
+            max_concorrencia: Número máximo de gerações simultâneas
+            armazem: Armazém consultado para pular tópicos com versão fresca
+                (padrão: BRIEFING_ARMAZEM_PATH)
+            jitter: Desvio relativo aplicado a cada intervalo
+            espera_falha: Segundos até nova tentativa após uma falha
+            relogio: Fonte de tempo (substituível em testes)
+            semente: Semente do jitter, para execuções reproduzíveis
+
+        Raises:
+            ValueError: Se max_concorrencia for menor que 1 ou o jitter estiver fora de [0, 1)
+        """
+        if max_concorrencia < 1:
+            raise ValueError("max_concorrencia deve ser pelo menos 1")
+        if not 0 <= jitter < 1:
+            raise ValueError("jitter deve estar entre 0 e 1")
+
+        if armazem is None:
+            from armazem_briefings import obter_armazem
+            armazem = obter_armazem()
+        if gerador is None:
+            from hedge_modelos import obter_executor_hedge
+            hedge = obter_executor_hedge()
+            if hedge is not None:
+                hedge.garantir_concorrencia(max_concorrencia)
+
+        self.max_concorrencia = max_concorrencia
+        self.jitter = jitter
+        self.espera_falha = espera_falha
+        self._gerador = gerador
+        self._armazem = armazem
+        self._relogio = relogio
+        self._aleatorio = random.Random(semente)
+        self._executor = ThreadPoolExecutor(max_workers=max_concorrencia, thread_name_prefix="agendador")
+        self._trava = threading.Lock()
+        self._despertar = threading.Event()
+        self._parado = threading.Event()
+        self._sequencia = itertools.count()
+        # (próximo horário, seq, entrada) e (prioridade, horário, seq, entrada)
+        self._agendados: List[Tuple[float, int, _Entrada]] = []
+        self._vencidos: List[Tuple[int, float, int, _Entrada]] = []
+        self._entradas: Dict[str, _Entrada] = {}
+        self._em_andamento = 0
+        self._contadores = {"execucoes": 0, "falhas": 0, "frescos": 0}
+
+        for agendado in topicos:
+            self.adicionar(agendado)
+
+    def __enter__(self) -> "AgendadorDeTopicos":
+        return self
+
+    def __exit__(self, tipo, valor, rastreamento) -> bool:
+        self.fechar()
+        return False
+
+    def _desviar(self, intervalo: float) -> float:
+        return intervalo * (1 + self._aleatorio.uniform(-self.jitter, self.jitter))
+
+    def _agendar(self, entrada: _Entrada, proximo: float) -> None:
+        """Coloca a entrada na fila de horários (chamar com a trava)."""
+        entrada.proximo = proximo
+        heapq.heappush(self._agendados, (proximo, next(self._sequencia), entrada))
+
+    def adicionar(self, agendado: TopicoAgendado) -> None:
+        """
+        Agenda um tópico. A primeira execução cai em um ponto aleatório
+        da janela de jitter do seu intervalo.
+
+        Args:
+            agendado: Tópico e seus parâmetros
+
+        Raises:
+            ValueError: Se o tópico já estiver agendado ou o intervalo não for positivo
+        """
+        if agendado.intervalo <= 0:
+            raise ValueError(f"O intervalo de '{agendado.topico}' deve ser positivo")
+        chave = normalizar_topico(agendado.topico)
+        with self._trava:
+            if chave in self._entradas:
+                raise ValueError(f"Tópico já agendado: {agendado.topico!r}")
+            entrada = _Entrada(agendado, 0.0)
+            self._entradas[chave] = entrada
+            janela = agendado.intervalo * self.jitter
+            self._agendar(entrada, self._relogio() + self._aleatorio.uniform(0, janela))
+        self._despertar.set()
+
+    def proxima_execucao(self) -> Optional[float]:
+        """
+        Horário da próxima execução agendada.
+
+        Returns:
+            float: Horário (no relógio do agendador), ou None sem tópicos agendados
+        """
+        with self._trava:
+            if self._vencidos:
+                return self._vencidos[0][1]
+            return self._agendados[0][0] if self._agendados else None
+
+    def _versao_fresca(self, agendado: TopicoAgendado, agora: float) -> Optional[float]:
+        """Horário em que a versão armazenada do tópico vence, se ainda estiver fresca."""
+        if self._armazem is None:
+            return None
+        try:
+            ultima = self._armazem.ultima_versao(agendado.topico)
+        except Exception as e:
+            logger.warning(f"Falha ao consultar o armazém para '{agendado.topico}': {e}")
+            return None
+        if ultima is None or agora - ultima.gerado_em >= agendado.intervalo:
+            return None
+        return ultima.gerado_em + agendado.intervalo
+
+    def executar_pendentes(self) -> int:
+        """
+        Despacha os tópicos vencidos enquanto houver vaga no pool.
+
+        Returns:
+            int: Número de gerações iniciadas
+        """
+        agora = self._relogio()
+        iniciadas = 0
+        with self._trava:
+            while self._agendados and self._agendados[0][0] <= agora:
+                proximo, sequencia, entrada = heapq.heappop(self._agendados)
+                heapq.heappush(self._vencidos, (entrada.agendado.prioridade, proximo, sequencia, entrada))
+
+        while True:
+            with self._trava:
+                if not self._vencidos or self._em_andamento >= self.max_concorrencia:
+                    break
+                entrada = heapq.heappop(self._vencidos)[3]
+                self._em_andamento += 1
+
+            vence_em = self._versao_fresca(entrada.agendado, agora)
+            if vence_em is not None:
+                with self._trava:
+                    self._em_andamento -= 1
+                    self._contadores["frescos"] += 1
+                    janela = entrada.agendado.intervalo * self.jitter
+                    self._agendar(entrada, vence_em + self._aleatorio.uniform(0, janela))
+                obter_metricas().incrementar('agendador_execucoes_total', resultado='fresco')
+                continue
+
+            # Fora da trava: o callback roda na hora se a geração já tiver terminado
+            iniciadas += 1
+            futuro = self._executor.submit(self._gerar, entrada.agendado)
+            futuro.add_done_callback(lambda f, entrada=entrada: self._concluir(entrada, f))
+        return iniciadas
+
+    def _gerar(self, agendado: TopicoAgendado) -> Any:
+        if self._gerador is not None:
+            return self._gerador(agendado.topico)
+        if agendado.incremental and self._armazem is not None:
+            from briefing_incremental import criar_briefing_incremental
+            return criar_briefing_incremental(agendado.topico, armazem=self._armazem)
+        from deduplicacao_topicos import obter_gerador_deduplicado
+        return obter_gerador_deduplicado()(agendado.topico)
+
+    def _concluir(self, entrada: _Entrada, futuro: Future) -> None:
+        topico = entrada.agendado.topico
+        erro = futuro.exception()
+        falhou = erro is not None or futuro.result() is None
+        if erro is not None:
+            logger.warning(f"Falha ao atualizar '{topico}': {erro}")
+        elif falhou:
+            logger.warning(f"Falha ao atualizar '{topico}': briefing não gerado")
+
+        espera = min(self.espera_falha, entrada.agendado.intervalo) if falhou else entrada.agendado.intervalo
+        with self._trava:
+            self._em_andamento -= 1
+            self._contadores["falhas" if falhou else "execucoes"] += 1
+            self._agendar(entrada, self._relogio() + self._desviar(espera))
+        obter_metricas().incrementar('agendador_execucoes_total', resultado='falha' if falhou else 'sucesso')
+        self._despertar.set()
+
+    def executar(self, duracao: Optional[float] = None) -> None:
+        """
+        Executa o laço do agendador até `parar()` ou até passar a duração.
+
+        Args:
+            duracao: Segundos de execução (None: até ser parado)
+        """
+        fim = None if duracao is None else time.monotonic() + duracao
+        while not self._parado.is_set():
+            self._despertar.clear()
+            self.executar_pendentes()
+
+            espera = ESPERA_MAXIMA_LACO
+            with self._trava:
+                if self._agendados and self._em_andamento < self.max_concorrencia:
+                    espera = min(espera, self._agendados[0][0] - self._relogio())
+            if fim is not None:
+                restante = fim - time.monotonic()
+                if restante <= 0:
+                    break
+                espera = min(espera, restante)
+            self._despertar.wait(max(0.0, espera))
+
+    def parar(self) -> None:
+        """Interrompe o laço de `executar` (as gerações em andamento continuam)."""
+        self._parado.set()
+        self._despertar.set()
+
+    def aguardar(self, timeout: Optional[float] = None) -> bool:
+        """
+        Aguarda até não haver gerações em andamento.
+
+        Args:
+            timeout: Tempo máximo de espera, em segundos
+
+        Returns:
+            bool: True se o pool ficou ocioso dentro do prazo
+        """
+        limite = None if timeout is None else time.monotonic() + timeout
+        while True:
+            with self._trava:
+                if self._em_andamento == 0:
+                    return True
+            if limite is not None and time.monotonic() >= limite:
+                return False
+            self._despertar.wait(0.01)
+
+    def estatisticas(self) -> Dict[str, int]:
+        """
+        Retorna os contadores do agendador.
+
+        Returns:
+            Dict[str, int]: topicos, vencidos, em_andamento, execucoes, falhas e frescos
+        """
+        with self._trava:
+            return {
+                "topicos": len(self._entradas),
+                "vencidos": len(self._vencidos),
+                "em_andamento": self._em_andamento,
+                **self._contadores,
+            }
+
+    def fechar(self, esperar: bool = True) -> None:
+        """
+        Para o agendador e encerra o pool.
+
+        Args:
+            esperar: Aguarda as gerações em andamento
+        """
+        self.parar()
+        self._executor.shutdown(wait=esperar)
+
+
+def iniciar_agendador(caminho: str, duracao: Optional[float] = None) -> None:
+    """
+    Carrega o arquivo de tópicos e executa o agendador até ser interrompido.
+
+    Args:
+        caminho: Arquivo de tópicos (YAML ou JSON)
+        duracao: Segundos de execução (None: até Ctrl+C)
+
+    Raises:
+        ValueError: Se o arquivo for inválido ou a GOOGLE_API_KEY não estiver configurada
+    """
+    import criar_briefing_noticias_v2 as v2
+
+    topicos = carregar_topicos(caminho)
+    v2.client.configurar()
+    agendador = AgendadorDeTopicos(
+        topicos,
+        max_concorrencia=int(os.getenv("AGENDADOR_CONCORRENCIA", CONCORRENCIA_PADRAO)),
+        jitter=float(os.getenv("AGENDADOR_JITTER", JITTER_PADRAO)),
+        espera_falha=float(os.getenv("AGENDADOR_ESPERA_FALHA", ESPERA_FALHA_PADRAO)),
+    )
+    print(f"🗓️  Agendador com {len(topicos)} tópicos (concorrência: {agendador.max_concorrencia})")
+    try:
+        agendador.executar(duracao)
+    except KeyboardInterrupt:
+        print("\n⏹️  Agendador interrompido pelo usuário")
+    finally:
+        agendador.fechar(esperar=False)
+        estatisticas = agendador.estatisticas()
+        print(f"📊 {estatisticas['execucoes']} atualizações, {estatisticas['falhas']} falhas, "
+              f"{estatisticas['frescos']} puladas por estarem frescas")
@@ -0,0 +1,521 @@
+"""
+Armazém Local de Briefings
+==========================
+
+Guarda os briefings gerados em SQLite, indexados para consulta:
+
+- `briefings`: um registro por briefing, com tópico, modelo, data de
+  geração e o JSON validado;
+- `artigos`: fonte normalizada de cada artigo (índice por fonte);
+- `briefings_fts`: índice FTS5 do tópico, títulos, fontes, resumos e
+  análise, para busca textual (sem distinção de acentos e maiúsculas);
+- `versoes`: histórico de versões por tópico pedido (normalizado), usado
+  pelos briefings incrementais (`briefing_incremental.py`).
+
+O identificador de cada briefing é derivado do momento da geração
+(milissegundos × IDS_POR_MS + sequência), então a ordem dos ids é a ordem
+cronológica: um período vira um intervalo de ids, que as três tabelas
+(inclusive o FTS5, pelo rowid) percorrem já ordenado, e "os mais recentes"
+param no limite pedido em vez de ordenar todos os resultados.
+
+Diferente do cache (`cache_briefing.py`), nada expira: o armazém é o
+histórico consultável. Use `remover_anteriores` para reter só um período.
+
+Configuração via variáveis de ambiente:
+    BRIEFING_ARMAZEM_PATH: Caminho do arquivo SQLite (ativa o armazém padrão,
+        que passa a receber cada briefing gerado pela v2)
+
+Exemplo:
+    >>> armazem = ArmazemDeBriefings("briefings.sqlite3")
+    >>> recentes = armazem.consultar(fonte="Reuters", desde=time.time() - 24 * 3600)
+    >>> sobre_chips = armazem.consultar(texto="semicondutores exportação")
+"""
+
+import json
+import logging
+import os
+import sqlite3
+import threading
+import time
+from dataclasses import dataclass
+from typing import Any, Iterable, List, Optional, Tuple
+
+from cache_briefing import normalizar_topico
+
+logger = logging.getLogger(__name__)
+
+LIMITE_PADRAO = 50
+ORDEM_RECENTES = "recentes"
+ORDEM_RELEVANCIA = "relevancia"
+ORDENS = (ORDEM_RECENTES, ORDEM_RELEVANCIA)
+LOTE_IMPORTACAO = 1000
+# Quanto uma escrita espera pela trava de outro processo antes de falhar, em ms
+ESPERA_TRAVA_MS = 30000
+# Briefings distintos no mesmo milissegundo (o id cabe em 63 bits até 2262)
+IDS_POR_MS = 1 << 20
+
+_ESQUEMA = """
+CREATE TABLE IF NOT EXISTS briefings (
+    id INTEGER PRIMARY KEY,
+    topico TEXT NOT NULL,
+    modelo TEXT,
+    gerado_em REAL NOT NULL,
+    conteudo TEXT NOT NULL
+);
+CREATE INDEX IF NOT EXISTS idx_briefings_modelo ON briefings(modelo, id);
+CREATE TABLE IF NOT EXISTS artigos (
+    briefing_id INTEGER NOT NULL,
+    fonte TEXT NOT NULL,
+    PRIMARY KEY (fonte, briefing_id)
+) WITHOUT ROWID;
+CREATE INDEX IF NOT EXISTS idx_artigos_briefing ON artigos(briefing_id);
+CREATE TABLE IF NOT EXISTS versoes (
+    topico TEXT NOT NULL,
+    versao INTEGER NOT NULL,
+    briefing_id INTEGER NOT NULL,
+    incrementos INTEGER NOT NULL DEFAULT 0,
+    PRIMARY KEY (topico, versao)
+) WITHOUT ROWID;
+CREATE INDEX IF NOT EXISTS idx_versoes_briefing ON versoes(briefing_id);
+CREATE VIRTUAL TABLE IF NOT EXISTS briefings_fts USING fts5(
+    topico, titulos, fontes, resumos, analise,
+    tokenize = 'unicode61 remove_diacritics 2'
+);
+"""
+
+
+@dataclass
+class BriefingArmazenado:
+    """
+    Briefing devolvido por uma consulta ao armazém.
+
+    Attributes:
+        id: Identificador no armazém
+        topico: Tópico central do briefing
+        modelo: Modelo que gerou o briefing (None se desconhecido)
+        gerado_em: Momento da geração (segundos desde a época)
+        briefing: BriefingDeNoticias validado
+        versao: Número da versão do tópico (apenas em `versoes`)
+        incrementos: Atualizações incrementais desde a última geração
+            completa (apenas em `versoes`)
+    """
+    id: int
+    topico: str
+    modelo: Optional[str]
+    gerado_em: float
+    briefing: Any
+    versao: Optional[int] = None
+    incrementos: Optional[int] = None
+
+
+def _expressao_fts(texto: str) -> str:
+    """
+    Converte o texto digitado em uma expressão FTS5 segura.
+
+    Cada palavra vira um termo entre aspas (todos obrigatórios); uma
+    palavra terminada em `*` busca pelo prefixo.
+
+    Raises:
+        ValueError: Se o texto não tiver nenhuma palavra
+    """
+    termos = []
+    for palavra in texto.split():
+        prefixo = palavra.endswith("*")
+        palavra = palavra.rstrip("*")
+        if palavra:
+            termos.append('"' + palavra.replace('"', '""') + '"' + ("*" if prefixo else ""))
+    if not termos:
+        raise ValueError("Texto de busca vazio")
+    return " ".join(termos)
+
+
+def _id_do_momento(momento: float) -> int:
+    """Menor id possível para um briefing gerado em `momento`."""
+    return int(momento * 1000) * IDS_POR_MS
+
+
+def _dados_do_briefing(briefing: Any) -> Tuple[str, dict]:
+    """JSON e dicionário do briefing (modelo Pydantic ou dict)."""
+    if hasattr(briefing, "model_dump_json"):
+        return briefing.model_dump_json(), briefing.model_dump()
+    return json.dumps(briefing, ensure_ascii=False), briefing
+
+
+class ArmazemDeBriefings:
+    """
+    Histórico de briefings em SQLite com índices por fonte, data, modelo e texto.
+
+    Seguro para uso entre threads; vários processos podem compartilhar o
+    arquivo graças ao modo WAL do SQLite. As escritas abrem a transação com
+    `BEGIN IMMEDIATE`: a trava de escrita é obtida antes da leitura do
+    próximo id (e da próxima versão), e um processo que a encontre ocupada
+    aguarda até ESPERA_TRAVA_MS em vez de falhar com "database is locked".
+
+    Attributes:
+        caminho: Caminho do arquivo SQLite
+    """
+
+    def __init__(self, caminho: str):
+        self.caminho = caminho
+        self._trava = threading.Lock()
+
+        diretorio = os.path.dirname(os.path.abspath(caminho))
+        os.makedirs(diretorio, exist_ok=True)
+
+        self._conexao = sqlite3.connect(caminho, check_same_thread=False, isolation_level=None)
+        self._conexao.execute(f"PRAGMA busy_timeout={ESPERA_TRAVA_MS}")
+        self._conexao.execute("PRAGMA journal_mode=WAL")
+        self._conexao.execute("PRAGMA synchronous=NORMAL")
+        try:
+            self._conexao.executescript(_ESQUEMA)
+        except sqlite3.OperationalError as e:
+            self._conexao.close()
+            if "fts5" in str(e).lower():
+                raise RuntimeError("O SQLite desta instalação não tem suporte a FTS5") from e
+            raise
+
+    def _inserir(
+        self,
+        briefing: Any,
+        modelo: Optional[str],
+        gerado_em: Optional[float],
+        topico_pedido: Optional[str] = None,
+        incrementos: int = 0,
+    ) -> int:
+        """Insere um briefing nas tabelas (chamar com a trava, dentro de uma transação)."""
+        conteudo, dados = _dados_do_briefing(briefing)
+        gerado_em = time.time() if gerado_em is None else gerado_em
+        artigos = dados.get("artigos") or []
+
+        inicio = _id_do_momento(gerado_em)
+        (ultimo,) = self._conexao.execute(
+            "SELECT MAX(id) FROM briefings WHERE id >= ? AND id < ?", (inicio, inicio + IDS_POR_MS)
+        ).fetchone()
+        briefing_id = inicio if ultimo is None else ultimo + 1
+
+        self._conexao.execute(
+            "INSERT INTO briefings (id, topico, modelo, gerado_em, conteudo) VALUES (?, ?, ?, ?, ?)",
+            (briefing_id, dados.get("topico_central", ""), modelo, gerado_em, conteudo),
+        )
+        self._conexao.executemany(
+            "INSERT OR IGNORE INTO artigos (briefing_id, fonte) VALUES (?, ?)",
+            [(briefing_id, normalizar_topico(a.get("fonte", ""))) for a in artigos],
+        )
+        self._conexao.execute(
+            "INSERT INTO briefings_fts (rowid, topico, titulos, fontes, resumos, analise) "
+            "VALUES (?, ?, ?, ?, ?, ?)",
+            (
+                briefing_id,
+                dados.get("topico_central", ""),
+                "\n".join(a.get("titulo", "") for a in artigos),
+                "\n".join(a.get("fonte", "") for a in artigos),
+                "\n".join(a.get("resumo_curto", "") for a in artigos),
+                dados.get("analise_sintetizada", ""),
+            ),
+        )
+        if topico_pedido is not None:
+            self._conexao.execute(
+                "INSERT INTO versoes (topico, versao, briefing_id, incrementos) "
+                "SELECT ?, COALESCE(MAX(versao), 0) + 1, ?, ? FROM versoes WHERE topico = ?",
+                (normalizar_topico(topico_pedido), briefing_id, incrementos, normalizar_topico(topico_pedido)),
+            )
+        return briefing_id
+
+    def adicionar(
+        self,
+        briefing: Any,
+        modelo: Optional[str] = None,
+        gerado_em: Optional[float] = None,
+        topico_pedido: Optional[str] = None,
+        incrementos: int = 0,
+    ) -> Optional[int]:
+        """
+        Armazena um briefing.
+
+        Args:
+            briefing: BriefingDeNoticias (ou dict com os mesmos campos)
+            modelo: Modelo que gerou o briefing
+            gerado_em: Momento da geração (padrão: agora)
+            topico_pedido: Tópico pedido; se informado, o briefing vira a
+                próxima versão desse tópico
+            incrementos: Atualizações incrementais desde a última geração completa
+
+        Returns:
+            int: Identificador do briefing, ou None se a gravação falhar
+        """
+        with self._trava:
+            try:
+                self._conexao.execute("BEGIN IMMEDIATE")
+                try:
+                    briefing_id = self._inserir(briefing, modelo, gerado_em, topico_pedido, incrementos)
+                except BaseException:
+                    self._conexao.execute("ROLLBACK")
+                    raise
+                self._conexao.execute("COMMIT")
+                return briefing_id
+            except sqlite3.Error as e:
+                logger.warning(f"Erro ao gravar no armazém: {e}")
+                return None
+
+    def adicionar_varios(self, itens: Iterable[Tuple[Any, Optional[str], Optional[float]]]) -> int:
+        """
+        Armazena vários briefings em transações de até LOTE_IMPORTACAO itens.
+
+        Args:
+            itens: Tuplas (briefing, modelo, gerado_em)
+
+        Returns:
+            int: Quantidade de briefings armazenados
+        """
+        total = 0
+        lote = []
+        for item in itens:
+            lote.append(item)
+            if len(lote) >= LOTE_IMPORTACAO:
+                total += self._adicionar_lote(lote)
+                lote = []
+        if lote:
+            total += self._adicionar_lote(lote)
+        return total
+
+    def _adicionar_lote(self, lote: List[Tuple[Any, Optional[str], Optional[float]]]) -> int:
+        with self._trava:
+            self._conexao.execute("BEGIN IMMEDIATE")
+            try:
+                for briefing, modelo, gerado_em in lote:
+                    self._inserir(briefing, modelo, gerado_em)
+            except BaseException:
+                self._conexao.execute("ROLLBACK")
+                raise
+            self._conexao.execute("COMMIT")
+            return len(lote)
+
+    def importar_jsonl(self, diretorio: str, prefixo: Optional[str] = None) -> int:
+        """
+        Importa os briefings gravados em segmentos JSONL (`armazenamento_jsonl.py`).
+
+        Args:
+            diretorio: Diretório dos segmentos
+            prefixo: Início do nome dos arquivos (padrão: o do gravador)
+
+        Returns:
+            int: Quantidade de briefings importados
+        """
+        from armazenamento_jsonl import PREFIXO_PADRAO, ler_registros
+
+        registros = ler_registros(diretorio, prefixo or PREFIXO_PADRAO)
+        return self.adicionar_varios(
+            (registro["briefing"], registro.get("modelo"), registro.get("gravado_em"))
+            for registro in registros
+        )
+
+    def consultar(
+        self,
+        texto: Optional[str] = None,
+        fonte: Optional[str] = None,
+        topico: Optional[str] = None,
+        modelo: Optional[str] = None,
+        desde: Optional[float] = None,
+        ate: Optional[float] = None,
+        limite: int = LIMITE_PADRAO,
+        ordem: str = ORDEM_RECENTES,
+    ) -> List[BriefingArmazenado]:
+        """
+        Busca briefings combinando os filtros informados (todos opcionais).
+
+        Args:
+            texto: Palavras buscadas em tópico, títulos, fontes, resumos e análise
+            fonte: Nome de uma fonte citada (comparação exata, sem distinguir maiúsculas)
+            topico: Palavras buscadas apenas no tópico central
+            modelo: Modelo que gerou o briefing
+            desde: Gerados a partir deste momento (segundos desde a época)
+            ate: Gerados até este momento
+            limite: Número máximo de resultados
+            ordem: "recentes" ou "relevancia" (requer texto ou tópico)
+
+        Returns:
+            List[BriefingArmazenado]: Briefings encontrados
+
+        Raises:
+            ValueError: Se a ordem for inválida ou um texto de busca for vazio
+        """
+        from criar_briefing_noticias_v2 import BriefingDeNoticias
+
+        if ordem not in ORDENS:
+            raise ValueError(f"Ordem desconhecida: {ordem} (use {', '.join(ORDENS)})")
+
+        condicoes = []
+        valores: List[Any] = []
+        expressoes = []
+        if texto is not None:
+            expressoes.append(_expressao_fts(texto))
+        if topico is not None:
+            expressoes.append(f"topico : ({_expressao_fts(topico)})")
+
+        # A tabela mais seletiva conduz a consulta e o seu id dá o intervalo e a ordem
+        colunas = "b.id, b.topico, b.modelo, b.gerado_em, b.conteudo"
+        if expressoes:
+            sql = f"SELECT {colunas} FROM briefings_fts AS f JOIN briefings AS b ON b.id = f.rowid"
+            chave = "f.rowid"
+            condicoes.append("briefings_fts MATCH ?")
+            valores.append(" AND ".join(expressoes))
+        elif fonte is not None:
+            sql = f"SELECT {colunas} FROM artigos AS a JOIN briefings AS b ON b.id = a.briefing_id"
+            chave = "a.briefing_id"
+        else:
+            sql = f"SELECT {colunas} FROM briefings AS b"
+            chave = "b.id"
+
+        if fonte is not None:
+            if expressoes:
+                condicoes.append("EXISTS (SELECT 1 FROM artigos WHERE fonte = ? AND briefing_id = b.id)")
+            else:
+                condicoes.append("a.fonte = ?")
+            valores.append(normalizar_topico(fonte))
+        if modelo is not None:
+            condicoes.append("b.modelo = ?")
+            valores.append(modelo)
+        if desde is not None:
+            condicoes.append(f"{chave} >= ? AND b.gerado_em >= ?")
+            valores.extend([_id_do_momento(desde), desde])
+        if ate is not None:
+            condicoes.append(f"{chave} < ? AND b.gerado_em <= ?")
+            valores.extend([_id_do_momento(ate) + IDS_POR_MS, ate])
+
+        if condicoes:
+            sql += " WHERE " + " AND ".join(condicoes)
+        if ordem == ORDEM_RELEVANCIA and expressoes:
+            sql += " ORDER BY f.rank"
+        else:
+            sql += f" ORDER BY {chave} DESC"
+        sql += " LIMIT ?"
+        valores.append(limite)
+
+        with self._trava:
+            linhas = self._conexao.execute(sql, valores).fetchall()
+        return [
+            BriefingArmazenado(id, topico_central, nome_modelo, gerado_em,
+                               BriefingDeNoticias.model_validate_json(conteudo))
+            for id, topico_central, nome_modelo, gerado_em, conteudo in linhas
+        ]
+
+    def obter(self, briefing_id: int) -> Optional[BriefingArmazenado]:
+        """
+        Retorna um briefing pelo identificador.
+
+        Args:
+            briefing_id: Identificador devolvido por `adicionar`
+
+        Returns:
+            BriefingArmazenado: Briefing encontrado, ou None
+        """
+        from criar_briefing_noticias_v2 import BriefingDeNoticias
+
+        with self._trava:
+            linha = self._conexao.execute(
+                "SELECT id, topico, modelo, gerado_em, conteudo FROM briefings WHERE id = ?",
+                (briefing_id,),
+            ).fetchone()
+        if linha is None:
+            return None
+        return BriefingArmazenado(*linha[:4], BriefingDeNoticias.model_validate_json(linha[4]))
+
+    def versoes(self, topico: str, limite: int = LIMITE_PADRAO) -> List[BriefingArmazenado]:
+        """
+        Histórico de versões de um tópico pedido, da mais recente para a mais antiga.
+
+        Args:
+            topico: Tópico pedido (comparado após normalização)
+            limite: Número máximo de versões
+
+        Returns:
+            List[BriefingArmazenado]: Versões, com `versao` e `incrementos` preenchidos
+        """
+        from criar_briefing_noticias_v2 import BriefingDeNoticias
+
+        with self._trava:
+            linhas = self._conexao.execute(
+                "SELECT b.id, b.topico, b.modelo, b.gerado_em, b.conteudo, v.versao, v.incrementos "
+                "FROM versoes AS v JOIN briefings AS b ON b.id = v.briefing_id "
+                "WHERE v.topico = ? ORDER BY v.versao DESC LIMIT ?",
+                (normalizar_topico(topico), limite),
+            ).fetchall()
+        return [
+            BriefingArmazenado(id, topico_central, nome_modelo, gerado_em,
+                               BriefingDeNoticias.model_validate_json(conteudo), versao, incrementos)
+            for id, topico_central, nome_modelo, gerado_em, conteudo, versao, incrementos in linhas
+        ]
+
+    def ultima_versao(self, topico: str) -> Optional[BriefingArmazenado]:
+        """
+        Versão mais recente de um tópico pedido.
+
+        Args:
+            topico: Tópico pedido
+
+        Returns:
+            BriefingArmazenado: Última versão, ou None se o tópico não tiver versões
+        """
+        versoes = self.versoes(topico, limite=1)
+        return versoes[0] if versoes else None
+
+    def remover_anteriores(self, antes: float) -> int:
+        """
+        Remove os briefings gerados antes de um momento.
+
+        Args:
+            antes: Limite (segundos desde a época)
+
+        Returns:
+            int: Quantidade de briefings removidos
+        """
+        with self._trava:
+            self._conexao.execute("BEGIN IMMEDIATE")
+            try:
+                # Ids abaixo do primeiro id do milissegundo de `antes` são todos anteriores
+                limite = _id_do_momento(antes)
+                self._conexao.execute("DELETE FROM briefings_fts WHERE rowid < ?", (limite,))
+                self._conexao.execute("DELETE FROM artigos WHERE briefing_id < ?", (limite,))
+                self._conexao.execute("DELETE FROM versoes WHERE briefing_id < ?", (limite,))
+                removidos = self._conexao.execute("DELETE FROM briefings WHERE id < ?", (limite,)).rowcount
+            except BaseException:
+                self._conexao.execute("ROLLBACK")
+                raise
+            self._conexao.execute("COMMIT")
+            return removidos
+
+    def contar(self) -> int:
+        """Número de briefings armazenados."""
+        with self._trava:
+            (total,) = self._conexao.execute("SELECT COUNT(*) FROM briefings").fetchone()
+            return total
+
+    def fechar(self) -> None:
+        """Fecha a conexão com o banco."""
+        with self._trava:
+            self._conexao.close()
+
+
+_armazem_padrao: Optional[ArmazemDeBriefings] = None
+_trava_padrao = threading.Lock()
+
+
+def obter_armazem() -> Optional[ArmazemDeBriefings]:
+    """
+    Retorna o armazém compartilhado do processo, se configurado.
+
+    O armazém só é ativado quando BRIEFING_ARMAZEM_PATH está definida.
+
+    Returns:
+        ArmazemDeBriefings: Instância compartilhada, ou None se desativado
+    """
+    global _armazem_padrao
+    caminho = os.getenv("BRIEFING_ARMAZEM_PATH")
+    if not caminho:
+        return None
+
+    with _trava_padrao:
+        if _armazem_padrao is None or _armazem_padrao.caminho != caminho:
+            _armazem_padrao = ArmazemDeBriefings(caminho)
+            logger.info(f"Armazém de briefings ativado em '{caminho}'")
+        return _armazem_padrao
@@ -0,0 +1,403 @@
+"""
+Armazenamento de Briefings em JSONL
+===================================
+
+Grava briefings como linhas JSON anexadas a arquivos de segmento, em vez
+de um arquivo por briefing. As linhas ficam em um buffer e são escritas
+em lote (a cada `tamanho_lote` registros ou `intervalo_descarga`
+segundos); quando o segmento passa de `tamanho_max_segmento` bytes, um
+novo é aberto. Os segmentos podem ser comprimidos com gzip ou, se o
+pacote `zstandard` estiver instalado, com zstd.
+
+Cada linha tem o formato:
+
+    {"gravado_em": 1700000000.0, "topico": "...", "briefing": {...}}
+
+A leitura percorre os segmentos em ordem, em blocos, sem carregar um
+segmento inteiro na memória; a última linha de um segmento interrompido
+(queda do processo no meio de um lote) é descartada.
+
+Exemplo:
+    >>> with GravadorJsonl("dados/briefings", compressao="gzip") as gravador:
+    ...     gravador.gravar(briefing, topico="energia solar")
+    >>> for registro in ler_registros("dados/briefings"):
+    ...     print(registro["topico"])
+"""
+
+import atexit
+import glob
+import gzip
+import json
+import logging
+import os
+import threading
+import time
+import zlib
+from typing import Any, Callable, Dict, Iterator, List, Optional
+
+try:
+    import zstandard
+except ImportError:  # compressão zstd é opcional
+    zstandard = None
+
+logger = logging.getLogger(__name__)
+
+COMPRESSAO_NENHUMA = "nenhuma"
+COMPRESSAO_GZIP = "gzip"
+COMPRESSAO_ZSTD = "zstd"
+EXTENSOES = {
+    COMPRESSAO_NENHUMA: ".jsonl",
+    COMPRESSAO_GZIP: ".jsonl.gz",
+    COMPRESSAO_ZSTD: ".jsonl.zst",
+}
+
+# fsync após cada lote, só ao fechar um segmento, ou nunca (fica com o sistema operacional)
+FSYNC_LOTE = "lote"
+FSYNC_SEGMENTO = "segmento"
+FSYNC_NUNCA = "nunca"
+POLITICAS_FSYNC = (FSYNC_LOTE, FSYNC_SEGMENTO, FSYNC_NUNCA)
+
+PREFIXO_PADRAO = "briefings"
+TAMANHO_LOTE_PADRAO = 256
+INTERVALO_DESCARGA_PADRAO = 1.0
+TAMANHO_MAX_SEGMENTO_PADRAO = 64 * 1024 * 1024
+NIVEL_GZIP = 6
+NIVEL_ZSTD = 3
+TAMANHO_BLOCO_LEITURA = 64 * 1024
+# wbits do zlib para ler o formato gzip (cabeçalho e rodapé)
+ZLIB_GZIP = 16 + zlib.MAX_WBITS
+_ERROS_LEITURA = (zlib.error, OSError) + ((zstandard.ZstdError,) if zstandard is not None else ())
+
+
+def _validar_compressao(compressao: str) -> None:
+    if compressao not in EXTENSOES:
+        raise ValueError(f"Compressão desconhecida: {compressao} (use {', '.join(EXTENSOES)})")
+    if compressao == COMPRESSAO_ZSTD and zstandard is None:
+        raise ValueError("Compressão zstd requer o pacote 'zstandard' (pip install zstandard)")
+
+
+class _Segmento:
+    """Arquivo de segmento aberto para escrita."""
+
+    def __init__(self, caminho: str, compressao: str):
+        self.caminho = caminho
+        self.compressao = compressao
+        self.tamanho = 0
+        # "x": dois gravadores nunca escrevem no mesmo segmento
+        self._bruto = open(caminho, "xb")
+        if compressao == COMPRESSAO_GZIP:
+            self._saida = gzip.GzipFile(fileobj=self._bruto, mode="wb", compresslevel=NIVEL_GZIP)
+        elif compressao == COMPRESSAO_ZSTD:
+            self._saida = zstandard.ZstdCompressor(level=NIVEL_ZSTD).stream_writer(self._bruto)
+        else:
+            self._saida = self._bruto
+
+    def escrever(self, dados: bytes) -> None:
+        self._saida.write(dados)
+        self.tamanho += len(dados)
+
+    def descarregar(self, fsync: bool) -> None:
+        """Leva o lote até o arquivo (blocos comprimidos legíveis sem fechar o segmento)."""
+        if self.compressao == COMPRESSAO_GZIP:
+            self._saida.flush()
+        elif self.compressao == COMPRESSAO_ZSTD:
+            self._saida.flush(zstandard.FLUSH_BLOCK)
+        self._bruto.flush()
+        if fsync:
+            os.fsync(self._bruto.fileno())
+
+    def fechar(self, fsync: bool) -> None:
+        if self.compressao == COMPRESSAO_GZIP:
+            self._saida.close()
+        elif self.compressao == COMPRESSAO_ZSTD:
+            self._saida.flush(zstandard.FLUSH_FRAME)
+        self._bruto.flush()
+        if fsync:
+            os.fsync(self._bruto.fileno())
+        self._bruto.close()
+
+
+class GravadorJsonl:
+    """
+    Gravador de briefings em segmentos JSONL rotativos, seguro entre threads.
+
+    Registros ainda no buffer só chegam ao disco no próximo lote, em
+    `descarregar()` ou em `fechar()`; use o gravador como gerenciador de
+    contexto ou feche-o ao terminar.
+
+    Attributes:
+        diretorio: Diretório dos segmentos
+        prefixo: Início do nome dos arquivos de segmento
+        compressao: "nenhuma", "gzip" ou "zstd"
+        tamanho_lote: Registros acumulados antes de escrever
+        intervalo_descarga: Segundos máximos entre escritas (verificado a cada registro)
+        tamanho_max_segmento: Bytes (sem compressão) a partir dos quais um novo segmento é aberto
+        fsync: Política de fsync: "lote", "segmento" ou "nunca"
+    """
+
+    def __init__(
+        self,
+        diretorio: str,
+        prefixo: str = PREFIXO_PADRAO,
+        compressao: str = COMPRESSAO_NENHUMA,
+        tamanho_lote: int = TAMANHO_LOTE_PADRAO,
+        intervalo_descarga: float = INTERVALO_DESCARGA_PADRAO,
+        tamanho_max_segmento: int = TAMANHO_MAX_SEGMENTO_PADRAO,
+        fsync: str = FSYNC_SEGMENTO,
+        relogio: Callable[[], float] = time.monotonic,
+    ):
+        _validar_compressao(compressao)
+        if fsync not in POLITICAS_FSYNC:
+            raise ValueError(f"Política de fsync desconhecida: {fsync} (use {', '.join(POLITICAS_FSYNC)})")
+
+        self.diretorio = diretorio
+        self.prefixo = prefixo
+        self.compressao = compressao
+        self.tamanho_lote = max(1, tamanho_lote)
+        self.intervalo_descarga = intervalo_descarga
+        self.tamanho_max_segmento = tamanho_max_segmento
+        self.fsync = fsync
+        self._relogio = relogio
+        self._trava = threading.Lock()
+        self._buffer: List[bytes] = []
+        self._ultima_descarga = relogio()
+        self._segmento: Optional[_Segmento] = None
+        self._sequencia = 0
+        self._fechado = False
+        self._registros = 0
+        self._lotes = 0
+        self._segmentos = 0
+        self._bytes = 0
+        os.makedirs(diretorio, exist_ok=True)
+
+    def __enter__(self) -> "GravadorJsonl":
+        return self
+
+    def __exit__(self, tipo, valor, rastreamento) -> bool:
+        self.fechar()
+        return False
+
+    def gravar(self, briefing: Any, **metadados: Any) -> None:
+        """
+        Anexa um briefing ao buffer (e escreve o lote, se for a hora).
+
+        Args:
+            briefing: BriefingDeNoticias (ou outro modelo Pydantic) ou dict
+            **metadados: Campos extras do registro (ex: topico, modelo)
+
+        Raises:
+            ValueError: Se o gravador já estiver fechado
+        """
+        if hasattr(briefing, "model_dump_json"):
+            dados = briefing.model_dump_json()
+        else:
+            dados = json.dumps(briefing, ensure_ascii=False)
+        cabecalho = {"gravado_em": round(time.time(), 3), **metadados}
+        linha = json.dumps(cabecalho, ensure_ascii=False)[:-1] + ', "briefing": ' + dados + "}\n"
+
+        with self._trava:
+            if self._fechado:
+                raise ValueError("Gravador JSONL já fechado")
+            self._buffer.append(linha.encode("utf-8"))
+            self._registros += 1
+            if len(self._buffer) >= self.tamanho_lote or \
+                    self._relogio() - self._ultima_descarga >= self.intervalo_descarga:
+                self._descarregar()
+
+    def descarregar(self) -> None:
+        """Escreve imediatamente os registros do buffer."""
+        with self._trava:
+            self._descarregar()
+
+    def _descarregar(self) -> None:
+        self._ultima_descarga = self._relogio()
+        if not self._buffer:
+            return
+        if self._segmento is None or self._segmento.tamanho >= self.tamanho_max_segmento:
+            self._rotacionar()
+        dados = b"".join(self._buffer)
+        self._buffer.clear()
+        self._segmento.escrever(dados)
+        self._segmento.descarregar(fsync=self.fsync == FSYNC_LOTE)
+        self._lotes += 1
+        self._bytes += len(dados)
+
+    def _rotacionar(self) -> None:
+        if self._segmento is not None:
+            self._segmento.fechar(fsync=self.fsync != FSYNC_NUNCA)
+            logger.debug(f"Segmento fechado: {self._segmento.caminho}")
+        while True:
+            self._sequencia += 1
+            nome = (
+                f"{self.prefixo}-{time.strftime('%Y%m%d-%H%M%S')}-{os.getpid()}-"
+                f"{self._sequencia:06d}{EXTENSOES[self.compressao]}"
+            )
+            try:
+                self._segmento = _Segmento(os.path.join(self.diretorio, nome), self.compressao)
+                break
+            except FileExistsError:
+                continue
+        self._segmentos += 1
+
+    def fechar(self) -> None:
+        """Escreve o buffer e fecha o segmento atual."""
+        with self._trava:
+            if self._fechado:
+                return
+            self._descarregar()
+            if self._segmento is not None:
+                self._segmento.fechar(fsync=self.fsync != FSYNC_NUNCA)
+                self._segmento = None
+            self._fechado = True
+
+    def estatisticas(self) -> Dict[str, int]:
+        """
+        Retorna os contadores do gravador.
+
+        Returns:
+            Dict[str, int]: registros, lotes escritos, segmentos abertos,
+                bytes escritos (sem compressão) e registros pendentes no buffer
+        """
+        with self._trava:
+            return {
+                "registros": self._registros,
+                "lotes": self._lotes,
+                "segmentos": self._segmentos,
+                "bytes": self._bytes,
+                "pendentes": len(self._buffer),
+            }
+
+
+def listar_segmentos(diretorio: str, prefixo: str = PREFIXO_PADRAO) -> List[str]:
+    """
+    Lista os segmentos do diretório em ordem de criação.
+
+    Args:
+        diretorio: Diretório dos segmentos
+        prefixo: Início do nome dos arquivos
+
+    Returns:
+        List[str]: Caminhos dos segmentos
+    """
+    caminhos = []
+    for extensao in EXTENSOES.values():
+        caminhos.extend(glob.glob(os.path.join(glob.escape(diretorio), f"{glob.escape(prefixo)}-*{extensao}")))
+    return sorted(caminhos, key=os.path.basename)
+
+
+def _blocos(caminho: str) -> Iterator[bytes]:
+    """
+    Conteúdo descomprimido do segmento, em blocos.
+
+    O gzip é lido com `zlib` em vez do módulo `gzip`, que descarta os
+    lotes já descarregados de um segmento ainda aberto (sem o rodapé).
+    """
+    with open(caminho, "rb") as bruto:
+        if caminho.endswith(EXTENSOES[COMPRESSAO_GZIP]):
+            descompressor = zlib.decompressobj(ZLIB_GZIP)
+            for bloco in iter(lambda: bruto.read(TAMANHO_BLOCO_LEITURA), b""):
+                while bloco:
+                    yield descompressor.decompress(bloco)
+                    # Arquivo com vários membros gzip concatenados
+                    bloco = descompressor.unused_data
+                    if bloco:
+                        descompressor = zlib.decompressobj(ZLIB_GZIP)
+        elif caminho.endswith(EXTENSOES[COMPRESSAO_ZSTD]):
+            _validar_compressao(COMPRESSAO_ZSTD)
+            leitor = zstandard.ZstdDecompressor().stream_reader(bruto, read_across_frames=True)
+            yield from iter(lambda: leitor.read(TAMANHO_BLOCO_LEITURA), b"")
+        else:
+            yield from iter(lambda: bruto.read(TAMANHO_BLOCO_LEITURA), b"")
+
+
+def _linhas(caminho: str) -> Iterator[bytes]:
+    """Linhas completas do segmento; o trecho após a última quebra de linha é descartado."""
+    resto = b""
+    try:
+        for bloco in _blocos(caminho):
+            linhas = (resto + bloco).split(b"\n")
+            resto = linhas.pop()
+            yield from linhas
+    except _ERROS_LEITURA as e:
+        logger.warning(f"Leitura interrompida em {caminho}: {e}")
+        return
+    if resto.strip():
+        # Segmento interrompido no meio de uma linha
+        logger.warning(f"Linha incompleta descartada no fim de {caminho}")
+
+
+def ler_registros(diretorio: str, prefixo: str = PREFIXO_PADRAO) -> Iterator[Dict[str, Any]]:
+    """
+    Percorre os registros de todos os segmentos, sem carregar um segmento inteiro.
+
+    Segmentos ainda abertos por um gravador também podem ser lidos (até o
+    último lote descarregado); linhas inválidas são ignoradas com um aviso.
+
+    Args:
+        diretorio: Diretório dos segmentos
+        prefixo: Início do nome dos arquivos
+
+    Yields:
+        Dict[str, Any]: Registro com gravado_em, metadados e briefing
+    """
+    for caminho in listar_segmentos(diretorio, prefixo):
+        for linha in _linhas(caminho):
+            if not linha.strip():
+                continue
+            try:
+                yield json.loads(linha)
+            except ValueError:
+                logger.warning(f"Linha inválida ignorada em {caminho}")
+
+
+def ler_briefings(diretorio: str, prefixo: str = PREFIXO_PADRAO) -> Iterator[Any]:
+    """
+    Percorre os briefings gravados, já validados.
+
+    Args:
+        diretorio: Diretório dos segmentos
+        prefixo: Início do nome dos arquivos
+
+    Yields:
+        BriefingDeNoticias: Briefings na ordem de gravação
+    """
+    from criar_briefing_noticias_v2 import BriefingDeNoticias
+
+    for registro in ler_registros(diretorio, prefixo):
+        yield BriefingDeNoticias(**registro["briefing"])
+
+
+_gravador_padrao: Optional[GravadorJsonl] = None
+_trava_padrao = threading.Lock()
+
+
+def obter_gravador_jsonl() -> Optional[GravadorJsonl]:
+    """
+    Retorna o gravador JSONL do processo, se configurado.
+
+    Ativado por BRIEFING_JSONL_DIR; BRIEFING_JSONL_COMPRESSAO,
+    BRIEFING_JSONL_FSYNC, BRIEFING_JSONL_LOTE e BRIEFING_JSONL_SEGMENTO_MB
+    ajustam o comportamento. O gravador é fechado ao fim do processo.
+
+    Returns:
+        GravadorJsonl: Instância compartilhada, ou None se desativado
+    """
+    global _gravador_padrao
+    diretorio = os.getenv("BRIEFING_JSONL_DIR")
+    if not diretorio:
+        return None
+
+    with _trava_padrao:
+        if _gravador_padrao is None or _gravador_padrao.diretorio != diretorio:
+            if _gravador_padrao is not None:
+                _gravador_padrao.fechar()
+            _gravador_padrao = GravadorJsonl(
+                diretorio,
+                compressao=os.getenv("BRIEFING_JSONL_COMPRESSAO", COMPRESSAO_NENHUMA),
+                fsync=os.getenv("BRIEFING_JSONL_FSYNC", FSYNC_SEGMENTO),
+                tamanho_lote=int(os.getenv("BRIEFING_JSONL_LOTE", TAMANHO_LOTE_PADRAO)),
+                tamanho_max_segmento=int(float(os.getenv("BRIEFING_JSONL_SEGMENTO_MB", 64)) * 1024 * 1024),
+            )
+            atexit.register(_gravador_padrao.fechar)
+            logger.info(f"Gravação de briefings em JSONL ativada em '{diretorio}'")
+        return _gravador_padrao
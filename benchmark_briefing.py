@@ -0,0 +1,291 @@
+"""
+Benchmark Offline do Pipeline de Briefings
+==========================================
+
+Mede o custo do próprio pipeline (`criar_briefing_avancado`, extração do
+JSON, validação Pydantic, cache e gravação em disco) com o backend Gemini
+falso, sem rede e sem API key.
+
+Relata briefings/s, latências p50/p95/p99, chamadas e tokens por briefing
+e pico de memória (RSS). Com --agrupado K, os tópicos são pedidos em
+grupos de até K por chamada (ver `briefing_agrupado.py`). Cada
+execução é anexada a um arquivo JSONL com o commit atual, para que
+regressões entre commits fiquem visíveis; a saída compara com a última
+execução de mesma configuração.
+
+Execute com: python run.py --bench
+         ou: python benchmark_briefing.py [--briefings 200] [--concorrencia 4]
+                 [--latencia 0.0] [--taxa-erro 0.0] [--respostas gravadas.jsonl]
+                 [--agrupado 8] [--max-saida 30000]
+"""
+
+import argparse
+import json
+import logging
+import os
+import subprocess
+import sys
+import tempfile
+import time
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import asdict
+from datetime import datetime
+from typing import Any, Dict, List, Optional
+
+from gemini_falso import BackendGeminiFalso, ConfiguracaoFalsa, carregar_respostas
+
+ARQUIVO_RESULTADOS_PADRAO = "benchmark_resultados.jsonl"
+
+
+def percentil(valores: List[float], p: float) -> float:
+    """
+    Percentil por interpolação linear.
+
+    Args:
+        valores: Amostras (não precisam estar ordenadas)
+        p: Percentil entre 0 e 100
+
+    Returns:
+        float: Valor do percentil (0.0 se não houver amostras)
+    """
+    if not valores:
+        return 0.0
+    ordenados = sorted(valores)
+    posicao = (len(ordenados) - 1) * p / 100
+    inferior = int(posicao)
+    superior = min(inferior + 1, len(ordenados) - 1)
+    return ordenados[inferior] + (ordenados[superior] - ordenados[inferior]) * (posicao - inferior)
+
+
+def pico_rss_mb() -> Optional[float]:
+    """
+    Pico de memória residente do processo, em MB.
+
+    Returns:
+        float: Pico de RSS, ou None onde o módulo `resource` não existe (Windows)
+    """
+    try:
+        import resource
+    except ImportError:
+        return None
+    pico = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # Linux informa em KB; macOS, em bytes
+    return pico / (1024 * 1024) if sys.platform == "darwin" else pico / 1024
+
+
+def commit_atual() -> Optional[str]:
+    """Retorna o hash curto do commit atual, ou None fora de um repositório git."""
+    try:
+        resultado = subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"],
+            capture_output=True, text=True, check=True,
+            cwd=os.path.dirname(os.path.abspath(__file__)),
+        )
+    except (OSError, subprocess.CalledProcessError):
+        return None
+    return resultado.stdout.strip() or None
+
+
+def executar_benchmark(
+    briefings: int = 200,
+    concorrencia: int = 1,
+    config: Optional[ConfiguracaoFalsa] = None,
+    agrupado: int = 0,
+) -> Dict[str, Any]:
+    """
+    Gera briefings com o backend falso e mede o desempenho.
+
+    Cada tópico é único, então toda geração passa pelo modelo, pela
+    validação e pela gravação no cache e em arquivo. A latência de um
+    briefing é o tempo até ele ficar disponível (no modo agrupado, o da
+    chamada do seu grupo).
+
+    Args:
+        briefings: Número de briefings a gerar
+        concorrencia: Threads gerando em paralelo
+        config: Comportamento do backend falso
+        agrupado: Tópicos por chamada no modo agrupado (0 = uma chamada por tópico)
+
+    Returns:
+        Dict[str, Any]: Métricas da execução
+    """
+    import criar_briefing_noticias_v2 as v2
+    from briefing_agrupado import EmpacotadorDeTopicos
+    from cache_briefing import CacheDeBriefings
+
+    config = config or ConfiguracaoFalsa()
+    backend = BackendGeminiFalso(config)
+    latencias: List[float] = []
+    falhas = 0
+
+    with tempfile.TemporaryDirectory() as diretorio:
+        cache = CacheDeBriefings(os.path.join(diretorio, "cache.sqlite3"), max_entradas=briefings + 1)
+
+        empacotador = EmpacotadorDeTopicos(k_maximo=agrupado) if agrupado else None
+
+        def salvar(indice: int, briefing: Any) -> bool:
+            if briefing is not None:
+                caminho = os.path.join(diretorio, f"briefing_{indice}.json")
+                with open(caminho, "w", encoding="utf-8") as f:
+                    f.write(briefing.model_dump_json(indent=2))
+            return briefing is not None
+
+        def gerar(indice: int) -> int:
+            inicio = time.perf_counter()
+            briefing = v2.criar_briefing_avancado(f"tópico de benchmark {indice}", cache=cache)
+            sucesso = salvar(indice, briefing)
+            latencias.append(time.perf_counter() - inicio)
+            return 0 if sucesso else 1
+
+        def gerar_grupo(primeiro: int) -> int:
+            inicio = time.perf_counter()
+            indices = range(primeiro, min(primeiro + agrupado, briefings))
+            topicos = [f"tópico de benchmark {i}" for i in indices]
+            resultado = empacotador.gerar(topicos, cache=cache)
+            falhas_grupo = sum(1 for i, t in zip(indices, topicos) if not salvar(i, resultado.get(t)))
+            latencias.extend([time.perf_counter() - inicio] * len(topicos))
+            return falhas_grupo
+
+        v2.client.usar_backend(backend)
+        try:
+            inicio = time.perf_counter()
+            with ThreadPoolExecutor(max_workers=max(1, concorrencia)) as executor:
+                if empacotador is not None:
+                    falhas = sum(executor.map(gerar_grupo, range(0, briefings, agrupado)))
+                else:
+                    falhas = sum(executor.map(gerar, range(briefings)))
+            duracao = time.perf_counter() - inicio
+        finally:
+            v2.client.usar_backend(None)
+            cache.fechar()
+
+    return {
+        "briefings": briefings,
+        "falhas": falhas,
+        "duracao_s": duracao,
+        "briefings_por_s": (briefings - falhas) / duracao if duracao else 0.0,
+        "p50_ms": percentil(latencias, 50) * 1000,
+        "p95_ms": percentil(latencias, 95) * 1000,
+        "p99_ms": percentil(latencias, 99) * 1000,
+        "pico_rss_mb": pico_rss_mb(),
+        "chamadas_modelo": backend.chamadas,
+        "chamadas_por_briefing": backend.chamadas / briefings if briefings else 0.0,
+        "tokens_entrada_por_briefing": backend.tokens_entrada / briefings if briefings else 0.0,
+        "tokens_saida_por_briefing": backend.tokens_saida / briefings if briefings else 0.0,
+        "erros_simulados": backend.erros,
+    }
+
+
+def registrar_resultado(resultado: Dict[str, Any], parametros: Dict[str, Any], caminho: str) -> Optional[Dict[str, Any]]:
+    """
+    Anexa a execução ao histórico e devolve a última com os mesmos parâmetros.
+
+    Args:
+        resultado: Métricas de `executar_benchmark`
+        parametros: Configuração usada (compõe a comparação)
+        caminho: Arquivo JSONL do histórico
+
+    Returns:
+        Dict[str, Any]: Registro anterior comparável, ou None
+    """
+    anterior = None
+    if os.path.exists(caminho):
+        with open(caminho, "r", encoding="utf-8") as f:
+            for linha in f:
+                try:
+                    registro = json.loads(linha)
+                except ValueError:
+                    continue
+                if registro.get("parametros") == parametros:
+                    anterior = registro
+
+    registro = {
+        "data": datetime.now().isoformat(timespec="seconds"),
+        "commit": commit_atual(),
+        "python": sys.version.split()[0],
+        "parametros": parametros,
+        "resultado": resultado,
+    }
+    with open(caminho, "a", encoding="utf-8") as f:
+        f.write(json.dumps(registro, ensure_ascii=False) + "\n")
+    return anterior
+
+
+def _variacao(atual: float, anterior: Optional[float]) -> str:
+    if not anterior:
+        return ""
+    return f" ({(atual - anterior) / anterior:+.1%})"
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    """Função principal."""
+    parser = argparse.ArgumentParser(description="Benchmark offline do pipeline de briefings")
+    parser.add_argument('--briefings', type=int, default=200,
+                        help='Briefings a gerar (padrão: 200)')
+    parser.add_argument('--concorrencia', type=int, default=1,
+                        help='Threads em paralelo (padrão: 1)')
+    parser.add_argument('--latencia', type=float, default=0.0,
+                        help='Latência simulada do modelo, em segundos (padrão: 0)')
+    parser.add_argument('--jitter', type=float, default=0.0,
+                        help='Latência extra aleatória, em segundos (padrão: 0)')
+    parser.add_argument('--taxa-erro', type=float, default=0.0,
+                        help='Probabilidade de erro 503 simulado (padrão: 0)')
+    parser.add_argument('--tamanho', type=int, default=1200,
+                        help='Tamanho da análise sintética, em caracteres (padrão: 1200)')
+    parser.add_argument('--agrupado', type=int, default=0,
+                        help='Tópicos por chamada no modo agrupado (padrão: 0, desligado)')
+    parser.add_argument('--max-saida', type=int, default=0,
+                        help='Trunca respostas com mais caracteres (simula o limite de saída)')
+    parser.add_argument('--respostas', type=str,
+                        help='Arquivo JSONL com respostas gravadas')
+    parser.add_argument('--resultados', type=str,
+                        default=os.getenv('BENCH_RESULTADOS', ARQUIVO_RESULTADOS_PADRAO),
+                        help=f'Histórico de execuções (padrão: {ARQUIVO_RESULTADOS_PADRAO})')
+    args = parser.parse_args(argv)
+
+    # Erros simulados são esperados; só mostrar logs se pedido
+    logging.basicConfig(level=getattr(logging, os.getenv('LOG_LEVEL', 'ERROR')))
+
+    # O benchmark mede o pipeline, não a cota da API
+    os.environ.setdefault('GEMINI_RPM', '1000000000')
+    os.environ.setdefault('GEMINI_TPM', '1000000000000')
+
+    config = ConfiguracaoFalsa(
+        latencia=args.latencia,
+        jitter=args.jitter,
+        taxa_erro=args.taxa_erro,
+        tamanho_analise=args.tamanho,
+        max_caracteres_saida=args.max_saida,
+        respostas=carregar_respostas(args.respostas) if args.respostas else [],
+    )
+    parametros = {
+        "briefings": args.briefings,
+        "concorrencia": args.concorrencia,
+        "agrupado": args.agrupado,
+        "backend": {k: v for k, v in asdict(config).items() if k != "respostas"},
+        "respostas": os.path.basename(args.respostas) if args.respostas else None,
+    }
+
+    print(f"⏱️  Gerando {args.briefings} briefings com o backend falso "
+          f"(concorrência {args.concorrencia})...")
+    resultado = executar_benchmark(args.briefings, args.concorrencia, config, args.agrupado)
+    anterior = registrar_resultado(resultado, parametros, args.resultados)
+    base = (anterior or {}).get("resultado", {})
+
+    print(f"  briefings/s   {resultado['briefings_por_s']:10.1f}{_variacao(resultado['briefings_por_s'], base.get('briefings_por_s'))}")
+    for chave in ("p50_ms", "p95_ms", "p99_ms"):
+        print(f"  {chave[:3]:<13} {resultado[chave]:10.2f} ms{_variacao(resultado[chave], base.get(chave))}")
+    print(f"  chamadas/brf  {resultado['chamadas_por_briefing']:10.2f}")
+    print(f"  tokens/brf    {resultado['tokens_entrada_por_briefing']:10.0f} entrada   "
+          f"{resultado['tokens_saida_por_briefing']:.0f} saída")
+    if resultado["pico_rss_mb"] is not None:
+        print(f"  pico RSS      {resultado['pico_rss_mb']:10.1f} MB")
+    print(f"  falhas        {resultado['falhas']:10d}")
+    if anterior:
+        print(f"📊 Comparado com o commit {anterior.get('commit')} ({anterior.get('data')})")
+    print(f"💾 Resultado anexado a {args.resultados}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,97 @@
+"""
+Benchmark de Tempo de Importação
+================================
+
+Mede, em subprocessos novos, quanto custa importar os módulos do projeto.
+O cenário "com SDK" reproduz o custo que toda importação da v2 pagava
+antes da inicialização preguiçosa (SDK google.generativeai carregado e
+configurado já no import).
+
+Execute com: python benchmark_importacao.py [--repeticoes 10]
+"""
+
+import argparse
+import os
+import statistics
+import subprocess
+import sys
+from typing import Dict, List
+
+CENARIOS = {
+    "v2 (inicialização preguiçosa)": "import criar_briefing_noticias_v2",
+    "v2 + SDK configurado (custo anterior)": (
+        "import criar_briefing_noticias_v2; "
+        "criar_briefing_noticias_v2.client.configurar()"
+    ),
+}
+
+
+def medir_importacao(codigo: str, repeticoes: int) -> List[float]:
+    """
+    Executa o código em subprocessos novos e mede o tempo de cada execução.
+
+    O tempo de inicialização do interpretador não entra na medição.
+
+    Args:
+        codigo: Código Python a executar
+        repeticoes: Número de execuções
+
+    Returns:
+        List[float]: Tempos em segundos
+    """
+    script = (
+        "import time, warnings\n"
+        "warnings.simplefilter('ignore')\n"
+        "inicio = time.perf_counter()\n"
+        f"{codigo}\n"
+        "print(time.perf_counter() - inicio)\n"
+    )
+    ambiente = os.environ.copy()
+    ambiente.setdefault("GOOGLE_API_KEY", "chave-de-benchmark")
+    diretorio = os.path.dirname(os.path.abspath(__file__))
+
+    tempos = []
+    for _ in range(repeticoes):
+        resultado = subprocess.run(
+            [sys.executable, "-c", script],
+            capture_output=True, text=True, env=ambiente, cwd=diretorio, check=True,
+        )
+        tempos.append(float(resultado.stdout.strip().splitlines()[-1]))
+    return tempos
+
+
+def executar_benchmark(repeticoes: int = 10) -> Dict[str, Dict[str, float]]:
+    """
+    Mede todos os cenários.
+
+    Args:
+        repeticoes: Execuções por cenário
+
+    Returns:
+        Dict[str, Dict[str, float]]: Mediana e mínimo (em ms) por cenário
+    """
+    resultados = {}
+    for nome, codigo in CENARIOS.items():
+        tempos = medir_importacao(codigo, repeticoes)
+        resultados[nome] = {
+            "mediana_ms": statistics.median(tempos) * 1000,
+            "minimo_ms": min(tempos) * 1000,
+        }
+    return resultados
+
+
+def main():
+    """Função principal."""
+    parser = argparse.ArgumentParser(description="Benchmark de tempo de importação")
+    parser.add_argument('--repeticoes', type=int, default=10,
+                        help='Execuções por cenário (padrão: 10)')
+    args = parser.parse_args()
+
+    print("⏱️  Medindo tempo de importação...")
+    for nome, metricas in executar_benchmark(args.repeticoes).items():
+        print(f"  {nome:<40} mediana {metricas['mediana_ms']:8.1f} ms   "
+              f"mínimo {metricas['minimo_ms']:8.1f} ms")
+
+
+if __name__ == "__main__":
+    main()
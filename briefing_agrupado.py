@@ -0,0 +1,321 @@
+"""
+Briefings Agrupados
+===================
+
+Para lotes de tópicos curtos, o custo fixo de cada chamada (conexão,
+preâmbulo do prompt, aquecimento do modelo) domina. O modo agrupado pede
+K briefings em uma única chamada, como um array JSON, valida cada item
+separadamente e recorre a chamadas individuais (`criar_briefing_avancado`)
+apenas para os tópicos cujo item faltou ou não passou na validação.
+
+K se adapta ao limite de saída do modelo: o tamanho médio observado de
+cada briefing define quantos cabem na resposta, e uma resposta truncada
+reduz K pela metade.
+
+Exemplo:
+    >>> empacotador = EmpacotadorDeTopicos()
+    >>> briefings = empacotador.gerar(["IA na saúde", "energia solar", "carros elétricos"])
+    >>> briefings["energia solar"].topico_central
+"""
+
+import json
+import logging
+import threading
+import time
+from typing import Any, Callable, Dict, List, Optional, Sequence, Tuple
+
+from cache_briefing import CacheDeBriefings, gerar_chave_cache, normalizar_topico, obter_cache_padrao
+from reparo_json import reparar_json
+from templates_prompt import TEMPLATE_AGRUPADO
+
+logger = logging.getLogger(__name__)
+
+# Limite de saída dos modelos Gemini 1.5/2.0 Flash, em tokens
+LIMITE_TOKENS_SAIDA = 8192
+# Fração do limite usada no cálculo de K (margem para variação de tamanho)
+MARGEM_SAIDA = 0.7
+K_MAXIMO_PADRAO = 8
+# Estimativa inicial de tokens por briefing, antes de observar respostas
+TOKENS_POR_BRIEFING_INICIAL = 900
+# Peso das novas observações na média de tokens por briefing
+ALFA_TAMANHO = 0.3
+
+
+def montar_prompt_agrupado(topicos: Sequence[str]) -> str:
+    """
+    Monta a parte variável do prompt que pede um briefing por tópico.
+
+    As instruções fixas ficam em `TEMPLATE_AGRUPADO.prefixo`.
+
+    Args:
+        topicos: Tópicos do grupo
+
+    Returns:
+        str: Lista numerada de tópicos
+    """
+    lista = "\n    ".join(f"{i}. tópico: '{topico}'" for i, topico in enumerate(topicos, 1))
+    return TEMPLATE_AGRUPADO.renderizar_sufixo(lista_topicos=lista)
+
+
+def separar_resposta(texto: str, quantidade: int) -> Tuple[Dict[int, Any], bool]:
+    """
+    Extrai e valida os briefings de uma resposta agrupada.
+
+    Args:
+        texto: Texto bruto da resposta
+        quantidade: Número de tópicos pedidos
+
+    Returns:
+        Tuple[Dict[int, Any], bool]: Briefings válidos por posição (a partir
+            de 0) e se a resposta estava completa (False se truncada ou ilegível)
+    """
+    from criar_briefing_noticias_v2 import BriefingDeNoticias
+
+    texto = texto.strip()
+    inicio = texto.find('[')
+    fim = texto.rfind(']') + 1
+    completa = True
+    try:
+        itens = json.loads(texto[inicio:fim] if inicio >= 0 and fim > inicio else texto)
+    except ValueError:
+        # Resposta truncada ou malformada: aproveita os itens que fecharam
+        try:
+            reparado = reparar_json(texto[inicio:] if inicio >= 0 else texto)
+            itens = json.loads(reparado.texto)
+        except ValueError:
+            return {}, False
+        completa = not reparado.truncado
+    if not isinstance(itens, list):
+        return {}, False
+
+    briefings: Dict[int, Any] = {}
+    for posicao, item in enumerate(itens):
+        if not isinstance(item, dict):
+            continue
+        dados = dict(item)
+        indice = dados.pop("indice", posicao + 1)
+        if not isinstance(indice, int) or not 1 <= indice <= quantidade or indice - 1 in briefings:
+            continue
+        try:
+            briefings[indice - 1] = BriefingDeNoticias(**dados)
+        except (ValueError, TypeError) as e:
+            logger.warning(f"Item {indice} da resposta agrupada inválido: {e}")
+    return briefings, completa
+
+
+class EmpacotadorDeTopicos:
+    """
+    Gera briefings em grupos de K tópicos por chamada.
+
+    Attributes:
+        k_maximo: Maior número de tópicos por chamada
+        limite_tokens_saida: Limite de tokens da resposta do modelo
+    """
+
+    def __init__(
+        self,
+        k_maximo: int = K_MAXIMO_PADRAO,
+        limite_tokens_saida: int = LIMITE_TOKENS_SAIDA,
+        individual: Optional[Callable[[str], Any]] = None,
+    ):
+        self.k_maximo = k_maximo
+        self.limite_tokens_saida = limite_tokens_saida
+        self._individual = individual
+        self._trava = threading.Lock()
+        self._tokens_por_briefing = float(TOKENS_POR_BRIEFING_INICIAL)
+        self._teto_k = k_maximo
+        self._chamadas_agrupadas = 0
+        self._briefings_agrupados = 0
+        self._fallbacks_individuais = 0
+        self._truncamentos = 0
+
+    def calcular_k(self) -> int:
+        """
+        Número de tópicos que cabem na próxima chamada.
+
+        Returns:
+            int: K entre 1 e k_maximo
+        """
+        with self._trava:
+            cabem = int(self.limite_tokens_saida * MARGEM_SAIDA // self._tokens_por_briefing)
+            return max(1, min(self.k_maximo, self._teto_k, cabem))
+
+    def _registrar_resposta(self, texto: str, validos: int, completa: bool) -> None:
+        with self._trava:
+            self._chamadas_agrupadas += 1
+            self._briefings_agrupados += validos
+            if not completa:
+                self._truncamentos += 1
+                self._teto_k = max(1, self._teto_k // 2)
+            elif validos:
+                observado = len(texto) / 4 / validos
+                self._tokens_por_briefing += ALFA_TAMANHO * (observado - self._tokens_por_briefing)
+                self._teto_k = min(self.k_maximo, self._teto_k + 1)
+
+    def _chamar_grupo(self, topicos: Sequence[str], cache: Optional[CacheDeBriefings]) -> Tuple[Dict[int, Any], bool]:
+        """
+        Faz a chamada agrupada com fallback entre modelos.
+
+        Returns:
+            Tuple[Dict[int, Any], bool]: Itens válidos por posição e se a
+                resposta veio completa (False indica truncamento)
+        """
+        import criar_briefing_noticias_v2 as v2
+        from roteador_modelos import obter_roteador
+
+        prompt = montar_prompt_agrupado(topicos)
+        v2.client.configurar()
+        roteador = obter_roteador()
+
+        for nome_modelo in roteador.ordenar(v2.MODELOS_DISPONIVEIS):
+            inicio = time.perf_counter()
+            try:
+                response = v2._chamar_modelo(nome_modelo, prompt, prefixo=TEMPLATE_AGRUPADO.prefixo)
+                texto = response.text if response else ""
+            except Exception as e:
+                roteador.registrar_falha(nome_modelo)
+                logger.warning(f"Modelo {nome_modelo} não disponível para o grupo: {e}")
+                continue
+
+            briefings, completa = separar_resposta(texto or "", len(topicos))
+            self._registrar_resposta(texto or "", len(briefings), completa)
+            if not completa and not briefings:
+                # Outro modelo truncaria do mesmo jeito; o grupo será dividido
+                roteador.registrar_sucesso(nome_modelo, time.perf_counter() - inicio)
+                return {}, False
+            if not briefings:
+                roteador.registrar_falha(nome_modelo)
+                logger.warning(f"Resposta agrupada de {nome_modelo} sem itens válidos")
+                continue
+
+            roteador.registrar_sucesso(nome_modelo, time.perf_counter() - inicio)
+            for posicao, briefing in briefings.items():
+                self._salvar_no_cache(cache, topicos[posicao], nome_modelo, briefing)
+            return briefings, completa
+
+        return {}, True
+
+    def _salvar_no_cache(self, cache: Optional[CacheDeBriefings], topico: str, nome_modelo: str, briefing: Any) -> None:
+        if cache is not None:
+            import criar_briefing_noticias_v2 as v2
+            chave = gerar_chave_cache(topico, TEMPLATE_AGRUPADO.chave_cache(), nome_modelo, v2.TEMPERATURA_PADRAO)
+            cache.definir(chave, briefing.model_dump_json())
+
+    def _buscar_no_cache(self, cache: Optional[CacheDeBriefings], topico: str) -> Optional[Any]:
+        if cache is None:
+            return None
+        import criar_briefing_noticias_v2 as v2
+        encontrado = cache.obter_primeira(
+            gerar_chave_cache(topico, template.chave_cache(), nome_modelo, v2.TEMPERATURA_PADRAO)
+            for template in (v2.TEMPLATE_BRIEFING_JSON, v2.TEMPLATE_BRIEFING, TEMPLATE_AGRUPADO)
+            for nome_modelo in v2.MODELOS_DISPONIVEIS
+        )
+        if encontrado is None:
+            return None
+        try:
+            return v2.BriefingDeNoticias.model_validate_json(encontrado[1])
+        except ValueError:
+            return None
+
+    def gerar(
+        self,
+        topicos: Sequence[str],
+        cache: Optional[CacheDeBriefings] = None,
+    ) -> Dict[str, Optional[Any]]:
+        """
+        Gera briefings para os tópicos, agrupando as chamadas.
+
+        Tópicos repetidos (após normalização) são pedidos uma única vez e
+        tópicos já em cache não entram nos grupos.
+
+        Args:
+            topicos: Tópicos a pesquisar
+            cache: Cache de briefings (padrão: cache definido por BRIEFING_CACHE_PATH)
+
+        Returns:
+            Dict[str, Optional[BriefingDeNoticias]]: Briefing (ou None) por tópico pedido
+        """
+        if cache is None:
+            cache = obter_cache_padrao()
+        resultados: Dict[str, Optional[Any]] = {}
+        pendentes: List[str] = []
+        vistos = set()
+        for topico in topicos:
+            if not topico or not topico.strip() or normalizar_topico(topico) in vistos:
+                continue
+            vistos.add(normalizar_topico(topico))
+            em_cache = self._buscar_no_cache(cache, topico)
+            if em_cache is not None:
+                resultados[topico] = em_cache
+            else:
+                pendentes.append(topico)
+
+        while pendentes:
+            k = self.calcular_k()
+            grupo, pendentes = pendentes[:k], pendentes[k:]
+            if len(grupo) == 1:
+                resultados[grupo[0]] = self._gerar_individual(grupo[0], cache)
+                continue
+
+            logger.info(f"Gerando {len(grupo)} briefings em uma chamada")
+            briefings, completa = self._chamar_grupo(grupo, cache)
+            if not completa:
+                # Resposta truncada: K já foi reduzido; os itens aproveitados
+                # ficam e os que faltaram voltam à fila
+                for posicao, briefing in briefings.items():
+                    resultados[grupo[posicao]] = briefing
+                pendentes = [t for posicao, t in enumerate(grupo) if posicao not in briefings] + pendentes
+                continue
+            for posicao, topico in enumerate(grupo):
+                briefing = briefings.get(posicao)
+                resultados[topico] = briefing if briefing is not None else self._gerar_individual(topico, cache)
+
+        # Tópicos repetidos recebem o briefing da primeira ocorrência
+        por_normalizado = {normalizar_topico(t): b for t, b in resultados.items()}
+        return {t: por_normalizado.get(normalizar_topico(t)) for t in topicos if t and t.strip()}
+
+    def _gerar_individual(self, topico: str, cache: Optional[CacheDeBriefings]) -> Optional[Any]:
+        with self._trava:
+            self._fallbacks_individuais += 1
+        if self._individual is not None:
+            return self._individual(topico)
+        from criar_briefing_noticias_v2 import criar_briefing_avancado
+        return criar_briefing_avancado(topico, cache=cache)
+
+    def estatisticas(self) -> Dict[str, float]:
+        """
+        Retorna os contadores do modo agrupado.
+
+        Returns:
+            Dict[str, float]: chamadas_agrupadas, briefings_agrupados,
+                fallbacks_individuais, truncamentos, tokens_por_briefing e k_atual
+        """
+        k_atual = self.calcular_k()
+        with self._trava:
+            return {
+                "chamadas_agrupadas": self._chamadas_agrupadas,
+                "briefings_agrupados": self._briefings_agrupados,
+                "fallbacks_individuais": self._fallbacks_individuais,
+                "truncamentos": self._truncamentos,
+                "tokens_por_briefing": round(self._tokens_por_briefing, 1),
+                "k_atual": k_atual,
+            }
+
+
+def criar_briefings_agrupados(
+    topicos: Sequence[str],
+    k_maximo: int = K_MAXIMO_PADRAO,
+    cache: Optional[CacheDeBriefings] = None,
+) -> Dict[str, Optional[Any]]:
+    """
+    Atalho para gerar um lote no modo agrupado.
+
+    Args:
+        topicos: Tópicos a pesquisar
+        k_maximo: Maior número de tópicos por chamada
+        cache: Cache de briefings (padrão: cache definido por BRIEFING_CACHE_PATH)
+
+    Returns:
+        Dict[str, Optional[BriefingDeNoticias]]: Briefing (ou None) por tópico
+    """
+    return EmpacotadorDeTopicos(k_maximo=k_maximo).gerar(topicos, cache=cache)
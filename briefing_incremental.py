@@ -0,0 +1,198 @@
+"""
+Briefings Incrementais
+======================
+
+Tópicos recorrentes (o mesmo assunto a cada hora) não precisam ser
+gerados do zero a cada vez. No modo incremental, a última versão do
+tópico é lida do armazém (`armazem_briefings.py`), o modelo recebe apenas
+os títulos e fontes já conhecidos e devolve só os artigos novos e a
+análise atualizada (`TEMPLATE_ATUALIZACAO`), e o resultado é mesclado em
+uma nova versão. Sem novidades, a versão anterior é devolvida sem gravar
+nada, e a resposta do modelo tem poucos tokens.
+
+Uma geração completa acontece quando o tópico não tem versão, quando a
+última versão é antiga demais ou depois de muitas atualizações seguidas
+(para a análise não se afastar indefinidamente de uma geração limpa).
+
+Requer o armazém (BRIEFING_ARMAZEM_PATH ou `armazem=`); sem ele, cada
+chamada é uma geração completa.
+
+Configuração via variáveis de ambiente:
+    BRIEFING_INCREMENTAL_IDADE_MAXIMA: Idade máxima, em segundos, da versão
+        que pode ser atualizada (padrão: 86400)
+    BRIEFING_INCREMENTAL_MAX_INCREMENTOS: Atualizações seguidas antes de uma
+        nova geração completa (padrão: 12)
+    BRIEFING_INCREMENTAL_MAX_ARTIGOS: Artigos mantidos por versão (padrão: 10)
+
+Exemplo:
+    >>> briefing = criar_briefing_incremental("energia solar")  # 1ª vez: completo
+    >>> briefing = criar_briefing_incremental("energia solar")  # depois: só o que mudou
+    >>> historico = obter_armazem().versoes("energia solar")
+"""
+
+import logging
+import os
+import time
+from typing import Any, Dict, Optional, Tuple
+
+from armazem_briefings import ArmazemDeBriefings, obter_armazem
+from cache_briefing import normalizar_topico
+from criar_briefing_noticias_v2 import (
+    AtualizacaoDeBriefing,
+    BriefingDeNoticias,
+    criar_briefing_avancado,
+    gerar_atualizacao,
+)
+from instrumentacao import obter_metricas
+from single_flight import GrupoSingleFlight
+
+logger = logging.getLogger(__name__)
+
+IDADE_MAXIMA_PADRAO = 24 * 3600
+MAX_INCREMENTOS_PADRAO = 12
+MAX_ARTIGOS_PADRAO = 10
+
+# Atualizações simultâneas do mesmo tópico gerariam versões concorrentes
+_single_flight = GrupoSingleFlight()
+
+
+def _chave_artigo(artigo: Any) -> Tuple[str, str]:
+    return normalizar_topico(artigo.titulo), normalizar_topico(artigo.fonte)
+
+
+def mesclar_atualizacao(
+    anterior: BriefingDeNoticias,
+    atualizacao: AtualizacaoDeBriefing,
+    max_artigos: int = MAX_ARTIGOS_PADRAO
+) -> Tuple[BriefingDeNoticias, int]:
+    """
+    Aplica uma atualização incremental sobre o briefing anterior.
+
+    Artigos já conhecidos (mesmo título e fonte, sem distinguir maiúsculas)
+    são descartados; os novos entram na frente e os mais antigos saem ao
+    passar de `max_artigos`. Campos omitidos na atualização mantêm o valor
+    anterior.
+
+    Args:
+        anterior: Última versão do briefing
+        atualizacao: Resposta do modelo
+        max_artigos: Número máximo de artigos na nova versão
+
+    Returns:
+        Tuple[BriefingDeNoticias, int]: Nova versão e quantidade de artigos realmente novos
+    """
+    conhecidos = {_chave_artigo(artigo) for artigo in anterior.artigos}
+    novos = []
+    for artigo in atualizacao.novos_artigos:
+        chave = _chave_artigo(artigo)
+        if chave not in conhecidos:
+            conhecidos.add(chave)
+            novos.append(artigo)
+
+    briefing = BriefingDeNoticias(
+        topico_central=anterior.topico_central,
+        artigos=(novos + list(anterior.artigos))[:max_artigos],
+        analise_sintetizada=atualizacao.analise_sintetizada or anterior.analise_sintetizada,
+        prompt_para_imagem=atualizacao.prompt_para_imagem or anterior.prompt_para_imagem,
+    )
+    return briefing, len(novos)
+
+
+def criar_briefing_incremental(
+    topico: str,
+    armazem: Optional[ArmazemDeBriefings] = None,
+    parametros: Optional[Dict[str, Any]] = None,
+    idade_maxima: Optional[float] = None,
+    max_incrementos: Optional[int] = None,
+    max_artigos: Optional[int] = None,
+) -> Optional[BriefingDeNoticias]:
+    """
+    Atualiza o briefing de um tópico recorrente, gerando-o do zero só quando preciso.
+
+    Args:
+        topico: O tema a ser pesquisado
+        armazem: Armazém com o histórico (padrão: BRIEFING_ARMAZEM_PATH)
+        parametros: Parâmetros extras do template, como `periodo`
+        idade_maxima: Idade máxima da versão atualizável, em segundos
+        max_incrementos: Atualizações seguidas antes de uma geração completa
+        max_artigos: Artigos mantidos por versão
+
+    Returns:
+        BriefingDeNoticias: Versão atual do briefing, ou None se a geração falhar
+
+    Raises:
+        ValueError: Se o tópico for vazio
+    """
+    if not topico or not topico.strip():
+        raise ValueError("O tópico não pode estar vazio")
+
+    if armazem is None:
+        armazem = obter_armazem()
+    if armazem is None:
+        logger.warning("Modo incremental sem armazém (BRIEFING_ARMAZEM_PATH); gerando briefing completo")
+        return criar_briefing_avancado(topico, parametros=parametros)
+
+    if idade_maxima is None:
+        idade_maxima = float(os.getenv("BRIEFING_INCREMENTAL_IDADE_MAXIMA", IDADE_MAXIMA_PADRAO))
+    if max_incrementos is None:
+        max_incrementos = int(os.getenv("BRIEFING_INCREMENTAL_MAX_INCREMENTOS", MAX_INCREMENTOS_PADRAO))
+    if max_artigos is None:
+        max_artigos = int(os.getenv("BRIEFING_INCREMENTAL_MAX_ARTIGOS", MAX_ARTIGOS_PADRAO))
+
+    return _single_flight.executar(
+        (armazem.caminho, normalizar_topico(topico)), _atualizar,
+        topico, armazem, parametros, idade_maxima, max_incrementos, max_artigos
+    )
+
+
+def _atualizar(
+    topico: str,
+    armazem: ArmazemDeBriefings,
+    parametros: Optional[Dict[str, Any]],
+    idade_maxima: float,
+    max_incrementos: int,
+    max_artigos: int,
+) -> Optional[BriefingDeNoticias]:
+    metricas = obter_metricas()
+    anterior = armazem.ultima_versao(topico)
+
+    motivo = None
+    if anterior is None:
+        motivo = "primeira versão"
+    elif time.time() - anterior.gerado_em > idade_maxima:
+        motivo = "versão anterior antiga demais"
+    elif anterior.incrementos >= max_incrementos:
+        motivo = f"{anterior.incrementos} atualizações seguidas"
+
+    if motivo is not None:
+        logger.info(f"Briefing completo para '{topico}' ({motivo})")
+        # Sem o cache: um briefing reaproveitado seria gravado como versão nova,
+        # com data de agora, e a idade das versões deixaria de valer
+        briefing = criar_briefing_avancado(topico, parametros=parametros, usar_cache=False)
+        if briefing is None:
+            metricas.incrementar('briefings_incrementais_total', resultado='falha')
+            return None
+        ultima = armazem.ultima_versao(topico)
+        if ultima is None or (anterior is not None and ultima.id == anterior.id):
+            # O armazém padrão da v2 é outro (ou não existe): registra a versão aqui
+            armazem.adicionar(briefing, topico_pedido=topico)
+        metricas.incrementar('briefings_incrementais_total', resultado='completo')
+        return briefing
+
+    try:
+        atualizacao, modelo = gerar_atualizacao(topico, anterior.briefing, parametros)
+    except ValueError as e:
+        logger.error(f"Falha na atualização incremental de '{topico}': {e}")
+        metricas.incrementar('briefings_incrementais_total', resultado='falha')
+        return None
+
+    briefing, novos = mesclar_atualizacao(anterior.briefing, atualizacao, max_artigos)
+    if briefing == anterior.briefing:
+        logger.info(f"Nenhuma novidade para '{topico}' (versão {anterior.versao} mantida)")
+        metricas.incrementar('briefings_incrementais_total', resultado='sem_novidades')
+        return anterior.briefing
+
+    armazem.adicionar(briefing, modelo=modelo, topico_pedido=topico, incrementos=anterior.incrementos + 1)
+    logger.info(f"Briefing de '{topico}' atualizado: {novos} artigos novos (versão {anterior.versao + 1})")
+    metricas.incrementar('briefings_incrementais_total', resultado='atualizado')
+    return briefing
@@ -0,0 +1,174 @@
+"""
+Geração Concorrente de Briefings em Lote
+========================================
+
+Executa `criar_briefing_avancado` para vários tópicos ao mesmo tempo,
+limitando a concorrência com um semáforo e entregando cada resultado
+assim que fica pronto. Falhas de um tópico são reportadas no próprio
+resultado e não interrompem o restante do lote.
+
+Exemplo:
+    >>> async for resultado in criar_briefings_em_lote(topicos, max_concorrencia=10):
+    ...     print(resultado.topico, resultado.sucesso)
+"""
+
+import asyncio
+import logging
+import time
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass
+from typing import Any, AsyncIterator, Callable, Iterable, List, Optional
+
+logger = logging.getLogger(__name__)
+
+MAX_CONCORRENCIA_PADRAO = 8
+
+
+@dataclass
+class ResultadoLote:
+    """
+    Resultado da geração de um tópico dentro de um lote.
+
+    Attributes:
+        topico: Tópico solicitado
+        briefing: Briefing gerado (None em caso de falha)
+        erro: Descrição do erro quando a geração falha
+        duracao: Tempo gasto na geração, em segundos
+    """
+    topico: str
+    briefing: Optional[Any] = None
+    erro: Optional[str] = None
+    duracao: float = 0.0
+
+    @property
+    def sucesso(self) -> bool:
+        """Indica se o briefing foi gerado."""
+        return self.briefing is not None
+
+
+def _gerador_padrao() -> Callable[[str], Any]:
+    """Importa o gerador da v2 (com deduplicação de tópicos) apenas quando o lote é executado."""
+    from deduplicacao_topicos import obter_gerador_deduplicado
+    return obter_gerador_deduplicado()
+
+
+async def criar_briefings_em_lote(
+    topicos: Iterable[str],
+    max_concorrencia: int = MAX_CONCORRENCIA_PADRAO,
+    gerador: Optional[Callable[[str], Any]] = None,
+    pos_processamento: Optional[Any] = None,
+) -> AsyncIterator[ResultadoLote]:
+    """
+    Gera briefings para vários tópicos de forma concorrente.
+
+    Cada resultado é entregue assim que sua geração termina, portanto a
+    ordem de saída não segue a ordem de entrada. O tempo total do lote
+    tende ao da chamada mais lenta, e não à soma de todas.
+
+    Args:
+        topicos: Tópicos a pesquisar
+        max_concorrencia: Número máximo de gerações simultâneas
+        gerador: Função que recebe um tópico e devolve um briefing (ou None).
+            Pode ser síncrona (executada em threads) ou uma corrotina.
+            Padrão: `criar_briefing_noticias_v2.criar_briefing_avancado`
+        pos_processamento: `EstagioPosProcessamento` que recebe cada briefing
+            gerado (renderização e gravação em outros processos). Se o
+            estágio estiver cheio, a vaga de geração espera sem bloquear o loop.
+            O estágio precisa de `ao_concluir`: o lote não coleta resultados
+            com `obter()`, e sem o callback as vagas nunca seriam liberadas.
+
+    Yields:
+        ResultadoLote: Resultado de cada tópico, na ordem de conclusão
+
+    Raises:
+        ValueError: Se max_concorrencia for menor que 1 ou o estágio de
+            pós-processamento não tiver `ao_concluir`
+    """
+    if max_concorrencia < 1:
+        raise ValueError("max_concorrencia deve ser pelo menos 1")
+    if pos_processamento is not None and getattr(pos_processamento, "ao_concluir", None) is None:
+        raise ValueError("O estágio de pós-processamento do lote precisa de ao_concluir")
+
+    topicos = list(topicos)
+    if not topicos:
+        return
+
+    if gerador is None:
+        gerador = _gerador_padrao()
+        from hedge_modelos import obter_executor_hedge
+        hedge = obter_executor_hedge()
+        if hedge is not None:
+            # Primários parados na fila do pool de hedge limitariam o lote
+            hedge.garantir_concorrencia(max_concorrencia)
+    assincrono = asyncio.iscoroutinefunction(gerador)
+    loop = asyncio.get_running_loop()
+    semaforo = asyncio.Semaphore(max_concorrencia)
+    executor = None if assincrono else ThreadPoolExecutor(
+        max_workers=max_concorrencia, thread_name_prefix="briefing-lote"
+    )
+
+    logger.info(f"Iniciando lote de {len(topicos)} tópicos (concorrência: {max_concorrencia})")
+
+    async def processar(topico: str) -> ResultadoLote:
+        async with semaforo:
+            inicio = time.perf_counter()
+            try:
+                if assincrono:
+                    briefing = await gerador(topico)
+                else:
+                    briefing = await loop.run_in_executor(executor, gerador, topico)
+            except Exception as e:
+                logger.warning(f"Falha no tópico '{topico}': {e}")
+                return ResultadoLote(
+                    topico=topico,
+                    erro=f"{type(e).__name__}: {e}",
+                    duracao=time.perf_counter() - inicio,
+                )
+
+            duracao = time.perf_counter() - inicio
+            if briefing is None:
+                return ResultadoLote(topico=topico, erro="Falha ao criar briefing", duracao=duracao)
+            if pos_processamento is not None:
+                await pos_processamento.enviar_async(briefing)
+            return ResultadoLote(topico=topico, briefing=briefing, duracao=duracao)
+
+    tarefas = [asyncio.ensure_future(processar(topico)) for topico in topicos]
+    try:
+        for proxima in asyncio.as_completed(tarefas):
+            yield await proxima
+    finally:
+        for tarefa in tarefas:
+            tarefa.cancel()
+        if executor is not None:
+            executor.shutdown(wait=False)
+
+
+def executar_lote(
+    topicos: Iterable[str],
+    max_concorrencia: int = MAX_CONCORRENCIA_PADRAO,
+    gerador: Optional[Callable[[str], Any]] = None,
+    ao_concluir: Optional[Callable[[ResultadoLote], None]] = None,
+    pos_processamento: Optional[Any] = None,
+) -> List[ResultadoLote]:
+    """
+    Versão síncrona de `criar_briefings_em_lote`.
+
+    Args:
+        topicos: Tópicos a pesquisar
+        max_concorrencia: Número máximo de gerações simultâneas
+        gerador: Função geradora (veja `criar_briefings_em_lote`)
+        ao_concluir: Callback chamado para cada resultado assim que fica pronto
+        pos_processamento: Estágio de pós-processamento (veja `criar_briefings_em_lote`)
+
+    Returns:
+        List[ResultadoLote]: Resultados na ordem de conclusão
+    """
+    async def coletar() -> List[ResultadoLote]:
+        resultados = []
+        async for resultado in criar_briefings_em_lote(topicos, max_concorrencia, gerador, pos_processamento):
+            if ao_concluir:
+                ao_concluir(resultado)
+            resultados.append(resultado)
+        return resultados
+
+    return asyncio.run(coletar())
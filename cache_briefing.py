@@ -0,0 +1,282 @@
+"""
+Cache Persistente de Briefings
+==============================
+
+Armazena em SQLite o JSON validado de cada `BriefingDeNoticias`,
+endereçado por um hash de (tópico normalizado, template do prompt,
+modelo, temperatura). Entradas expiram após um TTL e o cache é limitado
+por número de entradas e por tamanho total, descartando primeiro as
+entradas acessadas há mais tempo (LRU).
+
+Configuração via variáveis de ambiente:
+    BRIEFING_CACHE_PATH: Caminho do arquivo SQLite (ativa o cache padrão)
+    BRIEFING_CACHE_TTL: TTL em segundos (padrão: 3600)
+    BRIEFING_CACHE_MAX_ENTRADAS: Número máximo de entradas (padrão: 10000)
+"""
+
+import hashlib
+import json
+import logging
+import os
+import sqlite3
+import threading
+import time
+import unicodedata
+from typing import Dict, Iterable, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+TTL_PADRAO = 3600
+MAX_ENTRADAS_PADRAO = 10_000
+MAX_BYTES_PADRAO = 256 * 1024 * 1024
+
+
+def normalizar_topico(topico: str) -> str:
+    """
+    Normaliza um tópico para uso em chaves de cache.
+
+    Aplica normalização Unicode, converte para minúsculas e colapsa espaços.
+
+    Args:
+        topico: Tópico original
+
+    Returns:
+        str: Tópico normalizado
+    """
+    return " ".join(unicodedata.normalize("NFC", topico).lower().split())
+
+
+def gerar_chave_cache(topico: str, template: str, modelo: str, temperatura: float) -> str:
+    """
+    Gera a chave de conteúdo de um briefing.
+
+    Args:
+        topico: Tópico pesquisado
+        template: Texto do template de prompt usado na geração
+        modelo: Nome do modelo Gemini
+        temperatura: Temperatura de geração
+
+    Returns:
+        str: Hash SHA-256 hexadecimal
+    """
+    material = json.dumps(
+        [normalizar_topico(topico), template, modelo, round(float(temperatura), 4)],
+        ensure_ascii=False,
+    )
+    return hashlib.sha256(material.encode("utf-8")).hexdigest()
+
+
+class CacheDeBriefings:
+    """
+    Cache LRU com TTL persistido em SQLite.
+
+    Seguro para uso entre threads; vários processos podem compartilhar o
+    mesmo arquivo graças ao modo WAL do SQLite.
+
+    Attributes:
+        caminho: Caminho do arquivo SQLite
+        ttl: Tempo de vida das entradas, em segundos
+        max_entradas: Número máximo de entradas mantidas
+        max_bytes: Tamanho máximo somado dos conteúdos, em bytes
+    """
+
+    def __init__(
+        self,
+        caminho: str,
+        ttl: float = TTL_PADRAO,
+        max_entradas: int = MAX_ENTRADAS_PADRAO,
+        max_bytes: int = MAX_BYTES_PADRAO,
+    ):
+        self.caminho = caminho
+        self.ttl = ttl
+        self.max_entradas = max_entradas
+        self.max_bytes = max_bytes
+
+        self._trava = threading.Lock()
+        self._acertos = 0
+        self._faltas = 0
+        self._expirados = 0
+        self._despejos = 0
+
+        diretorio = os.path.dirname(os.path.abspath(caminho))
+        os.makedirs(diretorio, exist_ok=True)
+
+        self._conexao = sqlite3.connect(caminho, check_same_thread=False, isolation_level=None)
+        self._conexao.execute("PRAGMA journal_mode=WAL")
+        self._conexao.execute("PRAGMA synchronous=NORMAL")
+        self._conexao.execute(
+            """
+            CREATE TABLE IF NOT EXISTS briefings (
+                chave TEXT PRIMARY KEY,
+                conteudo TEXT NOT NULL,
+                tamanho INTEGER NOT NULL,
+                criado_em REAL NOT NULL,
+                acessado_em REAL NOT NULL
+            )
+            """
+        )
+        self._conexao.execute(
+            "CREATE INDEX IF NOT EXISTS idx_briefings_acessado ON briefings(acessado_em)"
+        )
+
+    def obter(self, chave: str) -> Optional[str]:
+        """
+        Busca o conteúdo associado a uma chave.
+
+        Args:
+            chave: Chave gerada por `gerar_chave_cache`
+
+        Returns:
+            str: JSON armazenado, ou None se ausente ou expirado
+        """
+        encontrado = self.obter_primeira([chave])
+        return None if encontrado is None else encontrado[1]
+
+    def obter_primeira(self, chaves: Iterable[str]) -> Optional[Tuple[str, str]]:
+        """
+        Busca a primeira chave presente entre várias variantes de uma mesma consulta.
+
+        Uma busca lógica (o mesmo tópico sob vários modelos ou templates)
+        conta um único acerto ou uma única falta, não uma por chave.
+
+        Args:
+            chaves: Chaves em ordem de preferência
+
+        Returns:
+            Tuple[str, str]: Chave encontrada e seu JSON, ou None se nenhuma estiver válida
+        """
+        agora = time.time()
+        with self._trava:
+            try:
+                for chave in chaves:
+                    linha = self._conexao.execute(
+                        "SELECT conteudo, criado_em FROM briefings WHERE chave = ?", (chave,)
+                    ).fetchone()
+                    if linha is None:
+                        continue
+
+                    conteudo, criado_em = linha
+                    if self.ttl is not None and agora - criado_em > self.ttl:
+                        self._conexao.execute("DELETE FROM briefings WHERE chave = ?", (chave,))
+                        self._expirados += 1
+                        continue
+
+                    self._conexao.execute(
+                        "UPDATE briefings SET acessado_em = ? WHERE chave = ?", (agora, chave)
+                    )
+                    self._acertos += 1
+                    return chave, conteudo
+            except sqlite3.Error as e:
+                logger.warning(f"Erro ao ler o cache: {e}")
+
+            self._faltas += 1
+            return None
+
+    def definir(self, chave: str, conteudo: str) -> None:
+        """
+        Armazena um conteúdo, descartando entradas antigas se necessário.
+
+        Args:
+            chave: Chave gerada por `gerar_chave_cache`
+            conteudo: JSON do briefing validado
+        """
+        agora = time.time()
+        tamanho = len(conteudo.encode("utf-8"))
+        with self._trava:
+            try:
+                self._conexao.execute(
+                    "INSERT OR REPLACE INTO briefings (chave, conteudo, tamanho, criado_em, acessado_em) "
+                    "VALUES (?, ?, ?, ?, ?)",
+                    (chave, conteudo, tamanho, agora, agora),
+                )
+                self._despejar()
+            except sqlite3.Error as e:
+                logger.warning(f"Erro ao gravar no cache: {e}")
+
+    def _despejar(self) -> None:
+        """Remove as entradas menos usadas até respeitar os limites (chamar com a trava)."""
+        entradas, total = self._conexao.execute(
+            "SELECT COUNT(*), COALESCE(SUM(tamanho), 0) FROM briefings"
+        ).fetchone()
+
+        excesso = max(0, entradas - self.max_entradas)
+        if total > self.max_bytes:
+            # Soma acumulada das entradas mais antigas até cobrir o excesso de bytes
+            liberar = total - self.max_bytes
+            acumulado = 0
+            contagem = 0
+            for (tamanho,) in self._conexao.execute(
+                "SELECT tamanho FROM briefings ORDER BY acessado_em"
+            ):
+                acumulado += tamanho
+                contagem += 1
+                if acumulado >= liberar:
+                    break
+            excesso = max(excesso, contagem)
+
+        if excesso:
+            self._conexao.execute(
+                "DELETE FROM briefings WHERE chave IN "
+                "(SELECT chave FROM briefings ORDER BY acessado_em LIMIT ?)",
+                (excesso,),
+            )
+            self._despejos += excesso
+            logger.debug(f"Cache: {excesso} entradas despejadas")
+
+    def limpar(self) -> None:
+        """Remove todas as entradas do cache."""
+        with self._trava:
+            self._conexao.execute("DELETE FROM briefings")
+
+    def estatisticas(self) -> Dict[str, int]:
+        """
+        Retorna os contadores do cache.
+
+        Returns:
+            Dict[str, int]: acertos, faltas, expirados, despejos e entradas atuais
+        """
+        with self._trava:
+            (entradas,) = self._conexao.execute("SELECT COUNT(*) FROM briefings").fetchone()
+            return {
+                "acertos": self._acertos,
+                "faltas": self._faltas,
+                "expirados": self._expirados,
+                "despejos": self._despejos,
+                "entradas": entradas,
+            }
+
+    def fechar(self) -> None:
+        """Fecha a conexão com o banco."""
+        with self._trava:
+            self._conexao.close()
+
+
+_cache_padrao: Optional[CacheDeBriefings] = None
+_trava_padrao = threading.Lock()
+
+
+def obter_cache_padrao() -> Optional[CacheDeBriefings]:
+    """
+    Retorna o cache compartilhado do processo, se configurado.
+
+    O cache só é ativado quando BRIEFING_CACHE_PATH está definida.
+
+    Returns:
+        CacheDeBriefings: Instância compartilhada, ou None se desativado
+    """
+    global _cache_padrao
+    caminho = os.getenv("BRIEFING_CACHE_PATH")
+    if not caminho:
+        return None
+
+    with _trava_padrao:
+        if _cache_padrao is None or _cache_padrao.caminho != caminho:
+            if _cache_padrao is not None:
+                _cache_padrao.fechar()
+            _cache_padrao = CacheDeBriefings(
+                caminho,
+                ttl=float(os.getenv("BRIEFING_CACHE_TTL", TTL_PADRAO)),
+                max_entradas=int(os.getenv("BRIEFING_CACHE_MAX_ENTRADAS", MAX_ENTRADAS_PADRAO)),
+            )
+            logger.info(f"Cache de briefings ativado em '{caminho}'")
+        return _cache_padrao
@@ -0,0 +1,396 @@
+"""
+Cache de Imagens Renderizadas
+=============================
+
+Tópicos relacionados costumam gerar `prompt_para_imagem` quase iguais, e
+cada um custaria uma nova chamada ao Imagen. Este módulo guarda o PNG de
+cada imagem gerada em disco, endereçado por um hash de (prompt
+normalizado, proporção, modelo). O índice fica em SQLite ao lado dos
+arquivos e o total de bytes é limitado, descartando primeiro as imagens
+usadas há mais tempo (LRU).
+
+Opcionalmente, um prompt que não esteja no cache pode reaproveitar a
+imagem de um prompt quase idêntico (mesma proporção e modelo), comparando
+as assinaturas de `deduplicacao_topicos` pela similaridade de Jaccard.
+
+Configuração via variáveis de ambiente:
+    IMAGEM_CACHE_DIR: Diretório do cache (ativa o cache padrão)
+    IMAGEM_CACHE_MAX_MB: Tamanho máximo das imagens, em MB (padrão: 512)
+    IMAGEM_CACHE_LIMIAR: Similaridade mínima para reaproveitar a imagem de
+        um prompt parecido (padrão: desativado, só prompts idênticos)
+"""
+
+import hashlib
+import json
+import logging
+import os
+import sqlite3
+import shutil
+import tempfile
+import threading
+import time
+import uuid
+from contextlib import contextmanager
+from typing import BinaryIO, Dict, Iterator, List, Optional, Tuple, Union
+
+from cache_briefing import normalizar_topico
+from deduplicacao_topicos import assinatura_topico, similaridade
+
+logger = logging.getLogger(__name__)
+
+MAX_BYTES_PADRAO = 512 * 1024 * 1024
+ARQUIVO_INDICE = "indice.sqlite3"
+TAMANHO_BLOCO_ESCRITA = 1024 * 1024
+
+
+def gerar_chave_imagem(prompt: str, proporcao: str, modelo: str) -> str:
+    """
+    Gera a chave de conteúdo de uma imagem.
+
+    Args:
+        prompt: Prompt enviado ao modelo de imagem
+        proporcao: Proporção da imagem (ex.: "16:9")
+        modelo: Nome do modelo de imagem
+
+    Returns:
+        str: Hash SHA-256 hexadecimal
+    """
+    material = json.dumps([normalizar_topico(prompt), proporcao, modelo], ensure_ascii=False)
+    return hashlib.sha256(material.encode("utf-8")).hexdigest()
+
+
+@contextmanager
+def arquivo_atomico(caminho: str) -> Iterator[BinaryIO]:
+    """
+    Abre um arquivo que só aparece no destino se for gravado por inteiro.
+
+    A escrita vai para um arquivo temporário no mesmo diretório, que
+    substitui o destino ao sair do bloco sem erro; gravações simultâneas no
+    mesmo caminho nunca deixam um arquivo misturado ou pela metade.
+
+    Args:
+        caminho: Caminho final do arquivo
+
+    Yields:
+        BinaryIO: Arquivo sem buffer, aberto para escrita binária
+    """
+    diretorio = os.path.dirname(os.path.abspath(caminho))
+    descritor, temporario = tempfile.mkstemp(dir=diretorio, prefix=".tmp_", suffix=".part")
+    try:
+        with open(descritor, "wb", buffering=0) as arquivo:
+            yield arquivo
+        os.replace(temporario, caminho)
+    except BaseException:
+        try:
+            os.unlink(temporario)
+        except OSError:
+            pass
+        raise
+
+
+def gravar_atomico(caminho: str, dados: Union[bytes, bytearray, memoryview]) -> None:
+    """
+    Grava um buffer em disco sem cópias intermediárias, por inteiro ou não grava.
+
+    O buffer vindo da API é escrito diretamente (via memoryview, sem
+    decodificar a imagem nem copiá-la para outro buffer).
+
+    Args:
+        caminho: Caminho final do arquivo
+        dados: Conteúdo do arquivo
+    """
+    visao = memoryview(dados).cast("B")
+    with arquivo_atomico(caminho) as arquivo:
+        escrito = 0
+        while escrito < len(visao):
+            # write em arquivo sem buffer pode gravar só parte do pedido
+            escrito += arquivo.write(visao[escrito:escrito + TAMANHO_BLOCO_ESCRITA])
+
+
+def copiar_atomico(origem: str, destino: str) -> None:
+    """
+    Publica uma cópia de um arquivo no destino, atomicamente.
+
+    Usa um hard link quando origem e destino estão no mesmo sistema de
+    arquivos (nenhum byte é copiado) e, caso contrário, a cópia do kernel
+    de `shutil.copyfile`.
+
+    Args:
+        origem: Arquivo existente
+        destino: Caminho final da cópia
+    """
+    if os.path.exists(destino) and os.path.samefile(origem, destino):
+        return
+
+    diretorio = os.path.dirname(os.path.abspath(destino))
+    temporario = os.path.join(diretorio, f".tmp_{uuid.uuid4().hex}.part")
+    try:
+        try:
+            os.link(origem, temporario)
+        except OSError:
+            shutil.copyfile(origem, temporario)
+        os.replace(temporario, destino)
+    finally:
+        # rename entre dois links do mesmo arquivo não remove a origem
+        try:
+            os.unlink(temporario)
+        except OSError:
+            pass
+
+
+class CacheDeImagens:
+    """
+    Cache LRU de imagens em disco, limitado por tamanho total.
+
+    Seguro para uso entre threads; vários processos podem compartilhar o
+    mesmo diretório graças ao modo WAL do SQLite e à gravação atômica.
+
+    Attributes:
+        diretorio: Diretório das imagens e do índice
+        max_bytes: Tamanho máximo somado das imagens, em bytes
+        limiar: Similaridade mínima para reaproveitar a imagem de um prompt
+            parecido (None: apenas prompts idênticos)
+    """
+
+    def __init__(self, diretorio: str, max_bytes: int = MAX_BYTES_PADRAO, limiar: Optional[float] = None):
+        self.diretorio = diretorio
+        self.max_bytes = max_bytes
+        self.limiar = limiar
+
+        self._trava = threading.Lock()
+        self._acertos = 0
+        self._aproximados = 0
+        self._faltas = 0
+        self._despejos = 0
+
+        os.makedirs(diretorio, exist_ok=True)
+        self._conexao = sqlite3.connect(
+            os.path.join(diretorio, ARQUIVO_INDICE), check_same_thread=False, isolation_level=None
+        )
+        self._conexao.execute("PRAGMA journal_mode=WAL")
+        self._conexao.execute("PRAGMA synchronous=NORMAL")
+        self._conexao.execute(
+            """
+            CREATE TABLE IF NOT EXISTS imagens (
+                chave TEXT PRIMARY KEY,
+                proporcao TEXT NOT NULL,
+                modelo TEXT NOT NULL,
+                assinatura TEXT NOT NULL,
+                tamanho INTEGER NOT NULL,
+                acessado_em REAL NOT NULL
+            )
+            """
+        )
+        self._conexao.execute("CREATE INDEX IF NOT EXISTS idx_imagens_acessado ON imagens(acessado_em)")
+        self._conexao.execute("CREATE INDEX IF NOT EXISTS idx_imagens_variante ON imagens(modelo, proporcao)")
+
+    def caminho(self, chave: str) -> str:
+        """Caminho do PNG de uma chave."""
+        return os.path.join(self.diretorio, f"{chave}.png")
+
+    def _buscar_parecida(self, prompt: str, candidatas: List[Tuple[str, str]]) -> Optional[str]:
+        """Chave da imagem de prompt mais parecido acima do limiar (chamar sem a trava)."""
+        assinatura = assinatura_topico(prompt)
+        if not assinatura:
+            return None
+        melhor, melhor_valor = None, 0.0
+        for chave, texto in candidatas:
+            valor = similaridade(assinatura, frozenset(texto.split()))
+            if valor > melhor_valor:
+                melhor, melhor_valor = chave, valor
+        if melhor is not None and melhor_valor >= self.limiar:
+            logger.debug(f"Imagem reaproveitada de prompt parecido (similaridade {melhor_valor:.2f})")
+            return melhor
+        return None
+
+    def obter(self, prompt: str, proporcao: str, modelo: str) -> Optional[str]:
+        """
+        Busca a imagem de um prompt.
+
+        Na falta da chave exata, as assinaturas candidatas são lidas com a
+        trava, mas comparadas fora dela, para não bloquear as demais leituras
+        e gravações do cache durante a varredura.
+
+        Args:
+            prompt: Prompt da imagem
+            proporcao: Proporção da imagem
+            modelo: Nome do modelo de imagem
+
+        Returns:
+            str: Caminho do PNG em cache, ou None se ausente
+        """
+        chave = gerar_chave_imagem(prompt, proporcao, modelo)
+        aproximada = False
+        try:
+            with self._trava:
+                linha = self._conexao.execute("SELECT chave FROM imagens WHERE chave = ?", (chave,)).fetchone()
+                candidatas = []
+                if linha is None and self.limiar is not None:
+                    candidatas = self._conexao.execute(
+                        "SELECT chave, assinatura FROM imagens WHERE modelo = ? AND proporcao = ?", (modelo, proporcao)
+                    ).fetchall()
+
+            if linha is None:
+                chave = self._buscar_parecida(prompt, candidatas) if candidatas else None
+                aproximada = chave is not None
+
+            with self._trava:
+                if chave is None:
+                    self._faltas += 1
+                    return None
+
+                if not os.path.exists(self.caminho(chave)):
+                    # Arquivo removido por fora do cache (ou despejado durante a comparação)
+                    self._conexao.execute("DELETE FROM imagens WHERE chave = ?", (chave,))
+                    self._faltas += 1
+                    return None
+
+                self._conexao.execute("UPDATE imagens SET acessado_em = ? WHERE chave = ?", (time.time(), chave))
+                if aproximada:
+                    self._aproximados += 1
+                else:
+                    self._acertos += 1
+                return self.caminho(chave)
+        except sqlite3.Error as e:
+            logger.warning(f"Erro ao ler o cache de imagens: {e}")
+            with self._trava:
+                self._faltas += 1
+            return None
+
+    def guardar(self, prompt: str, proporcao: str, modelo: str, dados: Union[bytes, memoryview]) -> str:
+        """
+        Armazena o PNG de um prompt, descartando imagens antigas se necessário.
+
+        Args:
+            prompt: Prompt da imagem
+            proporcao: Proporção da imagem
+            modelo: Nome do modelo de imagem
+            dados: Bytes do PNG
+
+        Returns:
+            str: Caminho do PNG em cache
+        """
+        chave = gerar_chave_imagem(prompt, proporcao, modelo)
+        gravar_atomico(self.caminho(chave), dados)
+        self._indexar(chave, prompt, proporcao, modelo, memoryview(dados).nbytes)
+        return self.caminho(chave)
+
+    def guardar_arquivo(self, prompt: str, proporcao: str, modelo: str, caminho: str) -> str:
+        """
+        Armazena um PNG já gravado em disco, sem regravar seus bytes.
+
+        Args:
+            prompt: Prompt da imagem
+            proporcao: Proporção da imagem
+            modelo: Nome do modelo de imagem
+            caminho: PNG a incluir no cache (é copiado por hard link quando possível)
+
+        Returns:
+            str: Caminho do PNG em cache
+        """
+        chave = gerar_chave_imagem(prompt, proporcao, modelo)
+        copiar_atomico(caminho, self.caminho(chave))
+        self._indexar(chave, prompt, proporcao, modelo, os.path.getsize(caminho))
+        return self.caminho(chave)
+
+    def _indexar(self, chave: str, prompt: str, proporcao: str, modelo: str, tamanho: int) -> None:
+        assinatura = " ".join(sorted(assinatura_topico(prompt)))
+        with self._trava:
+            try:
+                self._conexao.execute(
+                    "INSERT OR REPLACE INTO imagens (chave, proporcao, modelo, assinatura, tamanho, acessado_em) "
+                    "VALUES (?, ?, ?, ?, ?, ?)",
+                    (chave, proporcao, modelo, assinatura, tamanho, time.time()),
+                )
+                self._despejar(preservar=chave)
+            except sqlite3.Error as e:
+                logger.warning(f"Erro ao gravar no cache de imagens: {e}")
+
+    def _despejar(self, preservar: str) -> None:
+        """
+        Remove as imagens menos usadas até respeitar o limite (chamar com a trava).
+
+        A imagem recém-guardada nunca é despejada, pois seu caminho acabou de
+        ser devolvido a quem a guardou; se sozinha ela passar do limite, sai
+        na próxima gravação.
+
+        Args:
+            preservar: Chave da imagem recém-guardada
+        """
+        (total,) = self._conexao.execute("SELECT COALESCE(SUM(tamanho), 0) FROM imagens").fetchone()
+        if total <= self.max_bytes:
+            return
+
+        liberar = total - self.max_bytes
+        removidas = []
+        for chave, tamanho in self._conexao.execute(
+            "SELECT chave, tamanho FROM imagens WHERE chave != ? ORDER BY acessado_em", (preservar,)
+        ):
+            removidas.append(chave)
+            liberar -= tamanho
+            if liberar <= 0:
+                break
+
+        self._conexao.executemany("DELETE FROM imagens WHERE chave = ?", [(c,) for c in removidas])
+        for chave in removidas:
+            try:
+                os.unlink(self.caminho(chave))
+            except OSError:
+                pass
+        self._despejos += len(removidas)
+        logger.debug(f"Cache de imagens: {len(removidas)} imagens despejadas")
+
+    def estatisticas(self) -> Dict[str, int]:
+        """
+        Retorna os contadores do cache.
+
+        Returns:
+            Dict[str, int]: acertos, aproximados, faltas, despejos, entradas e bytes atuais
+        """
+        with self._trava:
+            entradas, total = self._conexao.execute(
+                "SELECT COUNT(*), COALESCE(SUM(tamanho), 0) FROM imagens"
+            ).fetchone()
+            return {
+                "acertos": self._acertos,
+                "aproximados": self._aproximados,
+                "faltas": self._faltas,
+                "despejos": self._despejos,
+                "entradas": entradas,
+                "bytes": total,
+            }
+
+    def fechar(self) -> None:
+        """Fecha a conexão com o índice."""
+        with self._trava:
+            self._conexao.close()
+
+
+_cache_padrao: Optional[CacheDeImagens] = None
+_trava_padrao = threading.Lock()
+
+
+def obter_cache_imagens() -> Optional[CacheDeImagens]:
+    """
+    Retorna o cache de imagens compartilhado do processo, se configurado.
+
+    O cache só é ativado quando IMAGEM_CACHE_DIR está definida.
+
+    Returns:
+        CacheDeImagens: Instância compartilhada, ou None se desativado
+    """
+    global _cache_padrao
+    diretorio = os.getenv("IMAGEM_CACHE_DIR")
+    if not diretorio:
+        return None
+
+    with _trava_padrao:
+        if _cache_padrao is None or _cache_padrao.diretorio != diretorio:
+            limiar = os.getenv("IMAGEM_CACHE_LIMIAR")
+            _cache_padrao = CacheDeImagens(
+                diretorio,
+                max_bytes=int(float(os.getenv("IMAGEM_CACHE_MAX_MB", MAX_BYTES_PADRAO / (1024 * 1024))) * 1024 * 1024),
+                limiar=float(limiar) if limiar else None,
+            )
+            logger.info(f"Cache de imagens ativado em '{diretorio}'")
+        return _cache_padrao
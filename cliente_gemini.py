@@ -0,0 +1,318 @@
+"""
+Cliente Gemini com Inicialização Preguiçosa
+===========================================
+
+Centraliza a configuração da API Gemini (leitura do .env, validação da
+GOOGLE_API_KEY e `genai.configure`) e adia a importação do SDK
+`google.generativeai` até a primeira geração. Importar os módulos do
+projeto passa a ser barato e livre de efeitos colaterais, o que permite
+usá-los em testes, ferramentas e processos de trabalho sem API key.
+
+A interface `client.models.generate_content(model=..., contents=...)`
+segue o formato do SDK atual do Gemini. Com `prefixo=`, as instruções
+estáticas do prompt podem ir para o cache de contexto do Gemini (desligado
+por padrão; veja GEMINI_CACHE_CONTEXTO) e cada chamada envia só a parte
+variável.
+
+`client.models.generate_images(model=..., prompt=..., config=...)` gera
+imagens com o Imagen. O SDK `google.generativeai` não tem essa operação;
+ela usa o pacote opcional `google-genai`, importado só na primeira imagem.
+
+Exemplo:
+    >>> client = obter_cliente()
+    >>> resposta = client.models.generate_content(
+    ...     model='gemini-1.5-flash',
+    ...     contents='Olá',
+    ...     config={'temperature': 0.5}
+    ... )
+"""
+
+import datetime
+import hashlib
+import logging
+import os
+import re
+import threading
+import time
+from typing import Any, Callable, Dict, Optional, Set, Tuple
+
+from limitador_taxa import estimar_tokens
+
+logger = logging.getLogger(__name__)
+
+# Menor prefixo aceito pelo cache de contexto da API (Gemini 1.5), em tokens
+CONTEXTO_MIN_TOKENS_PADRAO = 32768
+CONTEXTO_TTL_PADRAO = 3600
+# Fração do TTL após a qual o contexto é recriado (evita usar um contexto expirando)
+_RENOVACAO_CONTEXTO = 0.9
+# Versão usada quando o nome do modelo não fixa uma (o cache de contexto exige versão estável)
+VERSAO_CONTEXTO_PADRAO = "001"
+
+
+def cache_de_contexto_ativo() -> bool:
+    """
+    Indica se o cache de contexto está ligado (GEMINI_CACHE_CONTEXTO, padrão 0).
+
+    Fica desligado por padrão: as instruções fixas dos templates ficam bem
+    abaixo do mínimo de tokens da API e nunca seriam cacheadas. Ligue ao
+    usar prefixos longos (documentos de referência, por exemplo).
+    """
+    return os.getenv('GEMINI_CACHE_CONTEXTO', '0').lower() in ('1', 'true', 'sim')
+
+
+def nome_modelo_contexto(nome: str) -> str:
+    """
+    Converte o nome de um modelo no nome versionado exigido pelo cache de contexto.
+
+    Args:
+        nome: Nome do modelo (ex.: 'gemini-1.5-flash')
+
+    Returns:
+        str: Nome com prefixo e versão (ex.: 'models/gemini-1.5-flash-001')
+    """
+    if nome.startswith('models/'):
+        nome = nome[len('models/'):]
+    if not re.search(r'-\d{3}$', nome):
+        nome = f"{nome}-{VERSAO_CONTEXTO_PADRAO}"
+    return f"models/{nome}"
+
+
+class _ModelosGemini:
+    """Acesso às operações de modelo (`client.models`)."""
+
+    def __init__(self, cliente: "ClienteGemini"):
+        self._cliente = cliente
+
+    def generate_content(
+        self,
+        model: str,
+        contents: Any,
+        config: Optional[Dict[str, Any]] = None,
+        stream: bool = False,
+        prefixo: Optional[str] = None,
+    ) -> Any:
+        """
+        Gera conteúdo com o modelo indicado.
+
+        Args:
+            model: Nome do modelo Gemini
+            contents: Prompt ou conteúdos da requisição
+            config: Configuração de geração (temperatura, formato de resposta...)
+            stream: Se True, retorna um iterável de trechos
+            prefixo: Instruções estáticas que antecedem `contents`; vão para o
+                cache de contexto quando possível, senão são concatenadas
+
+        Returns:
+            Resposta do SDK (ou iterável de trechos em modo streaming)
+        """
+        if prefixo:
+            modelo = self._cliente.modelo_com_contexto(model, prefixo)
+            if modelo is not None:
+                return modelo.generate_content(contents=contents, generation_config=config, stream=stream)
+            contents = prefixo + contents
+        modelo = self._cliente.modelo(model)
+        return modelo.generate_content(contents=contents, generation_config=config, stream=stream)
+
+    def generate_images(self, model: str, prompt: str, config: Optional[Dict[str, Any]] = None) -> Any:
+        """
+        Gera imagens com um modelo Imagen.
+
+        Args:
+            model: Nome do modelo Imagen
+            prompt: Descrição da imagem
+            config: Opções de geração (ex: number_of_images, aspect_ratio)
+
+        Returns:
+            Resposta do SDK, com `generated_images[i].image.image_bytes`
+
+        Raises:
+            RuntimeError: Se o pacote google-genai não estiver instalado
+        """
+        return self._cliente.cliente_imagens().models.generate_images(
+            model=model, prompt=prompt, config=config or {}
+        )
+
+
+class ClienteGemini:
+    """
+    Cliente configurado sob demanda na primeira chamada.
+
+    Attributes:
+        models: Operações de geração de conteúdo
+    """
+
+    def __init__(self, fabrica_modelo: Optional[Callable[[str], Any]] = None):
+        """
+        Args:
+            fabrica_modelo: Cria o objeto de modelo a partir do nome. Quando
+                informado, substitui o SDK (ex: backends falsos em benchmarks)
+                e dispensa a API key.
+        """
+        self._fabrica_modelo = fabrica_modelo
+        self._genai = None
+        self._trava = threading.Lock()
+        self.models = _ModelosGemini(self)
+        # (modelo, hash do prefixo) -> (modelo ligado ao contexto, recriar_em)
+        self._contextos: Dict[Tuple[str, str], Tuple[Any, float]] = {}
+        self._contextos_recusados: Set[Tuple[str, str]] = set()
+        self._trava_contexto = threading.Lock()
+        self._cliente_imagens = None
+
+    @property
+    def configurado(self) -> bool:
+        """Indica se o cliente já está pronto para gerar."""
+        return self._fabrica_modelo is not None or self._genai is not None
+
+    def configurar(self) -> None:
+        """
+        Carrega o .env, valida a API key e configura o SDK (apenas uma vez).
+
+        Raises:
+            ValueError: Se GOOGLE_API_KEY não estiver configurada
+        """
+        if self.configurado:
+            return
+
+        with self._trava:
+            if self.configurado:
+                return
+
+            from dotenv import load_dotenv
+            load_dotenv()
+
+            api_key = os.getenv('GOOGLE_API_KEY')
+            if not api_key:
+                logger.error("GOOGLE_API_KEY não encontrada nas variáveis de ambiente")
+                logger.info("Crie um arquivo .env com: GOOGLE_API_KEY=sua-chave-aqui")
+                logger.info("Ou obtenha uma chave em: https://aistudio.google.com/app/apikey")
+                raise ValueError("API Key não configurada. Configure a variável de ambiente GOOGLE_API_KEY")
+
+            import google.generativeai as genai
+
+            try:
+                genai.configure(api_key=api_key)
+            except Exception as e:
+                logger.error(f"Erro na configuração da API Key: {e}")
+                raise
+
+            self._genai = genai
+            logger.info("API Gemini configurada e pronta para uso")
+
+    @property
+    def genai(self) -> Any:
+        """Módulo `google.generativeai` já configurado."""
+        self.configurar()
+        return self._genai
+
+    def modelo(self, nome: str) -> Any:
+        """
+        Retorna o objeto de modelo para o nome indicado.
+
+        Args:
+            nome: Nome do modelo Gemini
+
+        Returns:
+            Objeto com o método `generate_content`
+        """
+        self.configurar()
+        if self._fabrica_modelo is not None:
+            return self._fabrica_modelo(nome)
+        return self._genai.GenerativeModel(nome)
+
+    def modelo_com_contexto(self, nome: str, prefixo: str) -> Optional[Any]:
+        """
+        Retorna um modelo cujo cache de contexto já contém o prefixo.
+
+        Só atua com GEMINI_CACHE_CONTEXTO=1. O contexto é criado na primeira
+        chamada, para a versão estável do modelo (`nome_modelo_contexto`), e
+        recriado perto do fim do TTL (GEMINI_CACHE_CONTEXTO_TTL). Prefixos menores que o mínimo da API
+        (GEMINI_CACHE_CONTEXTO_MIN_TOKENS) não são enviados ao cache; se a API
+        recusar o contexto (modelo sem suporte, por exemplo), a recusa é
+        lembrada e as próximas chamadas enviam o prompt inteiro.
+
+        Args:
+            nome: Nome do modelo Gemini
+            prefixo: Instruções estáticas do prompt
+
+        Returns:
+            Objeto de modelo, ou None se o prompt deve ser enviado inteiro
+        """
+        if self._fabrica_modelo is not None or not cache_de_contexto_ativo():
+            return None
+        if estimar_tokens(prefixo, tokens_saida=0) < int(os.getenv('GEMINI_CACHE_CONTEXTO_MIN_TOKENS', CONTEXTO_MIN_TOKENS_PADRAO)):
+            return None
+
+        chave = (nome, hashlib.sha256(prefixo.encode("utf-8")).hexdigest())
+        agora = time.monotonic()
+        with self._trava_contexto:
+            if chave in self._contextos_recusados:
+                return None
+            existente = self._contextos.get(chave)
+            if existente is not None and agora < existente[1]:
+                return existente[0]
+
+            genai = self.genai
+            ttl = float(os.getenv('GEMINI_CACHE_CONTEXTO_TTL', CONTEXTO_TTL_PADRAO))
+            try:
+                contexto = genai.caching.CachedContent.create(
+                    model=nome_modelo_contexto(nome),
+                    system_instruction=prefixo,
+                    ttl=datetime.timedelta(seconds=ttl),
+                )
+                modelo = genai.GenerativeModel.from_cached_content(cached_content=contexto)
+            except Exception as e:
+                logger.warning(f"Cache de contexto indisponível para {nome}; enviando o prompt inteiro: {e}")
+                self._contextos_recusados.add(chave)
+                return None
+
+            self._contextos[chave] = (modelo, agora + ttl * _RENOVACAO_CONTEXTO)
+            logger.info(f"Prefixo do prompt guardado no cache de contexto de {nome}")
+            return modelo
+
+    def cliente_imagens(self) -> Any:
+        """
+        Cliente do SDK `google-genai`, usado apenas para o Imagen.
+
+        Returns:
+            `google.genai.Client` configurado com a GOOGLE_API_KEY
+
+        Raises:
+            RuntimeError: Se o pacote google-genai não estiver instalado
+        """
+        if self._cliente_imagens is not None:
+            return self._cliente_imagens
+
+        self.configurar()
+        with self._trava:
+            if self._cliente_imagens is None:
+                try:
+                    from google import genai as genai_imagens
+                except ImportError as e:
+                    raise RuntimeError(
+                        "Geração de imagens requer o pacote google-genai (pip install google-genai)"
+                    ) from e
+                self._cliente_imagens = genai_imagens.Client(api_key=os.getenv('GOOGLE_API_KEY'))
+            return self._cliente_imagens
+
+    def usar_backend(self, fabrica_modelo: Optional[Callable[[str], Any]]) -> None:
+        """
+        Troca a fábrica de modelos (None volta a usar o SDK real).
+
+        Args:
+            fabrica_modelo: Cria o objeto de modelo a partir do nome
+        """
+        with self._trava:
+            self._fabrica_modelo = fabrica_modelo
+
+
+_cliente_padrao = ClienteGemini()
+
+
+def obter_cliente() -> ClienteGemini:
+    """
+    Retorna o cliente Gemini compartilhado do processo.
+
+    Returns:
+        ClienteGemini: Instância compartilhada (configurada na primeira geração)
+    """
+    return _cliente_padrao
@@ -3,45 +3,55 @@ Versão melhorada do criar_briefing_noticias.py
 ==============================================
 
 Melhorias implementadas:
-- Uso de variáveis de ambiente (.env)
+- Uso de variáveis de ambiente (.env), carregadas na primeira geração
+- Importação leve, sem efeitos colaterais (SDK importado sob demanda)
 - Logging estruturado
 - Tratamento de erros específico
 - Type hints completos
 - Validações robustas
+- Métricas por etapa (ver `instrumentacao.py`)
+- Saída estruturada nativa (modo JSON com `response_schema`), com o prompt
+  de texto apenas como fallback
+- Reparo de JSON malformado e complemento só dos campos faltantes, em vez
+  de gerar o briefing de novo (ver `reparo_json.py`)
 """
 
-import google.generativeai as genai
-from google.generativeai import types
 from pydantic import BaseModel, Field
-from typing import List, Optional
-import pathlib
+from typing import Any, Callable, Dict, Iterator, List, Optional, Tuple
 import os
+import json
+import time
 import logging
-from dotenv import load_dotenv
 
-# Configurar logging
-logging.basicConfig(
-    level=logging.INFO,
-    format='%(asctime)s - %(name)s - %(levelname)s - %(message)s'
+from cliente_gemini import obter_cliente
+from cache_briefing import CacheDeBriefings, gerar_chave_cache, normalizar_topico, obter_cache_padrao
+from armazem_briefings import obter_armazem
+from cache_imagens import copiar_atomico, gerar_chave_imagem, gravar_atomico, obter_cache_imagens
+from derivados_imagem import obter_pool_derivados
+from roteador_modelos import obter_roteador
+from hedge_modelos import ExecutorDeHedge, marcar_inicio, obter_executor_hedge
+from limitador_taxa import ESPERA_429_PADRAO, erro_de_cota, estimar_tokens, extrair_retry_after, obter_limitador
+from parser_json_incremental import EVENTO_ARTIGO, EVENTO_BRIEFING, EventoBriefing, ParserIncrementalDeBriefing
+from instrumentacao import BALDES_TAMANHO, obter_metricas
+from single_flight import GrupoSingleFlight
+from templates_prompt import (
+    TEMPLATE_AGRUPADO, TEMPLATE_ATUALIZACAO, TEMPLATE_BRIEFING, TEMPLATE_BRIEFING_JSON, TEMPLATE_COMPLEMENTO,
+    TemplateDePrompt,
 )
-logger = logging.getLogger(__name__)
+from reparo_json import BriefingIncompleto, carregar_json_tolerante, mesclar_complemento, recuperar_briefing
 
-# --- Configuração da API Key via Variável de Ambiente ---
-load_dotenv()
+logger = logging.getLogger(__name__)
 
-api_key = os.getenv('GOOGLE_API_KEY')
-if not api_key:
-    logger.error("GOOGLE_API_KEY não encontrada nas variáveis de ambiente")
-    logger.info("Crie um arquivo .env com: GOOGLE_API_KEY=sua-chave-aqui")
-    logger.info("Ou obtenha uma chave em: https://aistudio.google.com/app/apikey")
-    raise ValueError("API Key não configurada. Configure a variável de ambiente GOOGLE_API_KEY")
+# --- Cliente Gemini ---
+# A configuração (.env, GOOGLE_API_KEY, genai.configure) e a importação do
+# SDK só acontecem na primeira geração; importar este módulo não tem efeitos
+# colaterais.
+client = obter_cliente()
 
-try:
-    genai.configure(api_key=api_key)
-    logger.info("API Key configurada com sucesso")
-except Exception as e:
-    logger.error(f"Erro na configuração da API Key: {e}")
-    raise
+# Pedidos simultâneos para o mesmo tópico compartilham uma única geração
+single_flight = GrupoSingleFlight()
+# ...e o mesmo vale para imagens com o mesmo prompt
+single_flight_imagens = GrupoSingleFlight()
 
 # --- ETAPA 1: Definição da Estrutura de Dados com Pydantic ---
 
@@ -79,24 +89,566 @@ class BriefingDeNoticias(BaseModel):
     )
 
 
+class AtualizacaoDeBriefing(BaseModel):
+    """
+    Resposta de uma atualização incremental: só o que mudou desde o briefing anterior.
+    
+    Attributes:
+        novos_artigos: Artigos que não estavam no briefing anterior
+        analise_sintetizada: Análise atualizada (None mantém a anterior)
+        prompt_para_imagem: Novo prompt de imagem (None mantém o anterior)
+    """
+    novos_artigos: List[ArtigoEncontrado] = Field(
+        default_factory=list, description="Apenas artigos que não estavam entre os conhecidos."
+    )
+    analise_sintetizada: Optional[str] = Field(default=None, description="Análise atualizada de 2 parágrafos.")
+    prompt_para_imagem: Optional[str] = Field(default=None, description="Novo prompt de imagem, se o foco mudou.")
+
+
 # --- Configuração do modelo ---
-# A API não requer inicialização de cliente, apenas configuração
-logger.info("API Gemini configurada e pronta para uso")
+# Modelos em ordem de preferência; o roteador reordena pela saúde observada
+MODELOS_DISPONIVEIS = ['gemini-2.0-flash-exp', 'gemini-1.5-flash', 'gemini-1.5-pro']
+
+# Temperatura de geração (um pouco de criatividade na análise)
+TEMPERATURA_PADRAO = 0.5
+
+# Modelo e proporção das imagens (Imagen)
+MODELO_IMAGEM = 'imagen-3.0-generate-001'
+PROPORCAO_IMAGEM = "16:9"
+
+# Quantas vezes uma chamada aguarda a cota após um 429 antes de desistir do modelo
+MAX_ESPERAS_COTA = 2
+
+# Modelos que recusaram o modo JSON nesta execução (passam a usar o prompt de texto)
+_modelos_sem_modo_json = set()
+
+
+def modo_json_ativo() -> bool:
+    """Indica se o modo JSON nativo está ligado (GEMINI_MODO_JSON, padrão 1)."""
+    return os.getenv('GEMINI_MODO_JSON', '1').lower() not in ('0', 'false', 'nao', 'não')
+
+
+def _usa_modo_json(nome_modelo: str) -> bool:
+    """Indica se o modelo deve ser chamado no modo JSON."""
+    return modo_json_ativo() and nome_modelo not in _modelos_sem_modo_json
+
+
+def _template_do_modelo(nome_modelo: str) -> TemplateDePrompt:
+    """Template de prompt usado com o modelo (também compõe a chave do cache)."""
+    return TEMPLATE_BRIEFING_JSON if _usa_modo_json(nome_modelo) else TEMPLATE_BRIEFING
+
+
+def _chave_cache(
+    topico: str,
+    template: TemplateDePrompt,
+    nome_modelo: str,
+    parametros: Optional[Dict[str, Any]] = None
+) -> str:
+    """Chave do briefing no cache: tópico, template (nome, versão e parâmetros), modelo e temperatura."""
+    return gerar_chave_cache(topico, template.chave_cache(**(parametros or {})), nome_modelo, TEMPERATURA_PADRAO)
+
+
+def _buscar_no_cache(
+    cache: CacheDeBriefings,
+    topico: str,
+    parametros: Optional[Dict[str, Any]] = None
+) -> Optional[BriefingDeNoticias]:
+    """
+    Procura um briefing já gerado para o tópico por qualquer um dos modelos.
+    
+    Sem parâmetros extras, briefings gerados no modo agrupado
+    (`briefing_agrupado.py`) também servem.
+    
+    Args:
+        cache: Cache de briefings
+        topico: Tópico pesquisado
+        parametros: Parâmetros extras do template (período, número de artigos)
+    
+    Returns:
+        BriefingDeNoticias: Briefing em cache, ou None se não houver
+    """
+    modelos_por_chave = {
+        _chave_cache(topico, template, nome_modelo, parametros): nome_modelo
+        for template in (TEMPLATE_BRIEFING_JSON, TEMPLATE_BRIEFING)
+        for nome_modelo in MODELOS_DISPONIVEIS
+    }
+    if not parametros:
+        # O modo agrupado não aceita parâmetros: só equivale ao pedido padrão
+        modelos_por_chave.update(
+            (_chave_cache(topico, TEMPLATE_AGRUPADO, nome_modelo), nome_modelo) for nome_modelo in MODELOS_DISPONIVEIS
+        )
+    encontrado = cache.obter_primeira(modelos_por_chave)
+    if encontrado is None:
+        return None
+    chave, conteudo = encontrado
+    try:
+        briefing = BriefingDeNoticias.model_validate_json(conteudo)
+    except ValueError as e:
+        logger.warning(f"Entrada de cache inválida ignorada: {e}")
+        return None
+    logger.info(f"Briefing para '{topico}' obtido do cache ({modelos_por_chave[chave]})")
+    return briefing
+
+
+def interpretar_resposta(texto: str) -> BriefingDeNoticias:
+    """
+    Etapa de interpretação: extrai o JSON do texto retornado pelo modelo e valida o briefing.
+    
+    Args:
+        texto: Texto bruto da resposta
+    
+    Returns:
+        BriefingDeNoticias: Briefing validado
+    
+    Raises:
+        ValueError: Se o JSON for inválido ou não corresponder ao modelo
+    """
+    metricas = obter_metricas()
+    
+    try:
+        with metricas.medir('briefing_etapa_segundos', etapa='extracao_json'):
+            texto = texto.strip()
+            inicio = texto.find('{')
+            fim = texto.rfind('}') + 1
+            
+            if inicio >= 0 and fim > inicio:
+                briefing_dict = json.loads(texto[inicio:fim])
+            else:
+                briefing_dict = json.loads(texto)
+        
+        with metricas.medir('briefing_etapa_segundos', etapa='validacao'):
+            return BriefingDeNoticias(**briefing_dict)
+    except (ValueError, TypeError) as e:
+        logger.debug(f"JSON fora do formato ({e}); tentando reparar")
+        return _reparar_resposta(texto)
+
+
+def _reparar_resposta(texto: str) -> BriefingDeNoticias:
+    """
+    Repara o JSON da resposta (aspas, vírgulas, truncamento) e valida o briefing.
+    
+    Raises:
+        BriefingIncompleto: Se o reparo recuperou parte do briefing, mas faltam campos
+        ValueError: Se nada aproveitável foi encontrado
+    """
+    metricas = obter_metricas()
+    with metricas.medir('briefing_etapa_segundos', etapa='reparo_json'):
+        dados, faltando = recuperar_briefing(texto, validar_artigo=lambda artigo: ArtigoEncontrado(**artigo))
+    
+    if faltando:
+        raise BriefingIncompleto(dados, faltando)
+    
+    briefing = BriefingDeNoticias(**dados)
+    metricas.incrementar('briefing_reparos_total', tipo='local')
+    logger.info("JSON malformado reparado sem nova geração")
+    return briefing
+
+
+def completar_briefing(
+    topico: str,
+    incompleto: BriefingIncompleto,
+    nome_modelo: Optional[str] = None
+) -> BriefingDeNoticias:
+    """
+    Pede ao modelo apenas os campos que faltaram em um briefing reparado.
+    
+    A chamada de complemento é bem menor que uma nova geração: o modelo
+    recebe o briefing parcial e devolve só os campos faltantes.
+    
+    Args:
+        topico: Tópico do briefing
+        incompleto: Erro com os campos recuperados e os faltantes
+        nome_modelo: Modelo preferido (o que gerou a resposta original)
+    
+    Returns:
+        BriefingDeNoticias: Briefing completo e validado
+    
+    Raises:
+        ValueError: Se nenhum modelo devolver os campos faltantes
+    """
+    campos = "\n    ".join(
+        f"- {campo}: {BriefingDeNoticias.model_fields[campo].description}"
+        for campo in incompleto.campos_faltando
+    )
+    prompt = TEMPLATE_COMPLEMENTO.renderizar_sufixo(
+        topico=topico,
+        campos=campos,
+        parcial=json.dumps(incompleto.dados, ensure_ascii=False)
+    )
+    roteador = obter_roteador()
+    candidatos = roteador.ordenar(MODELOS_DISPONIVEIS)
+    if nome_modelo in candidatos:
+        candidatos.remove(nome_modelo)
+        candidatos.insert(0, nome_modelo)
+    
+    metricas = obter_metricas()
+    ultimo_erro: Optional[Exception] = None
+    for candidato in candidatos:
+        metricas.incrementar('briefing_tentativas_modelo_total', modelo=candidato)
+        inicio = time.perf_counter()
+        try:
+            with metricas.medir('briefing_etapa_segundos', etapa='complemento'):
+                response = _chamar_modelo(candidato, prompt, prefixo=TEMPLATE_COMPLEMENTO.prefixo)
+                complemento = carregar_json_tolerante(response.text or "")
+                if not isinstance(complemento, dict):
+                    raise ValueError("Complemento não é um objeto JSON")
+                dados = mesclar_complemento(incompleto.dados, complemento, incompleto.campos_faltando)
+                briefing = BriefingDeNoticias(**dados)
+        except Exception as e:
+            roteador.registrar_falha(candidato)
+            logger.warning(f"Complemento com {candidato} falhou: {e}")
+            ultimo_erro = e
+            continue
+        roteador.registrar_sucesso(candidato, time.perf_counter() - inicio)
+        metricas.incrementar('briefing_reparos_total', tipo='complemento')
+        logger.info(f"Campos faltantes completados com {candidato}: {', '.join(incompleto.campos_faltando)}")
+        return briefing
+    
+    raise ValueError(f"Não foi possível completar o briefing: {ultimo_erro}")
+
+
+def gerar_atualizacao(
+    topico: str,
+    anterior: BriefingDeNoticias,
+    parametros: Optional[Dict[str, Any]] = None
+) -> Tuple[AtualizacaoDeBriefing, str]:
+    """
+    Pede ao modelo apenas o que mudou desde um briefing anterior.
+    
+    O prompt leva só o título e a fonte dos artigos conhecidos (e a análise
+    atual); a resposta traz apenas os artigos novos e, se necessário, a
+    análise e o prompt de imagem atualizados. Sem novidades, a resposta
+    é um objeto quase vazio.
+    
+    Args:
+        topico: Tópico do briefing
+        anterior: Última versão do briefing
+        parametros: Parâmetros extras do template, como `periodo`
+    
+    Returns:
+        Tuple[AtualizacaoDeBriefing, str]: Atualização validada e o modelo usado
+    
+    Raises:
+        ValueError: Se nenhum modelo devolver uma atualização válida
+    """
+    conhecidos = "\n    ".join(f"- {artigo.titulo} ({artigo.fonte})" for artigo in anterior.artigos)
+    prompt = TEMPLATE_ATUALIZACAO.renderizar_sufixo(
+        topico=topico,
+        conhecidos=conhecidos or "(nenhum)",
+        analise=anterior.analise_sintetizada,
+        **(parametros or {})
+    )
+    
+    client.configurar()
+    roteador = obter_roteador()
+    metricas = obter_metricas()
+    ultimo_erro: Optional[Exception] = None
+    for candidato in roteador.ordenar(MODELOS_DISPONIVEIS):
+        metricas.incrementar('briefing_tentativas_modelo_total', modelo=candidato)
+        inicio = time.perf_counter()
+        try:
+            with metricas.medir('briefing_etapa_segundos', etapa='atualizacao'):
+                response = _chamar_modelo(candidato, prompt, prefixo=TEMPLATE_ATUALIZACAO.prefixo)
+                dados = carregar_json_tolerante(response.text or "")
+                if not isinstance(dados, dict):
+                    raise ValueError("Atualização não é um objeto JSON")
+                atualizacao = AtualizacaoDeBriefing(**dados)
+        except Exception as e:
+            roteador.registrar_falha(candidato)
+            logger.warning(f"Atualização com {candidato} falhou: {e}")
+            ultimo_erro = e
+            continue
+        roteador.registrar_sucesso(candidato, time.perf_counter() - inicio)
+        logger.info(f"Atualização gerada com {candidato}: {len(atualizacao.novos_artigos)} artigos novos")
+        return atualizacao, candidato
+    
+    raise ValueError(f"Não foi possível atualizar o briefing: {ultimo_erro}")
+
+
+def _chamar_modelo(
+    nome_modelo: str,
+    prompt: str,
+    stream: bool = False,
+    modo_json: bool = False,
+    prefixo: str = ""
+):
+    """
+    Chama o modelo respeitando o limitador de taxa compartilhado.
+    
+    Antes de cada chamada aguarda cota de requisições e tokens do modelo.
+    Um erro 429 bloqueia o modelo pelo tempo sugerido pela API e a chamada
+    volta para a fila, em vez de seguir direto para o próximo modelo.
+    
+    Args:
+        nome_modelo: Nome do modelo Gemini
+        prompt: Parte variável do prompt (ou o prompt completo, sem prefixo)
+        stream: Se True, retorna a resposta em trechos
+        modo_json: Se True, pede JSON validado pelo esquema de BriefingDeNoticias
+        prefixo: Instruções estáticas do template (candidatas ao cache de contexto)
+    
+    Returns:
+        Resposta do SDK
+    
+    Raises:
+        Exception: Erros da API (incluindo 429 após MAX_ESPERAS_COTA esperas)
+    """
+    limitador = obter_limitador()
+    tokens = estimar_tokens(prefixo + prompt)
+    config = {'temperature': TEMPERATURA_PADRAO}
+    if modo_json:
+        config['response_mime_type'] = 'application/json'
+        config['response_schema'] = BriefingDeNoticias
+    
+    for tentativa in range(MAX_ESPERAS_COTA + 1):
+        limitador.adquirir(nome_modelo, tokens)
+        # Com cota obtida, começa a contar o prazo do hedge (a espera acima não conta)
+        marcar_inicio()
+        try:
+            return client.models.generate_content(
+                model=nome_modelo,
+                contents=prompt,
+                config=config,
+                stream=stream,
+                prefixo=prefixo or None
+            )
+        except Exception as e:
+            if not erro_de_cota(e) or tentativa == MAX_ESPERAS_COTA:
+                raise
+            limitador.penalizar(nome_modelo, extrair_retry_after(e) or ESPERA_429_PADRAO)
+
+
+def _erro_modo_json(erro: BaseException) -> bool:
+    """Indica se o erro é a recusa do modelo/SDK ao modo JSON ou ao esquema."""
+    mensagem = str(erro).lower()
+    return (
+        type(erro).__name__ in ('InvalidArgument', 'BadRequest')
+        or 'response_schema' in mensagem
+        or 'response_mime_type' in mensagem
+    )
+
+
+def _chamar_para_topico(
+    nome_modelo: str,
+    topico: str,
+    stream: bool = False,
+    parametros: Optional[Dict[str, Any]] = None
+):
+    """
+    Chama o modelo no modo JSON e recorre ao prompt de texto se ele for recusado.
+    
+    Args:
+        nome_modelo: Nome do modelo Gemini
+        topico: Tópico do briefing
+        stream: Se True, retorna a resposta em trechos
+        parametros: Parâmetros extras do template (período, número de artigos)
+    
+    Returns:
+        Resposta do SDK
+    """
+    parametros = parametros or {}
+    if _usa_modo_json(nome_modelo):
+        try:
+            return _chamar_modelo(nome_modelo, TEMPLATE_BRIEFING_JSON.renderizar_sufixo(topico=topico, **parametros),
+                                  stream=stream, modo_json=True, prefixo=TEMPLATE_BRIEFING_JSON.prefixo)
+        except Exception as e:
+            if not _erro_modo_json(e):
+                raise
+            logger.warning(f"Modelo {nome_modelo} recusou o modo JSON; usando o prompt de texto: {e}")
+            _modelos_sem_modo_json.add(nome_modelo)
+    
+    return _chamar_modelo(nome_modelo, TEMPLATE_BRIEFING.renderizar_sufixo(topico=topico, **parametros),
+                          stream=stream, prefixo=TEMPLATE_BRIEFING.prefixo)
+
+
+def _briefing_da_resposta(response, nome_modelo: str, topico: Optional[str] = None) -> BriefingDeNoticias:
+    """
+    Obtém o briefing validado de uma resposta.
+    
+    Usa `response.parsed` quando o SDK já entrega o objeto; no modo JSON o
+    texto é validado diretamente pelo Pydantic, e só respostas fora do
+    formato passam pela extração (e, se preciso, pelo reparo) do JSON. Se
+    o reparo deixar campos faltando e o tópico for conhecido, apenas esses
+    campos são pedidos ao modelo.
+    
+    Raises:
+        ValueError: Se a resposta estiver vazia ou for inválida
+    """
+    parsed = getattr(response, 'parsed', None)
+    if isinstance(parsed, BriefingDeNoticias):
+        return parsed
+    
+    texto = response.text if response else None
+    if not texto:
+        raise ValueError(f"Resposta vazia do modelo {nome_modelo}")
+    
+    metricas = obter_metricas()
+    metricas.observar('briefing_resposta_bytes', len(texto.encode('utf-8')),
+                      baldes=BALDES_TAMANHO, modelo=nome_modelo)
+    try:
+        with metricas.medir('briefing_etapa_segundos', etapa='validacao'):
+            return BriefingDeNoticias.model_validate_json(texto)
+    except ValueError:
+        pass
+    
+    try:
+        try:
+            return interpretar_resposta(texto)
+        except BriefingIncompleto as e:
+            if topico is None:
+                raise
+            logger.warning(f"Resposta de {nome_modelo} incompleta ({', '.join(e.campos_faltando)}); pedindo complemento")
+            return completar_briefing(topico, e, nome_modelo)
+    except (ValueError, TypeError):
+        metricas.incrementar('briefing_falhas_interpretacao_total', modelo=nome_modelo)
+        raise
 
 
-def criar_briefing_avancado(topico: str) -> Optional[BriefingDeNoticias]:
+def _gerar_com_modelo(
+    nome_modelo: str,
+    topico: str,
+    parametros: Optional[Dict[str, Any]] = None
+) -> BriefingDeNoticias:
+    """
+    Gera e valida um briefing com um modelo específico.
+    
+    O resultado (sucesso ou falha) é registrado no roteador de modelos.
+    
+    Args:
+        nome_modelo: Nome do modelo Gemini
+        topico: Tópico do briefing
+        parametros: Parâmetros extras do template (período, número de artigos)
+    
+    Returns:
+        BriefingDeNoticias: Briefing validado
+    
+    Raises:
+        ValueError: Se a resposta estiver vazia ou for inválida
+        Exception: Erros da API são propagados
+    """
+    roteador = obter_roteador()
+    metricas = obter_metricas()
+    metricas.incrementar('briefing_tentativas_modelo_total', modelo=nome_modelo)
+    inicio = time.perf_counter()
+    try:
+        logger.debug(f"Tentando modelo: {nome_modelo}")
+        with metricas.medir('briefing_etapa_segundos', etapa='chamada_modelo'):
+            response = _chamar_para_topico(nome_modelo, topico, parametros=parametros)
+        
+        briefing = _briefing_da_resposta(response, nome_modelo, topico)
+    except Exception:
+        roteador.registrar_falha(nome_modelo)
+        raise
+    
+    roteador.registrar_sucesso(nome_modelo, time.perf_counter() - inicio)
+    logger.info(f"✅ Modelo {nome_modelo} funcionou!")
+    return briefing
+
+
+def gerar_resposta_bruta(topico: str) -> Tuple[str, str]:
+    """
+    Etapa de geração: obtém o texto bruto do briefing, sem interpretá-lo.
+    
+    Permite repetir a geração e a interpretação como etapas separadas
+    (ver `politica_retry`). Se todos os modelos falharem, o erro do último
+    é propagado, para que quem chama possa classificá-lo como transitório
+    ou definitivo.
+    
+    Args:
+        topico: O tema a ser pesquisado
+    
+    Returns:
+        Tuple[str, str]: Texto da resposta e modelo que o gerou
+    
+    Raises:
+        ValueError: Se o tópico for vazio ou a resposta vier vazia
+        Exception: Último erro da API quando nenhum modelo funcionar
+    """
+    if not topico or not topico.strip():
+        raise ValueError("O tópico não pode estar vazio")
+    
+    client.configurar()
+    roteador = obter_roteador()
+    ultimo_erro: Optional[Exception] = None
+    
+    for nome_modelo in roteador.ordenar(MODELOS_DISPONIVEIS):
+        inicio = time.perf_counter()
+        try:
+            response = _chamar_para_topico(nome_modelo, topico)
+            if not response or not response.text:
+                raise ValueError(f"Resposta vazia do modelo {nome_modelo}")
+        except Exception as e:
+            roteador.registrar_falha(nome_modelo)
+            logger.warning(f"Modelo {nome_modelo} não disponível: {e}")
+            ultimo_erro = e
+            continue
+        
+        roteador.registrar_sucesso(nome_modelo, time.perf_counter() - inicio)
+        return response.text, nome_modelo
+    
+    raise ultimo_erro or ValueError("Nenhum modelo disponível funcionou")
+
+
+def _gerar_com_fallback(
+    candidatos: List[str],
+    gerar: Callable[[str], BriefingDeNoticias]
+) -> Tuple[BriefingDeNoticias, str]:
+    """
+    Tenta os modelos em sequência até que um produza um briefing válido.
+    
+    Args:
+        candidatos: Modelos em ordem de tentativa
+        gerar: Função que gera o briefing com um modelo
+    
+    Returns:
+        Tuple[BriefingDeNoticias, str]: Briefing e modelo que o gerou
+    
+    Raises:
+        ValueError: Se nenhum modelo funcionar
+    """
+    for indice, nome_modelo in enumerate(candidatos):
+        if indice > 0:
+            obter_metricas().incrementar('briefing_fallbacks_total')
+        try:
+            return gerar(nome_modelo), nome_modelo
+        except Exception as e:
+            logger.warning(f"Modelo {nome_modelo} não disponível: {e}")
+    
+    raise ValueError("Nenhum modelo disponível funcionou")
+
+
+def criar_briefing_avancado(
+    topico: str,
+    cache: Optional[CacheDeBriefings] = None,
+    hedge: Optional[ExecutorDeHedge] = None,
+    parametros: Optional[Dict[str, Any]] = None,
+    usar_cache: bool = True
+) -> Optional[BriefingDeNoticias]:
     """
     Função principal que busca notícias, as estrutura, analisa e cria um prompt de imagem.
     
+    Briefings já gerados para o mesmo tópico, template (nome, versão e
+    parâmetros), modelo e temperatura são reaproveitados do cache, sem nova
+    chamada à API, e pedidos simultâneos para o mesmo tópico aguardam a
+    geração já em andamento (`single_flight`). Com hedge ativado, um modelo
+    primário lento é acompanhado pelo próximo da cadeia e vence o primeiro
+    briefing válido.
+    
     Args:
         topico: O tema a ser pesquisado (ex: "IA na saúde")
+        cache: Cache de briefings (padrão: cache definido por BRIEFING_CACHE_PATH)
+        hedge: Executor de hedge (padrão: ativado por HEDGE_ATIVO=1)
+        parametros: Parâmetros extras do template, como `periodo`
+            ("da última semana") e `artigos` ("3 a 5")
+        usar_cache: Se False, gera de novo mesmo com o tópico em cache
+            (o resultado ainda é gravado no cache)
     
     Returns:
         BriefingDeNoticias: Objeto com artigos, análise e prompt de imagem
         None: Se houver erro na geração
     
     Raises:
-        ValueError: Se o tópico for vazio ou inválido
+        ValueError: Se o tópico for vazio ou inválido, ou se a
+            GOOGLE_API_KEY não estiver configurada
     
     Example:
         >>> briefing = criar_briefing_avancado("carros elétricos")
@@ -107,154 +659,319 @@ def criar_briefing_avancado(topico: str) -> Optional[BriefingDeNoticias]:
         logger.error("Tópico vazio fornecido")
         raise ValueError("O tópico não pode estar vazio")
     
+    parametros = dict(parametros or {})
+    # Parâmetros desconhecidos são erro de uso, não falha de geração
+    TEMPLATE_BRIEFING.resolver(topico=topico, **parametros)
+    
     logger.info(f"Iniciando criação do briefing para: '{topico}'")
+    metricas = obter_metricas()
     
     # --- ETAPA 2: Buscar, Estruturar e Analisar em uma única chamada ---
-    prompt_principal = f"""
-    Atue como um analista de notícias sênior. Sua tarefa é criar um briefing completo sobre o tópico: '{topico}'.
-    
-    IMPORTANTE: Retorne sua resposta em formato JSON válido com a seguinte estrutura exata:
-    {{
-        "topico_central": "string - o tema principal",
-        "artigos": [
-            {{
-                "titulo": "string - título da matéria",
-                "fonte": "string - nome do veículo",
-                "resumo_curto": "string - resumo de 1-2 frases"
-            }}
-        ],
-        "analise_sintetizada": "string - análise de 2 parágrafos",
-        "prompt_para_imagem": "string - prompt em inglês para geração de imagem"
-    }}
-    
-    1. Baseie-se em seu conhecimento para encontrar 3 a 5 artigos relevantes e recentes sobre o tópico.
-    2. Preencha todas as informações solicitadas no formato JSON acima.
-    3. A análise deve ter 2 parágrafos: o primeiro resumindo fatos, o segundo explorando implicações.
-    4. O prompt para imagem deve ser descritivo e artístico em inglês.
-    
-    Retorne APENAS o JSON, sem texto adicional antes ou depois.
+    if cache is None:
+        cache = obter_cache_padrao()
+    
+    if cache is not None and usar_cache:
+        with metricas.medir('briefing_etapa_segundos', etapa='cache'):
+            briefing_em_cache = _buscar_no_cache(cache, topico, parametros)
+        if briefing_em_cache is not None:
+            metricas.incrementar('briefings_total', resultado='cache')
+            return briefing_em_cache
+    
+    chave = (normalizar_topico(topico), json.dumps(parametros, sort_keys=True, ensure_ascii=False))
+    return single_flight.executar(chave, _gerar_briefing, topico, cache, hedge, parametros)
+
+
+def _gerar_briefing(
+    topico: str,
+    cache: Optional[CacheDeBriefings],
+    hedge: Optional[ExecutorDeHedge],
+    parametros: Optional[Dict[str, Any]] = None
+) -> Optional[BriefingDeNoticias]:
+    """
+    Gera o briefing com os modelos (após a falta no cache) e o grava no
+    cache e, se configurado, no armazém consultável (BRIEFING_ARMAZEM_PATH).
+    
+    Args:
+        topico: O tema a ser pesquisado
+        cache: Cache de briefings, ou None
+        hedge: Executor de hedge, ou None para o padrão
+        parametros: Parâmetros extras do template
+    
+    Returns:
+        BriefingDeNoticias: Briefing gerado, ou None se houver erro
+    
+    Raises:
+        ValueError: Se a GOOGLE_API_KEY não estiver configurada
     """
+    metricas = obter_metricas()
+    
+    # Configura a API apenas quando uma geração é realmente necessária
+    client.configurar()
     
     try:
         logger.debug("Enviando requisição para API Gemini...")
         
-        # Tentar diferentes modelos até encontrar um disponível
-        modelos_disponiveis = ['gemini-2.0-flash-exp', 'gemini-1.5-flash', 'gemini-1.5-pro']
-        
-        model = None
-        response = None
-        for nome_modelo in modelos_disponiveis:
-            try:
-                logger.debug(f"Tentando modelo: {nome_modelo}")
-                model = genai.GenerativeModel(nome_modelo)
-                
-                response = model.generate_content(
-                    contents=prompt_principal,
-                    generation_config={'temperature': 0.5}
-                )
-                
-                if response and response.text:
-                    logger.info(f"✅ Modelo {nome_modelo} funcionou!")
-                    break
-            except Exception as e:
-                logger.warning(f"Modelo {nome_modelo} não disponível: {e}")
-                continue
-        
-        if not response or not response.text:
-            raise ValueError("Nenhum modelo disponível funcionou")
+        if hedge is None:
+            hedge = obter_executor_hedge()
         
-        # Parsear a resposta JSON
-        import json
+        # Tentar os modelos na ordem de saúde observada pelo roteador
+        candidatos = obter_roteador().ordenar(MODELOS_DISPONIVEIS)
         
-        # Tentar extrair JSON da resposta
-        texto = response.text.strip()
-        inicio = texto.find('{')
-        fim = texto.rfind('}') + 1
+        def gerar(nome_modelo: str) -> BriefingDeNoticias:
+            return _gerar_com_modelo(nome_modelo, topico, parametros)
         
-        if inicio >= 0 and fim > inicio:
-            json_str = texto[inicio:fim]
-            briefing_dict = json.loads(json_str)
-        else:
-            briefing_dict = json.loads(texto)
+        with metricas.medir('briefing_etapa_segundos', etapa='geracao'):
+            if hedge is not None:
+                briefing, modelo_usado = hedge.executar(candidatos, gerar, aguardar_inicio=True)
+            else:
+                briefing, modelo_usado = _gerar_com_fallback(candidatos, gerar)
         
-        briefing = BriefingDeNoticias(**briefing_dict)
         logger.info("Briefing estruturado com sucesso")
         logger.debug(f"Encontrados {len(briefing.artigos)} artigos")
+        
+        if cache is not None:
+            with metricas.medir('briefing_etapa_segundos', etapa='persistencia_cache'):
+                chave = _chave_cache(topico, _template_do_modelo(modelo_usado), modelo_usado, parametros)
+                cache.definir(chave, briefing.model_dump_json())
+        
+        armazem = obter_armazem()
+        if armazem is not None:
+            with metricas.medir('briefing_etapa_segundos', etapa='persistencia_armazem'):
+                armazem.adicionar(briefing, modelo=modelo_usado, topico_pedido=topico)
+        
+        metricas.incrementar('briefings_total', resultado='sucesso')
         return briefing
 
     except AttributeError as e:
         logger.error(f"Erro ao acessar atributos da resposta: {e}")
-        return None
     except ValueError as e:
         logger.error(f"Erro de validação nos dados retornados: {e}")
-        return None
     except Exception as e:
         logger.error(f"Erro inesperado ao gerar o briefing: {e}", exc_info=True)
-        return None
+    
+    metricas.incrementar('briefings_total', resultado='falha')
+    return None
+
 
+def _eventos_do_briefing(briefing: BriefingDeNoticias) -> Iterator[EventoBriefing]:
+    """Emite os eventos de streaming de um briefing já completo."""
+    yield EventoBriefing('topico_central', briefing.topico_central)
+    for artigo in briefing.artigos:
+        yield EventoBriefing(EVENTO_ARTIGO, artigo)
+    yield EventoBriefing('analise_sintetizada', briefing.analise_sintetizada)
+    yield EventoBriefing('prompt_para_imagem', briefing.prompt_para_imagem)
+    yield EventoBriefing(EVENTO_BRIEFING, briefing)
 
-def gerar_imagem_do_briefing(briefing: Optional[BriefingDeNoticias]) -> None:
+
+def criar_briefing_em_streaming(
+    topico: str,
+    cache: Optional[CacheDeBriefings] = None
+) -> Iterator[EventoBriefing]:
+    """
+    Gera um briefing em modo streaming, emitindo cada parte assim que chega.
+    
+    Cada `ArtigoEncontrado` é emitido quando seu objeto JSON fecha, seguido
+    de `analise_sintetizada` e `prompt_para_imagem`; o último evento traz o
+    `BriefingDeNoticias` completo e validado. Se um modelo falhar antes de
+    emitir qualquer evento, o próximo modelo é tentado.
+    
+    Args:
+        topico: O tema a ser pesquisado
+        cache: Cache de briefings (padrão: cache definido por BRIEFING_CACHE_PATH)
+    
+    Yields:
+        EventoBriefing: Eventos com tipo e valor
+    
+    Raises:
+        ValueError: Se o tópico for vazio ou nenhum modelo funcionar
+    
+    Example:
+        >>> for evento in criar_briefing_em_streaming("carros elétricos"):
+        ...     if evento.tipo == "artigo":
+        ...         print(evento.valor.titulo)
+    """
+    if not topico or not topico.strip():
+        logger.error("Tópico vazio fornecido")
+        raise ValueError("O tópico não pode estar vazio")
+    
+    if cache is None:
+        cache = obter_cache_padrao()
+    
+    if cache is not None:
+        briefing_em_cache = _buscar_no_cache(cache, topico)
+        if briefing_em_cache is not None:
+            yield from _eventos_do_briefing(briefing_em_cache)
+            return
+    
+    logger.info(f"Iniciando briefing em streaming para: '{topico}'")
+    client.configurar()
+    roteador = obter_roteador()
+    
+    for nome_modelo in roteador.ordenar(MODELOS_DISPONIVEIS):
+        parser = ParserIncrementalDeBriefing(fabrica_artigo=lambda dados: ArtigoEncontrado(**dados))
+        emitiu = False
+        inicio = time.perf_counter()
+        try:
+            response = _chamar_para_topico(nome_modelo, topico, stream=True)
+            
+            for trecho in response:
+                for evento in parser.alimentar(trecho.text):
+                    emitiu = True
+                    yield evento
+            
+            briefing = BriefingDeNoticias(**parser.finalizar())
+        except Exception as e:
+            roteador.registrar_falha(nome_modelo)
+            if emitiu:
+                logger.error(f"Streaming interrompido no modelo {nome_modelo}: {e}")
+                raise ValueError(f"Streaming interrompido: {e}") from e
+            logger.warning(f"Modelo {nome_modelo} não disponível: {e}")
+            continue
+        
+        roteador.registrar_sucesso(nome_modelo, time.perf_counter() - inicio)
+        logger.info(f"✅ Briefing em streaming concluído com {nome_modelo}")
+        
+        if cache is not None:
+            chave = _chave_cache(topico, _template_do_modelo(nome_modelo), nome_modelo)
+            cache.definir(chave, briefing.model_dump_json())
+        
+        yield EventoBriefing(EVENTO_BRIEFING, briefing)
+        return
+    
+    raise ValueError("Nenhum modelo disponível funcionou")
+
+
+def gerar_imagem_do_briefing(briefing: Optional[BriefingDeNoticias]) -> Optional[str]:
     """
     Usa o prompt gerado no briefing para criar uma imagem com o modelo Imagen.
     
+    A chamada bloqueia por alguns segundos; para não atrasar o briefing,
+    use a fila de imagens (`fila_imagens.obter_fila_imagens().enfileirar`).
+    
     Args:
         briefing: Objeto BriefingDeNoticias com o prompt de imagem
     
     Returns:
-        None
-    
-    Raises:
-        IOError: Se houver erro ao salvar a imagem
+        str: Caminho da imagem salva, ou None se não foi possível gerá-la
+            (erros são registrados e não propagados)
     """
     if not briefing:
         logger.warning("Briefing ausente. Não é possível gerar imagem.")
-        return
+        return None
     
     if not briefing.prompt_para_imagem:
         logger.warning("Prompt de imagem ausente no briefing.")
-        return
+        return None
 
     logger.info(f"Gerando imagem com o prompt: '{briefing.prompt_para_imagem[:50]}...'")
+    metricas = obter_metricas()
+    
+    with metricas.medir('briefing_etapa_segundos', etapa='imagem'):
+        try:
+            return salvar_imagem_do_briefing(briefing)
+        except RuntimeError as e:
+            logger.warning(f"⚠️  {e}")
+            logger.info(f"📝 Prompt para imagem: {briefing.prompt_para_imagem}")
+            logger.info("💡 Você pode usar este prompt em ferramentas como DALL-E, Midjourney ou Stable Diffusion.")
+        except (AttributeError, IndexError) as e:
+            logger.error(f"Erro ao acessar dados da imagem: {e}")
+        except IOError as e:
+            logger.error(f"Erro ao salvar imagem: {e}")
+        except Exception as e:
+            logger.error(f"Erro inesperado ao gerar a imagem: {e}", exc_info=True)
+    return None
+
+
+def salvar_imagem_do_briefing(briefing: BriefingDeNoticias) -> str:
+    """
+    Gera a imagem do briefing e a grava em OUTPUT_DIR, propagando os erros.
+    
+    Com o cache de imagens ativo (IMAGEM_CACHE_DIR), prompts já renderizados
+    (ou parecidos, com IMAGEM_CACHE_LIMIAR) não chamam o Imagen. O nome do
+    arquivo é o hash do prompt, da proporção e do modelo. Com
+    IMAGEM_DERIVADOS, a miniatura e o WebP são gerados em segundo plano.
+    
+    Args:
+        briefing: Briefing com `prompt_para_imagem`
+    
+    Returns:
+        str: Caminho da imagem salva
+    
+    Raises:
+        RuntimeError: Se o SDK de imagens (google-genai) não estiver instalado
+        Exception: Erros da API ou de gravação
+    """
+    prompt = briefing.prompt_para_imagem
+    chave = gerar_chave_imagem(prompt, PROPORCAO_IMAGEM, MODELO_IMAGEM)
+    
+    # Nome derivado do conteúdo: gravações simultâneas nunca colidem
+    nome_arquivo = f"briefing_{chave[:20]}.png"
+    output_dir = os.getenv('OUTPUT_DIR', '.')
+    os.makedirs(output_dir, exist_ok=True)
+    caminho_completo = os.path.join(output_dir, nome_arquivo)
+    single_flight_imagens.executar(caminho_completo, _renderizar_imagem, prompt, caminho_completo)
+    logger.info(f"Imagem salva como '{caminho_completo}'")
     
     try:
-        # Nota: A API ImageGenerationModel não está disponível na versão atual
-        # Esta funcionalidade será implementada quando a API Imagen estiver disponível
-        logger.warning("⚠️  Geração de imagem temporariamente desabilitada.")
-        logger.info(f"📝 Prompt para imagem: {briefing.prompt_para_imagem}")
-        logger.info("💡 Você pode usar este prompt em ferramentas como DALL-E, Midjourney ou Stable Diffusion.")
-        
-        return
-        
-        # Código original comentado para referência futura:
-        # imagen = genai.ImageGenerationModel('imagen-3.0-generate-001')
-        # result = imagen.generate_images(
-        #     prompt=briefing.prompt_para_imagem,
-        #     number_of_images=1,
-        #     aspect_ratio="16:9",
-        # )
-        # imagem_bytes = result.images[0]._pil_image
-        # nome_arquivo = f"briefing_{briefing.topico_central.replace(' ', '_').lower()}.png"
-        # output_dir = os.getenv('OUTPUT_DIR', '.')
-        # if output_dir != '.' and not os.path.exists(output_dir):
-        #     os.makedirs(output_dir)
-        #     logger.info(f"Diretório {output_dir} criado")
-        # caminho_completo = os.path.join(output_dir, nome_arquivo)
-        # imagem_bytes.save(caminho_completo)
-        # logger.info(f"Imagem salva como '{caminho_completo}'")
+        derivados = obter_pool_derivados()
+    except ValueError as e:
+        # A imagem já está salva: uma configuração ruim dos derivados não derruba o briefing
+        logger.warning(f"Derivados de imagem desativados: {e}")
+        derivados = None
+    if derivados is not None:
+        derivados.agendar(caminho_completo)
+    return caminho_completo
 
-    except AttributeError as e:
-        logger.error(f"Erro ao acessar dados da imagem: {e}")
-    except IOError as e:
-        logger.error(f"Erro ao salvar imagem: {e}")
-    except Exception as e:
-        logger.error(f"Erro inesperado ao gerar a imagem: {e}", exc_info=True)
+
+def _renderizar_imagem(prompt: str, destino: str) -> None:
+    """
+    Grava em `destino` o PNG de um prompt, vindo do cache de imagens ou do Imagen.
+    
+    Os bytes nunca passam pelo Pillow: uma imagem em cache é publicada por
+    hard link (ou cópia do kernel) e a da API é escrita direto do buffer
+    da resposta.
+    
+    Args:
+        prompt: Prompt da imagem
+        destino: Caminho final do PNG
+    """
+    metricas = obter_metricas()
+    cache = obter_cache_imagens()
+    if cache is not None:
+        caminho_cache = cache.obter(prompt, PROPORCAO_IMAGEM, MODELO_IMAGEM)
+        if caminho_cache is not None:
+            try:
+                copiar_atomico(caminho_cache, destino)
+                logger.info("✅ Imagem encontrada no cache")
+                metricas.incrementar('imagens_origem_total', origem='cache')
+                return
+            except OSError as e:
+                # Despejada por outro processo entre a consulta e a cópia
+                logger.debug(f"Imagem do cache indisponível: {e}")
+    
+    resultado = client.models.generate_images(
+        model=MODELO_IMAGEM,
+        prompt=prompt,
+        config={"number_of_images": 1, "aspect_ratio": PROPORCAO_IMAGEM},
+    )
+    gravar_atomico(destino, memoryview(resultado.generated_images[0].image.image_bytes))
+    metricas.incrementar('imagens_origem_total', origem='api')
+    
+    if cache is not None:
+        try:
+            cache.guardar_arquivo(prompt, PROPORCAO_IMAGEM, MODELO_IMAGEM, destino)
+        except OSError as e:
+            logger.warning(f"Erro ao gravar imagem no cache: {e}")
 
 
 # --- Execução do Pipeline ---
 if __name__ == "__main__":
-    # Configurar nível de log via variável de ambiente
+    # Configurar logging (nível via variável de ambiente)
     log_level = os.getenv('LOG_LEVEL', 'INFO')
-    logging.getLogger().setLevel(getattr(logging, log_level))
+    logging.basicConfig(
+        level=getattr(logging, log_level),
+        format='%(asctime)s - %(name)s - %(levelname)s - %(message)s'
+    )
     
     # Tópico pode ser fornecido via argumento ou variável de ambiente
     topico_env = os.getenv('TOPICO')
@@ -269,6 +986,11 @@ if __name__ == "__main__":
         meu_briefing = criar_briefing_avancado(topico)
         
         if meu_briefing:
+            # A imagem é gerada em segundo plano enquanto o texto é exibido
+            from fila_imagens import FilaDeImagens
+            fila_imagens = FilaDeImagens(max_concorrencia=1, gerador=salvar_imagem_do_briefing)
+            imagem = fila_imagens.enfileirar(meu_briefing)
+            
             # Imprime o resultado do conteúdo avançado
             print("\n" + "="*50)
             print("📰 BRIEFING DE NOTÍCIAS AVANÇADO 📰")
@@ -281,8 +1003,11 @@ if __name__ == "__main__":
                 print(f"{i}. {art.titulo} ({art.fonte})")
             print("="*50 + "\n")
 
-            # Executa a parte visual do pipeline
-            gerar_imagem_do_briefing(meu_briefing)
+            # Aguarda a parte visual do pipeline
+            if imagem.resultado() is None:
+                logger.warning(f"⚠️  Imagem não gerada ({imagem.erro})")
+                logger.info(f"📝 Prompt para imagem: {meu_briefing.prompt_para_imagem}")
+            fila_imagens.fechar()
             
             logger.info("Pipeline executado com sucesso!")
         else:
@@ -3,13 +3,22 @@ Versão Funcional Simplificada do CriarNoticia
 ============================================
 
 Esta versão usa a API atual do Google Generative AI de forma simplificada.
+
+O roteador de modelos guarda a saúde de cada modelo apenas na memória do
+processo. Como este script gera um único briefing e termina, cada execução
+começa sem histórico e tenta os modelos na ordem da lista; o roteador só
+reordena os modelos e abre o disjuntor dentro de um processo de longa
+duração (serviço, agendador ou lote).
 """
 
 import google.generativeai as genai
 import os
 import json
+import time
 from dotenv import load_dotenv
 
+from roteador_modelos import obter_roteador
+
 # Carregar variáveis de ambiente
 load_dotenv()
 
@@ -52,16 +61,23 @@ try:
     # Tentar diferentes modelos até encontrar um disponível
     modelos_para_tentar = ['gemini-2.0-flash-exp', 'gemini-1.5-flash', 'gemini-1.5-pro', 'gemini-pro']
     
+    # O roteador ordena os modelos pela saúde observada nas chamadas anteriores
+    # deste processo (a saúde não é persistida entre execuções)
+    roteador = obter_roteador()
+    
     modelo_funcionou = None
-    for nome_modelo in modelos_para_tentar:
+    for nome_modelo in roteador.ordenar(modelos_para_tentar):
+        inicio = time.perf_counter()
         try:
             print(f"Tentando modelo: {nome_modelo}...")
             model = genai.GenerativeModel(nome_modelo)
             response = model.generate_content(prompt)
+            roteador.registrar_sucesso(nome_modelo, time.perf_counter() - inicio)
             modelo_funcionou = nome_modelo
             print(f"✅ Modelo {nome_modelo} funcionou!\n")
             break
         except Exception as e:
+            roteador.registrar_falha(nome_modelo)
             print(f"⚠️  {nome_modelo} não disponível: {str(e)[:100]}")
             continue
     
@@ -0,0 +1,300 @@
+"""
+Deduplicação Semântica de Tópicos
+=================================
+
+Agendadores costumam enviar variações do mesmo assunto em poucos minutos
+("Apple Vision Pro lançamento", "lançamento do Apple Vision Pro"). Este
+módulo reduz cada tópico a uma assinatura (sem acentos, minúsculas, sem
+stopwords, plurais simples removidos) e compara assinaturas pela
+similaridade de Jaccard dos conjuntos de tokens. Tópicos acima do limiar
+são atendidos pelo mesmo tópico canônico, reaproveitando a geração em
+andamento ou o briefing já em cache.
+
+Exemplo:
+    >>> gerar = obter_gerador_deduplicado()
+    >>> gerar("Apple Vision Pro lançamento")
+    >>> gerar("lançamento do Apple Vision Pro")  # mesmo briefing, sem nova chamada
+"""
+
+import logging
+import os
+import re
+import threading
+import time
+import unicodedata
+from collections import OrderedDict
+from typing import Any, Callable, Dict, FrozenSet, Optional, Set, Tuple
+
+from cache_briefing import TTL_PADRAO, normalizar_topico
+from single_flight import GrupoSingleFlight
+
+logger = logging.getLogger(__name__)
+
+LIMIAR_PADRAO = 0.75
+MAX_TOPICOS_PADRAO = 10_000
+
+STOPWORDS = frozenset("""
+    a o as os um uma uns umas de da do das dos e ou em no na nos nas ao aos
+    para por pelo pela pelos pelas com sem sobre entre que se sua seu suas seus
+    the of and or in on at for to an with about from by
+""".split())
+
+_PADRAO_TOKEN = re.compile(r"\w+")
+
+
+def _sem_acentos(texto: str) -> str:
+    decomposto = unicodedata.normalize("NFKD", texto)
+    return "".join(c for c in decomposto if not unicodedata.combining(c))
+
+
+def _radical(token: str) -> str:
+    """Remove o plural simples ('carros' -> 'carro'), preservando palavras curtas."""
+    return token[:-1] if len(token) > 3 and token.endswith("s") else token
+
+
+def assinatura_topico(topico: str) -> FrozenSet[str]:
+    """
+    Reduz um tópico ao conjunto de tokens significativos.
+
+    Args:
+        topico: Tópico original
+
+    Returns:
+        FrozenSet[str]: Tokens sem acentos, em minúsculas, sem stopwords
+
+    Example:
+        >>> sorted(assinatura_topico("Lançamento do Apple Vision Pro"))
+        ['apple', 'lancamento', 'pro', 'vision']
+    """
+    tokens = _PADRAO_TOKEN.findall(_sem_acentos(topico).lower())
+    return frozenset(_radical(t) for t in tokens if t not in STOPWORDS)
+
+
+def similaridade(a: FrozenSet[str], b: FrozenSet[str]) -> float:
+    """
+    Similaridade de Jaccard entre duas assinaturas.
+
+    Args:
+        a: Primeira assinatura
+        b: Segunda assinatura
+
+    Returns:
+        float: Valor entre 0.0 (nada em comum) e 1.0 (idênticas)
+    """
+    if not a or not b:
+        return 0.0
+    return len(a & b) / len(a | b)
+
+
+class IndiceDeTopicos:
+    """
+    Índice invertido de tópicos canônicos recentes.
+
+    Attributes:
+        limiar: Similaridade mínima para considerar dois tópicos iguais
+        ttl: Tempo em segundos que um tópico canônico continua válido
+        max_topicos: Número máximo de tópicos indexados
+    """
+
+    def __init__(
+        self,
+        limiar: float = LIMIAR_PADRAO,
+        ttl: float = TTL_PADRAO,
+        max_topicos: int = MAX_TOPICOS_PADRAO,
+        relogio: Callable[[], float] = time.monotonic,
+    ):
+        self.limiar = limiar
+        self.ttl = ttl
+        self.max_topicos = max_topicos
+        self._relogio = relogio
+        self._trava = threading.Lock()
+        # canônico -> (assinatura, indexado_em, tópico como foi pedido), do mais antigo para o mais novo
+        self._topicos: "OrderedDict[str, Tuple[FrozenSet[str], float, str]]" = OrderedDict()
+        self._por_token: Dict[str, Set[str]] = {}
+
+    def __len__(self) -> int:
+        return len(self._topicos)
+
+    def _remover(self, canonico: str) -> None:
+        assinatura, _, _ = self._topicos.pop(canonico)
+        for token in assinatura:
+            donos = self._por_token.get(token)
+            if donos is not None:
+                donos.discard(canonico)
+                if not donos:
+                    del self._por_token[token]
+
+    def canonico(self, topico: str) -> str:
+        """
+        Retorna o tópico canônico equivalente, indexando o tópico se for novo.
+
+        Args:
+            topico: Tópico pedido
+
+        Returns:
+            str: Tópico canônico (o próprio tópico normalizado, se não houver similar)
+        """
+        return self._canonico(topico)[0]
+
+    def original(self, canonico: str) -> Optional[str]:
+        """
+        Retorna o tópico canônico como foi pedido, antes da normalização.
+
+        Args:
+            canonico: Tópico canônico
+
+        Returns:
+            str: Texto original, ou None se o tópico não estiver indexado
+        """
+        with self._trava:
+            entrada = self._topicos.get(canonico)
+            return entrada[2] if entrada is not None else None
+
+    def descartar(self, canonico: str) -> None:
+        """
+        Remove um tópico canônico do índice.
+
+        Args:
+            canonico: Tópico canônico
+        """
+        with self._trava:
+            if canonico in self._topicos:
+                self._remover(canonico)
+
+    def _canonico(self, topico: str) -> Tuple[str, bool]:
+        """Tópico canônico e se ele acabou de ser indexado por este pedido."""
+        normalizado = normalizar_topico(topico)
+        assinatura = assinatura_topico(topico)
+        if not assinatura:
+            return normalizado, False
+
+        agora = self._relogio()
+        with self._trava:
+            melhor, melhor_valor = None, 0.0
+            candidatos = set().union(*(self._por_token.get(t, ()) for t in assinatura))
+            for candidato in candidatos:
+                assinatura_candidato, indexado_em, _ = self._topicos[candidato]
+                if agora - indexado_em > self.ttl:
+                    self._remover(candidato)
+                    continue
+                valor = similaridade(assinatura, assinatura_candidato)
+                if valor > melhor_valor:
+                    melhor, melhor_valor = candidato, valor
+
+            if melhor is not None and melhor_valor >= self.limiar:
+                if melhor != normalizado:
+                    logger.debug(f"Tópico '{topico}' atendido por '{melhor}' (similaridade {melhor_valor:.2f})")
+                return melhor, False
+
+            if normalizado in self._topicos:
+                self._remover(normalizado)
+            self._topicos[normalizado] = (assinatura, agora, topico.strip())
+            for token in assinatura:
+                self._por_token.setdefault(token, set()).add(normalizado)
+            while len(self._topicos) > self.max_topicos:
+                self._remover(next(iter(self._topicos)))
+            return normalizado, True
+
+
+class GeradorDeduplicado:
+    """
+    Envolve um gerador de briefings, encaminhando tópicos similares ao canônico.
+
+    Pedidos para um tópico canônico que já está sendo gerado aguardam o
+    resultado em andamento; pedidos posteriores chegam ao gerador com o
+    texto original do tópico canônico e, portanto, encontram o briefing no
+    cache. Um tópico novo só permanece no índice se a geração der certo:
+    após um erro ou um retorno None, ele é descartado e não atrai pedidos
+    similares para um briefing que não existe.
+
+    Attributes:
+        indice: Índice de tópicos usado na comparação
+    """
+
+    def __init__(self, gerador: Callable[[str], Any], indice: Optional[IndiceDeTopicos] = None):
+        self.indice = indice or IndiceDeTopicos()
+        self._gerador = gerador
+        self._trava = threading.Lock()
+        self._voos = GrupoSingleFlight()
+        self._chamadas = 0
+        self._redirecionados = 0
+
+    def __call__(self, topico: str) -> Any:
+        """
+        Gera (ou reaproveita) o briefing do tópico.
+
+        Args:
+            topico: Tópico pedido
+
+        Returns:
+            O retorno do gerador para o tópico canônico
+
+        Raises:
+            ValueError: Se o tópico for vazio
+        """
+        if not topico or not topico.strip():
+            raise ValueError("O tópico não pode estar vazio")
+
+        canonico, novo = self.indice._canonico(topico)
+        redirecionado = canonico != normalizar_topico(topico)
+        with self._trava:
+            self._chamadas += 1
+            if redirecionado:
+                self._redirecionados += 1
+
+        pedido = (self.indice.original(canonico) or topico) if redirecionado else topico
+        return self._voos.executar(canonico, self._gerar, canonico, pedido, novo)
+
+    def _gerar(self, canonico: str, topico: str, novo: bool) -> Any:
+        """Chama o gerador, tirando do índice o tópico novo cuja geração falhou."""
+        resultado = None
+        try:
+            resultado = self._gerador(topico)
+        finally:
+            if novo and resultado is None:
+                self.indice.descartar(canonico)
+        return resultado
+
+    def estatisticas(self) -> Dict[str, int]:
+        """
+        Retorna os contadores de deduplicação.
+
+        Returns:
+            Dict[str, int]: chamadas, redirecionados (atendidos por outro tópico),
+                coalescidos (aguardaram uma geração em andamento) e topicos_indexados
+        """
+        with self._trava:
+            return {
+                "chamadas": self._chamadas,
+                "redirecionados": self._redirecionados,
+                "coalescidos": self._voos.estatisticas()["coalescidos"],
+                "topicos_indexados": len(self.indice),
+            }
+
+
+_gerador_padrao: Optional[GeradorDeduplicado] = None
+_trava_padrao = threading.Lock()
+
+
+def obter_gerador_deduplicado() -> GeradorDeduplicado:
+    """
+    Retorna o gerador deduplicado do processo, sobre `criar_briefing_avancado` da v2.
+
+    O limiar vem de DEDUP_LIMIAR (padrão 0.75; 1.0 só une tópicos com a
+    mesma assinatura) e a validade dos tópicos indexados segue
+    BRIEFING_CACHE_TTL.
+
+    Returns:
+        GeradorDeduplicado: Gerador compartilhado
+    """
+    global _gerador_padrao
+    if _gerador_padrao is None:
+        with _trava_padrao:
+            if _gerador_padrao is None:
+                from criar_briefing_noticias_v2 import criar_briefing_avancado
+                indice = IndiceDeTopicos(
+                    limiar=float(os.getenv("DEDUP_LIMIAR", LIMIAR_PADRAO)),
+                    ttl=float(os.getenv("BRIEFING_CACHE_TTL", TTL_PADRAO)),
+                )
+                _gerador_padrao = GeradorDeduplicado(criar_briefing_avancado, indice)
+    return _gerador_padrao
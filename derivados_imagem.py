@@ -0,0 +1,236 @@
+"""
+Derivados de Imagens
+====================
+
+Gera, a partir do PNG de um briefing, versões menores para publicação:
+uma miniatura e uma cópia em WebP. O PNG original é gravado direto do
+buffer da API, sem passar pelo Pillow; só os derivados decodificam a
+imagem, e isso acontece em um pool em segundo plano para não atrasar quem
+pediu a imagem. O Pillow libera o GIL ao decodificar, redimensionar e
+codificar, então threads bastam para ocupar vários núcleos.
+
+Os derivados têm o nome do PNG de origem (que já é um hash do conteúdo)
+e um derivado já existente não é gerado de novo.
+
+O Pillow é opcional: sem ele, os derivados são ignorados com um aviso. Ele
+só é importado quando um derivado é gerado ou o pool é configurado, para
+que importar a v2 continue leve e sem efeitos colaterais.
+
+Configuração via variáveis de ambiente:
+    IMAGEM_DERIVADOS: Derivados a gerar, separados por vírgula
+        (miniatura, webp; padrão: nenhum)
+    IMAGEM_MINIATURA_LARGURA: Largura máxima da miniatura (padrão: 320)
+    IMAGEM_DERIVADOS_WORKERS: Threads do pool de derivados (padrão: 1)
+"""
+
+import atexit
+import logging
+import os
+import threading
+from concurrent.futures import Future, ThreadPoolExecutor
+from typing import Any, Dict, List, Optional, Sequence
+
+from cache_imagens import arquivo_atomico
+
+logger = logging.getLogger(__name__)
+
+DERIVADO_MINIATURA = "miniatura"
+DERIVADO_WEBP = "webp"
+# Sufixo acrescentado ao nome do PNG de origem
+SUFIXOS = {
+    DERIVADO_MINIATURA: "_miniatura.webp",
+    DERIVADO_WEBP: ".webp",
+}
+LARGURA_MINIATURA_PADRAO = 320
+QUALIDADE_WEBP = 85
+
+
+def _carregar_pillow() -> Optional[Any]:
+    """Módulo `PIL.Image`, ou None se o Pillow não estiver instalado."""
+    try:
+        from PIL import Image
+    except ImportError:  # pragma: no cover - depende do ambiente
+        return None
+    return Image
+
+
+def caminho_derivado(caminho: str, derivado: str) -> str:
+    """
+    Caminho de um derivado do PNG indicado.
+
+    Args:
+        caminho: PNG de origem
+        derivado: 'miniatura' ou 'webp'
+
+    Returns:
+        str: Caminho do derivado
+    """
+    return os.path.splitext(caminho)[0] + SUFIXOS[derivado]
+
+
+def gerar_derivados(
+    caminho: str,
+    derivados: Sequence[str] = (DERIVADO_MINIATURA, DERIVADO_WEBP),
+    largura_miniatura: int = LARGURA_MINIATURA_PADRAO,
+) -> List[str]:
+    """
+    Gera os derivados de um PNG (decodificando-o uma única vez).
+
+    Args:
+        caminho: PNG de origem
+        derivados: Derivados desejados
+        largura_miniatura: Largura máxima da miniatura, em pixels
+
+    Returns:
+        List[str]: Caminhos dos derivados, na ordem pedida
+
+    Raises:
+        ValueError: Se um derivado for desconhecido
+        RuntimeError: Se o Pillow não estiver instalado
+    """
+    desconhecidos = [d for d in derivados if d not in SUFIXOS]
+    if desconhecidos:
+        raise ValueError(f"Derivados desconhecidos: {', '.join(desconhecidos)} (use {', '.join(SUFIXOS)})")
+    Image = _carregar_pillow()
+    if Image is None:
+        raise RuntimeError("Derivados de imagem requerem o pacote Pillow (pip install Pillow)")
+
+    destinos = [caminho_derivado(caminho, d) for d in derivados]
+    pendentes = [(d, destino) for d, destino in zip(derivados, destinos) if not os.path.exists(destino)]
+    if not pendentes:
+        return destinos
+
+    with Image.open(caminho) as imagem:
+        imagem.load()
+        for derivado, destino in pendentes:
+            if derivado == DERIVADO_MINIATURA:
+                saida = imagem.copy()
+                saida.thumbnail((largura_miniatura, max(1, largura_miniatura * imagem.height // max(imagem.width, 1))))
+            else:
+                saida = imagem
+            with arquivo_atomico(destino) as arquivo:
+                saida.save(arquivo, format="WEBP", quality=QUALIDADE_WEBP)
+            logger.debug(f"Derivado '{derivado}' salvo como '{destino}'")
+    return destinos
+
+
+class PoolDeDerivados:
+    """
+    Pool em segundo plano que gera os derivados das imagens salvas.
+
+    Attributes:
+        derivados: Derivados gerados para cada imagem
+        largura_miniatura: Largura máxima da miniatura
+    """
+
+    def __init__(
+        self,
+        derivados: Sequence[str] = (DERIVADO_MINIATURA, DERIVADO_WEBP),
+        largura_miniatura: int = LARGURA_MINIATURA_PADRAO,
+        workers: int = 1,
+    ):
+        self.derivados = tuple(derivados)
+        self.largura_miniatura = largura_miniatura
+        self._executor = ThreadPoolExecutor(max_workers=workers, thread_name_prefix="derivados")
+        self._trava = threading.Lock()
+        self._gerados = 0
+        self._falhas = 0
+
+    def __enter__(self) -> "PoolDeDerivados":
+        return self
+
+    def __exit__(self, tipo, valor, rastreamento) -> bool:
+        self.fechar()
+        return False
+
+    def agendar(self, caminho: str) -> Future:
+        """
+        Agenda os derivados de um PNG sem esperar por eles.
+
+        Args:
+            caminho: PNG de origem
+
+        Returns:
+            Future: Resolve para a lista de caminhos dos derivados
+        """
+        futuro = self._executor.submit(gerar_derivados, caminho, self.derivados, self.largura_miniatura)
+        futuro.add_done_callback(self._concluir)
+        return futuro
+
+    def _concluir(self, futuro: Future) -> None:
+        erro = futuro.exception()
+        with self._trava:
+            if erro is None:
+                self._gerados += 1
+            else:
+                self._falhas += 1
+        if erro is not None:
+            logger.warning(f"Falha ao gerar derivados de imagem: {erro}")
+
+    def estatisticas(self) -> Dict[str, int]:
+        """
+        Retorna os contadores do pool.
+
+        Returns:
+            Dict[str, int]: gerados e falhas
+        """
+        with self._trava:
+            return {"gerados": self._gerados, "falhas": self._falhas}
+
+    def fechar(self, esperar: bool = True) -> None:
+        """
+        Encerra o pool.
+
+        Args:
+            esperar: Aguarda os derivados em andamento
+        """
+        self._executor.shutdown(wait=esperar)
+
+
+_pool_padrao: Optional[PoolDeDerivados] = None
+_trava_padrao = threading.Lock()
+
+
+def obter_pool_derivados() -> Optional[PoolDeDerivados]:
+    """
+    Retorna o pool de derivados compartilhado do processo, se configurado.
+
+    O pool só é ativado quando IMAGEM_DERIVADOS lista algum derivado e o
+    Pillow está instalado.
+
+    Returns:
+        PoolDeDerivados: Instância compartilhada, ou None se desativado
+    """
+    global _pool_padrao
+    derivados = tuple(d.strip() for d in os.getenv("IMAGEM_DERIVADOS", "").split(",") if d.strip())
+    if not derivados:
+        return None
+
+    with _trava_padrao:
+        if _pool_padrao is None or _pool_padrao.derivados != derivados:
+            if _carregar_pillow() is None:
+                logger.warning("IMAGEM_DERIVADOS ignorada: instale o Pillow (pip install Pillow)")
+                return None
+            desconhecidos = [d for d in derivados if d not in SUFIXOS]
+            if desconhecidos:
+                raise ValueError(f"IMAGEM_DERIVADOS inválida: {', '.join(desconhecidos)} (use {', '.join(SUFIXOS)})")
+            anterior = _pool_padrao
+            _pool_padrao = PoolDeDerivados(
+                derivados,
+                largura_miniatura=int(os.getenv("IMAGEM_MINIATURA_LARGURA", LARGURA_MINIATURA_PADRAO)),
+                workers=int(os.getenv("IMAGEM_DERIVADOS_WORKERS", 1)),
+            )
+            if anterior is None:
+                atexit.register(_fechar_pool_padrao)
+            else:
+                # Os derivados já agendados no pool anterior terminam em segundo plano
+                anterior.fechar(esperar=False)
+        return _pool_padrao
+
+
+def _fechar_pool_padrao() -> None:
+    """Aguarda os derivados pendentes do pool compartilhado ao encerrar o processo."""
+    with _trava_padrao:
+        pool = _pool_padrao
+    if pool is not None:
+        pool.fechar()
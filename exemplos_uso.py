@@ -7,7 +7,10 @@ para diferentes casos de uso.
 """
 
 import os
-from criar_briefing_noticias import criar_briefing_avancado, gerar_imagem_do_briefing
+from criar_briefing_noticias import criar_briefing_avancado
+from briefing_lote import executar_lote
+from fila_imagens import obter_fila_imagens
+from pos_processamento import RENDERIZADORES, EstagioPosProcessamento, gravar_sem_sobrescrever
 
 # ============================================================================
 # EXEMPLO 1: Configurando a API Key via Variável de Ambiente (Recomendado)
@@ -39,17 +42,35 @@ def analisar_multiplos_topicos():
         "tendências em cibersegurança 2024"
     ]
     
-    briefings = []
-    for topico in topicos:
+    def exibir_resultado(resultado):
         print(f"\n{'='*60}")
-        print(f"Processando: {topico}")
+        if resultado.sucesso:
+            print(f"✅ {resultado.topico} ({resultado.duracao:.1f}s)")
+        else:
+            print(f"❌ {resultado.topico}: {resultado.erro}")
         print('='*60)
-        
-        briefing = criar_briefing_avancado(topico)
-        if briefing:
-            briefings.append(briefing)
-            # Opcionalmente, gerar imagem para cada um
-            # gerar_imagem_do_briefing(briefing)
+    
+    def exibir_arquivos(resultado):
+        if resultado.sucesso:
+            print(f"💾 {resultado.topico}: {', '.join(resultado.arquivos.values())}")
+    
+    # Os tópicos são processados em paralelo; cada resultado é exibido
+    # assim que fica pronto, e uma falha não interrompe os demais.
+    # A renderização e a gravação dos arquivos ficam em outros processos,
+    # sem ocupar as threads que chamam a API.
+    with EstagioPosProcessamento(formatos=("md", "json"), diretorio="briefings",
+                                 ao_concluir=exibir_arquivos) as estagio:
+        resultados = executar_lote(
+            topicos,
+            max_concorrencia=4,
+            gerador=criar_briefing_avancado,
+            ao_concluir=exibir_resultado,
+            pos_processamento=estagio
+        )
+    
+    briefings = [r.briefing for r in resultados if r.sucesso]
+    # Opcionalmente, pedir a imagem de cada um (geradas em segundo plano)
+    # imagens = [obter_fila_imagens().enfileirar(briefing) for briefing in briefings]
     
     return briefings
 
@@ -59,40 +80,35 @@ def analisar_multiplos_topicos():
 # ============================================================================
 def salvar_briefing_em_arquivo(briefing, formato='txt'):
     """
-    Salva o briefing gerado em um arquivo de texto ou JSON.
+    Salva o briefing gerado em um arquivo de texto, Markdown, HTML ou JSON.
+    
+    Com formato='jsonl', o briefing é anexado aos segmentos do gravador
+    configurado em BRIEFING_JSONL_DIR (ver `armazenamento_jsonl.py`), o
+    formato indicado para volumes grandes: um arquivo por briefing não
+    escala para milhares de briefings.
     """
-    import json
     from datetime import datetime
     
     if not briefing:
         return
     
-    timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
+    if formato == 'jsonl':
+        from armazenamento_jsonl import obter_gravador_jsonl
+        gravador = obter_gravador_jsonl()
+        if gravador is None:
+            print("⚠️  Defina BRIEFING_JSONL_DIR para gravar em JSONL")
+            return
+        gravador.gravar(briefing, topico=briefing.topico_central)
+        print(f"✅ Briefing anexado aos segmentos em: {gravador.diretorio}")
+        return
+    
+    timestamp = datetime.now().strftime("%Y%m%d_%H%M%S_%f")
     nome_base = f"briefing_{timestamp}"
     
-    if formato == 'txt':
-        # Salvar como texto formatado
-        with open(f"{nome_base}.txt", 'w', encoding='utf-8') as f:
-            f.write("="*70 + "\n")
-            f.write("BRIEFING DE NOTÍCIAS AVANÇADO\n")
-            f.write("="*70 + "\n\n")
-            f.write(f"TÓPICO: {briefing.topico_central}\n\n")
-            f.write("ANÁLISE SINTETIZADA\n")
-            f.write("-"*70 + "\n")
-            f.write(briefing.analise_sintetizada + "\n\n")
-            f.write("FONTES UTILIZADAS\n")
-            f.write("-"*70 + "\n")
-            for i, art in enumerate(briefing.artigos, 1):
-                f.write(f"{i}. {art.titulo}\n")
-                f.write(f"   Fonte: {art.fonte}\n")
-                f.write(f"   Resumo: {art.resumo_curto}\n\n")
-        print(f"✅ Briefing salvo em: {nome_base}.txt")
-    
-    elif formato == 'json':
-        # Salvar como JSON
-        with open(f"{nome_base}.json", 'w', encoding='utf-8') as f:
-            json.dump(briefing.model_dump(), f, ensure_ascii=False, indent=2)
-        print(f"✅ Briefing salvo em: {nome_base}.json")
+    if formato in RENDERIZADORES:
+        # txt, md, html ou json (os mesmos renderizadores do pós-processamento em lote)
+        caminho = gravar_sem_sobrescrever(nome_base, f".{formato}", RENDERIZADORES[formato](briefing))
+        print(f"✅ Briefing salvo em: {caminho}")
 
 
 # ============================================================================
@@ -100,49 +116,73 @@ def salvar_briefing_em_arquivo(briefing, formato='txt'):
 # ============================================================================
 def pipeline_robusto(topico: str):
     """
-    Executa o pipeline completo com tratamento de erros adequado.
+    Executa o pipeline completo com retry por etapa.
+    
+    Cada etapa (geração, interpretação, persistência, imagem) tem sua própria
+    política de retry com backoff exponencial e jitter. Uma etapa que falha é
+    repetida sem refazer as anteriores: uma falha ao salvar o arquivo não
+    gera o briefing de novo. Erros de validação não são repetidos: JSON
+    malformado é reparado localmente, campos faltantes são pedidos em uma
+    chamada curta de complemento e só uma resposta irrecuperável faz a
+    geração ser refeita.
     """
-    import time
+    from politica_retry import PoliticaDeRetry
+    from reparo_json import BriefingIncompleto
+    from criar_briefing_noticias_v2 import completar_briefing, gerar_resposta_bruta, interpretar_resposta
+    
+    politica_api = PoliticaDeRetry(max_tentativas=4, espera_base=2.0, espera_maxima=30.0, prazo_total=180.0)
+    politica_disco = PoliticaDeRetry(max_tentativas=3, espera_base=0.2, espera_maxima=2.0)
+    regeneracoes_maximas = 2
     
-    tentativas_maximas = 3
+    try:
+        # Etapas 1 e 2: geração e interpretação
+        for regeneracao in range(regeneracoes_maximas + 1):
+            print(f"\n🔄 Gerando briefing ({regeneracao + 1}/{regeneracoes_maximas + 1})")
+            texto, modelo = politica_api.executar(gerar_resposta_bruta, topico)
+            try:
+                try:
+                    briefing = interpretar_resposta(texto)
+                except BriefingIncompleto as e:
+                    print(f"🩹 Resposta incompleta, pedindo apenas: {', '.join(e.campos_faltando)}")
+                    briefing = politica_api.executar(completar_briefing, topico, e, modelo)
+                break
+            except ValueError as e:
+                print(f"⚠️  Resposta de {modelo} inválida: {e}")
+        else:
+            print("❌ Nenhuma resposta válida foi gerada")
+            return None
+    except Exception as e:
+        print(f"❌ Falha na geração do briefing: {e}")
+        return None
     
-    for tentativa in range(1, tentativas_maximas + 1):
+    # Exibir resultado
+    print("\n" + "="*70)
+    print("📰 BRIEFING GERADO COM SUCESSO")
+    print("="*70)
+    print(f"Tópico: {briefing.topico_central}")
+    print(f"Artigos encontrados: {len(briefing.artigos)}")
+    print(f"Tamanho da análise: {len(briefing.analise_sintetizada)} caracteres")
+    
+    # Etapa 3: persistência (cada formato é repetido isoladamente)
+    for formato in ('txt', 'json'):
         try:
-            print(f"\n🔄 Tentativa {tentativa}/{tentativas_maximas}")
-            
-            # Criar briefing
-            briefing = criar_briefing_avancado(topico)
-            
-            if not briefing:
-                raise Exception("Falha ao criar briefing")
-            
-            # Exibir resultado
-            print("\n" + "="*70)
-            print("📰 BRIEFING GERADO COM SUCESSO")
-            print("="*70)
-            print(f"Tópico: {briefing.topico_central}")
-            print(f"Artigos encontrados: {len(briefing.artigos)}")
-            print(f"Tamanho da análise: {len(briefing.analise_sintetizada)} caracteres")
-            
-            # Salvar em arquivo
-            salvar_briefing_em_arquivo(briefing, formato='txt')
-            salvar_briefing_em_arquivo(briefing, formato='json')
-            
-            # Gerar imagem
-            gerar_imagem_do_briefing(briefing)
-            
-            print("\n✅ Pipeline executado com sucesso!")
-            return briefing
-            
+            politica_disco.executar(salvar_briefing_em_arquivo, briefing, formato=formato)
         except Exception as e:
-            print(f"❌ Erro na tentativa {tentativa}: {e}")
-            if tentativa < tentativas_maximas:
-                tempo_espera = 5 * tentativa
-                print(f"⏳ Aguardando {tempo_espera} segundos antes de tentar novamente...")
-                time.sleep(tempo_espera)
-            else:
-                print("❌ Todas as tentativas falharam")
-                return None
+            print(f"❌ Falha ao salvar em {formato}: {e}")
+            return None
+    
+    # Etapa 4: imagem, gerada em segundo plano com retry próprio (uma falha
+    # aqui não invalida o briefing já salvo)
+    def exibir_imagem(imagem):
+        if imagem.erro:
+            print(f"⚠️  Falha ao gerar imagem: {imagem.erro}")
+        else:
+            print(f"🖼️  Imagem salva em: {imagem.resultado()}")
+
+    obter_fila_imagens().enfileirar(briefing).ao_concluir(exibir_imagem)
+    
+    print("\n✅ Pipeline executado com sucesso!")
+    return briefing
 
 
 # ============================================================================
@@ -156,8 +196,13 @@ def analise_comparativa(topico1: str, topico2: str):
     print(f"   Tópico 1: {topico1}")
     print(f"   Tópico 2: {topico2}")
     
-    briefing1 = criar_briefing_avancado(topico1)
-    briefing2 = criar_briefing_avancado(topico2)
+    # Os dois tópicos são gerados em paralelo
+    resultados = {
+        r.topico: r.briefing
+        for r in executar_lote([topico1, topico2], max_concorrencia=2, gerador=criar_briefing_avancado)
+    }
+    briefing1 = resultados.get(topico1)
+    briefing2 = resultados.get(topico2)
     
     if briefing1 and briefing2:
         print("\n" + "="*70)
@@ -177,23 +222,27 @@ def analise_comparativa(topico1: str, topico2: str):
 # ============================================================================
 # EXEMPLO 6: Filtrar por Data
 # ============================================================================
-def criar_briefing_com_filtro_temporal(topico: str, periodo: str = "última semana"):
+def criar_briefing_com_filtro_temporal(topico: str, periodo: str = "da última semana", artigos: str = "3 a 5"):
     """
     Cria um briefing focando em notícias de um período específico.
+    
+    O período e o número de artigos são parâmetros do template registrado
+    em `templates_prompt.py`; entram na chave do cache, então o mesmo tópico
+    com outro período gera um briefing próprio.
     """
-    prompt_customizado = f"""
-    Atue como um analista de notícias sênior. Sua tarefa é criar um briefing completo sobre o tópico: '{topico}'.
+    import criar_briefing_noticias_v2 as v2
     
-    IMPORTANTE: Foque especialmente em notícias da {periodo}.
+    print(f"\n🗓️  Briefing sobre '{topico}' com foco em notícias {periodo}")
+    briefing = v2.criar_briefing_avancado(topico, parametros={"periodo": periodo, "artigos": artigos})
     
-    1. Use a ferramenta de busca para encontrar as notícias mais recentes.
-    2. Selecione os 3 a 5 artigos mais importantes do período especificado.
-    3. Preencha todas as informações solicitadas no formato JSON, incluindo uma análise aprofundada.
-    """
+    if briefing:
+        print(f"✅ {len(briefing.artigos)} artigos selecionados")
+        for artigo in briefing.artigos:
+            print(f"   - {artigo.titulo} ({artigo.fonte})")
+    else:
+        print("❌ Falha ao gerar o briefing")
     
-    # Nota: Você precisaria modificar a função criar_briefing_avancado para aceitar
-    # um prompt customizado como parâmetro
-    print(f"💡 Para implementar filtros temporais, customize o prompt no arquivo principal")
+    return briefing
 
 
 # ============================================================================
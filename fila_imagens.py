@@ -0,0 +1,316 @@
+"""
+Fila de Geração de Imagens
+==========================
+
+Gerar a imagem de um briefing leva vários segundos, bem mais que o texto.
+A fila desacopla as duas coisas: `enfileirar` devolve na hora uma
+`ImagemPendente` (um "vale" que se resolve depois) e a imagem é gerada em
+um pool próprio de threads, com concorrência limitada e limite de taxa
+separado do usado pelas chamadas de texto.
+
+Uma imagem que falha fica registrada na própria `ImagemPendente` (e nas
+métricas) e nunca invalida o briefing. Se a fila estiver cheia, o pedido
+é recusado na hora, também sem afetar o briefing.
+
+Configuração via variáveis de ambiente:
+    IMAGEM_CONCORRENCIA: Imagens geradas ao mesmo tempo (padrão: 2)
+    IMAGEM_RPM: Imagens por minuto (padrão: 10)
+    IMAGEM_MAX_FILA: Imagens aguardando na fila (padrão: 100)
+
+Exemplo:
+    >>> briefing = criar_briefing_avancado("energia solar")
+    >>> imagem = obter_fila_imagens().enfileirar(briefing)
+    >>> ...  # o briefing já pode ser usado
+    >>> caminho = imagem.resultado(timeout=60)  # None se a imagem falhou
+"""
+
+import asyncio
+import atexit
+import logging
+import os
+import threading
+import time
+from concurrent.futures import Future, ThreadPoolExecutor
+from concurrent.futures import TimeoutError as TempoEsgotado
+from typing import Any, Callable, Dict, Optional
+
+from instrumentacao import obter_metricas
+from limitador_taxa import ESPERA_429_PADRAO, LimitadorDeTaxa, LimiteModelo, erro_de_cota, extrair_retry_after
+from politica_retry import PoliticaDeRetry
+
+logger = logging.getLogger(__name__)
+
+CONCORRENCIA_PADRAO = 2
+RPM_PADRAO = 10
+MAX_FILA_PADRAO = 100
+# Chave do balde de imagens no limitador próprio da fila
+CHAVE_LIMITE = "imagens"
+
+
+class ImagemPendente:
+    """
+    Imagem em geração para um briefing.
+
+    Attributes:
+        topico: Tópico central do briefing
+        prompt: Prompt enviado ao modelo de imagem
+    """
+
+    def __init__(self, topico: str, prompt: str, futuro: Future):
+        self.topico = topico
+        self.prompt = prompt
+        self._futuro = futuro
+
+    def __repr__(self) -> str:
+        estado = "pronta" if self.pronta() else "pendente"
+        return f"ImagemPendente({self.topico!r}, {estado})"
+
+    def pronta(self) -> bool:
+        """Indica se a geração terminou (com sucesso ou não)."""
+        return self._futuro.done()
+
+    def resultado(self, timeout: Optional[float] = None) -> Optional[str]:
+        """
+        Aguarda a imagem.
+
+        Args:
+            timeout: Espera máxima, em segundos (None: sem limite)
+
+        Returns:
+            str: Caminho da imagem, ou None se a geração falhou
+
+        Raises:
+            TimeoutError: Se a imagem não ficar pronta dentro do timeout
+        """
+        try:
+            return self._futuro.result(timeout=timeout)
+        except TempoEsgotado:
+            raise TimeoutError(f"Imagem de '{self.topico}' não ficou pronta em {timeout}s")
+        except Exception:
+            return None
+
+    async def resultado_async(self) -> Optional[str]:
+        """Versão para asyncio de `resultado` (sem bloquear o loop)."""
+        try:
+            return await asyncio.wrap_future(self._futuro)
+        except Exception:
+            return None
+
+    @property
+    def erro(self) -> Optional[str]:
+        """Descrição do erro, se a geração já falhou."""
+        if not self._futuro.done() or self._futuro.exception() is None:
+            return None
+        erro = self._futuro.exception()
+        return f"{type(erro).__name__}: {erro}"
+
+    def ao_concluir(self, callback: Callable[["ImagemPendente"], None]) -> None:
+        """
+        Registra um callback chamado quando a geração terminar.
+
+        Args:
+            callback: Recebe a própria ImagemPendente
+        """
+        self._futuro.add_done_callback(lambda _: callback(self))
+
+
+class FilaDeImagens:
+    """
+    Pool de geração de imagens com fila limitada e limite de taxa próprio.
+
+    Attributes:
+        max_concorrencia: Imagens geradas ao mesmo tempo
+        max_fila: Imagens aceitas aguardando ou em geração
+        limitador: Limitador de taxa exclusivo das imagens
+    """
+
+    def __init__(
+        self,
+        max_concorrencia: int = CONCORRENCIA_PADRAO,
+        rpm: float = RPM_PADRAO,
+        max_fila: int = MAX_FILA_PADRAO,
+        gerador: Optional[Callable[[Any], str]] = None,
+        limitador: Optional[LimitadorDeTaxa] = None,
+        politica: Optional[PoliticaDeRetry] = None,
+    ):
+        """
+        Args:
+            max_concorrencia: Imagens geradas ao mesmo tempo
+            rpm: Imagens por minuto
+            max_fila: Imagens aceitas aguardando ou em geração
+            gerador: Gera e grava a imagem de um briefing, devolvendo o caminho
+                (padrão: `criar_briefing_noticias_v2.salvar_imagem_do_briefing`)
+            limitador: Limitador de taxa (padrão: um novo, só para imagens)
+            politica: Repetição de falhas transitórias (None: uma tentativa só)
+
+        Raises:
+            ValueError: Se max_concorrencia ou max_fila forem menores que 1
+        """
+        if max_concorrencia < 1 or max_fila < 1:
+            raise ValueError("max_concorrencia e max_fila devem ser pelo menos 1")
+
+        self.max_concorrencia = max_concorrencia
+        self.max_fila = max_fila
+        self.limitador = limitador or LimitadorDeTaxa(padrao=LimiteModelo(rpm=rpm))
+        self._gerador = gerador
+        self._politica = politica
+        self._executor = ThreadPoolExecutor(max_workers=max_concorrencia, thread_name_prefix="imagens")
+        self._trava = threading.Lock()
+        self._em_andamento = 0
+        self._recusadas = 0
+        self._concluidas = 0
+        self._falhas = 0
+        self._fechada = False
+
+    def __enter__(self) -> "FilaDeImagens":
+        return self
+
+    def __exit__(self, tipo, valor, rastreamento) -> bool:
+        self.fechar()
+        return False
+
+    def _gerar(self, briefing: Any) -> str:
+        """Gera uma imagem, repetindo conforme a política (executado no pool)."""
+        gerador = self._gerador
+        if gerador is None:
+            from criar_briefing_noticias_v2 import salvar_imagem_do_briefing
+            gerador = salvar_imagem_do_briefing
+
+        if self._politica is None:
+            return self._tentar_gerar(gerador, briefing)
+        return self._politica.executar(self._tentar_gerar, gerador, briefing)
+
+    def _tentar_gerar(self, gerador: Callable[[Any], str], briefing: Any) -> str:
+        """Uma tentativa de geração, respeitando o limite de taxa."""
+        self.limitador.adquirir(CHAVE_LIMITE)
+        try:
+            with obter_metricas().medir('briefing_etapa_segundos', etapa='imagem'):
+                return gerador(briefing)
+        except Exception as e:
+            if erro_de_cota(e):
+                self.limitador.penalizar(CHAVE_LIMITE, extrair_retry_after(e) or ESPERA_429_PADRAO)
+            raise
+
+    def enfileirar(self, briefing: Any) -> ImagemPendente:
+        """
+        Pede a imagem de um briefing sem esperar por ela.
+
+        Args:
+            briefing: Briefing com `prompt_para_imagem`
+
+        Returns:
+            ImagemPendente: Resolve para o caminho da imagem (ou None se falhar)
+        """
+        topico = getattr(briefing, "topico_central", "")
+        prompt = getattr(briefing, "prompt_para_imagem", "")
+        metricas = obter_metricas()
+
+        with self._trava:
+            motivo = None
+            if self._fechada:
+                motivo = "fila de imagens fechada"
+            elif not prompt:
+                motivo = "briefing sem prompt de imagem"
+            elif self._em_andamento >= self.max_fila:
+                motivo = f"fila de imagens cheia ({self.max_fila})"
+                self._recusadas += 1
+            else:
+                self._em_andamento += 1
+
+        if motivo is not None:
+            logger.warning(f"Imagem de '{topico}' não enfileirada: {motivo}")
+            metricas.incrementar('imagens_total', resultado='recusada')
+            futuro: Future = Future()
+            futuro.set_exception(RuntimeError(motivo))
+            return ImagemPendente(topico, prompt, futuro)
+
+        futuro = self._executor.submit(self._gerar, briefing)
+        futuro.add_done_callback(self._concluir)
+        return ImagemPendente(topico, prompt, futuro)
+
+    def _concluir(self, futuro: Future) -> None:
+        erro = futuro.exception()
+        with self._trava:
+            self._em_andamento -= 1
+            if erro is None:
+                self._concluidas += 1
+            else:
+                self._falhas += 1
+        if erro is None:
+            obter_metricas().incrementar('imagens_total', resultado='sucesso')
+        else:
+            obter_metricas().incrementar('imagens_total', resultado='falha')
+            logger.warning(f"Falha ao gerar imagem: {erro}")
+
+    def estatisticas(self) -> Dict[str, int]:
+        """
+        Retorna os contadores da fila.
+
+        Returns:
+            Dict[str, int]: em_andamento, concluidas, falhas e recusadas
+        """
+        with self._trava:
+            return {
+                "em_andamento": self._em_andamento,
+                "concluidas": self._concluidas,
+                "falhas": self._falhas,
+                "recusadas": self._recusadas,
+            }
+
+    def aguardar(self, timeout: Optional[float] = None) -> bool:
+        """
+        Espera as imagens já enfileiradas terminarem.
+
+        Args:
+            timeout: Espera máxima, em segundos (None: sem limite)
+
+        Returns:
+            bool: True se a fila esvaziou
+        """
+        limite = None if timeout is None else time.monotonic() + timeout
+        while True:
+            with self._trava:
+                if self._em_andamento == 0:
+                    return True
+            if limite is not None and time.monotonic() >= limite:
+                return False
+            time.sleep(0.05)
+
+    def fechar(self, esperar: bool = True) -> None:
+        """
+        Para de aceitar pedidos e encerra o pool.
+
+        Args:
+            esperar: Aguarda as imagens em andamento terminarem
+        """
+        with self._trava:
+            self._fechada = True
+        self._executor.shutdown(wait=esperar)
+
+
+_fila_padrao: Optional[FilaDeImagens] = None
+_trava_padrao = threading.Lock()
+
+
+def obter_fila_imagens() -> FilaDeImagens:
+    """
+    Retorna a fila de imagens compartilhada do processo.
+
+    Configurada por IMAGEM_CONCORRENCIA, IMAGEM_RPM e IMAGEM_MAX_FILA, com
+    até 3 tentativas por imagem; ao fim do processo, as imagens em andamento
+    são aguardadas.
+
+    Returns:
+        FilaDeImagens: Instância compartilhada
+    """
+    global _fila_padrao
+    with _trava_padrao:
+        if _fila_padrao is None:
+            _fila_padrao = FilaDeImagens(
+                max_concorrencia=int(os.getenv("IMAGEM_CONCORRENCIA", CONCORRENCIA_PADRAO)),
+                rpm=float(os.getenv("IMAGEM_RPM", RPM_PADRAO)),
+                max_fila=int(os.getenv("IMAGEM_MAX_FILA", MAX_FILA_PADRAO)),
+                politica=PoliticaDeRetry(max_tentativas=3, espera_base=2.0, espera_maxima=30.0),
+            )
+            atexit.register(_fila_padrao.fechar)
+        return _fila_padrao
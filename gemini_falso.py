@@ -0,0 +1,238 @@
+"""
+Backend Gemini Falso
+====================
+
+Substituto determinístico do `GenerativeModel` do SDK para benchmarks e
+testes sem rede. Devolve respostas gravadas ou sintéticas com latência,
+taxa de erro e tamanho configuráveis, e se conecta ao pipeline pela
+fábrica de modelos do cliente:
+
+    >>> from criar_briefing_noticias_v2 import client
+    >>> client.usar_backend(BackendGeminiFalso(ConfiguracaoFalsa(latencia=0.2)))
+
+A mesma semente produz a mesma sequência de respostas, atrasos e erros
+(com uma única thread).
+"""
+
+import json
+import random
+import re
+import threading
+import time
+from dataclasses import dataclass, field
+from typing import Any, Iterator, List, Optional
+
+# Tamanho dos trechos devolvidos com stream=True
+TAMANHO_TRECHO = 64
+
+_PADRAO_TOPICO = re.compile(r"tópico:\s*'(.+?)'", re.DOTALL)
+# Tópicos numerados dos prompts agrupados (ver briefing_agrupado.py)
+_PADRAO_TOPICO_AGRUPADO = re.compile(r"(\d+)\. tópico: '(.+?)'")
+
+
+class ServiceUnavailable(Exception):
+    """Erro transitório simulado (mesmo nome da exceção 503 do google.api_core)."""
+
+
+@dataclass
+class ConfiguracaoFalsa:
+    """
+    Comportamento do backend falso.
+
+    Attributes:
+        latencia: Atraso fixo de cada chamada, em segundos
+        jitter: Atraso extra aleatório (0 a jitter), em segundos
+        taxa_erro: Probabilidade de uma chamada lançar ServiceUnavailable
+        artigos: Número de artigos das respostas sintéticas
+        tamanho_analise: Tamanho aproximado da análise sintética, em caracteres
+        semente: Semente do gerador aleatório
+        respostas: Respostas gravadas, usadas em rodízio no lugar das sintéticas
+        max_caracteres_saida: Trunca respostas maiores (simula o limite de saída; 0 = sem limite)
+    """
+    latencia: float = 0.0
+    jitter: float = 0.0
+    taxa_erro: float = 0.0
+    artigos: int = 4
+    tamanho_analise: int = 1200
+    semente: int = 0
+    respostas: List[str] = field(default_factory=list)
+    max_caracteres_saida: int = 0
+
+
+class RespostaFalsa:
+    """Resposta com a mesma interface usada do `GenerateContentResponse`."""
+
+    def __init__(self, texto: str):
+        self.text = texto
+
+    def __iter__(self) -> Iterator["RespostaFalsa"]:
+        for inicio in range(0, len(self.text), TAMANHO_TRECHO):
+            yield RespostaFalsa(self.text[inicio:inicio + TAMANHO_TRECHO])
+
+
+def carregar_respostas(caminho: str) -> List[str]:
+    """
+    Lê respostas gravadas de um arquivo JSONL.
+
+    Cada linha é uma string JSON (o texto bruto da resposta) ou um objeto
+    (o briefing, que é serializado de volta em JSON).
+
+    Args:
+        caminho: Caminho do arquivo
+
+    Returns:
+        List[str]: Textos das respostas
+    """
+    respostas = []
+    with open(caminho, "r", encoding="utf-8") as f:
+        for linha in f:
+            if not linha.strip():
+                continue
+            valor = json.loads(linha)
+            respostas.append(valor if isinstance(valor, str) else json.dumps(valor, ensure_ascii=False))
+    return respostas
+
+
+def _briefing_sintetico(topico: str, artigos: int, tamanho_analise: int, aleatorio: random.Random) -> dict:
+    frase = f"O tema {topico} segue em evolução com novos dados e reações do mercado. "
+    paragrafo = (frase * (tamanho_analise // (2 * len(frase)) + 1))[:tamanho_analise // 2]
+    return {
+        "topico_central": topico.title(),
+        "artigos": [
+            {
+                "titulo": f"{topico.capitalize()}: desdobramento {i + 1}",
+                "fonte": aleatorio.choice(["Reuters", "G1", "Folha", "The Verge", "BBC"]),
+                "resumo_curto": f"Resumo sintético número {i + 1} sobre {topico}.",
+            }
+            for i in range(artigos)
+        ],
+        "analise_sintetizada": f"{paragrafo}\n\n{paragrafo}",
+        "prompt_para_imagem": f"An editorial illustration about {topico}, soft light, detailed",
+    }
+
+
+def gerar_resposta_sintetica(
+    topico: str, artigos: int, tamanho_analise: int, aleatorio: random.Random, modo_json: bool = False
+) -> str:
+    """
+    Monta um JSON de briefing válido com o tamanho pedido.
+
+    Args:
+        topico: Tópico do briefing
+        artigos: Número de artigos
+        tamanho_analise: Tamanho aproximado da análise, em caracteres
+        aleatorio: Gerador aleatório
+        modo_json: Se True, devolve só o JSON compacto, como no modo JSON da API
+
+    Returns:
+        str: Texto da resposta (fora do modo JSON, cercado por markdown como o modelo costuma fazer)
+    """
+    briefing = _briefing_sintetico(topico, artigos, tamanho_analise, aleatorio)
+    if modo_json:
+        return json.dumps(briefing, ensure_ascii=False)
+    return "```json\n" + json.dumps(briefing, ensure_ascii=False, indent=2) + "\n```"
+
+
+def gerar_resposta_agrupada(topicos: List[str], artigos: int, tamanho_analise: int, aleatorio: random.Random) -> str:
+    """
+    Monta o array JSON de uma resposta agrupada, um briefing por tópico.
+
+    Args:
+        topicos: Tópicos na ordem do prompt
+        artigos: Número de artigos de cada briefing
+        tamanho_analise: Tamanho aproximado de cada análise, em caracteres
+        aleatorio: Gerador aleatório
+
+    Returns:
+        str: Texto da resposta
+    """
+    itens = []
+    for indice, topico in enumerate(topicos, 1):
+        item = {"indice": indice}
+        item.update(_briefing_sintetico(topico, artigos, tamanho_analise, aleatorio))
+        itens.append(item)
+    return "```json\n" + json.dumps(itens, ensure_ascii=False, indent=2) + "\n```"
+
+
+class GenerativeModelFalso:
+    """Modelo falso criado pela fábrica do backend."""
+
+    def __init__(self, nome: str, backend: "BackendGeminiFalso"):
+        self.model_name = nome
+        self._backend = backend
+
+    def generate_content(self, contents: Any, generation_config: Any = None, stream: bool = False) -> RespostaFalsa:
+        """
+        Simula uma chamada ao modelo.
+
+        Args:
+            contents: Prompt (o tópico é extraído dele para as respostas sintéticas)
+            generation_config: Só `response_mime_type` é considerado (modo JSON)
+            stream: Se True, a resposta pode ser iterada em trechos
+
+        Returns:
+            RespostaFalsa: Resposta com `.text`
+
+        Raises:
+            ServiceUnavailable: Conforme a taxa de erro configurada
+        """
+        modo_json = isinstance(generation_config, dict) and \
+            generation_config.get("response_mime_type") == "application/json"
+        return self._backend.responder(self.model_name, str(contents), modo_json)
+
+
+class BackendGeminiFalso:
+    """
+    Fábrica de modelos falsos com estado compartilhado (sorteios e contadores).
+
+    Attributes:
+        config: Comportamento configurado
+        chamadas: Total de chamadas recebidas
+        erros: Total de erros simulados
+        tokens_entrada: Tokens estimados dos prompts recebidos (4 caracteres por token)
+        tokens_saida: Tokens estimados das respostas devolvidas
+    """
+
+    def __init__(self, config: Optional[ConfiguracaoFalsa] = None):
+        self.config = config or ConfiguracaoFalsa()
+        self.chamadas = 0
+        self.erros = 0
+        self.tokens_entrada = 0
+        self.tokens_saida = 0
+        self._aleatorio = random.Random(self.config.semente)
+        self._trava = threading.Lock()
+
+    def __call__(self, nome: str) -> GenerativeModelFalso:
+        return GenerativeModelFalso(nome, self)
+
+    def responder(self, modelo: str, prompt: str, modo_json: bool = False) -> RespostaFalsa:
+        """Sorteia atraso, erro e conteúdo de uma chamada e a executa."""
+        config = self.config
+        with self._trava:
+            indice = self.chamadas
+            self.chamadas += 1
+            self.tokens_entrada += len(prompt) // 4
+            atraso = config.latencia + (self._aleatorio.uniform(0, config.jitter) if config.jitter else 0.0)
+            falhou = config.taxa_erro > 0 and self._aleatorio.random() < config.taxa_erro
+            if falhou:
+                self.erros += 1
+            elif config.respostas:
+                texto = config.respostas[indice % len(config.respostas)]
+            elif _PADRAO_TOPICO_AGRUPADO.search(prompt):
+                topicos = [t for _, t in _PADRAO_TOPICO_AGRUPADO.findall(prompt)]
+                texto = gerar_resposta_agrupada(topicos, config.artigos, config.tamanho_analise, self._aleatorio)
+            else:
+                correspondencia = _PADRAO_TOPICO.search(prompt)
+                topico = correspondencia.group(1) if correspondencia else "tópico"
+                texto = gerar_resposta_sintetica(topico, config.artigos, config.tamanho_analise,
+                                                 self._aleatorio, modo_json)
+            if not falhou:
+                if config.max_caracteres_saida:
+                    texto = texto[:config.max_caracteres_saida]
+                self.tokens_saida += len(texto) // 4
+
+        if atraso:
+            time.sleep(atraso)
+        if falhou:
+            raise ServiceUnavailable(f"503 Serviço indisponível (simulado, {modelo})")
+        return RespostaFalsa(texto)
@@ -0,0 +1,341 @@
+"""
+Requisições com Hedge entre Modelos
+===================================
+
+Quando o modelo primário demora mais do que o esperado (um percentil da
+sua latência recente), a mesma requisição é disparada para o próximo
+modelo da cadeia de fallback e vence a primeira resposta válida. Um
+orçamento limita a fração de chamadas extras geradas pelo hedge.
+
+Observação: chamadas síncronas já em andamento não podem ser interrompidas;
+a requisição perdedora é cancelada se ainda não começou e, caso contrário,
+seu resultado é simplesmente descartado. A chamada perdedora consome cota
+da API (requisições e tokens, no limitador e na cobrança) como qualquer
+outra; é por isso que o orçamento limita a fração de hedges.
+
+O pool tem duas threads por requisição simultânea (primário e hedge). Um
+pool menor que a concorrência de quem chama deixaria primários parados na
+fila; por isso o prazo do hedge só começa a contar quando o primário de
+fato começa, e `garantir_concorrencia` amplia o pool para um lote maior.
+Com `aguardar_inicio=True`, o início é o momento em que a chamada invoca
+`marcar_inicio` (a v2 o faz depois de obter cota no limitador de taxa):
+esperar pela cota não é lentidão do modelo, e um hedge nesse momento só
+entraria na mesma fila do limitador.
+
+Configuração via variáveis de ambiente:
+    HEDGE_ATIVO: "1" para ativar o hedge por padrão (padrão: desativado)
+    HEDGE_PERCENTIL: Percentil da latência do primário usado como atraso (padrão: 95)
+    HEDGE_ATRASO_PADRAO: Atraso em segundos enquanto não há amostras (padrão: 3.0)
+    HEDGE_ORCAMENTO: Fração máxima de chamadas extras (padrão: 0.1)
+    HEDGE_CONCORRENCIA: Requisições simultâneas previstas (padrão: 8, a do lote)
+"""
+
+import logging
+import os
+import threading
+import time
+from concurrent.futures import FIRST_COMPLETED, Future, ThreadPoolExecutor, wait
+from dataclasses import dataclass
+from typing import Callable, Dict, List, Optional, Tuple, TypeVar
+
+from roteador_modelos import RoteadorDeModelos, obter_roteador
+
+logger = logging.getLogger(__name__)
+
+T = TypeVar("T")
+
+MIN_AMOSTRAS_PERCENTIL = 10
+# Mesmo padrão de briefing_lote.MAX_CONCORRENCIA_PADRAO
+CONCORRENCIA_PADRAO = 8
+# Threads por requisição: o primário e, no máximo, um hedge em paralelo
+THREADS_POR_REQUISICAO = 2
+
+# Evento de início da chamada em andamento na thread (ver `marcar_inicio`)
+_contexto = threading.local()
+
+
+def marcar_inicio() -> None:
+    """
+    Inicia o prazo do hedge para a chamada em andamento nesta thread.
+
+    Fora de uma chamada de `ExecutorDeHedge.executar(..., aguardar_inicio=True)`
+    não faz nada.
+    """
+    iniciado = getattr(_contexto, "iniciado", None)
+    if iniciado is not None:
+        iniciado.set()
+
+
+@dataclass
+class ConfiguracaoHedge:
+    """
+    Parâmetros do hedge.
+
+    Attributes:
+        percentil: Percentil da latência do primário que dispara o hedge
+        atraso_padrao: Atraso usado enquanto há poucas amostras de latência
+        atraso_minimo: Menor atraso permitido, em segundos
+        orcamento: Fração máxima de chamadas extras em relação às requisições
+        rajada: Hedges que podem ser disparados antes de acumular orçamento
+        max_workers: Threads disponíveis para chamadas simultâneas
+            (duas por requisição simultânea)
+    """
+    percentil: float = 95.0
+    atraso_padrao: float = 3.0
+    atraso_minimo: float = 0.05
+    orcamento: float = 0.1
+    rajada: float = 1.0
+    max_workers: int = THREADS_POR_REQUISICAO * CONCORRENCIA_PADRAO
+
+    @classmethod
+    def do_ambiente(cls) -> "ConfiguracaoHedge":
+        """Cria a configuração a partir das variáveis de ambiente."""
+        concorrencia = int(os.getenv("HEDGE_CONCORRENCIA", CONCORRENCIA_PADRAO))
+        return cls(
+            percentil=float(os.getenv("HEDGE_PERCENTIL", cls.percentil)),
+            atraso_padrao=float(os.getenv("HEDGE_ATRASO_PADRAO", cls.atraso_padrao)),
+            orcamento=float(os.getenv("HEDGE_ORCAMENTO", cls.orcamento)),
+            max_workers=THREADS_POR_REQUISICAO * max(1, concorrencia),
+        )
+
+
+class OrcamentoHedge:
+    """
+    Balde de créditos que limita a fração de chamadas extras.
+
+    Cada requisição acrescenta `fracao` crédito (até `rajada`) e cada hedge
+    consome um crédito inteiro.
+    """
+
+    def __init__(self, fracao: float, rajada: float = 1.0):
+        self.fracao = fracao
+        self.rajada = rajada
+        self._creditos = rajada
+        self._trava = threading.Lock()
+
+    def registrar_requisicao(self) -> None:
+        """Acrescenta o crédito de uma nova requisição."""
+        with self._trava:
+            self._creditos = min(self.rajada, self._creditos + self.fracao)
+
+    def consumir(self) -> bool:
+        """
+        Tenta consumir o crédito de um hedge.
+
+        Returns:
+            bool: True se havia orçamento disponível
+        """
+        with self._trava:
+            if self._creditos >= 1.0:
+                self._creditos -= 1.0
+                return True
+            return False
+
+
+class ExecutorDeHedge:
+    """
+    Executa uma chamada na cadeia de modelos com hedge de latência.
+
+    Attributes:
+        config: Parâmetros do hedge
+        roteador: Roteador que fornece as latências observadas
+    """
+
+    def __init__(self, config: Optional[ConfiguracaoHedge] = None, roteador: Optional[RoteadorDeModelos] = None):
+        self.config = config or ConfiguracaoHedge()
+        self.roteador = roteador or obter_roteador()
+        self._orcamento = OrcamentoHedge(self.config.orcamento, self.config.rajada)
+        self._max_workers = self.config.max_workers
+        self._executor = ThreadPoolExecutor(max_workers=self._max_workers, thread_name_prefix="hedge")
+        self._trava = threading.Lock()
+        self._requisicoes = 0
+        self._hedges = 0
+        self._vitorias_hedge = 0
+        self._hedges_negados = 0
+
+    def garantir_concorrencia(self, requisicoes: int) -> None:
+        """
+        Amplia o pool para atender `requisicoes` chamadas simultâneas sem fila.
+
+        O pool antigo termina as chamadas em andamento e é descartado.
+
+        Args:
+            requisicoes: Requisições simultâneas previstas (ex: a concorrência do lote)
+        """
+        necessario = THREADS_POR_REQUISICAO * requisicoes
+        with self._trava:
+            if necessario <= self._max_workers:
+                return
+            antigo = self._executor
+            self._max_workers = necessario
+            self._executor = ThreadPoolExecutor(max_workers=necessario, thread_name_prefix="hedge")
+        antigo.shutdown(wait=False)
+        logger.debug(f"Pool de hedge ampliado para {necessario} threads")
+
+    def calcular_atraso(self, modelo: str) -> float:
+        """
+        Calcula quanto esperar pelo modelo antes de disparar o hedge.
+
+        Args:
+            modelo: Modelo primário
+
+        Returns:
+            float: Atraso em segundos
+        """
+        atraso = self.roteador.percentil_latencia(
+            modelo, self.config.percentil, min_amostras=MIN_AMOSTRAS_PERCENTIL
+        )
+        if atraso is None:
+            atraso = self.config.atraso_padrao
+        return max(self.config.atraso_minimo, atraso)
+
+    def executar(
+        self, candidatos: List[str], chamar: Callable[[str], T], aguardar_inicio: bool = False
+    ) -> Tuple[T, str]:
+        """
+        Executa `chamar` nos candidatos até obter um resultado válido.
+
+        O primeiro candidato é chamado imediatamente. Se não responder dentro
+        do atraso calculado e houver orçamento, o próximo candidato é chamado
+        em paralelo e vence quem responder primeiro. Falhas seguem para o
+        próximo candidato, como no fallback comum, e o novo primário ganha
+        um prazo próprio.
+
+        Args:
+            candidatos: Modelos em ordem de tentativa
+            chamar: Função que recebe o nome do modelo e devolve um resultado
+                válido, lançando exceção em caso de falha
+            aguardar_inicio: Se True, o prazo do hedge só começa quando
+                `chamar` invocar `marcar_inicio` (ou terminar)
+
+        Returns:
+            Tuple[T, str]: Resultado vencedor e o modelo que o produziu
+
+        Raises:
+            ValueError: Se nenhum candidato produzir resultado
+        """
+        fila = list(candidatos)
+        if not fila:
+            raise ValueError("Nenhum modelo candidato informado")
+
+        self._orcamento.registrar_requisicao()
+        with self._trava:
+            self._requisicoes += 1
+
+        pendentes: Dict[Future, str] = {}
+        hedges: set = set()
+        erros: List[str] = []
+
+        def disparar(como_hedge: bool = False) -> threading.Event:
+            modelo = fila.pop(0)
+            iniciado = threading.Event()
+
+            def tarefa() -> T:
+                if not aguardar_inicio:
+                    iniciado.set()
+                    return chamar(modelo)
+                _contexto.iniciado = iniciado
+                try:
+                    return chamar(modelo)
+                finally:
+                    _contexto.iniciado = None
+                    iniciado.set()
+
+            with self._trava:
+                futuro = self._executor.submit(tarefa)
+            pendentes[futuro] = modelo
+            if como_hedge:
+                hedges.add(futuro)
+            return iniciado
+
+        def disparar_primario() -> float:
+            modelo = fila[0]
+            iniciado = disparar()
+            # O prazo conta a partir do início real do primário: a espera na fila
+            # do pool (ou pela cota) não é lentidão do modelo
+            while not iniciado.wait(0.05):
+                if all(futuro.done() for futuro in pendentes):
+                    break
+            return time.monotonic() + self.calcular_atraso(modelo)
+
+        prazo_hedge = disparar_primario()
+        hedge_avaliado = False
+
+        while pendentes:
+            timeout = None
+            if not hedge_avaliado and fila:
+                timeout = max(0.0, prazo_hedge - time.monotonic())
+
+            concluidos, _ = wait(list(pendentes), timeout=timeout, return_when=FIRST_COMPLETED)
+
+            if not concluidos:
+                hedge_avaliado = True
+                if self._orcamento.consumir():
+                    logger.info(f"Primário lento; disparando hedge para {fila[0]}")
+                    with self._trava:
+                        self._hedges += 1
+                    disparar(como_hedge=True)
+                else:
+                    with self._trava:
+                        self._hedges_negados += 1
+                continue
+
+            for futuro in concluidos:
+                modelo = pendentes.pop(futuro)
+                try:
+                    resultado = futuro.result()
+                except Exception as e:
+                    logger.warning(f"Modelo {modelo} falhou: {e}")
+                    erros.append(f"{modelo}: {e}")
+                    continue
+
+                for perdedor in pendentes:
+                    perdedor.cancel()
+                if futuro in hedges:
+                    with self._trava:
+                        self._vitorias_hedge += 1
+                return resultado, modelo
+
+            if not pendentes and fila:
+                prazo_hedge = disparar_primario()
+                hedge_avaliado = False
+
+        raise ValueError(f"Nenhum modelo disponível funcionou ({'; '.join(erros)})")
+
+    def estatisticas(self) -> Dict[str, int]:
+        """
+        Retorna os contadores do hedge.
+
+        Returns:
+            Dict[str, int]: requisicoes, hedges, vitorias_hedge e hedges_negados
+        """
+        with self._trava:
+            return {
+                "requisicoes": self._requisicoes,
+                "hedges": self._hedges,
+                "vitorias_hedge": self._vitorias_hedge,
+                "hedges_negados": self._hedges_negados,
+            }
+
+
+_executor_padrao: Optional[ExecutorDeHedge] = None
+_trava_padrao = threading.Lock()
+
+
+def obter_executor_hedge() -> Optional[ExecutorDeHedge]:
+    """
+    Retorna o executor de hedge compartilhado, se ativado.
+
+    O hedge só é ativado por padrão quando HEDGE_ATIVO=1.
+
+    Returns:
+        ExecutorDeHedge: Instância compartilhada, ou None se desativado
+    """
+    global _executor_padrao
+    if os.getenv("HEDGE_ATIVO", "0") != "1":
+        return None
+
+    with _trava_padrao:
+        if _executor_padrao is None:
+            _executor_padrao = ExecutorDeHedge(ConfiguracaoHedge.do_ambiente())
+        return _executor_padrao
@@ -0,0 +1,261 @@
+"""
+Instrumentação do Pipeline
+==========================
+
+Métricas leves em memória para descobrir onde o tempo do briefing é gasto
+(chamada ao modelo, extração do JSON, validação Pydantic, saída):
+
+- Spans: blocos `with metricas.medir(...)` cronometrados em um histograma
+- Contadores: tentativas por modelo, fallbacks, falhas de interpretação
+- Histogramas: latência por etapa e tamanho das respostas
+
+Exportação em texto Prometheus (`formato_prometheus`) ou snapshot JSON
+(`snapshot`); o serviço expõe ambos em GET /metricas.
+
+Desativadas por padrão (METRICAS_HABILITADAS=1 para ativar). Desativadas,
+cada chamada retorna na primeira linha e `medir` devolve um span nulo
+compartilhado, sem leitura de relógio nem alocação.
+"""
+
+import math
+import os
+import threading
+import time
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+
+# Limites superiores dos baldes, em segundos e em bytes
+BALDES_LATENCIA = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0)
+BALDES_TAMANHO = (256, 1024, 4096, 16384, 65536, 262144, 1048576)
+
+_Chave = Tuple[str, Tuple[Tuple[str, str], ...]]
+
+
+def _chave(nome: str, rotulos: Dict[str, Any]) -> _Chave:
+    return nome, tuple(sorted((k, str(v)) for k, v in rotulos.items()))
+
+
+def _formatar_rotulos(rotulos: Sequence[Tuple[str, str]], extra: Optional[Tuple[str, str]] = None) -> str:
+    pares = list(rotulos) + ([extra] if extra else [])
+    if not pares:
+        return ""
+    conteudo = ",".join(
+        '{}="{}"'.format(k, v.replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n"))
+        for k, v in pares
+    )
+    return "{" + conteudo + "}"
+
+
+class _Histograma:
+    """Histograma cumulativo com baldes fixos."""
+
+    __slots__ = ("limites", "contagens", "soma", "contagem")
+
+    def __init__(self, limites: Sequence[float]):
+        self.limites = tuple(limites)
+        self.contagens = [0] * len(self.limites)
+        self.soma = 0.0
+        self.contagem = 0
+
+    def observar(self, valor: float) -> None:
+        self.soma += valor
+        self.contagem += 1
+        for i, limite in enumerate(self.limites):
+            if valor <= limite:
+                self.contagens[i] += 1
+                break
+
+    def cumulativos(self) -> List[Tuple[str, int]]:
+        """Retorna os pares (le, contagem acumulada), incluindo +Inf."""
+        acumulado = 0
+        pares = []
+        for limite, contagem in zip(self.limites, self.contagens):
+            acumulado += contagem
+            pares.append((_formatar_numero(limite), acumulado))
+        pares.append(("+Inf", self.contagem))
+        return pares
+
+
+def _formatar_numero(valor: float) -> str:
+    if math.isinf(valor):
+        return "+Inf"
+    return repr(float(valor)) if not float(valor).is_integer() else str(int(valor))
+
+
+class _Span:
+    """Cronometra um bloco e registra a duração ao sair."""
+
+    __slots__ = ("_metricas", "_nome", "_rotulos", "_inicio")
+
+    def __init__(self, metricas: "Metricas", nome: str, rotulos: Dict[str, Any]):
+        self._metricas = metricas
+        self._nome = nome
+        self._rotulos = rotulos
+        self._inicio = 0.0
+
+    def __enter__(self) -> "_Span":
+        self._inicio = time.perf_counter()
+        return self
+
+    def __exit__(self, tipo, valor, rastreamento) -> bool:
+        self._metricas.observar(self._nome, time.perf_counter() - self._inicio, **self._rotulos)
+        return False
+
+
+class _SpanNulo:
+    """Span usado quando as métricas estão desativadas."""
+
+    __slots__ = ()
+
+    def __enter__(self) -> "_SpanNulo":
+        return self
+
+    def __exit__(self, tipo, valor, rastreamento) -> bool:
+        return False
+
+
+_SPAN_NULO = _SpanNulo()
+
+
+class Metricas:
+    """
+    Registro de contadores e histogramas, seguro entre threads.
+
+    Attributes:
+        habilitado: Se False, todas as operações são ignoradas
+    """
+
+    def __init__(self, habilitado: bool = True):
+        self.habilitado = habilitado
+        self._trava = threading.Lock()
+        self._contadores: Dict[_Chave, float] = {}
+        self._histogramas: Dict[_Chave, _Histograma] = {}
+
+    def incrementar(self, nome: str, valor: float = 1, **rotulos: Any) -> None:
+        """
+        Soma um valor a um contador.
+
+        Args:
+            nome: Nome da métrica (ex: 'briefing_tentativas_modelo_total')
+            valor: Incremento
+            **rotulos: Rótulos da série (ex: modelo='gemini-1.5-flash')
+        """
+        if not self.habilitado:
+            return
+        chave = _chave(nome, rotulos)
+        with self._trava:
+            self._contadores[chave] = self._contadores.get(chave, 0) + valor
+
+    def observar(self, nome: str, valor: float, baldes: Sequence[float] = BALDES_LATENCIA, **rotulos: Any) -> None:
+        """
+        Registra uma observação em um histograma.
+
+        Args:
+            nome: Nome da métrica (ex: 'briefing_etapa_segundos')
+            valor: Valor observado
+            baldes: Limites dos baldes, usados na primeira observação da série
+            **rotulos: Rótulos da série
+        """
+        if not self.habilitado:
+            return
+        chave = _chave(nome, rotulos)
+        with self._trava:
+            histograma = self._histogramas.get(chave)
+            if histograma is None:
+                histograma = self._histogramas[chave] = _Histograma(baldes)
+            histograma.observar(valor)
+
+    def medir(self, nome: str, **rotulos: Any):
+        """
+        Cria um span que cronometra o bloco `with` no histograma `nome`.
+
+        Args:
+            nome: Nome do histograma de latência
+            **rotulos: Rótulos da série (ex: etapa='validacao')
+
+        Returns:
+            Gerenciador de contexto
+        """
+        if not self.habilitado:
+            return _SPAN_NULO
+        return _Span(self, nome, rotulos)
+
+    def limpar(self) -> None:
+        """Descarta todas as séries registradas."""
+        with self._trava:
+            self._contadores.clear()
+            self._histogramas.clear()
+
+    def snapshot(self) -> Dict[str, Any]:
+        """
+        Retorna o estado atual em estrutura serializável em JSON.
+
+        Returns:
+            Dict[str, Any]: {'contadores': {...}, 'histogramas': {...}}
+        """
+        with self._trava:
+            contadores: Dict[str, List[Dict[str, Any]]] = {}
+            for (nome, rotulos), valor in sorted(self._contadores.items()):
+                contadores.setdefault(nome, []).append({"rotulos": dict(rotulos), "valor": valor})
+
+            histogramas: Dict[str, List[Dict[str, Any]]] = {}
+            for (nome, rotulos), histograma in sorted(self._histogramas.items()):
+                histogramas.setdefault(nome, []).append({
+                    "rotulos": dict(rotulos),
+                    "contagem": histograma.contagem,
+                    "soma": histograma.soma,
+                    "media": histograma.soma / histograma.contagem if histograma.contagem else 0.0,
+                    "baldes": dict(histograma.cumulativos()),
+                })
+
+        return {"contadores": contadores, "histogramas": histogramas}
+
+    def formato_prometheus(self) -> str:
+        """
+        Exporta as métricas no formato de texto do Prometheus (0.0.4).
+
+        Returns:
+            str: Texto pronto para ser servido em /metricas
+        """
+        linhas: List[str] = []
+        with self._trava:
+            nome_anterior = None
+            for (nome, rotulos), valor in sorted(self._contadores.items()):
+                if nome != nome_anterior:
+                    linhas.append(f"# TYPE {nome} counter")
+                    nome_anterior = nome
+                linhas.append(f"{nome}{_formatar_rotulos(rotulos)} {_formatar_numero(valor)}")
+
+            nome_anterior = None
+            for (nome, rotulos), histograma in sorted(self._histogramas.items()):
+                if nome != nome_anterior:
+                    linhas.append(f"# TYPE {nome} histogram")
+                    nome_anterior = nome
+                for le, contagem in histograma.cumulativos():
+                    linhas.append(f"{nome}_bucket{_formatar_rotulos(rotulos, ('le', le))} {contagem}")
+                linhas.append(f"{nome}_sum{_formatar_rotulos(rotulos)} {histograma.soma}")
+                linhas.append(f"{nome}_count{_formatar_rotulos(rotulos)} {histograma.contagem}")
+
+        return "\n".join(linhas) + "\n" if linhas else ""
+
+
+_metricas: Optional[Metricas] = None
+_trava_metricas = threading.Lock()
+
+
+def obter_metricas() -> Metricas:
+    """
+    Retorna o registro de métricas do processo.
+
+    Ativado quando METRICAS_HABILITADAS=1; caso contrário o registro
+    existe, mas ignora todas as operações.
+
+    Returns:
+        Metricas: Registro compartilhado
+    """
+    global _metricas
+    if _metricas is None:
+        with _trava_metricas:
+            if _metricas is None:
+                habilitado = os.getenv("METRICAS_HABILITADAS", "0").lower() in ("1", "true", "sim")
+                _metricas = Metricas(habilitado=habilitado)
+    return _metricas
@@ -0,0 +1,424 @@
+"""
+Limitador de Taxa para Chamadas ao Gemini
+=========================================
+
+Baldes de tokens por modelo para requisições por minuto (RPM) e tokens
+estimados por minuto (TPM). Toda geração passa por `adquirir`, que
+espera (em vez de falhar) até haver cota disponível. Respostas 429 com
+indicação de "retry after" bloqueiam o modelo pelo tempo pedido, e as
+chamadas seguintes aguardam em fila.
+
+Há duas variantes com a mesma interface:
+    LimitadorDeTaxa: em memória, compartilhado por threads e tarefas asyncio
+    LimitadorDeTaxaCompartilhado: estado em arquivo protegido por flock,
+        compartilhado por vários processos no mesmo host
+
+Configuração via variáveis de ambiente:
+    GEMINI_RPM: Requisições por minuto por modelo (padrão: 60)
+    GEMINI_TPM: Tokens por minuto por modelo (padrão: 1000000)
+    GEMINI_LIMITES: JSON com limites por modelo, ex: {"gemini-1.5-pro": {"rpm": 2, "tpm": 32000}}
+    GEMINI_LIMITADOR_ARQUIVO: Caminho do estado compartilhado entre processos
+"""
+
+import asyncio
+import json
+import logging
+import os
+import re
+import threading
+import time
+from abc import ABC, abstractmethod
+from dataclasses import asdict, dataclass
+from typing import Callable, Dict, Optional
+
+try:
+    import fcntl
+except ImportError:  # Windows
+    fcntl = None
+
+logger = logging.getLogger(__name__)
+
+RPM_PADRAO = 60
+TPM_PADRAO = 1_000_000
+TOKENS_SAIDA_ESTIMADOS = 1024
+ESPERA_429_PADRAO = 10.0
+INTERVALO_MAXIMO_ESPERA = 1.0
+
+
+@dataclass
+class LimiteModelo:
+    """
+    Cotas de um modelo.
+
+    Attributes:
+        rpm: Requisições por minuto
+        tpm: Tokens (entrada + saída estimada) por minuto
+    """
+    rpm: float = RPM_PADRAO
+    tpm: float = TPM_PADRAO
+
+
+@dataclass
+class _EstadoModelo:
+    """Conteúdo dos baldes de um modelo."""
+    requisicoes: float
+    tokens: float
+    atualizado_em: float
+    bloqueado_ate: float = 0.0
+
+
+def estimar_tokens(texto: str, tokens_saida: int = TOKENS_SAIDA_ESTIMADOS) -> int:
+    """
+    Estima os tokens consumidos por uma chamada.
+
+    Usa a aproximação de ~4 caracteres por token para a entrada e soma
+    uma estimativa fixa para a saída.
+
+    Args:
+        texto: Prompt enviado
+        tokens_saida: Tokens de saída esperados
+
+    Returns:
+        int: Estimativa de tokens
+    """
+    return len(texto) // 4 + tokens_saida
+
+
+def erro_de_cota(erro: BaseException) -> bool:
+    """
+    Indica se uma exceção representa cota excedida (HTTP 429).
+
+    Decide pelo tipo da exceção ou pelo código de status que ela carrega,
+    nunca pelo texto da mensagem (que pode citar "429" por outro motivo).
+
+    Args:
+        erro: Exceção lançada pelo SDK
+
+    Returns:
+        bool: True para ResourceExhausted / 429
+    """
+    if type(erro).__name__ in ("ResourceExhausted", "TooManyRequests"):
+        return True
+    # google.api_core e urllib usam `code`; httpx/requests, `status_code`;
+    # google-genai traz também `status` ("RESOURCE_EXHAUSTED")
+    for atributo in ("code", "status_code"):
+        if getattr(erro, atributo, None) == 429:
+            return True
+    return getattr(erro, "status", None) == "RESOURCE_EXHAUSTED"
+
+
+def extrair_retry_after(erro: BaseException) -> Optional[float]:
+    """
+    Extrai o tempo de espera sugerido por um erro de cota.
+
+    Args:
+        erro: Exceção lançada pelo SDK
+
+    Returns:
+        float: Segundos a aguardar, ou None se não houver indicação
+    """
+    valor = getattr(erro, "retry_after", None)
+    if isinstance(valor, (int, float)):
+        return float(valor)
+
+    mensagem = str(erro)
+    for padrao in (r"retry in ([\d.]+)\s*s", r"retry_delay\s*\{\s*seconds:\s*(\d+)", r"retry-after:?\s*([\d.]+)"):
+        encontrado = re.search(padrao, mensagem, re.IGNORECASE)
+        if encontrado:
+            return float(encontrado.group(1))
+    return None
+
+
+def _avaliar(estado: _EstadoModelo, limite: LimiteModelo, tokens: float, agora: float) -> float:
+    """
+    Reabastece os baldes e consome a cota se houver saldo.
+
+    Args:
+        estado: Estado do modelo (modificado no lugar)
+        limite: Cotas do modelo
+        tokens: Tokens pedidos
+        agora: Instante atual
+
+    Returns:
+        float: 0.0 se a cota foi consumida, ou segundos até haver saldo
+    """
+    decorrido = max(0.0, agora - estado.atualizado_em)
+    estado.requisicoes = min(limite.rpm, estado.requisicoes + decorrido * limite.rpm / 60.0)
+    estado.tokens = min(limite.tpm, estado.tokens + decorrido * limite.tpm / 60.0)
+    estado.atualizado_em = agora
+
+    tokens = min(tokens, limite.tpm)
+    espera = max(0.0, estado.bloqueado_ate - agora)
+    if estado.requisicoes < 1.0:
+        espera = max(espera, (1.0 - estado.requisicoes) * 60.0 / limite.rpm)
+    if estado.tokens < tokens:
+        espera = max(espera, (tokens - estado.tokens) * 60.0 / limite.tpm)
+
+    if espera > 0:
+        return espera
+
+    estado.requisicoes -= 1.0
+    estado.tokens -= tokens
+    return 0.0
+
+
+class _LimitadorBase(ABC):
+    """Lógica comum de espera síncrona e assíncrona."""
+
+    def __init__(self, limites: Optional[Dict[str, LimiteModelo]] = None, padrao: Optional[LimiteModelo] = None):
+        self.limites = dict(limites or {})
+        self.padrao = padrao or LimiteModelo()
+        self._trava_contadores = threading.Lock()
+        self._esperas = 0
+        self._tempo_espera = 0.0
+        self._penalidades = 0
+
+    def limite(self, modelo: str) -> LimiteModelo:
+        """Retorna as cotas de um modelo."""
+        return self.limites.get(modelo, self.padrao)
+
+    def _estado_inicial(self, modelo: str, agora: float) -> _EstadoModelo:
+        limite = self.limite(modelo)
+        return _EstadoModelo(requisicoes=limite.rpm, tokens=limite.tpm, atualizado_em=agora)
+
+    @abstractmethod
+    def tentar_adquirir(self, modelo: str, tokens: float = 0) -> float:
+        """
+        Tenta consumir a cota sem bloquear.
+
+        Args:
+            modelo: Nome do modelo
+            tokens: Tokens estimados da chamada
+
+        Returns:
+            float: 0.0 se adquiriu, ou segundos a esperar antes de tentar de novo
+        """
+
+    @abstractmethod
+    def penalizar(self, modelo: str, segundos: float) -> None:
+        """
+        Bloqueia o modelo após um 429 pelo tempo indicado.
+
+        Args:
+            modelo: Nome do modelo
+            segundos: Tempo de bloqueio
+        """
+
+    def _registrar_espera(self, segundos: float) -> None:
+        with self._trava_contadores:
+            self._esperas += 1
+            self._tempo_espera += segundos
+
+    def adquirir(self, modelo: str, tokens: float = 0, timeout: Optional[float] = None) -> float:
+        """
+        Aguarda (bloqueando a thread) até haver cota para a chamada.
+
+        Args:
+            modelo: Nome do modelo
+            tokens: Tokens estimados da chamada
+            timeout: Tempo máximo de espera, em segundos (None = sem limite)
+
+        Returns:
+            float: Tempo total esperado, em segundos
+
+        Raises:
+            TimeoutError: Se o timeout for atingido
+        """
+        inicio = time.monotonic()
+        while True:
+            espera = self.tentar_adquirir(modelo, tokens)
+            decorrido = time.monotonic() - inicio
+            if espera <= 0:
+                if decorrido > 0:
+                    self._registrar_espera(decorrido)
+                return decorrido
+            if timeout is not None and decorrido + espera > timeout:
+                raise TimeoutError(f"Cota do modelo {modelo} indisponível em {timeout}s")
+            logger.debug(f"Aguardando cota do modelo {modelo} por {espera:.2f}s")
+            time.sleep(min(espera, INTERVALO_MAXIMO_ESPERA))
+
+    async def adquirir_async(self, modelo: str, tokens: float = 0, timeout: Optional[float] = None) -> float:
+        """
+        Versão assíncrona de `adquirir`, que não bloqueia o event loop.
+
+        Args:
+            modelo: Nome do modelo
+            tokens: Tokens estimados da chamada
+            timeout: Tempo máximo de espera, em segundos (None = sem limite)
+
+        Returns:
+            float: Tempo total esperado, em segundos
+
+        Raises:
+            TimeoutError: Se o timeout for atingido
+        """
+        inicio = time.monotonic()
+        while True:
+            espera = self.tentar_adquirir(modelo, tokens)
+            decorrido = time.monotonic() - inicio
+            if espera <= 0:
+                if decorrido > 0:
+                    self._registrar_espera(decorrido)
+                return decorrido
+            if timeout is not None and decorrido + espera > timeout:
+                raise TimeoutError(f"Cota do modelo {modelo} indisponível em {timeout}s")
+            await asyncio.sleep(min(espera, INTERVALO_MAXIMO_ESPERA))
+
+    def estatisticas(self) -> Dict[str, float]:
+        """
+        Retorna os contadores do limitador.
+
+        Returns:
+            Dict[str, float]: esperas, tempo_espera (s) e penalidades (429)
+        """
+        with self._trava_contadores:
+            return {
+                "esperas": self._esperas,
+                "tempo_espera": round(self._tempo_espera, 3),
+                "penalidades": self._penalidades,
+            }
+
+
+class LimitadorDeTaxa(_LimitadorBase):
+    """
+    Limitador em memória, compartilhado por threads e tarefas asyncio.
+    """
+
+    def __init__(
+        self,
+        limites: Optional[Dict[str, LimiteModelo]] = None,
+        padrao: Optional[LimiteModelo] = None,
+        relogio: Callable[[], float] = time.monotonic,
+    ):
+        super().__init__(limites, padrao)
+        self._relogio = relogio
+        self._trava = threading.Lock()
+        self._estados: Dict[str, _EstadoModelo] = {}
+
+    def tentar_adquirir(self, modelo: str, tokens: float = 0) -> float:
+        agora = self._relogio()
+        with self._trava:
+            estado = self._estados.get(modelo)
+            if estado is None:
+                estado = self._estados[modelo] = self._estado_inicial(modelo, agora)
+            return _avaliar(estado, self.limite(modelo), tokens, agora)
+
+    def penalizar(self, modelo: str, segundos: float) -> None:
+        agora = self._relogio()
+        with self._trava:
+            estado = self._estados.get(modelo)
+            if estado is None:
+                estado = self._estados[modelo] = self._estado_inicial(modelo, agora)
+            estado.bloqueado_ate = max(estado.bloqueado_ate, agora + segundos)
+        with self._trava_contadores:
+            self._penalidades += 1
+        logger.warning(f"Cota do modelo {modelo} excedida; pausando por {segundos:.1f}s")
+
+
+class LimitadorDeTaxaCompartilhado(_LimitadorBase):
+    """
+    Limitador com estado em arquivo, compartilhado entre processos do host.
+
+    Cada operação trava o arquivo com `fcntl.flock`, lê o estado,
+    atualiza os baldes e grava de volta. Usa o relógio de parede, comum a
+    todos os processos.
+
+    Attributes:
+        caminho: Arquivo JSON com o estado dos baldes
+    """
+
+    def __init__(
+        self,
+        caminho: str,
+        limites: Optional[Dict[str, LimiteModelo]] = None,
+        padrao: Optional[LimiteModelo] = None,
+    ):
+        if fcntl is None:
+            raise RuntimeError("LimitadorDeTaxaCompartilhado requer fcntl (Linux/macOS)")
+        super().__init__(limites, padrao)
+        self.caminho = caminho
+        self._trava = threading.Lock()
+        diretorio = os.path.dirname(os.path.abspath(caminho))
+        os.makedirs(diretorio, exist_ok=True)
+
+    def _atualizar(self, modelo: str, operacao: Callable[[_EstadoModelo, float], float]) -> float:
+        """Executa uma operação sobre o estado do modelo com o arquivo travado."""
+        with self._trava, open(self.caminho, "a+", encoding="utf-8") as arquivo:
+            fcntl.flock(arquivo, fcntl.LOCK_EX)
+            try:
+                arquivo.seek(0)
+                conteudo = arquivo.read()
+                try:
+                    estados = json.loads(conteudo) if conteudo.strip() else {}
+                except ValueError:
+                    logger.warning(f"Estado do limitador corrompido em '{self.caminho}'; reiniciando")
+                    estados = {}
+
+                agora = time.time()
+                bruto = estados.get(modelo)
+                estado = _EstadoModelo(**bruto) if bruto else self._estado_inicial(modelo, agora)
+                resultado = operacao(estado, agora)
+                estados[modelo] = asdict(estado)
+
+                arquivo.seek(0)
+                arquivo.truncate()
+                arquivo.write(json.dumps(estados))
+                arquivo.flush()
+                return resultado
+            finally:
+                fcntl.flock(arquivo, fcntl.LOCK_UN)
+
+    def tentar_adquirir(self, modelo: str, tokens: float = 0) -> float:
+        limite = self.limite(modelo)
+        return self._atualizar(modelo, lambda estado, agora: _avaliar(estado, limite, tokens, agora))
+
+    def penalizar(self, modelo: str, segundos: float) -> None:
+        def bloquear(estado: _EstadoModelo, agora: float) -> float:
+            estado.bloqueado_ate = max(estado.bloqueado_ate, agora + segundos)
+            return 0.0
+
+        self._atualizar(modelo, bloquear)
+        with self._trava_contadores:
+            self._penalidades += 1
+        logger.warning(f"Cota do modelo {modelo} excedida; pausando por {segundos:.1f}s")
+
+
+def _limites_do_ambiente() -> Dict[str, LimiteModelo]:
+    """Lê os limites por modelo de GEMINI_LIMITES."""
+    bruto = os.getenv("GEMINI_LIMITES")
+    if not bruto:
+        return {}
+    try:
+        return {modelo: LimiteModelo(**valores) for modelo, valores in json.loads(bruto).items()}
+    except (ValueError, TypeError) as e:
+        logger.error(f"GEMINI_LIMITES inválido, ignorando: {e}")
+        return {}
+
+
+_limitador_padrao: Optional[_LimitadorBase] = None
+_trava_padrao = threading.Lock()
+
+
+def obter_limitador() -> _LimitadorBase:
+    """
+    Retorna o limitador compartilhado do processo.
+
+    Usa a variante em arquivo quando GEMINI_LIMITADOR_ARQUIVO está definida.
+
+    Returns:
+        LimitadorDeTaxa ou LimitadorDeTaxaCompartilhado
+    """
+    global _limitador_padrao
+    with _trava_padrao:
+        if _limitador_padrao is None:
+            padrao = LimiteModelo(
+                rpm=float(os.getenv("GEMINI_RPM", RPM_PADRAO)),
+                tpm=float(os.getenv("GEMINI_TPM", TPM_PADRAO)),
+            )
+            limites = _limites_do_ambiente()
+            arquivo = os.getenv("GEMINI_LIMITADOR_ARQUIVO")
+            if arquivo:
+                _limitador_padrao = LimitadorDeTaxaCompartilhado(arquivo, limites, padrao)
+            else:
+                _limitador_padrao = LimitadorDeTaxa(limites, padrao)
+        return _limitador_padrao
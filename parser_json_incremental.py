@@ -0,0 +1,228 @@
+"""
+Parser JSON Incremental para Briefings
+======================================
+
+Consome a resposta do Gemini em trechos (modo streaming) e emite cada
+campo do briefing assim que ele termina de chegar: cada artigo da lista
+`artigos` é emitido quando seu objeto fecha, e os campos de texto do
+nível superior (`topico_central`, `analise_sintetizada`,
+`prompt_para_imagem`) quando suas strings fecham.
+
+Apenas o valor em andamento fica em memória; o texto completo da
+resposta nunca é acumulado. Texto antes do primeiro `{` (como cercas
+```json) e depois do fechamento do objeto é ignorado.
+
+Exemplo:
+    >>> parser = ParserIncrementalDeBriefing()
+    >>> for trecho in resposta:
+    ...     for evento in parser.alimentar(trecho.text):
+    ...         print(evento.tipo, evento.valor)
+    >>> dados = parser.finalizar()
+"""
+
+import json
+from typing import Any, Callable, Dict, List, NamedTuple, Optional
+
+EVENTO_ARTIGO = "artigo"
+EVENTO_BRIEFING = "briefing"
+CHAVE_ARTIGOS = "artigos"
+
+
+class EventoBriefing(NamedTuple):
+    """
+    Evento emitido durante o parse incremental.
+
+    Attributes:
+        tipo: "artigo", "briefing" ou o nome de um campo do nível superior
+        valor: Artigo, briefing completo ou valor do campo
+    """
+    tipo: str
+    valor: Any
+
+
+class ParserIncrementalDeBriefing:
+    """
+    Máquina de estados que percorre o JSON caractere a caractere.
+
+    Attributes:
+        fabrica_artigo: Converte o dict de cada artigo (ex: em ArtigoEncontrado)
+    """
+
+    def __init__(self, fabrica_artigo: Optional[Callable[[Dict[str, Any]], Any]] = None):
+        self.fabrica_artigo = fabrica_artigo
+        self._pilha: List[str] = []
+        self._em_string = False
+        self._escape = False
+        self._concluido = False
+
+        self._chave: Optional[str] = None
+        self._buffer_chave: Optional[List[str]] = None
+        self._esperando_valor = False
+        self._buffer_valor: Optional[List[str]] = None
+        self._valor_escalar = False
+        self._em_artigos = False
+        self._buffer_artigo: Optional[List[str]] = None
+
+        self._dados: Dict[str, Any] = {}
+        self._artigos: List[Dict[str, Any]] = []
+
+    @property
+    def concluido(self) -> bool:
+        """Indica se o objeto JSON de nível superior já foi fechado."""
+        return self._concluido
+
+    def alimentar(self, trecho: str) -> List[EventoBriefing]:
+        """
+        Processa um trecho da resposta.
+
+        Args:
+            trecho: Próximo pedaço de texto recebido
+
+        Returns:
+            List[EventoBriefing]: Eventos completados por este trecho
+
+        Raises:
+            ValueError: Se um valor completo não for JSON válido
+        """
+        eventos: List[EventoBriefing] = []
+        for c in trecho:
+            if self._concluido:
+                break
+            self._processar(c, eventos)
+        return eventos
+
+    def finalizar(self) -> Dict[str, Any]:
+        """
+        Retorna os dados completos do briefing.
+
+        Returns:
+            Dict[str, Any]: Campos do nível superior, incluindo `artigos`
+
+        Raises:
+            ValueError: Se o JSON estiver incompleto
+        """
+        if not self._concluido:
+            raise ValueError("Resposta JSON incompleta")
+        dados = dict(self._dados)
+        dados[CHAVE_ARTIGOS] = list(self._artigos)
+        return dados
+
+    def _anexar(self, c: str) -> None:
+        """Acrescenta o caractere aos valores em captura."""
+        if self._buffer_artigo is not None:
+            self._buffer_artigo.append(c)
+        elif self._buffer_valor is not None:
+            self._buffer_valor.append(c)
+
+    def _processar(self, c: str, eventos: List[EventoBriefing]) -> None:
+        """Avança a máquina de estados em um caractere."""
+        profundidade = len(self._pilha)
+
+        if profundidade == 0:
+            if c == '{':
+                self._pilha.append(c)
+            return
+
+        if self._em_string:
+            if self._buffer_chave is not None:
+                if self._escape:
+                    self._escape = False
+                elif c == '\\':
+                    self._escape = True
+                elif c == '"':
+                    self._em_string = False
+                    self._chave = json.loads('"' + "".join(self._buffer_chave) + '"')
+                    self._buffer_chave = None
+                    return
+                self._buffer_chave.append(c)
+                return
+
+            self._anexar(c)
+            if self._escape:
+                self._escape = False
+            elif c == '\\':
+                self._escape = True
+            elif c == '"':
+                self._em_string = False
+                if self._buffer_valor is not None and profundidade == 1:
+                    self._concluir_valor(eventos)
+            return
+
+        if c == '"':
+            self._em_string = True
+            if profundidade == 1 and not self._esperando_valor:
+                self._buffer_chave = []
+            elif profundidade == 1 and self._esperando_valor:
+                self._esperando_valor = False
+                self._buffer_valor = ['"']
+            else:
+                self._anexar(c)
+            return
+
+        if profundidade == 1 and self._esperando_valor:
+            if c.isspace():
+                return
+            self._esperando_valor = False
+            if c == '[' and self._chave == CHAVE_ARTIGOS:
+                self._em_artigos = True
+                self._pilha.append(c)
+                return
+            self._buffer_valor = [c]
+            if c in '{[':
+                self._pilha.append(c)
+            else:
+                self._valor_escalar = True
+            return
+
+        if profundidade == 1:
+            if c == ':':
+                self._esperando_valor = True
+                return
+            if c in ',}' and self._valor_escalar:
+                self._concluir_valor(eventos)
+            if c == '}':
+                self._pilha.pop()
+                self._concluido = True
+                return
+            if c != ',':
+                self._anexar(c)
+            return
+
+        if c in '{[':
+            self._pilha.append(c)
+            if self._em_artigos and profundidade == 2 and c == '{':
+                self._buffer_artigo = [c]
+            else:
+                self._anexar(c)
+            return
+
+        if c in '}]':
+            self._anexar(c)
+            self._pilha.pop()
+            profundidade = len(self._pilha)
+            if self._buffer_artigo is not None and profundidade == 2:
+                self._concluir_artigo(eventos)
+            elif self._em_artigos and profundidade == 1:
+                self._em_artigos = False
+            elif self._buffer_valor is not None and profundidade == 1:
+                self._concluir_valor(eventos)
+            return
+
+        self._anexar(c)
+
+    def _concluir_valor(self, eventos: List[EventoBriefing]) -> None:
+        """Decodifica o valor capturado no nível superior e emite seu evento."""
+        texto = "".join(self._buffer_valor).strip()
+        self._buffer_valor = None
+        self._valor_escalar = False
+        valor = json.loads(texto)
+        self._dados[self._chave] = valor
+        eventos.append(EventoBriefing(self._chave, valor))
+
+    def _concluir_artigo(self, eventos: List[EventoBriefing]) -> None:
+        """Decodifica o artigo capturado e emite seu evento."""
+        dados = json.loads("".join(self._buffer_artigo))
+        self._buffer_artigo = None
+        self._artigos.append(dados)
+        artigo = self.fabrica_artigo(dados) if self.fabrica_artigo else dados
+        eventos.append(EventoBriefing(EVENTO_ARTIGO, artigo))
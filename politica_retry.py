@@ -0,0 +1,182 @@
+"""
+Política de Retry Reutilizável
+==============================
+
+Backoff exponencial com jitter completo ("full jitter"), classificação
+de erros retentáveis e prazo total, com variantes síncrona e assíncrona.
+Feita para ser aplicada por etapa do pipeline (geração, interpretação,
+persistência, imagem), de modo que uma etapa com falha seja repetida sem
+refazer as que já foram concluídas.
+
+Exemplo:
+    >>> politica = PoliticaDeRetry(max_tentativas=4, espera_base=1.0, prazo_total=60)
+    >>> texto, modelo = politica.executar(gerar_resposta_bruta, "IA na saúde")
+"""
+
+import asyncio
+import inspect
+import json
+import logging
+import random
+import time
+from dataclasses import dataclass, field
+from typing import Any, Awaitable, Callable, Optional
+
+from limitador_taxa import erro_de_cota
+
+logger = logging.getLogger(__name__)
+
+# Exceções transitórias do google.api_core, identificadas pelo nome para não
+# exigir a importação do SDK
+ERROS_TRANSITORIOS_API = {
+    "ServiceUnavailable",
+    "DeadlineExceeded",
+    "InternalServerError",
+    "GatewayTimeout",
+    "BadGateway",
+    "Aborted",
+    "RetryError",
+}
+
+# Erros de E/S que se repetiriam em toda tentativa (caminho ou permissão errados)
+ERROS_OS_PERMANENTES = (
+    FileNotFoundError,
+    FileExistsError,
+    PermissionError,
+    IsADirectoryError,
+    NotADirectoryError,
+)
+
+
+def erro_retentavel(erro: BaseException) -> bool:
+    """
+    Classifica se vale a pena repetir a operação que lançou o erro.
+
+    Erros de validação e de dados (ValueError, incluindo JSONDecodeError e
+    ValidationError do Pydantic, TypeError, KeyError) são determinísticos e
+    não são repetidos, nem erros de E/S permanentes (arquivo inexistente,
+    permissão negada). Cota excedida, indisponibilidade temporária da API,
+    timeouts e os demais erros de E/S são repetidos.
+
+    Args:
+        erro: Exceção lançada
+
+    Returns:
+        bool: True se a operação deve ser tentada novamente
+    """
+    if isinstance(erro, (json.JSONDecodeError, TypeError, KeyError) + ERROS_OS_PERMANENTES):
+        return False
+    if type(erro).__name__ in ERROS_TRANSITORIOS_API or erro_de_cota(erro):
+        return True
+    if isinstance(erro, (ConnectionError, TimeoutError, OSError)):
+        return True
+    return False
+
+
+@dataclass
+class PoliticaDeRetry:
+    """
+    Parâmetros de repetição de uma etapa.
+
+    Attributes:
+        max_tentativas: Número máximo de execuções (incluindo a primeira)
+        espera_base: Espera base do backoff, em segundos
+        espera_maxima: Teto da espera entre tentativas, em segundos
+        prazo_total: Tempo máximo somando todas as tentativas (None = sem prazo)
+        retentavel: Função que decide se um erro deve ser repetido
+        aleatorio: Gerador de números aleatórios usado no jitter
+    """
+    max_tentativas: int = 3
+    espera_base: float = 1.0
+    espera_maxima: float = 30.0
+    prazo_total: Optional[float] = None
+    retentavel: Callable[[BaseException], bool] = erro_retentavel
+    aleatorio: random.Random = field(default_factory=random.Random)
+
+    def calcular_espera(self, tentativa: int) -> float:
+        """
+        Calcula a espera após a tentativa indicada (full jitter).
+
+        Args:
+            tentativa: Número da tentativa que falhou (a partir de 1)
+
+        Returns:
+            float: Espera sorteada entre 0 e min(espera_maxima, base * 2^(tentativa-1))
+        """
+        teto = min(self.espera_maxima, self.espera_base * (2 ** (tentativa - 1)))
+        return self.aleatorio.uniform(0, teto)
+
+    def _proxima_espera(self, erro: BaseException, tentativa: int, inicio: float, nome: str) -> float:
+        """Decide se há nova tentativa e quanto esperar; relança o erro caso contrário."""
+        if not self.retentavel(erro):
+            logger.debug(f"{nome}: erro não retentável ({type(erro).__name__})")
+            raise erro
+        if tentativa >= self.max_tentativas:
+            logger.warning(f"{nome}: {tentativa} tentativas esgotadas")
+            raise erro
+
+        espera = self.calcular_espera(tentativa)
+        if self.prazo_total is not None:
+            restante = self.prazo_total - (time.monotonic() - inicio)
+            if restante <= espera:
+                raise TimeoutError(f"{nome}: prazo de {self.prazo_total}s esgotado") from erro
+
+        logger.warning(f"{nome}: tentativa {tentativa} falhou ({erro}); nova tentativa em {espera:.1f}s")
+        return espera
+
+    def executar(self, funcao: Callable[..., Any], *args: Any, **kwargs: Any) -> Any:
+        """
+        Executa a função, repetindo-a conforme a política.
+
+        Args:
+            funcao: Função a executar
+            *args: Argumentos posicionais
+            **kwargs: Argumentos nomeados
+
+        Returns:
+            O retorno da função
+
+        Raises:
+            Exception: O último erro, se não for retentável ou as tentativas acabarem
+            TimeoutError: Se o prazo total for esgotado
+        """
+        nome = getattr(funcao, "__name__", "etapa")
+        inicio = time.monotonic()
+        tentativa = 0
+        while True:
+            tentativa += 1
+            try:
+                return funcao(*args, **kwargs)
+            except Exception as erro:
+                espera = self._proxima_espera(erro, tentativa, inicio, nome)
+            time.sleep(espera)
+
+    async def executar_async(self, funcao: Callable[..., Awaitable[Any]], *args: Any, **kwargs: Any) -> Any:
+        """
+        Versão assíncrona de `executar`; as esperas não bloqueiam o event loop.
+
+        Args:
+            funcao: Corrotina (ou função síncrona) a executar
+            *args: Argumentos posicionais
+            **kwargs: Argumentos nomeados
+
+        Returns:
+            O retorno da função
+
+        Raises:
+            Exception: O último erro, se não for retentável ou as tentativas acabarem
+            TimeoutError: Se o prazo total for esgotado
+        """
+        nome = getattr(funcao, "__name__", "etapa")
+        inicio = time.monotonic()
+        tentativa = 0
+        while True:
+            tentativa += 1
+            try:
+                resultado = funcao(*args, **kwargs)
+                if inspect.isawaitable(resultado):
+                    resultado = await resultado
+                return resultado
+            except Exception as erro:
+                espera = self._proxima_espera(erro, tentativa, inicio, nome)
+            await asyncio.sleep(espera)
@@ -0,0 +1,446 @@
+"""
+Pós-processamento de Briefings em Processos Separados
+=====================================================
+
+Validação, renderização (txt, markdown, HTML) e serialização JSON são
+trabalho de CPU que, feito na thread de quem gera os briefings, atrasa o
+lado de rede (asyncio e threads de chamada à API). O `EstagioPosProcessamento`
+entrega os briefings a um pool de processos e devolve os resultados por uma
+fila limitada:
+
+- `enviar` / `enviar_async` apenas submetem o briefing; a geração segue
+  enquanto os processos trabalham;
+- no máximo `max_pendentes` briefings ficam no estágio (em processamento
+  ou com resultado ainda não coletado). Acima disso `enviar` espera e
+  `enviar_async` suspende só a corrotina que enviou, sem bloquear o loop:
+  a memória fica limitada e o ritmo da geração acompanha o do estágio;
+- os resultados saem por `obter()` / `resultados()` ou pelo callback
+  `ao_concluir`.
+
+Configuração via variáveis de ambiente:
+    POS_PROCESSAMENTO_WORKERS: Processos do pool (padrão: CPUs menos uma;
+        0 processa na thread de quem envia)
+    POS_PROCESSAMENTO_MAX_PENDENTES: Briefings no estágio (padrão: 4 por processo)
+
+Exemplo:
+    >>> with EstagioPosProcessamento(formatos=("md", "json"), diretorio="saida") as estagio:
+    ...     for briefing in briefings:
+    ...         estagio.enviar(briefing)
+    ...     for resultado in estagio.resultados():
+    ...         print(resultado.arquivos)
+"""
+
+import asyncio
+import html
+import json
+import logging
+import multiprocessing
+import os
+import queue
+import threading
+import time
+from concurrent.futures import Future, ProcessPoolExecutor, ThreadPoolExecutor
+from dataclasses import dataclass, field
+from datetime import datetime
+from typing import Any, Callable, Dict, Iterator, Optional, Sequence
+
+logger = logging.getLogger(__name__)
+
+FORMATO_TXT = "txt"
+FORMATO_MARKDOWN = "md"
+FORMATO_HTML = "html"
+FORMATO_JSON = "json"
+FORMATOS_PADRAO = (FORMATO_TXT, FORMATO_JSON)
+PENDENTES_POR_WORKER = 4
+
+
+@dataclass
+class ResultadoPosProcessamento:
+    """
+    Resultado do pós-processamento de um briefing.
+
+    Attributes:
+        topico: Tópico central do briefing (vazio se a validação falhar)
+        arquivos: Caminho gravado para cada formato (quando há diretório)
+        conteudos: Texto renderizado para cada formato (quando não há diretório)
+        erro: Descrição do erro quando o pós-processamento falha
+        duracao: Tempo gasto no processo, em segundos
+    """
+    topico: str = ""
+    arquivos: Dict[str, str] = field(default_factory=dict)
+    conteudos: Dict[str, str] = field(default_factory=dict)
+    erro: Optional[str] = None
+    duracao: float = 0.0
+
+    @property
+    def sucesso(self) -> bool:
+        """Indica se todos os formatos foram gerados."""
+        return self.erro is None
+
+
+def renderizar_txt(briefing: Any) -> str:
+    """Briefing como texto formatado (mesmo layout de `salvar_briefing_em_arquivo`)."""
+    linhas = [
+        "=" * 70,
+        "BRIEFING DE NOTÍCIAS AVANÇADO",
+        "=" * 70,
+        "",
+        f"TÓPICO: {briefing.topico_central}",
+        "",
+        "ANÁLISE SINTETIZADA",
+        "-" * 70,
+        briefing.analise_sintetizada,
+        "",
+        "FONTES UTILIZADAS",
+        "-" * 70,
+    ]
+    for i, art in enumerate(briefing.artigos, 1):
+        linhas += [f"{i}. {art.titulo}", f"   Fonte: {art.fonte}", f"   Resumo: {art.resumo_curto}", ""]
+    return "\n".join(linhas) + "\n"
+
+
+def renderizar_markdown(briefing: Any) -> str:
+    """Briefing em Markdown."""
+    linhas = [
+        f"# {briefing.topico_central}",
+        "",
+        "## Análise",
+        "",
+        briefing.analise_sintetizada,
+        "",
+        "## Fontes",
+        "",
+    ]
+    for art in briefing.artigos:
+        linhas.append(f"- **{art.titulo}** ({art.fonte}): {art.resumo_curto}")
+    return "\n".join(linhas) + "\n"
+
+
+def renderizar_html(briefing: Any) -> str:
+    """Briefing como página HTML (textos escapados)."""
+    e = html.escape
+    paragrafos = "".join(
+        f"<p>{e(p.strip())}</p>" for p in briefing.analise_sintetizada.split("\n") if p.strip()
+    )
+    artigos = "".join(
+        f"<li><strong>{e(art.titulo)}</strong> <em>({e(art.fonte)})</em>: {e(art.resumo_curto)}</li>"
+        for art in briefing.artigos
+    )
+    return (
+        "<!DOCTYPE html>\n<html lang=\"pt-BR\">\n<head><meta charset=\"utf-8\">"
+        f"<title>{e(briefing.topico_central)}</title></head>\n<body>\n"
+        f"<h1>{e(briefing.topico_central)}</h1>\n<h2>Análise</h2>\n{paragrafos}\n"
+        f"<h2>Fontes</h2>\n<ul>{artigos}</ul>\n</body>\n</html>\n"
+    )
+
+
+def serializar_json(briefing: Any) -> str:
+    """Briefing como JSON indentado."""
+    return json.dumps(briefing.model_dump(), ensure_ascii=False, indent=2)
+
+
+RENDERIZADORES: Dict[str, Callable[[Any], str]] = {
+    FORMATO_TXT: renderizar_txt,
+    FORMATO_MARKDOWN: renderizar_markdown,
+    FORMATO_HTML: renderizar_html,
+    FORMATO_JSON: serializar_json,
+}
+
+
+def gravar_sem_sobrescrever(nome_base: str, extensao: str, conteudo: str) -> str:
+    """
+    Grava o conteúdo no primeiro nome livre (`nome_base`, `nome_base_2`, ...).
+
+    A abertura exclusiva (modo 'x') garante que escritores concorrentes,
+    inclusive em outros processos, nunca sobrescrevam o arquivo um do outro.
+
+    Args:
+        nome_base: Caminho sem extensão
+        extensao: Extensão com o ponto (ex: ".txt")
+        conteudo: Texto a gravar
+
+    Returns:
+        str: Caminho gravado
+    """
+    sufixo = 1
+    while True:
+        caminho = f"{nome_base}{extensao}" if sufixo == 1 else f"{nome_base}_{sufixo}{extensao}"
+        try:
+            with open(caminho, "x", encoding="utf-8") as f:
+                f.write(conteudo)
+            return caminho
+        except FileExistsError:
+            sufixo += 1
+
+
+def processar_briefing(
+    dados: Any,
+    formatos: Sequence[str] = FORMATOS_PADRAO,
+    diretorio: Optional[str] = None,
+) -> ResultadoPosProcessamento:
+    """
+    Valida, renderiza e (opcionalmente) grava um briefing. Executado nos processos do pool.
+
+    Args:
+        dados: BriefingDeNoticias, dict ou texto JSON do briefing
+        formatos: Formatos a gerar ("txt", "md", "html", "json")
+        diretorio: Onde gravar os arquivos; None devolve os textos no resultado
+
+    Returns:
+        ResultadoPosProcessamento: Arquivos ou conteúdos gerados, ou o erro
+    """
+    from criar_briefing_noticias_v2 import BriefingDeNoticias
+
+    inicio = time.perf_counter()
+    resultado = ResultadoPosProcessamento()
+    try:
+        if isinstance(dados, (str, bytes)):
+            briefing = BriefingDeNoticias.model_validate_json(dados)
+        else:
+            briefing = BriefingDeNoticias.model_validate(dados, from_attributes=True)
+        resultado.topico = briefing.topico_central
+
+        nome_base = None
+        if diretorio is not None:
+            nome_base = os.path.join(diretorio, f"briefing_{datetime.now().strftime('%Y%m%d_%H%M%S_%f')}")
+        for formato in formatos:
+            conteudo = RENDERIZADORES[formato](briefing)
+            if nome_base is None:
+                resultado.conteudos[formato] = conteudo
+            else:
+                resultado.arquivos[formato] = gravar_sem_sobrescrever(nome_base, f".{formato}", conteudo)
+    except Exception as e:
+        resultado.erro = f"{type(e).__name__}: {e}"
+    resultado.duracao = time.perf_counter() - inicio
+    return resultado
+
+
+def _serializavel(briefing: Any) -> Any:
+    """Forma enviada ao processo: dicts e textos passam direto, modelos viram dict."""
+    if hasattr(briefing, "model_dump"):
+        return briefing.model_dump()
+    return briefing
+
+
+class EstagioPosProcessamento:
+    """
+    Estágio de pós-processamento com pool de processos e fila limitada.
+
+    Attributes:
+        formatos: Formatos gerados para cada briefing
+        diretorio: Diretório de saída (None devolve os textos no resultado)
+        workers: Processos do pool (0 processa na thread de quem envia)
+        max_pendentes: Briefings no estágio (em processamento ou não coletados)
+    """
+
+    def __init__(
+        self,
+        formatos: Sequence[str] = FORMATOS_PADRAO,
+        diretorio: Optional[str] = None,
+        workers: Optional[int] = None,
+        max_pendentes: Optional[int] = None,
+        ao_concluir: Optional[Callable[[ResultadoPosProcessamento], None]] = None,
+    ):
+        """
+        Args:
+            formatos: Formatos a gerar ("txt", "md", "html", "json")
+            diretorio: Diretório de saída (criado se necessário)
+            workers: Processos do pool (padrão: POS_PROCESSAMENTO_WORKERS ou CPUs menos uma)
+            max_pendentes: Limite do estágio (padrão: POS_PROCESSAMENTO_MAX_PENDENTES
+                ou 4 por processo)
+            ao_concluir: Callback para cada resultado; sem ele, colete com `obter()`
+
+        Raises:
+            ValueError: Se um formato for desconhecido
+        """
+        desconhecidos = [f for f in formatos if f not in RENDERIZADORES]
+        if desconhecidos:
+            raise ValueError(f"Formatos desconhecidos: {', '.join(desconhecidos)} (use {', '.join(RENDERIZADORES)})")
+
+        if workers is None:
+            # Um núcleo fica com a geração; com uma só CPU o pool só adicionaria custo
+            workers = int(os.getenv("POS_PROCESSAMENTO_WORKERS", (os.cpu_count() or 1) - 1))
+        if max_pendentes is None:
+            max_pendentes = int(os.getenv(
+                "POS_PROCESSAMENTO_MAX_PENDENTES", PENDENTES_POR_WORKER * max(1, workers)
+            ))
+
+        self.formatos = tuple(formatos)
+        self.diretorio = diretorio
+        self.workers = max(0, workers)
+        self.max_pendentes = max(1, max_pendentes)
+        self._ao_concluir = ao_concluir
+        self._vagas = threading.BoundedSemaphore(self.max_pendentes)
+        self._resultados: "queue.Queue[ResultadoPosProcessamento]" = queue.Queue()
+        self._trava = threading.Lock()
+        self._enviados = 0
+        self._coletados = 0
+        self._falhas = 0
+        self._fechado = False
+
+        if diretorio is not None:
+            os.makedirs(diretorio, exist_ok=True)
+        # Threads que aguardam vagas para `enviar_async`, fora do executor padrão do loop
+        self._esperas = ThreadPoolExecutor(thread_name_prefix="pos-processamento")
+        # "spawn": o processo de geração tem threads (lote, hedge, servidor),
+        # e um fork com threads ativas pode herdar travas presas
+        self._pool = ProcessPoolExecutor(
+            max_workers=self.workers, mp_context=multiprocessing.get_context("spawn")
+        ) if self.workers else None
+
+    @property
+    def ao_concluir(self) -> Optional[Callable[[ResultadoPosProcessamento], None]]:
+        """Callback que recebe os resultados (None: coletados com `obter()`)."""
+        return self._ao_concluir
+
+    def __enter__(self) -> "EstagioPosProcessamento":
+        return self
+
+    def __exit__(self, tipo, valor, rastreamento) -> bool:
+        self.fechar()
+        return False
+
+    def enviar(self, briefing: Any, timeout: Optional[float] = None) -> bool:
+        """
+        Entrega um briefing ao estágio, esperando vaga se o limite foi atingido.
+
+        Args:
+            briefing: BriefingDeNoticias, dict ou texto JSON
+            timeout: Espera máxima por uma vaga, em segundos (None: sem limite)
+
+        Returns:
+            bool: False se não houve vaga dentro do timeout
+
+        Raises:
+            ValueError: Se o estágio já estiver fechado
+        """
+        if self._fechado:
+            raise ValueError("Estágio de pós-processamento já fechado")
+        if not self._vagas.acquire(timeout=timeout):
+            return False
+        self._submeter(briefing)
+        return True
+
+    async def enviar_async(self, briefing: Any) -> None:
+        """
+        Versão para asyncio de `enviar`: aguarda a vaga sem bloquear o loop.
+
+        Args:
+            briefing: BriefingDeNoticias, dict ou texto JSON
+
+        Raises:
+            ValueError: Se o estágio já estiver fechado
+        """
+        if self._fechado:
+            raise ValueError("Estágio de pós-processamento já fechado")
+        if not self._vagas.acquire(blocking=False):
+            futuro = self._esperas.submit(self._vagas.acquire)
+            try:
+                await asyncio.wrap_future(futuro)
+            except asyncio.CancelledError:
+                # A vaga obtida depois do cancelamento volta ao estágio
+                futuro.add_done_callback(lambda f: None if f.cancelled() else self._vagas.release())
+                raise
+        self._submeter(briefing)
+
+    def _submeter(self, briefing: Any) -> None:
+        with self._trava:
+            self._enviados += 1
+        if self._pool is None:
+            futuro: Future = Future()
+            futuro.set_result(processar_briefing(briefing, self.formatos, self.diretorio))
+        else:
+            try:
+                futuro = self._pool.submit(processar_briefing, _serializavel(briefing), self.formatos, self.diretorio)
+            except Exception:
+                with self._trava:
+                    self._enviados -= 1
+                self._vagas.release()
+                raise
+        futuro.add_done_callback(self._concluir)
+
+    def _concluir(self, futuro: Future) -> None:
+        """Recebe o resultado do processo (na thread de gerenciamento do pool)."""
+        try:
+            resultado = futuro.result()
+        except Exception as e:
+            # Processo do pool encerrado de forma anormal
+            resultado = ResultadoPosProcessamento(erro=f"{type(e).__name__}: {e}")
+        if not resultado.sucesso:
+            with self._trava:
+                self._falhas += 1
+            logger.warning(f"Falha no pós-processamento de '{resultado.topico}': {resultado.erro}")
+
+        if self._ao_concluir is None:
+            self._resultados.put(resultado)
+            return
+        try:
+            self._ao_concluir(resultado)
+        except Exception as e:
+            logger.warning(f"Erro no callback de pós-processamento: {e}")
+        finally:
+            self._marcar_coletado()
+
+    def _marcar_coletado(self) -> None:
+        with self._trava:
+            self._coletados += 1
+        self._vagas.release()
+
+    def obter(self, timeout: Optional[float] = None) -> ResultadoPosProcessamento:
+        """
+        Retira o próximo resultado da fila (liberando uma vaga).
+
+        Args:
+            timeout: Espera máxima, em segundos (None: sem limite)
+
+        Returns:
+            ResultadoPosProcessamento: Próximo resultado concluído
+
+        Raises:
+            queue.Empty: Se nenhum resultado ficar pronto dentro do timeout
+        """
+        resultado = self._resultados.get(timeout=timeout)
+        self._marcar_coletado()
+        return resultado
+
+    def resultados(self) -> Iterator[ResultadoPosProcessamento]:
+        """
+        Percorre os resultados até esvaziar o estágio, na ordem de conclusão.
+
+        Yields:
+            ResultadoPosProcessamento: Cada resultado ainda não coletado
+        """
+        if self._ao_concluir is not None:
+            raise ValueError("Os resultados já são entregues ao callback ao_concluir")
+        while True:
+            with self._trava:
+                if self._coletados >= self._enviados:
+                    return
+            yield self.obter()
+
+    def estatisticas(self) -> Dict[str, int]:
+        """
+        Retorna os contadores do estágio.
+
+        Returns:
+            Dict[str, int]: enviados, coletados, falhas e pendentes
+        """
+        with self._trava:
+            return {
+                "enviados": self._enviados,
+                "coletados": self._coletados,
+                "falhas": self._falhas,
+                "pendentes": self._enviados - self._coletados,
+            }
+
+    def fechar(self, esperar: bool = True) -> None:
+        """
+        Encerra o pool de processos.
+
+        Args:
+            esperar: Aguarda os briefings em processamento terminarem
+        """
+        self._fechado = True
+        self._esperas.shutdown(wait=False)
+        if self._pool is not None:
+            self._pool.shutdown(wait=esperar)
@@ -0,0 +1,257 @@
+"""
+Reparo de JSON Malformado
+=========================
+
+Respostas do modelo às vezes chegam quase válidas: vírgula sobrando antes
+de `}`, aspas tipográficas no lugar de aspas retas, quebras de linha cruas
+dentro de strings ou o texto cortado no meio do último artigo. Em vez de
+descartar a resposta e gerar tudo de novo, este módulo:
+
+1. repara os defeitos comuns em uma única passada pelo texto;
+2. fecha um JSON truncado no último valor completo (o trecho cortado é
+   descartado, não inventado);
+3. aproveita os artigos completos de uma lista truncada e informa quais
+   campos do briefing ficaram faltando, para que apenas eles sejam pedidos
+   ao modelo em uma chamada curta de complemento.
+
+Exemplo:
+    >>> carregar_json_tolerante('{"a": [1, 2,], “b”: "x"')
+    {'a': [1, 2], 'b': 'x'}
+"""
+
+import json
+from typing import Any, Callable, Dict, List, NamedTuple, Optional, Tuple
+
+CAMPOS_BRIEFING = ("topico_central", "artigos", "analise_sintetizada", "prompt_para_imagem")
+CHAVE_ARTIGOS = "artigos"
+
+_ABRE_ASPAS_TIPOGRAFICAS = "“”„‟″"
+_FECHA_ASPAS_TIPOGRAFICAS = "”“‟″"
+_FECHAMENTOS = {"{": "}", "[": "]"}
+
+
+class JsonReparado(NamedTuple):
+    """
+    Resultado de `reparar_json`.
+
+    Attributes:
+        texto: JSON reparado
+        truncado: Se o texto original terminou antes de fechar o JSON
+        alterado: Se algum defeito foi corrigido
+    """
+    texto: str
+    truncado: bool
+    alterado: bool
+
+
+class BriefingIncompleto(ValueError):
+    """
+    A resposta foi reparada, mas faltam campos obrigatórios do briefing.
+
+    Attributes:
+        dados: Campos recuperados (artigos inválidos já descartados)
+        campos_faltando: Campos que ainda precisam ser gerados
+    """
+
+    def __init__(self, dados: Dict[str, Any], campos_faltando: List[str]):
+        super().__init__(f"Briefing incompleto, faltando: {', '.join(campos_faltando)}")
+        self.dados = dados
+        self.campos_faltando = campos_faltando
+
+
+def reparar_json(texto: str) -> JsonReparado:
+    """
+    Corrige defeitos comuns de JSON gerado por modelos.
+
+    Texto antes do primeiro `{`/`[` e depois do fechamento é ignorado.
+    Aspas tipográficas delimitando chaves e valores viram aspas retas
+    (dentro de strings normais são preservadas), vírgulas antes de `}`/`]`
+    são removidas e quebras de linha cruas em strings são escapadas. Se o
+    texto acabar antes do fechamento, o JSON é cortado no último valor
+    completo e os containers abertos são fechados.
+
+    Args:
+        texto: Texto bruto da resposta
+
+    Returns:
+        JsonReparado: Texto reparado e o que foi feito
+
+    Raises:
+        ValueError: Se o texto não contiver um objeto ou array JSON
+    """
+    posicoes = [p for p in (texto.find("{"), texto.find("[")) if p >= 0]
+    if not posicoes:
+        raise ValueError("Nenhum objeto JSON encontrado na resposta")
+
+    saida: List[str] = []
+    pilha: List[str] = []
+    alterado = False
+    em_string = False
+    aspas_tipograficas = False
+    escape = False
+    e_chave = False
+    virgula_pendente = False
+    espacos_pendentes: List[str] = []
+    ultimo_significativo = ""
+    # (tamanho da saída, pilha) após cada valor completo
+    ponto_seguro: Tuple[int, Tuple[str, ...]] = (0, ())
+
+    def marcar_ponto_seguro() -> None:
+        nonlocal ponto_seguro
+        ponto_seguro = (len(saida), tuple(pilha))
+
+    for c in texto[min(posicoes):]:
+        if em_string:
+            if escape:
+                escape = False
+                saida.append(c)
+            elif c == "\\":
+                escape = True
+                saida.append(c)
+            elif (c == '"' and not aspas_tipograficas) or (aspas_tipograficas and c in _FECHA_ASPAS_TIPOGRAFICAS):
+                em_string = False
+                saida.append('"')
+                ultimo_significativo = '"'
+                if not e_chave:
+                    marcar_ponto_seguro()
+            elif c == '"':
+                saida.append('\\"')
+                alterado = True
+            elif c in "\n\r\t":
+                saida.append({"\n": "\\n", "\r": "\\r", "\t": "\\t"}[c])
+                alterado = True
+            else:
+                saida.append(c)
+            continue
+
+        if c.isspace():
+            (espacos_pendentes if virgula_pendente else saida).append(c)
+            continue
+
+        if virgula_pendente:
+            # A vírgula só é escrita se vier outro valor depois dela
+            virgula_pendente = False
+            if c in "}]":
+                alterado = True
+            else:
+                saida.append(",")
+                saida.extend(espacos_pendentes)
+            espacos_pendentes.clear()
+
+        if c == ",":
+            # Tudo antes da vírgula é um valor completo (inclusive números e literais)
+            marcar_ponto_seguro()
+            virgula_pendente = True
+            ultimo_significativo = c
+        elif c == '"' or c in _ABRE_ASPAS_TIPOGRAFICAS:
+            em_string = True
+            aspas_tipograficas = c != '"'
+            alterado = alterado or aspas_tipograficas
+            e_chave = bool(pilha) and pilha[-1] == "{" and ultimo_significativo in ("{", ",")
+            saida.append('"')
+        elif c in "{[":
+            pilha.append(c)
+            saida.append(c)
+            ultimo_significativo = c
+            marcar_ponto_seguro()
+        elif c in "}]":
+            if not pilha or _FECHAMENTOS[pilha[-1]] != c:
+                raise ValueError(f"Fechamento inesperado: {c}")
+            pilha.pop()
+            saida.append(c)
+            ultimo_significativo = c
+            if not pilha:
+                return JsonReparado("".join(saida), False, alterado)
+            marcar_ponto_seguro()
+        else:
+            saida.append(c)
+            ultimo_significativo = c
+
+    # Texto acabou antes do fechamento: volta ao último valor completo
+    tamanho, pilha_segura = ponto_seguro
+    parcial = "".join(saida[:tamanho]).rstrip()
+    if parcial.endswith(","):
+        parcial = parcial[:-1]
+    fechamentos = "".join(_FECHAMENTOS[a] for a in reversed(pilha_segura))
+    return JsonReparado(parcial + fechamentos, True, True)
+
+
+def carregar_json_tolerante(texto: str) -> Any:
+    """
+    Carrega JSON tentando primeiro o texto como está e depois o reparo.
+
+    Args:
+        texto: Texto bruto da resposta
+
+    Returns:
+        Any: Valor JSON (dict ou list)
+
+    Raises:
+        ValueError: Se nem o texto reparado for JSON válido
+    """
+    try:
+        return json.loads(texto)
+    except ValueError:
+        pass
+    return json.loads(reparar_json(texto).texto)
+
+
+def recuperar_briefing(
+    texto: str,
+    validar_artigo: Optional[Callable[[Dict[str, Any]], Any]] = None,
+) -> Tuple[Dict[str, Any], List[str]]:
+    """
+    Recupera o que for aproveitável de uma resposta de briefing.
+
+    Artigos que não passam em `validar_artigo` (como o último de uma lista
+    truncada) são descartados; campos de texto vazios contam como faltando.
+
+    Args:
+        texto: Texto bruto da resposta
+        validar_artigo: Valida o dict de um artigo (lança exceção se inválido)
+
+    Returns:
+        Tuple[Dict[str, Any], List[str]]: Campos recuperados e campos faltando
+
+    Raises:
+        ValueError: Se a resposta não contiver um objeto JSON
+    """
+    dados = carregar_json_tolerante(texto)
+    if not isinstance(dados, dict):
+        raise ValueError("A resposta não contém um objeto de briefing")
+
+    artigos = dados.get(CHAVE_ARTIGOS)
+    if isinstance(artigos, list):
+        aproveitados = []
+        for artigo in artigos:
+            if not isinstance(artigo, dict):
+                continue
+            if validar_artigo is not None:
+                try:
+                    validar_artigo(artigo)
+                except (ValueError, TypeError):
+                    continue
+            aproveitados.append(artigo)
+        dados[CHAVE_ARTIGOS] = aproveitados
+
+    faltando = [campo for campo in CAMPOS_BRIEFING if not dados.get(campo)]
+    return dados, faltando
+
+
+def mesclar_complemento(dados: Dict[str, Any], complemento: Dict[str, Any], campos: List[str]) -> Dict[str, Any]:
+    """
+    Preenche os campos faltantes com os valores do complemento.
+
+    Args:
+        dados: Campos já recuperados
+        complemento: Resposta da chamada de complemento
+        campos: Campos que estavam faltando
+
+    Returns:
+        Dict[str, Any]: Novo dict com os campos preenchidos
+    """
+    mesclado = dict(dados)
+    for campo in campos:
+        if complemento.get(campo):
+            mesclado[campo] = complemento[campo]
+    return mesclado
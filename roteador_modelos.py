@@ -0,0 +1,250 @@
+"""
+Roteador de Modelos com Memória de Saúde
+========================================
+
+Mantém, para cada modelo Gemini, a taxa de sucesso recente e a latência
+observada, e ordena os candidatos de fallback pela saúde de cada um.
+Um disjuntor (circuit breaker) retira de circulação modelos que falham
+repetidamente; após um tempo de espera o modelo entra em estado
+meio-aberto e recebe uma única requisição de sondagem, que decide se ele
+volta ao rodízio.
+
+Exemplo:
+    >>> roteador = obter_roteador()
+    >>> for modelo in roteador.ordenar(['gemini-2.0-flash-exp', 'gemini-1.5-flash']):
+    ...     ...
+    ...     roteador.registrar_sucesso(modelo, latencia)
+"""
+
+import logging
+import math
+import threading
+import time
+from collections import deque
+from typing import Callable, Deque, Dict, Iterable, List, Optional
+
+logger = logging.getLogger(__name__)
+
+FECHADO = "fechado"
+ABERTO = "aberto"
+MEIO_ABERTO = "meio_aberto"
+
+LIMIAR_FALHAS_PADRAO = 3
+TEMPO_REABERTURA_PADRAO = 30.0
+ALFA_PADRAO = 0.2
+AMOSTRAS_LATENCIA = 200
+
+
+class SaudeModelo:
+    """
+    Estatísticas de saúde de um modelo.
+
+    Attributes:
+        nome: Nome do modelo
+        taxa_sucesso: Média móvel exponencial de sucessos (1.0 = sempre funciona)
+        latencia_media: Média móvel exponencial da latência, em segundos
+        falhas_consecutivas: Falhas seguidas desde o último sucesso
+        estado: Estado do disjuntor (fechado, aberto ou meio_aberto)
+        chamadas: Total de chamadas registradas
+    """
+
+    def __init__(self, nome: str):
+        self.nome = nome
+        self.taxa_sucesso = 1.0
+        self.latencia_media: Optional[float] = None
+        self.falhas_consecutivas = 0
+        self.estado = FECHADO
+        self.aberto_em = 0.0
+        self.sondagem_em: Optional[float] = None
+        self.chamadas = 0
+        self.latencias: Deque[float] = deque(maxlen=AMOSTRAS_LATENCIA)
+
+    def como_dict(self) -> Dict[str, object]:
+        """Retorna as estatísticas em formato serializável."""
+        return {
+            "estado": self.estado,
+            "taxa_sucesso": round(self.taxa_sucesso, 4),
+            "latencia_media": None if self.latencia_media is None else round(self.latencia_media, 4),
+            "falhas_consecutivas": self.falhas_consecutivas,
+            "chamadas": self.chamadas,
+        }
+
+
+class RoteadorDeModelos:
+    """
+    Ordena modelos candidatos pela saúde observada.
+
+    Seguro para uso entre threads.
+
+    Attributes:
+        limiar_falhas: Falhas consecutivas que abrem o disjuntor
+        tempo_reabertura: Segundos até um modelo aberto receber sondagem
+        alfa: Peso das observações novas nas médias móveis
+    """
+
+    def __init__(
+        self,
+        limiar_falhas: int = LIMIAR_FALHAS_PADRAO,
+        tempo_reabertura: float = TEMPO_REABERTURA_PADRAO,
+        alfa: float = ALFA_PADRAO,
+        relogio: Callable[[], float] = time.monotonic,
+    ):
+        self.limiar_falhas = limiar_falhas
+        self.tempo_reabertura = tempo_reabertura
+        self.alfa = alfa
+        self._relogio = relogio
+        self._trava = threading.Lock()
+        self._saude: Dict[str, SaudeModelo] = {}
+
+    def _obter(self, nome: str) -> SaudeModelo:
+        """Retorna (criando se necessário) a saúde de um modelo (chamar com a trava)."""
+        saude = self._saude.get(nome)
+        if saude is None:
+            saude = self._saude[nome] = SaudeModelo(nome)
+        return saude
+
+    def ordenar(self, candidatos: Iterable[str]) -> List[str]:
+        """
+        Ordena os candidatos para a próxima requisição.
+
+        Modelos em sondagem (meio-abertos) vêm primeiro, seguidos dos modelos
+        saudáveis por taxa de sucesso e latência; modelos com o disjuntor
+        aberto ficam no fim, apenas como último recurso. Empates mantêm a
+        ordem de preferência recebida.
+
+        Args:
+            candidatos: Modelos em ordem de preferência
+
+        Returns:
+            List[str]: Modelos na ordem em que devem ser tentados
+        """
+        agora = self._relogio()
+        sondagens, saudaveis, abertos = [], [], []
+
+        with self._trava:
+            for indice, nome in enumerate(candidatos):
+                saude = self._obter(nome)
+
+                if saude.estado == FECHADO:
+                    # Modelos ainda não experimentados ficam atrás dos já comprovados
+                    latencia = saude.latencia_media if saude.latencia_media is not None else math.inf
+                    saudaveis.append(((-round(saude.taxa_sucesso, 1), latencia, indice), nome))
+                    continue
+
+                sondagem_expirada = (
+                    saude.sondagem_em is not None
+                    and agora - saude.sondagem_em >= self.tempo_reabertura
+                )
+                pode_sondar = agora - saude.aberto_em >= self.tempo_reabertura and (
+                    saude.sondagem_em is None or sondagem_expirada
+                )
+                if pode_sondar:
+                    saude.estado = MEIO_ABERTO
+                    saude.sondagem_em = agora
+                    logger.info(f"Modelo {nome} em sondagem (meio-aberto)")
+                    sondagens.append(nome)
+                else:
+                    abertos.append(((saude.aberto_em, indice), nome))
+
+        saudaveis.sort()
+        abertos.sort()
+        return sondagens + [nome for _, nome in saudaveis] + [nome for _, nome in abertos]
+
+    def registrar_sucesso(self, nome: str, latencia: float) -> None:
+        """
+        Registra uma resposta válida de um modelo.
+
+        Args:
+            nome: Nome do modelo
+            latencia: Duração da chamada, em segundos
+        """
+        with self._trava:
+            saude = self._obter(nome)
+            saude.chamadas += 1
+            saude.taxa_sucesso += self.alfa * (1.0 - saude.taxa_sucesso)
+            if saude.latencia_media is None:
+                saude.latencia_media = latencia
+            else:
+                saude.latencia_media += self.alfa * (latencia - saude.latencia_media)
+            saude.latencias.append(latencia)
+            saude.falhas_consecutivas = 0
+
+            if saude.estado != FECHADO:
+                logger.info(f"Modelo {nome} recuperado; disjuntor fechado")
+            saude.estado = FECHADO
+            saude.sondagem_em = None
+
+    def registrar_falha(self, nome: str) -> None:
+        """
+        Registra uma falha de um modelo, abrindo o disjuntor se necessário.
+
+        Args:
+            nome: Nome do modelo
+        """
+        with self._trava:
+            saude = self._obter(nome)
+            saude.chamadas += 1
+            saude.taxa_sucesso -= self.alfa * saude.taxa_sucesso
+            saude.falhas_consecutivas += 1
+
+            if saude.estado == MEIO_ABERTO or saude.falhas_consecutivas >= self.limiar_falhas:
+                if saude.estado != ABERTO:
+                    logger.warning(f"Disjuntor aberto para o modelo {nome}")
+                saude.estado = ABERTO
+                saude.aberto_em = self._relogio()
+                saude.sondagem_em = None
+
+    def percentil_latencia(self, nome: str, percentil: float, min_amostras: int = 1) -> Optional[float]:
+        """
+        Calcula um percentil das latências recentes de um modelo.
+
+        Só chamadas bem-sucedidas têm latência registrada, então o mínimo de
+        amostras conta sucessos, não o total de chamadas.
+
+        Args:
+            nome: Nome do modelo
+            percentil: Valor entre 0 e 100
+            min_amostras: Latências necessárias para o percentil valer
+
+        Returns:
+            float: Latência no percentil pedido, ou None com menos de `min_amostras` amostras
+        """
+        with self._trava:
+            saude = self._saude.get(nome)
+            amostras = sorted(saude.latencias) if saude else []
+
+        if not amostras or len(amostras) < min_amostras:
+            return None
+        posicao = max(0, math.ceil(percentil / 100.0 * len(amostras)) - 1)
+        return amostras[min(posicao, len(amostras) - 1)]
+
+    def estatisticas(self) -> Dict[str, Dict[str, object]]:
+        """
+        Retorna a saúde de todos os modelos conhecidos.
+
+        Returns:
+            Dict[str, Dict[str, object]]: Estatísticas por modelo
+        """
+        with self._trava:
+            return {nome: saude.como_dict() for nome, saude in self._saude.items()}
+
+
+_roteador_padrao: Optional[RoteadorDeModelos] = None
+_trava_padrao = threading.Lock()
+
+
+def obter_roteador() -> RoteadorDeModelos:
+    """
+    Retorna o roteador compartilhado do processo.
+
+    A saúde dos modelos vive só na memória do processo e recomeça do zero
+    a cada execução; não há persistência entre processos.
+
+    Returns:
+        RoteadorDeModelos: Instância compartilhada
+    """
+    global _roteador_padrao
+    with _trava_padrao:
+        if _roteador_padrao is None:
+            _roteador_padrao = RoteadorDeModelos()
+        return _roteador_padrao
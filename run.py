@@ -49,6 +49,62 @@ def executar_testes(verbose=False, cobertura=False):
     return result.returncode == 0
 
 
+TOPICO_PADRAO = "lançamento e recepção do Apple Vision Pro"
+
+
+def executar_via_servico(topico=None):
+    """Pede o briefing a um serviço já em execução (python run.py --serve)."""
+    from servico_briefing import solicitar_briefing, url_servico
+    
+    topico = topico or os.getenv('TOPICO') or TOPICO_PADRAO
+    print(f"\n⚡ Usando serviço em {url_servico()} para: '{topico}'")
+    
+    try:
+        briefing = solicitar_briefing(topico)
+    except RuntimeError as e:
+        print(f"❌ {e}")
+        return False
+    
+    print("\n" + "="*50)
+    print("📰 BRIEFING DE NOTÍCIAS AVANÇADO 📰")
+    print("="*50)
+    print(f"TÓPICO: {briefing['topico_central']}\n")
+    print("--- ANÁLISE SINTETIZADA ---")
+    print(briefing['analise_sintetizada'])
+    print("\n--- FONTES UTILIZADAS ---")
+    for i, art in enumerate(briefing['artigos'], 1):
+        print(f"{i}. {art['titulo']} ({art['fonte']})")
+    print("="*50)
+    return True
+
+
+def servico_em_execucao():
+    """Verifica se há um serviço de briefings respondendo."""
+    from servico_briefing import servico_disponivel
+    return servico_disponivel()
+
+
+def iniciar_servico(host, porta):
+    """Inicia o serviço persistente de briefings."""
+    import logging
+    from servico_briefing import iniciar_servico as iniciar
+    
+    logging.basicConfig(
+        level=getattr(logging, os.getenv('LOG_LEVEL', 'INFO')),
+        format='%(asctime)s - %(name)s - %(levelname)s - %(message)s'
+    )
+    
+    try:
+        iniciar(host=host, porta=porta)
+    except ValueError as e:
+        print(f"❌ {e}")
+        return False
+    except OSError as e:
+        print(f"❌ Não foi possível abrir a porta {porta}: {e}")
+        return False
+    return True
+
+
 def executar_projeto(topico=None, versao=2):
     """Executa o projeto."""
     import subprocess
@@ -69,6 +125,110 @@ def executar_projeto(topico=None, versao=2):
     return result.returncode == 0
 
 
+def executar_incremental(topico=None, caminho=None):
+    """Atualiza o briefing de um tópico recorrente pedindo só o que mudou."""
+    import time
+    from armazem_briefings import ArmazemDeBriefings
+    from briefing_incremental import criar_briefing_incremental
+    
+    topico = topico or os.getenv('TOPICO') or TOPICO_PADRAO
+    caminho = caminho or os.getenv('BRIEFING_ARMAZEM_PATH')
+    if not caminho:
+        print("❌ O modo incremental requer --armazem ou BRIEFING_ARMAZEM_PATH")
+        return False
+    
+    armazem = ArmazemDeBriefings(caminho)
+    try:
+        print(f"\n🔁 Atualizando briefing incremental de: '{topico}'")
+        briefing = criar_briefing_incremental(topico, armazem=armazem)
+        if briefing is None:
+            print("❌ Falha ao gerar o briefing")
+            return False
+        
+        print(f"\nTÓPICO: {briefing.topico_central}\n")
+        print(briefing.analise_sintetizada)
+        print("\n--- HISTÓRICO DE VERSÕES ---")
+        for versao in armazem.versoes(topico, limite=5):
+            quando = time.strftime('%Y-%m-%d %H:%M', time.localtime(versao.gerado_em))
+            tipo = "completa" if versao.incrementos == 0 else f"incremental ({versao.incrementos})"
+            print(f"  v{versao.versao}  {quando}  {len(versao.briefing.artigos)} artigos  {tipo}")
+        return True
+    finally:
+        armazem.fechar()
+
+
+def executar_agendador(caminho):
+    """Mantém os tópicos do arquivo atualizados em um único processo."""
+    import logging
+    from agendador import iniciar_agendador
+    
+    logging.basicConfig(
+        level=getattr(logging, os.getenv('LOG_LEVEL', 'INFO')),
+        format='%(asctime)s - %(name)s - %(levelname)s - %(message)s'
+    )
+    
+    try:
+        iniciar_agendador(caminho)
+    except (OSError, ValueError, RuntimeError) as e:
+        print(f"❌ {e}")
+        return False
+    return True
+
+
+def executar_benchmark():
+    """Executa o benchmark offline do pipeline (backend Gemini falso)."""
+    import subprocess
+    
+    script = os.path.join(os.path.dirname(os.path.abspath(__file__)), "benchmark_briefing.py")
+    
+    # O benchmark não deve gravar briefings falsos no armazém real
+    env = os.environ.copy()
+    env.pop('BRIEFING_ARMAZEM_PATH', None)
+    
+    print("\n⏱️  Executando benchmark offline...")
+    result = subprocess.run([sys.executable, script], env=env)
+    return result.returncode == 0
+
+
+def consultar_armazem(caminho=None, texto=None, fonte=None, topico=None, horas=None,
+                      limite=20, importar=None):
+    """Consulta (ou alimenta) o armazém local de briefings."""
+    import time
+    from armazem_briefings import ArmazemDeBriefings
+    
+    caminho = caminho or os.getenv('BRIEFING_ARMAZEM_PATH')
+    if not caminho:
+        print("❌ Informe --armazem ou defina BRIEFING_ARMAZEM_PATH")
+        return False
+    
+    armazem = ArmazemDeBriefings(caminho)
+    try:
+        if importar:
+            print(f"\n📥 Importando segmentos JSONL de {importar}...")
+            print(f"✅ {armazem.importar_jsonl(importar)} briefings importados")
+            if not any([texto, fonte, topico, horas]):
+                return True
+        
+        desde = time.time() - horas * 3600 if horas else None
+        inicio = time.perf_counter()
+        try:
+            resultados = armazem.consultar(texto=texto, fonte=fonte, topico=topico,
+                                           desde=desde, limite=limite)
+        except ValueError as e:
+            print(f"❌ {e}")
+            return False
+        duracao = (time.perf_counter() - inicio) * 1000
+        
+        print(f"\n🔎 {len(resultados)} briefings ({duracao:.1f} ms, {armazem.contar()} no armazém)")
+        for resultado in resultados:
+            quando = time.strftime('%Y-%m-%d %H:%M', time.localtime(resultado.gerado_em))
+            fontes = ", ".join(sorted({a.fonte for a in resultado.briefing.artigos}))
+            print(f"  [{resultado.id}] {quando}  {resultado.topico}  ({fontes})")
+        return True
+    finally:
+        armazem.fechar()
+
+
 def gerar_documentacao():
     """Gera documentação do projeto."""
     print("\n📚 Gerando documentação...")
@@ -95,6 +255,12 @@ Exemplos de uso:
   python run.py --test --cov     # Testes com cobertura
   python run.py --run            # Executar projeto
   python run.py --run --topico "IA na medicina"  # Com tópico personalizado
+  python run.py --run --incremental --topico "IA"  # Só o que mudou desde a última versão
+  python run.py --serve          # Manter um serviço aquecido (usado pelo --run)
+  python run.py --schedule topicos.yaml  # Atualizar tópicos recorrentes (substitui o cron)
+  python run.py --bench          # Benchmark offline do pipeline
+  python run.py --buscar --fonte Reuters --horas 24  # Briefings já gerados
+  python run.py --buscar --texto "semicondutores"    # Busca textual
   python run.py --docs           # Ver documentação disponível
         """
     )
@@ -108,9 +274,35 @@ Exemplos de uso:
     parser.add_argument('--run', action='store_true',
                        help='Executar o projeto')
     parser.add_argument('--topico', type=str,
-                       help='Tópico para pesquisar (use com --run)')
+                       help='Tópico para pesquisar (use com --run ou --buscar)')
     parser.add_argument('--versao', type=int, choices=[1, 2], default=2,
                        help='Versão do script a executar (1 ou 2, padrão: 2)')
+    parser.add_argument('--incremental', action='store_true',
+                       help='Atualizar a última versão do tópico no armazém (use com --run)')
+    parser.add_argument('--serve', action='store_true',
+                       help='Iniciar o serviço persistente de briefings')
+    parser.add_argument('--host', type=str, default='127.0.0.1',
+                       help='Endereço do serviço (use com --serve, padrão: 127.0.0.1)')
+    parser.add_argument('--porta', type=int, default=8765,
+                       help='Porta do serviço (use com --serve, padrão: 8765)')
+    parser.add_argument('--schedule', type=str, metavar='ARQUIVO',
+                       help='Agendar os tópicos do arquivo YAML/JSON em um processo contínuo')
+    parser.add_argument('--bench', action='store_true',
+                       help='Executar o benchmark offline do pipeline')
+    parser.add_argument('--buscar', action='store_true',
+                       help='Consultar o armazém de briefings (BRIEFING_ARMAZEM_PATH)')
+    parser.add_argument('--armazem', type=str,
+                       help='Arquivo do armazém (use com --buscar ou --incremental)')
+    parser.add_argument('--texto', type=str,
+                       help='Busca textual em tópico, artigos e análise (use com --buscar)')
+    parser.add_argument('--fonte', type=str,
+                       help='Fonte citada nos artigos (use com --buscar)')
+    parser.add_argument('--horas', type=float,
+                       help='Apenas briefings das últimas N horas (use com --buscar)')
+    parser.add_argument('--limite', type=int, default=20,
+                       help='Número máximo de resultados (use com --buscar, padrão: 20)')
+    parser.add_argument('--importar', type=str,
+                       help='Importar segmentos JSONL deste diretório (use com --buscar)')
     parser.add_argument('--docs', action='store_true',
                        help='Listar documentação disponível')
     parser.add_argument('--verbose', '-v', action='store_true',
@@ -119,7 +311,7 @@ Exemplos de uso:
     args = parser.parse_args()
     
     # Se nenhum argumento, mostrar ajuda
-    if not any([args.check, args.test, args.run, args.docs]):
+    if not any([args.check, args.test, args.run, args.serve, args.schedule, args.bench, args.buscar, args.docs]):
         parser.print_help()
         return
     
@@ -135,13 +327,32 @@ Exemplos de uso:
     if args.test:
         sucesso = executar_testes(verbose=args.verbose, cobertura=args.cov)
     
+    if args.serve:
+        sucesso = iniciar_servico(args.host, args.porta)
+    
     if args.run:
-        if not verificar_ambiente():
+        if args.incremental:
+            sucesso = executar_incremental(topico=args.topico, caminho=args.armazem)
+        elif args.versao == 2 and servico_em_execucao():
+            # Serviço aquecido: a requisição paga apenas a chamada ao modelo
+            sucesso = executar_via_servico(topico=args.topico)
+        elif not verificar_ambiente():
             print("\n❌ Ambiente não configurado. Execute primeiro: python setup.py")
             sucesso = False
         else:
             sucesso = executar_projeto(topico=args.topico, versao=args.versao)
     
+    if args.schedule:
+        sucesso = executar_agendador(args.schedule)
+    
+    if args.bench:
+        sucesso = executar_benchmark()
+    
+    if args.buscar:
+        sucesso = consultar_armazem(caminho=args.armazem, texto=args.texto, fonte=args.fonte,
+                                    topico=args.topico, horas=args.horas, limite=args.limite,
+                                    importar=args.importar)
+    
     if args.docs:
         gerar_documentacao()
     
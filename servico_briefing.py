@@ -0,0 +1,256 @@
+"""
+Serviço Persistente de Briefings
+================================
+
+Servidor HTTP local que mantém um cliente Gemini já configurado (SDK
+importado, .env lido, `genai.configure` feito) e atende pedidos de
+briefing. Cada requisição paga apenas a chamada ao modelo, sem o custo
+de iniciar um novo interpretador por tópico.
+
+Endpoints:
+    POST /briefing   {"topico": "..."} -> JSON do BriefingDeNoticias
+    GET  /saude      Estado do serviço e saúde dos modelos
+    GET  /metricas   Métricas em texto Prometheus (?formato=json para snapshot JSON)
+
+Inicie com: python run.py --serve [--host 127.0.0.1] [--porta 8765]
+"""
+
+import json
+import logging
+import os
+import urllib.error
+import urllib.parse
+import urllib.request
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Any, Callable, Dict, Optional
+
+logger = logging.getLogger(__name__)
+
+HOST_PADRAO = "127.0.0.1"
+PORTA_PADRAO = 8765
+MAX_CORPO_BYTES = 64 * 1024
+
+
+def url_servico() -> str:
+    """
+    Retorna a URL do serviço (BRIEFING_SERVICE_URL ou o endereço padrão).
+
+    Returns:
+        str: URL base, sem barra final
+    """
+    return os.getenv("BRIEFING_SERVICE_URL", f"http://{HOST_PADRAO}:{PORTA_PADRAO}").rstrip("/")
+
+
+class _ManipuladorBriefing(BaseHTTPRequestHandler):
+    """Trata as requisições HTTP do serviço."""
+
+    server: "ServidorDeBriefings"
+
+    def log_message(self, formato: str, *args: Any) -> None:
+        logger.debug(f"{self.address_string()} - {formato % args}")
+
+    def _responder(self, status: int, corpo: Dict[str, Any]) -> None:
+        dados = json.dumps(corpo, ensure_ascii=False).encode("utf-8")
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json; charset=utf-8")
+        self.send_header("Content-Length", str(len(dados)))
+        self.end_headers()
+        self.wfile.write(dados)
+
+    def _responder_texto(self, status: int, texto: str, tipo: str) -> None:
+        dados = texto.encode("utf-8")
+        self.send_response(status)
+        self.send_header("Content-Type", tipo)
+        self.send_header("Content-Length", str(len(dados)))
+        self.end_headers()
+        self.wfile.write(dados)
+
+    def do_GET(self) -> None:
+        url = urllib.parse.urlsplit(self.path)
+        caminho = url.path.rstrip("/")
+        if caminho == "/saude":
+            self._responder(200, self.server.saude())
+        elif caminho == "/metricas":
+            from instrumentacao import obter_metricas
+            metricas = obter_metricas()
+            if urllib.parse.parse_qs(url.query).get("formato") == ["json"]:
+                self._responder(200, metricas.snapshot())
+            else:
+                self._responder_texto(200, metricas.formato_prometheus(), "text/plain; version=0.0.4; charset=utf-8")
+        else:
+            self._responder(404, {"erro": "Endpoint não encontrado"})
+
+    def do_POST(self) -> None:
+        if self.path.rstrip("/") != "/briefing":
+            self._responder(404, {"erro": "Endpoint não encontrado"})
+            return
+
+        try:
+            tamanho = int(self.headers.get("Content-Length", 0))
+        except ValueError:
+            tamanho = -1
+        if tamanho < 0:
+            self._responder(400, {"erro": "Content-Length inválido"})
+            return
+        if tamanho > MAX_CORPO_BYTES:
+            self._responder(413, {"erro": "Requisição muito grande"})
+            return
+
+        try:
+            pedido = json.loads(self.rfile.read(tamanho) or b"{}")
+            topico = pedido.get("topico", "")
+        except (ValueError, AttributeError):
+            self._responder(400, {"erro": "JSON inválido"})
+            return
+
+        if not isinstance(topico, str) or not topico.strip():
+            self._responder(400, {"erro": "O tópico não pode estar vazio"})
+            return
+
+        try:
+            briefing = self.server.gerador(topico)
+        except ValueError as e:
+            self._responder(400, {"erro": str(e)})
+            return
+        except Exception as e:
+            logger.error(f"Erro inesperado ao gerar '{topico}': {e}", exc_info=True)
+            self._responder(500, {"erro": "Erro interno ao gerar o briefing"})
+            return
+
+        if briefing is None:
+            self._responder(502, {"erro": "Falha ao criar briefing"})
+        else:
+            self._responder(200, briefing.model_dump())
+
+
+class ServidorDeBriefings(ThreadingHTTPServer):
+    """
+    Servidor HTTP multithread com o gerador de briefings já aquecido.
+
+    Attributes:
+        gerador: Função que recebe um tópico e devolve um briefing (ou None)
+    """
+
+    daemon_threads = True
+
+    def __init__(self, endereco, gerador: Callable[[str], Any]):
+        super().__init__(endereco, _ManipuladorBriefing)
+        self.gerador = gerador
+
+    def saude(self) -> Dict[str, Any]:
+        """Retorna o estado do serviço e a saúde dos modelos."""
+        from roteador_modelos import obter_roteador
+        from criar_briefing_noticias_v2 import single_flight
+        saude = {
+            "status": "ok",
+            "modelos": obter_roteador().estatisticas(),
+            "single_flight": single_flight.estatisticas(),
+        }
+        estatisticas = getattr(self.gerador, "estatisticas", None)
+        if callable(estatisticas):
+            saude["gerador"] = estatisticas()
+        return saude
+
+
+def criar_servidor(
+    host: str = HOST_PADRAO,
+    porta: int = PORTA_PADRAO,
+    gerador: Optional[Callable[[str], Any]] = None,
+) -> ServidorDeBriefings:
+    """
+    Cria o servidor, aquecendo o cliente Gemini quando usa o gerador padrão.
+
+    Args:
+        host: Endereço de escuta
+        porta: Porta TCP (0 escolhe uma porta livre)
+        gerador: Função geradora (padrão: criar_briefing_avancado da v2,
+            com deduplicação de tópicos similares)
+
+    Returns:
+        ServidorDeBriefings: Servidor pronto para `serve_forever()`
+
+    Raises:
+        ValueError: Se a GOOGLE_API_KEY não estiver configurada
+    """
+    if gerador is None:
+        import criar_briefing_noticias_v2 as v2
+        from deduplicacao_topicos import obter_gerador_deduplicado
+        v2.client.configurar()
+        gerador = obter_gerador_deduplicado()
+
+    return ServidorDeBriefings((host, porta), gerador)
+
+
+def iniciar_servico(host: str = HOST_PADRAO, porta: int = PORTA_PADRAO) -> None:
+    """
+    Inicia o serviço e atende requisições até ser interrompido.
+
+    Args:
+        host: Endereço de escuta
+        porta: Porta TCP
+    """
+    servidor = criar_servidor(host, porta)
+    print(f"🚀 Serviço de briefings ouvindo em http://{host}:{servidor.server_address[1]}")
+    try:
+        servidor.serve_forever()
+    except KeyboardInterrupt:
+        print("\n⏹️  Serviço interrompido pelo usuário")
+    finally:
+        servidor.server_close()
+
+
+# --- Cliente ---
+
+def servico_disponivel(url: Optional[str] = None, timeout: float = 0.5) -> bool:
+    """
+    Verifica se há um serviço respondendo no endereço.
+
+    Args:
+        url: URL base do serviço (padrão: `url_servico()`)
+        timeout: Tempo máximo de espera, em segundos
+
+    Returns:
+        bool: True se o serviço respondeu ao /saude
+    """
+    try:
+        with urllib.request.urlopen(f"{url or url_servico()}/saude", timeout=timeout) as resposta:
+            return resposta.status == 200
+    except (urllib.error.URLError, OSError, ValueError):
+        return False
+
+
+def solicitar_briefing(topico: str, url: Optional[str] = None, timeout: float = 300.0) -> Dict[str, Any]:
+    """
+    Pede um briefing ao serviço.
+
+    Args:
+        topico: Tópico a pesquisar
+        url: URL base do serviço (padrão: `url_servico()`)
+        timeout: Tempo máximo de espera, em segundos
+
+    Returns:
+        Dict[str, Any]: Briefing em formato de dicionário
+
+    Raises:
+        RuntimeError: Se o serviço responder com erro, estiver inacessível ou não responder a tempo
+    """
+    dados = json.dumps({"topico": topico}, ensure_ascii=False).encode("utf-8")
+    requisicao = urllib.request.Request(
+        f"{url or url_servico()}/briefing",
+        data=dados,
+        headers={"Content-Type": "application/json"},
+        method="POST",
+    )
+    try:
+        with urllib.request.urlopen(requisicao, timeout=timeout) as resposta:
+            return json.loads(resposta.read())
+    except urllib.error.HTTPError as e:
+        try:
+            mensagem = json.loads(e.read()).get("erro", str(e))
+        except ValueError:
+            mensagem = str(e)
+        raise RuntimeError(f"Serviço retornou {e.code}: {mensagem}") from e
+    except (urllib.error.URLError, OSError) as e:
+        # Conexão recusada, nome inválido ou timeout do socket
+        motivo = getattr(e, "reason", None) or e
+        raise RuntimeError(f"Serviço indisponível em {url or url_servico()}: {motivo}") from e
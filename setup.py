@@ -31,7 +31,8 @@ def verificar_dependencias():
     dependencias = {
         'google.generativeai': 'google-generativeai',
         'pydantic': 'pydantic',
-        'dotenv': 'python-dotenv'
+        'dotenv': 'python-dotenv',
+        'yaml': 'pyyaml'
     }
     
     faltando = []
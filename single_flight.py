@@ -0,0 +1,149 @@
+"""
+Single-Flight
+=============
+
+Coalescência de chamadas simultâneas com a mesma chave: a primeira
+executa a função, as demais aguardam o mesmo resultado (ou a mesma
+exceção) em vez de repetir o trabalho. Vale para threads e para asyncio,
+inclusive misturados: uma corrotina pode aguardar uma execução iniciada
+por uma thread e vice-versa.
+
+Exemplo:
+    >>> grupo = GrupoSingleFlight()
+    >>> grupo.executar("ia na saúde", gerar_briefing, "IA na saúde")
+"""
+
+import asyncio
+import inspect
+import threading
+from concurrent.futures import Future
+from typing import Any, Callable, Dict, Hashable, Set, Tuple
+
+
+class GrupoSingleFlight:
+    """
+    Grupo de execuções identificadas por chave.
+
+    Uma chave só fica registrada enquanto sua execução está em andamento;
+    o resultado não é guardado depois disso (para isso existe o cache).
+    """
+
+    def __init__(self):
+        self._trava = threading.Lock()
+        self._voos: Dict[Hashable, Future] = {}
+        # Execuções assíncronas cujo dono foi cancelado continuam até o fim
+        self._tarefas: Set[asyncio.Future] = set()
+        self._executados = 0
+        self._coalescidos = 0
+
+    def _entrar(self, chave: Hashable) -> Tuple[Future, bool]:
+        """Retorna o futuro da chave e se quem chamou é o dono da execução."""
+        with self._trava:
+            futuro = self._voos.get(chave)
+            if futuro is not None:
+                self._coalescidos += 1
+                return futuro, False
+            futuro = self._voos[chave] = Future()
+            self._executados += 1
+            return futuro, True
+
+    def _sair(self, chave: Hashable) -> None:
+        with self._trava:
+            del self._voos[chave]
+
+    def executar(self, chave: Hashable, funcao: Callable[..., Any], *args: Any, **kwargs: Any) -> Any:
+        """
+        Executa a função, ou aguarda a execução em andamento para a mesma chave.
+
+        Args:
+            chave: Identificador do trabalho (ex: tópico normalizado)
+            funcao: Função a executar
+            *args: Argumentos posicionais
+            **kwargs: Argumentos nomeados
+
+        Returns:
+            O retorno da função (compartilhado entre os chamadores coalescidos)
+
+        Raises:
+            Exception: A exceção da execução, repassada a todos os chamadores
+        """
+        futuro, dono = self._entrar(chave)
+        if not dono:
+            return futuro.result()
+
+        try:
+            resultado = funcao(*args, **kwargs)
+        except BaseException as e:
+            futuro.set_exception(e)
+            raise
+        else:
+            futuro.set_result(resultado)
+            return resultado
+        finally:
+            self._sair(chave)
+
+    async def executar_async(self, chave: Hashable, funcao: Callable[..., Any], *args: Any, **kwargs: Any) -> Any:
+        """
+        Versão assíncrona de `executar`; a espera não bloqueia o event loop.
+
+        A execução roda em uma tarefa protegida do cancelamento de quem a
+        iniciou: se o dono desistir (timeout, cliente desconectado), os demais
+        chamadores continuam aguardando o resultado, em vez de receberem um
+        CancelledError que não pediram. Da mesma forma, o cancelamento de um
+        chamador que aguarda não afeta os outros.
+
+        Args:
+            chave: Identificador do trabalho
+            funcao: Corrotina (ou função síncrona) a executar
+            *args: Argumentos posicionais
+            **kwargs: Argumentos nomeados
+
+        Returns:
+            O retorno da função (compartilhado entre os chamadores coalescidos)
+
+        Raises:
+            Exception: A exceção da execução, repassada a todos os chamadores
+        """
+        futuro, dono = self._entrar(chave)
+        if not dono:
+            return await asyncio.shield(asyncio.wrap_future(futuro))
+
+        async def executar_e_publicar() -> Any:
+            try:
+                resultado = funcao(*args, **kwargs)
+                if inspect.isawaitable(resultado):
+                    resultado = await resultado
+            except BaseException as e:
+                futuro.set_exception(e)
+                raise
+            else:
+                futuro.set_result(resultado)
+                return resultado
+            finally:
+                self._sair(chave)
+
+        tarefa = asyncio.ensure_future(executar_e_publicar())
+        self._tarefas.add(tarefa)
+        tarefa.add_done_callback(self._concluir_tarefa)
+        return await asyncio.shield(tarefa)
+
+    def _concluir_tarefa(self, tarefa: "asyncio.Future") -> None:
+        self._tarefas.discard(tarefa)
+        # Consome a exceção: sem o dono aguardando, o asyncio a reportaria como não tratada
+        if not tarefa.cancelled():
+            tarefa.exception()
+
+    def estatisticas(self) -> Dict[str, int]:
+        """
+        Retorna os contadores do grupo.
+
+        Returns:
+            Dict[str, int]: executados (chamadas reais), coalescidos (chamadas
+                que aguardaram outra) e em_andamento
+        """
+        with self._trava:
+            return {
+                "executados": self._executados,
+                "coalescidos": self._coalescidos,
+                "em_andamento": len(self._voos),
+            }
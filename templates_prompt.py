@@ -0,0 +1,371 @@
+"""
+Registro de Templates de Prompt
+===============================
+
+Os prompts do pipeline ficam registrados aqui com nome e versão. Cada
+template separa um prefixo estático (papel, regras e estrutura do JSON),
+igual em todas as chamadas, de um sufixo com parâmetros (tópico, período,
+número de artigos). O sufixo é compilado uma única vez, no registro;
+montar o prompt apenas junta os pedaços já separados.
+
+O prefixo estático pode ficar no cache de contexto do Gemini (ver
+`ClienteGemini.modelo_com_contexto`), e então cada chamada envia só o
+sufixo. A versão do template entra na chave do cache de respostas: mudar
+o texto de um template exige uma nova versão, o que deixa de reaproveitar
+os briefings gerados com a anterior.
+
+Exemplo:
+    >>> template = obter_registro().obter("briefing_json")
+    >>> prompt = template.renderizar(topico="energia solar", periodo="da última semana")
+"""
+
+import json
+import string
+import threading
+from typing import Any, Dict, List, Optional, Tuple
+
+_FORMATADOR = string.Formatter()
+
+
+def _compilar(texto: str) -> List[Tuple[str, Optional[str]]]:
+    """
+    Separa o texto em pares (trecho literal, parâmetro seguinte).
+
+    Raises:
+        ValueError: Se um campo usar formatação, conversão ou acesso a atributos
+    """
+    pedacos = []
+    for literal, campo, especificacao, conversao in _FORMATADOR.parse(texto):
+        if campo is not None and (not campo.isidentifier() or especificacao or conversao):
+            raise ValueError(f"Parâmetro de template inválido: {{{campo}}}")
+        pedacos.append((literal, campo))
+    return pedacos
+
+
+class TemplateDePrompt:
+    """
+    Template com prefixo estático e sufixo parametrizado.
+
+    Attributes:
+        nome: Nome do template no registro
+        versao: Versão do texto (incrementada a cada mudança)
+        prefixo: Instruções fixas, enviadas sem formatação
+        sufixo: Parte variável, com parâmetros no formato `{nome}`
+        padroes: Valores usados para os parâmetros não informados
+        parametros: Nomes dos parâmetros do sufixo
+    """
+
+    def __init__(
+        self,
+        nome: str,
+        versao: int,
+        prefixo: str,
+        sufixo: str,
+        padroes: Optional[Dict[str, Any]] = None,
+    ):
+        self.nome = nome
+        self.versao = versao
+        self.prefixo = prefixo
+        self.sufixo = sufixo
+        self.padroes = dict(padroes or {})
+        self._pedacos = _compilar(sufixo)
+        self.parametros = frozenset(campo for _, campo in self._pedacos if campo)
+
+        desconhecidos = set(self.padroes) - self.parametros
+        if desconhecidos:
+            raise ValueError(f"Padrões para parâmetros inexistentes: {', '.join(sorted(desconhecidos))}")
+
+    def __repr__(self) -> str:
+        return f"TemplateDePrompt({self.identificador!r})"
+
+    @property
+    def identificador(self) -> str:
+        """Nome e versão, no formato `nome@v1`."""
+        return f"{self.nome}@v{self.versao}"
+
+    def resolver(self, **valores: Any) -> Dict[str, Any]:
+        """
+        Completa os valores com os padrões e valida os parâmetros.
+
+        Args:
+            **valores: Valores dos parâmetros
+
+        Returns:
+            Dict[str, Any]: Valores de todos os parâmetros
+
+        Raises:
+            ValueError: Se faltar um parâmetro ou houver um desconhecido
+        """
+        resolvidos = {**self.padroes, **valores}
+        desconhecidos = set(resolvidos) - self.parametros
+        if desconhecidos:
+            raise ValueError(f"Parâmetros desconhecidos para {self.identificador}: {', '.join(sorted(desconhecidos))}")
+        faltando = self.parametros - set(resolvidos)
+        if faltando:
+            raise ValueError(f"Parâmetros ausentes para {self.identificador}: {', '.join(sorted(faltando))}")
+        return resolvidos
+
+    def renderizar_sufixo(self, **valores: Any) -> str:
+        """
+        Monta apenas a parte variável do prompt.
+
+        Args:
+            **valores: Valores dos parâmetros
+
+        Returns:
+            str: Sufixo preenchido
+        """
+        resolvidos = self.resolver(**valores)
+        return "".join(
+            literal + (str(resolvidos[campo]) if campo else "")
+            for literal, campo in self._pedacos
+        )
+
+    def renderizar(self, **valores: Any) -> str:
+        """
+        Monta o prompt completo (prefixo + sufixo).
+
+        Args:
+            **valores: Valores dos parâmetros
+
+        Returns:
+            str: Prompt completo
+        """
+        return self.prefixo + self.renderizar_sufixo(**valores)
+
+    def chave_cache(self, **valores: Any) -> str:
+        """
+        Identifica o template e os parâmetros na chave do cache de respostas.
+
+        O tópico fica de fora porque `gerar_chave_cache` já o normaliza à
+        parte; parâmetros não informados entram com o valor padrão.
+
+        Args:
+            **valores: Valores dos parâmetros (podem estar incompletos)
+
+        Returns:
+            str: Texto a usar como template em `gerar_chave_cache`
+        """
+        extras = {k: v for k, v in {**self.padroes, **valores}.items() if k != "topico"}
+        if not extras:
+            return self.identificador
+        return f"{self.identificador} {json.dumps(extras, sort_keys=True, ensure_ascii=False)}"
+
+
+class RegistroDeTemplates:
+    """Templates por nome e versão."""
+
+    def __init__(self):
+        self._trava = threading.Lock()
+        self._templates: Dict[str, Dict[int, TemplateDePrompt]] = {}
+
+    def __contains__(self, nome: str) -> bool:
+        return nome in self._templates
+
+    def registrar(self, template: TemplateDePrompt) -> TemplateDePrompt:
+        """
+        Adiciona um template ao registro.
+
+        Registrar de novo o mesmo texto é permitido; um texto diferente com
+        o mesmo nome e versão não.
+
+        Args:
+            template: Template a registrar
+
+        Returns:
+            TemplateDePrompt: O próprio template
+
+        Raises:
+            ValueError: Se a versão já existir com outro texto
+        """
+        with self._trava:
+            versoes = self._templates.setdefault(template.nome, {})
+            existente = versoes.get(template.versao)
+            if existente is not None and (existente.prefixo, existente.sufixo) != (template.prefixo, template.sufixo):
+                raise ValueError(f"{template.identificador} já registrado com outro texto; use uma nova versão")
+            versoes[template.versao] = template
+            return template
+
+    def obter(self, nome: str, versao: Optional[int] = None) -> TemplateDePrompt:
+        """
+        Retorna um template registrado.
+
+        Args:
+            nome: Nome do template
+            versao: Versão desejada (padrão: a mais recente)
+
+        Returns:
+            TemplateDePrompt: Template encontrado
+
+        Raises:
+            KeyError: Se o nome ou a versão não estiverem registrados
+        """
+        with self._trava:
+            versoes = self._templates.get(nome)
+            if not versoes:
+                raise KeyError(f"Template desconhecido: {nome}")
+            if versao is None:
+                versao = max(versoes)
+            if versao not in versoes:
+                raise KeyError(f"Versão desconhecida: {nome}@v{versao}")
+            return versoes[versao]
+
+    def versoes(self, nome: str) -> List[int]:
+        """Versões registradas do template, em ordem crescente."""
+        with self._trava:
+            return sorted(self._templates.get(nome, {}))
+
+
+_registro = RegistroDeTemplates()
+
+
+def obter_registro() -> RegistroDeTemplates:
+    """
+    Retorna o registro de templates do processo (com os templates do pipeline).
+
+    Returns:
+        RegistroDeTemplates: Registro compartilhado
+    """
+    return _registro
+
+
+_ESTRUTURA_BRIEFING = """
+    {
+        "topico_central": "string - o tema principal",
+        "artigos": [
+            {
+                "titulo": "string - título da matéria",
+                "fonte": "string - nome do veículo",
+                "resumo_curto": "string - resumo de 1-2 frases"
+            }
+        ],
+        "analise_sintetizada": "string - análise de 2 parágrafos",
+        "prompt_para_imagem": "string - prompt em inglês para geração de imagem"
+    }"""
+
+_PADROES_BRIEFING = {"artigos": "3 a 5", "periodo": "recentes"}
+
+_SUFIXO_BRIEFING = """
+    Crie o briefing sobre o tópico: '{topico}'.
+    Baseie-se em seu conhecimento para encontrar {artigos} artigos relevantes, priorizando notícias {periodo}.
+    """
+
+# Prompt de texto: descreve a estrutura do JSON no próprio prompt
+TEMPLATE_BRIEFING = _registro.registrar(TemplateDePrompt(
+    "briefing", 1,
+    prefixo="""
+    Atue como um analista de notícias sênior. Sua tarefa é criar um briefing completo sobre um tópico de notícias.
+
+    IMPORTANTE: Retorne sua resposta em formato JSON válido com a seguinte estrutura exata:""" + _ESTRUTURA_BRIEFING + """
+
+    1. Preencha todas as informações solicitadas no formato JSON acima.
+    2. A análise deve ter 2 parágrafos: o primeiro resumindo fatos, o segundo explorando implicações.
+    3. O prompt para imagem deve ser descritivo e artístico em inglês.
+    4. Retorne APENAS o JSON, sem texto adicional antes ou depois.
+    """,
+    sufixo=_SUFIXO_BRIEFING,
+    padroes=_PADROES_BRIEFING,
+))
+
+# Prompt do modo JSON: a estrutura e as descrições dos campos seguem no
+# `response_schema`, então o prompt não repete o esqueleto do JSON
+TEMPLATE_BRIEFING_JSON = _registro.registrar(TemplateDePrompt(
+    "briefing_json", 1,
+    prefixo="""
+    Atue como um analista de notícias sênior e crie um briefing completo sobre um tópico de notícias.
+    1. A análise deve ter 2 parágrafos: o primeiro resumindo fatos, o segundo explorando implicações.
+    2. O prompt para imagem deve ser descritivo e artístico em inglês.
+    """,
+    sufixo=_SUFIXO_BRIEFING,
+    padroes=_PADROES_BRIEFING,
+))
+
+# Vários tópicos por chamada (ver briefing_agrupado.py)
+TEMPLATE_AGRUPADO = _registro.registrar(TemplateDePrompt(
+    "briefing_agrupado", 1,
+    prefixo="""
+    Atue como um analista de notícias sênior. Crie um briefing completo para CADA um dos tópicos listados ao final.
+
+    IMPORTANTE: Retorne um array JSON válido com um objeto por tópico, na mesma ordem da lista, com a estrutura exata:
+    [
+        {
+            "indice": 1,
+            "topico_central": "string - o tema principal",
+            "artigos": [
+                {
+                    "titulo": "string - título da matéria",
+                    "fonte": "string - nome do veículo",
+                    "resumo_curto": "string - resumo de 1-2 frases"
+                }
+            ],
+            "analise_sintetizada": "string - análise de 2 parágrafos",
+            "prompt_para_imagem": "string - prompt em inglês para geração de imagem"
+        }
+    ]
+
+    1. "indice" é o número do tópico na lista.
+    2. Para cada tópico, baseie-se em seu conhecimento para encontrar 3 a 5 artigos relevantes e recentes.
+    3. A análise deve ter 2 parágrafos: o primeiro resumindo fatos, o segundo explorando implicações.
+    4. O prompt para imagem deve ser descritivo e artístico em inglês.
+    5. Retorne APENAS o array JSON, sem texto adicional antes ou depois.
+    """,
+    sufixo="""
+    Tópicos:
+    {lista_topicos}
+    """,
+))
+
+# Complemento: pede apenas os campos que faltaram em uma resposta reparada
+TEMPLATE_COMPLEMENTO = _registro.registrar(TemplateDePrompt(
+    "complemento", 1,
+    prefixo="""
+    Um briefing de notícias em JSON ficou incompleto.
+    Retorne APENAS um objeto JSON com os campos faltantes listados, sem repetir os demais.
+    """,
+    sufixo="""
+    O briefing é sobre o tópico: '{topico}'.
+    Campos faltantes:
+    {campos}
+
+    Briefing parcial:
+    {parcial}
+    """,
+))
+
+# Atualização incremental: o modelo recebe só títulos e fontes já conhecidos
+# e devolve apenas as novidades (ver briefing_incremental.py)
+TEMPLATE_ATUALIZACAO = _registro.registrar(TemplateDePrompt(
+    "atualizacao", 1,
+    prefixo="""
+    Atue como um analista de notícias sênior. Um briefing sobre o tópico indicado já foi publicado;
+    você receberá os artigos já conhecidos (título e fonte) e a análise atual.
+
+    IMPORTANTE: Retorne APENAS um objeto JSON com a estrutura:
+    {
+        "novos_artigos": [
+            {
+                "titulo": "string - título da matéria",
+                "fonte": "string - nome do veículo",
+                "resumo_curto": "string - resumo de 1-2 frases"
+            }
+        ],
+        "analise_sintetizada": "string - análise atualizada de 2 parágrafos",
+        "prompt_para_imagem": "string - novo prompt em inglês, apenas se o foco mudou"
+    }
+
+    1. Em "novos_artigos" inclua apenas artigos recentes que NÃO estão entre os conhecidos.
+    2. Inclua "analise_sintetizada" apenas se houver novos artigos ou se a análise atual precisar de correção.
+    3. Omita "prompt_para_imagem" se a imagem atual ainda representa o tópico.
+    4. Se não houver novidades, retorne {"novos_artigos": []}.
+    """,
+    sufixo="""
+    Tópico: '{topico}'. Busque até {artigos} artigos novos, priorizando notícias {periodo}.
+
+    Artigos conhecidos:
+    {conhecidos}
+
+    Análise atual:
+    {analise}
+    """,
+    padroes={"artigos": "3", "periodo": "das últimas horas"},
+))
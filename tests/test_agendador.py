@@ -0,0 +1,210 @@
+"""
+Testes para o agendador de tópicos recorrentes
+==============================================
+
+Execute com: pytest tests/test_agendador.py -v
+"""
+
+import json
+import threading
+import time
+import pytest
+import sys
+import os
+from unittest.mock import Mock, patch
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from agendador import AgendadorDeTopicos, TopicoAgendado, carregar_topicos, interpretar_intervalo
+
+
+class RelogioFalso:
+    """Relógio controlado pelo teste."""
+
+    def __init__(self):
+        self.agora = 0.0
+
+    def __call__(self):
+        return self.agora
+
+
+@pytest.fixture(autouse=True)
+def sem_armazem_padrao():
+    with patch.dict(os.environ, {"BRIEFING_ARMAZEM_PATH": ""}):
+        yield
+
+
+class TestCarregarTopicos:
+    """Testes do arquivo de tópicos."""
+
+    def test_intervalos(self):
+        """Testa números e sufixos de unidade."""
+        assert interpretar_intervalo(90) == 90.0
+        assert interpretar_intervalo("15m") == 900.0
+        assert interpretar_intervalo(" 1.5h ") == 5400.0
+        for invalido in ("0", "-1h", "uma hora", True):
+            with pytest.raises(ValueError):
+                interpretar_intervalo(invalido)
+
+    def test_json_com_padrao(self, tmp_path):
+        """Testa que os valores de `padrao` valem para todos os tópicos, salvo os sobrescritos."""
+        caminho = tmp_path / "topicos.json"
+        caminho.write_text(json.dumps({
+            "padrao": {"intervalo": "2h", "incremental": True},
+            "topicos": ["energia solar", {"topico": "juros", "intervalo": 600, "prioridade": 0}],
+        }), encoding="utf-8")
+
+        solar, juros = carregar_topicos(str(caminho))
+
+        assert solar == TopicoAgendado("energia solar", intervalo=7200.0, incremental=True)
+        assert (juros.intervalo, juros.prioridade, juros.incremental) == (600.0, 0, True)
+
+    def test_topico_repetido(self, tmp_path):
+        """Testa que tópicos repetidos (após normalização) são rejeitados."""
+        caminho = tmp_path / "topicos.json"
+        caminho.write_text(json.dumps(["Energia Solar", "energia  solar"]), encoding="utf-8")
+
+        with pytest.raises(ValueError):
+            carregar_topicos(str(caminho))
+
+    def test_yaml(self, tmp_path):
+        """Testa a leitura do formato YAML."""
+        pytest.importorskip("yaml")
+        caminho = tmp_path / "topicos.yaml"
+        caminho.write_text("topicos:\n  - IA\n  - topico: chips\n    intervalo: 30m\n", encoding="utf-8")
+
+        assert [(t.topico, t.intervalo) for t in carregar_topicos(str(caminho))] == [("IA", 3600.0), ("chips", 1800.0)]
+
+
+class TestAgendadorDeTopicos:
+    """Testes do agendamento e do despacho."""
+
+    def test_primeiras_execucoes_espalhadas(self):
+        """Testa que os tópicos não vencem todos no mesmo instante."""
+        relogio = RelogioFalso()
+        topicos = [TopicoAgendado(f"tópico {i}", intervalo=3600) for i in range(200)]
+        chamadas = []
+
+        with AgendadorDeTopicos(topicos, gerador=chamadas.append, max_concorrencia=200,
+                                jitter=0.1, relogio=relogio, semente=1) as agendador:
+            relogio.agora = 180
+            primeira_metade = agendador.executar_pendentes()
+            relogio.agora = 360
+            segunda_metade = agendador.executar_pendentes()
+            agendador.aguardar(2)
+
+        assert 50 < primeira_metade < 150
+        assert primeira_metade + segunda_metade == 200
+        assert len(chamadas) == 200
+
+    def test_prioridade_entre_vencidos(self):
+        """Testa que, sem vaga para todos, sai primeiro a menor prioridade."""
+        relogio = RelogioFalso()
+        liberar = threading.Event()
+        ordem = []
+
+        def gerador(topico):
+            ordem.append(topico)
+            liberar.wait(2)
+            return topico
+
+        topicos = [TopicoAgendado("baixa", prioridade=20), TopicoAgendado("alta", prioridade=0),
+                   TopicoAgendado("media", prioridade=10)]
+        with AgendadorDeTopicos(topicos, gerador=gerador, max_concorrencia=1, jitter=0,
+                                relogio=relogio) as agendador:
+            assert agendador.executar_pendentes() == 1
+            assert agendador.estatisticas()["vencidos"] == 2
+            liberar.set()
+            for _ in range(2):
+                agendador.aguardar(2)
+                agendador.executar_pendentes()
+            agendador.aguardar(2)
+
+        assert ordem == ["alta", "media", "baixa"]
+
+    def test_reagendamento_apos_sucesso_e_falha(self):
+        """Testa o intervalo normal após sucesso e a espera curta após falha."""
+        relogio = RelogioFalso()
+        gerador = Mock(side_effect=["briefing", None])
+
+        with AgendadorDeTopicos([TopicoAgendado("IA", intervalo=3600)], gerador=gerador, jitter=0,
+                                espera_falha=60, relogio=relogio) as agendador:
+            agendador.executar_pendentes()
+            agendador.aguardar(2)
+            assert agendador.proxima_execucao() == 3600
+
+            relogio.agora = 3600
+            agendador.executar_pendentes()
+            agendador.aguardar(2)
+            assert agendador.proxima_execucao() == 3660
+            assert agendador.executar_pendentes() == 0
+
+            estatisticas = agendador.estatisticas()
+        assert (estatisticas["execucoes"], estatisticas["falhas"]) == (1, 1)
+
+    def test_versao_fresca_nao_e_gerada(self):
+        """Testa que um tópico com versão recente no armazém é reagendado sem gerar."""
+        relogio = RelogioFalso()
+        relogio.agora = 1000
+        armazem = Mock()
+        armazem.ultima_versao.return_value = Mock(gerado_em=400.0)
+        gerador = Mock(return_value="briefing")
+
+        with AgendadorDeTopicos([TopicoAgendado("IA", intervalo=3600)], gerador=gerador, armazem=armazem,
+                                jitter=0, relogio=relogio) as agendador:
+            assert agendador.executar_pendentes() == 0
+            assert agendador.proxima_execucao() == 4000
+            assert agendador.estatisticas()["frescos"] == 1
+
+            relogio.agora = 4000
+            assert agendador.executar_pendentes() == 1
+            agendador.aguardar(2)
+
+        gerador.assert_called_once_with("IA")
+
+    def test_concorrencia_limitada(self):
+        """Testa que nunca há mais gerações em andamento que o limite."""
+        relogio = RelogioFalso()
+        trava = threading.Lock()
+        simultaneas = [0, 0]
+
+        def gerador(topico):
+            with trava:
+                simultaneas[0] += 1
+                simultaneas[1] = max(simultaneas[1], simultaneas[0])
+            time.sleep(0.01)
+            with trava:
+                simultaneas[0] -= 1
+            return topico
+
+        topicos = [TopicoAgendado(f"tópico {i}") for i in range(20)]
+        with AgendadorDeTopicos(topicos, gerador=gerador, max_concorrencia=3, jitter=0,
+                                relogio=relogio) as agendador:
+            while agendador.estatisticas()["execucoes"] < 20:
+                agendador.executar_pendentes()
+                time.sleep(0.005)
+
+        assert simultaneas[1] == 3
+
+    def test_laco_executa_ate_parar(self):
+        """Testa o laço com o relógio real e a interrupção por `parar`."""
+        chamadas = []
+        agendador = AgendadorDeTopicos([TopicoAgendado("IA", intervalo=0.05)], gerador=chamadas.append, jitter=0)
+
+        threading.Timer(0.3, agendador.parar).start()
+        inicio = time.monotonic()
+        agendador.executar()
+        agendador.fechar()
+
+        assert time.monotonic() - inicio < 2
+        assert 3 <= len(chamadas) <= 8
+
+    def test_topico_duplicado(self):
+        """Testa que o mesmo tópico não é agendado duas vezes."""
+        with AgendadorDeTopicos([TopicoAgendado("IA")], gerador=Mock()) as agendador:
+            with pytest.raises(ValueError):
+                agendador.adicionar(TopicoAgendado(" ia "))
+
+
+if __name__ == "__main__":
+    pytest.main([__file__, "-v", "--tb=short"])
@@ -0,0 +1,224 @@
+"""
+Testes para o armazém local de briefings
+========================================
+
+Execute com: pytest tests/test_armazem_briefings.py -v
+"""
+
+import subprocess
+import pytest
+import sys
+import os
+from unittest.mock import Mock, patch
+
+RAIZ = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
+sys.path.insert(0, RAIZ)
+
+from armazem_briefings import ArmazemDeBriefings, _expressao_fts
+from criar_briefing_noticias_v2 import BriefingDeNoticias
+
+
+def criar_briefing(topico, fontes, analise="Análise"):
+    return BriefingDeNoticias(
+        topico_central=topico,
+        artigos=[{"titulo": f"{topico} em {fonte}", "fonte": fonte, "resumo_curto": "Resumo"} for fonte in fontes],
+        analise_sintetizada=analise,
+        prompt_para_imagem="Prompt"
+    )
+
+
+@pytest.fixture
+def armazem(tmp_path):
+    armazem = ArmazemDeBriefings(str(tmp_path / "armazem.sqlite3"))
+    yield armazem
+    armazem.fechar()
+
+
+class TestConsultas:
+    """Testes dos filtros de consulta."""
+
+    def test_por_fonte_e_periodo(self, armazem):
+        """Testa "briefings citando a Reuters nas últimas 24h"."""
+        agora = 1_000_000.0
+        armazem.adicionar(criar_briefing("Chips", ["Reuters", "G1"]), gerado_em=agora - 3600)
+        armazem.adicionar(criar_briefing("Juros", ["reuters"]), gerado_em=agora - 3 * 86400)
+        armazem.adicionar(criar_briefing("Clima", ["BBC"]), gerado_em=agora - 60)
+
+        resultados = armazem.consultar(fonte="REUTERS", desde=agora - 86400)
+
+        assert [r.topico for r in resultados] == ["Chips"]
+        assert [r.topico for r in armazem.consultar(fonte="Reuters")] == ["Chips", "Juros"]
+
+    def test_busca_textual_na_analise(self, armazem):
+        """Testa a busca sem distinção de acentos e maiúsculas."""
+        armazem.adicionar(criar_briefing("Economia", ["G1"], analise="A exportação de semicondutores cresceu."))
+        armazem.adicionar(criar_briefing("Esportes", ["G1"], analise="O campeonato terminou."))
+
+        assert [r.topico for r in armazem.consultar(texto="EXPORTACAO")] == ["Economia"]
+        assert [r.topico for r in armazem.consultar(texto="semicond*")] == ["Economia"]
+        assert armazem.consultar(texto="exportação campeonato") == []
+
+    def test_busca_apenas_no_topico(self, armazem):
+        """Testa que o filtro de tópico não olha os demais campos."""
+        armazem.adicionar(criar_briefing("Energia solar", ["G1"]))
+        armazem.adicionar(criar_briefing("Mercado", ["G1"], analise="Energia solar em alta"))
+
+        assert [r.topico for r in armazem.consultar(topico="energia")] == ["Energia solar"]
+        assert len(armazem.consultar(texto="energia")) == 2
+
+    def test_por_modelo_e_ordem(self, armazem):
+        """Testa o filtro por modelo e a ordem dos mais recentes."""
+        armazem.adicionar(criar_briefing("A", ["G1"]), modelo="m1", gerado_em=1.0)
+        armazem.adicionar(criar_briefing("B", ["G1"]), modelo="m2", gerado_em=2.0)
+        armazem.adicionar(criar_briefing("C", ["G1"]), modelo="m1", gerado_em=3.0)
+
+        assert [r.topico for r in armazem.consultar(modelo="m1")] == ["C", "A"]
+        assert [r.topico for r in armazem.consultar(limite=1)] == ["C"]
+
+    def test_ordem_cronologica_independe_da_insercao(self, armazem):
+        """Testa que briefings antigos importados depois não passam à frente."""
+        armazem.adicionar(criar_briefing("Novo", ["G1"], analise="chips"), gerado_em=100.0)
+        armazem.adicionar(criar_briefing("Antigo", ["G1"], analise="chips"), gerado_em=50.0)
+        armazem.adicionar(criar_briefing("Mesmo instante", ["G1"], analise="chips"), gerado_em=100.0)
+
+        assert [r.topico for r in armazem.consultar(texto="chips")] == ["Mesmo instante", "Novo", "Antigo"]
+        assert [r.topico for r in armazem.consultar(fonte="g1", ate=99.0)] == ["Antigo"]
+
+    def test_resultado_validado(self, armazem):
+        """Testa que o briefing devolvido é o mesmo armazenado."""
+        briefing = criar_briefing("Chips", ["Reuters"])
+        briefing_id = armazem.adicionar(briefing, modelo="m")
+
+        resultado = armazem.obter(briefing_id)
+        assert resultado.briefing == briefing
+        assert resultado.modelo == "m"
+        assert armazem.obter(briefing_id + 1) is None
+
+    def test_parametros_invalidos(self, armazem):
+        """Testa a validação do texto de busca e da ordem."""
+        with pytest.raises(ValueError):
+            armazem.consultar(texto="  ")
+        with pytest.raises(ValueError):
+            armazem.consultar(ordem="alfabetica")
+
+    def test_texto_com_sintaxe_fts(self, armazem):
+        """Testa que aspas e operadores digitados não quebram a consulta."""
+        armazem.adicionar(criar_briefing("IA", ["G1"], analise='Ele disse "basta" AND saiu'))
+
+        assert len(armazem.consultar(texto='"basta" AND NEAR(')) == 0
+        assert len(armazem.consultar(texto='"basta"')) == 1
+        assert _expressao_fts('a"b c*') == '"a""b" "c"*'
+
+
+class TestManutencao:
+    """Testes de importação e retenção."""
+
+    def test_importar_jsonl(self, armazem, tmp_path):
+        """Testa a importação dos segmentos do gravador JSONL."""
+        from armazenamento_jsonl import GravadorJsonl
+
+        diretorio = str(tmp_path / "segmentos")
+        with GravadorJsonl(diretorio, compressao="gzip") as gravador:
+            gravador.gravar(criar_briefing("Chips", ["Reuters"]), modelo="m1")
+            gravador.gravar(criar_briefing("Juros", ["G1"]))
+
+        assert armazem.importar_jsonl(diretorio) == 2
+        resultado, = armazem.consultar(fonte="reuters")
+        assert resultado.modelo == "m1"
+
+    def test_remover_anteriores(self, armazem):
+        """Testa que a retenção remove o briefing de todos os índices."""
+        armazem.adicionar(criar_briefing("Antigo", ["Reuters"]), gerado_em=1.0)
+        armazem.adicionar(criar_briefing("Novo", ["Reuters"]), gerado_em=10.0)
+
+        assert armazem.remover_anteriores(5.0) == 1
+        assert armazem.contar() == 1
+        assert [r.topico for r in armazem.consultar(fonte="reuters")] == ["Novo"]
+        assert armazem.consultar(texto="antigo") == []
+
+
+    def test_erro_na_insercao_desfaz_a_transacao(self, armazem):
+        """Testa que um briefing inválido não deixa a transação aberta para as próximas gravações."""
+        invalido = {"topico_central": "IA", "artigos": ["não é um artigo"]}
+
+        with pytest.raises(AttributeError):
+            armazem.adicionar(invalido)
+        assert armazem.adicionar(criar_briefing("IA", ["Reuters"])) is not None
+        assert armazem.contar() == 1
+
+    def test_versoes_por_topico_pedido(self, armazem):
+        """Testa a numeração das versões e a retenção do histórico."""
+        armazem.adicionar(criar_briefing("Chips", ["G1"]), gerado_em=1.0, topico_pedido="Chips")
+        armazem.adicionar(criar_briefing("Semicondutores", ["G1"]), gerado_em=2.0, topico_pedido="  CHIPS ",
+                          incrementos=1)
+        armazem.adicionar(criar_briefing("Chips", ["G1"]), gerado_em=3.0)
+
+        ultima = armazem.ultima_versao("chips")
+        assert (ultima.versao, ultima.incrementos, ultima.topico) == (2, 1, "Semicondutores")
+        assert [v.versao for v in armazem.versoes("chips")] == [2, 1]
+        assert armazem.ultima_versao("juros") is None
+
+        armazem.remover_anteriores(1.5)
+        assert [v.versao for v in armazem.versoes("chips")] == [2]
+
+
+class TestVariosProcessos:
+    """Testes do arquivo compartilhado entre processos."""
+
+    def test_escritas_simultaneas(self, tmp_path):
+        """Testa que processos gravando no mesmo arquivo não perdem briefings nem versões."""
+        caminho = str(tmp_path / "armazem.sqlite3")
+        codigo = (
+            "import sys\n"
+            "from armazem_briefings import ArmazemDeBriefings\n"
+            "armazem = ArmazemDeBriefings(sys.argv[1])\n"
+            "briefing = {'topico_central': 'IA', 'artigos': [{'titulo': 'T', 'fonte': 'Reuters', "
+            "'resumo_curto': 'R'}], 'analise_sintetizada': 'A', 'prompt_para_imagem': 'P'}\n"
+            "falhas = sum(armazem.adicionar(briefing, topico_pedido='IA') is None for _ in range(100))\n"
+            "sys.exit(min(falhas, 1))\n"
+        )
+        processos = [subprocess.Popen([sys.executable, "-c", codigo, caminho], cwd=RAIZ,
+                                      stderr=subprocess.PIPE, text=True)
+                     for _ in range(4)]
+        for processo in processos:
+            _, erros = processo.communicate(timeout=120)
+            assert processo.returncode == 0, erros
+
+        armazem = ArmazemDeBriefings(caminho)
+        assert armazem.contar() == 400
+        assert [v.versao for v in armazem.versoes("IA", limite=1000)] == list(range(400, 0, -1))
+        armazem.fechar()
+
+
+class TestArmazemNoPipeline:
+    """Testes da gravação automática pela v2."""
+
+    def test_briefing_gerado_e_armazenado(self, tmp_path):
+        """Testa que cada briefing gerado entra no armazém configurado."""
+        import armazem_briefings
+        import criar_briefing_noticias_v2 as v2
+
+        modelo = Mock()
+        modelo.generate_content.return_value = Mock(
+            text=criar_briefing("Chips", ["Reuters"]).model_dump_json(), parsed=None
+        )
+        caminho = str(tmp_path / "armazem.sqlite3")
+        with patch.dict(os.environ, {'BRIEFING_ARMAZEM_PATH': caminho}), \
+                patch.object(armazem_briefings, '_armazem_padrao', None), \
+                patch.object(v2, 'obter_roteador') as mock_roteador, \
+                patch.object(v2, 'obter_cache_padrao', return_value=None), \
+                patch.object(v2, 'obter_executor_hedge', return_value=None), \
+                patch.object(v2.client, '_fabrica_modelo', lambda nome: modelo):
+            mock_roteador.return_value.ordenar.return_value = list(v2.MODELOS_DISPONIVEIS)
+            assert v2.criar_briefing_avancado("chips") is not None
+            armazem = armazem_briefings.obter_armazem()
+            resultado, = armazem.consultar(fonte="Reuters")
+            versao = armazem.ultima_versao("chips")
+            armazem.fechar()
+
+        assert resultado.modelo == v2.MODELOS_DISPONIVEIS[0]
+        assert (versao.id, versao.versao) == (resultado.id, 1)
+
+
+if __name__ == "__main__":
+    pytest.main([__file__, "-v", "--tb=short"])
@@ -0,0 +1,189 @@
+"""
+Testes para o armazenamento de briefings em JSONL
+=================================================
+
+Execute com: pytest tests/test_armazenamento_jsonl.py -v
+"""
+
+import gzip
+import json
+import pytest
+import sys
+import os
+from unittest.mock import patch
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+import armazenamento_jsonl
+from armazenamento_jsonl import (
+    GravadorJsonl,
+    ler_briefings,
+    ler_registros,
+    listar_segmentos,
+)
+from criar_briefing_noticias_v2 import BriefingDeNoticias
+
+
+BRIEFING = BriefingDeNoticias(
+    topico_central="Teste",
+    artigos=[{"titulo": "T", "fonte": "F", "resumo_curto": "R"}],
+    analise_sintetizada="Análise",
+    prompt_para_imagem="Prompt"
+)
+
+
+class TestGravadorJsonl:
+    """Testes da escrita em lotes e da rotação de segmentos."""
+
+    def test_escreve_em_lotes(self, tmp_path):
+        """Testa que os registros só vão ao disco ao completar um lote."""
+        gravador = GravadorJsonl(str(tmp_path), tamanho_lote=3, intervalo_descarga=3600)
+
+        gravador.gravar(BRIEFING, topico="a")
+        gravador.gravar(BRIEFING, topico="b")
+        assert list(ler_registros(str(tmp_path))) == []
+        assert gravador.estatisticas()["pendentes"] == 2
+
+        gravador.gravar(BRIEFING, topico="c")
+        assert [r["topico"] for r in ler_registros(str(tmp_path))] == ["a", "b", "c"]
+        assert gravador.estatisticas()["lotes"] == 1
+        gravador.fechar()
+
+    def test_descarga_por_intervalo(self, tmp_path):
+        """Testa que um lote incompleto é escrito quando o intervalo vence."""
+        agora = [0.0]
+        gravador = GravadorJsonl(str(tmp_path), tamanho_lote=100, intervalo_descarga=1.0,
+                                 relogio=lambda: agora[0])
+
+        gravador.gravar(BRIEFING)
+        assert gravador.estatisticas()["pendentes"] == 1
+        agora[0] = 2.0
+        gravador.gravar(BRIEFING)
+
+        assert gravador.estatisticas()["pendentes"] == 0
+        gravador.fechar()
+
+    def test_rotacao(self, tmp_path):
+        """Testa que um segmento cheio dá lugar a um novo."""
+        with GravadorJsonl(str(tmp_path), tamanho_lote=1, tamanho_max_segmento=1) as gravador:
+            for i in range(3):
+                gravador.gravar(BRIEFING, indice=i)
+
+        assert len(listar_segmentos(str(tmp_path))) == 3
+        assert [r["indice"] for r in ler_registros(str(tmp_path))] == [0, 1, 2]
+
+    def test_fechar_escreve_pendentes(self, tmp_path):
+        """Testa que fechar escreve o buffer e impede novas gravações."""
+        gravador = GravadorJsonl(str(tmp_path), tamanho_lote=100, intervalo_descarga=3600)
+        gravador.gravar(BRIEFING)
+        gravador.fechar()
+
+        assert len(list(ler_registros(str(tmp_path)))) == 1
+        with pytest.raises(ValueError):
+            gravador.gravar(BRIEFING)
+
+    def test_parametros_invalidos(self, tmp_path):
+        """Testa a validação da política de fsync e da compressão."""
+        with pytest.raises(ValueError):
+            GravadorJsonl(str(tmp_path), fsync="sempre")
+        with pytest.raises(ValueError):
+            GravadorJsonl(str(tmp_path), compressao="bz2")
+
+    def test_zstd_sem_biblioteca(self, tmp_path):
+        """Testa que zstd sem o pacote zstandard é um erro claro."""
+        with patch.object(armazenamento_jsonl, 'zstandard', None):
+            with pytest.raises(ValueError):
+                GravadorJsonl(str(tmp_path), compressao="zstd")
+
+
+class TestLeitura:
+    """Testes da leitura em streaming dos segmentos."""
+
+    def test_ida_e_volta_gzip(self, tmp_path):
+        """Testa que briefings gravados com gzip voltam validados."""
+        with GravadorJsonl(str(tmp_path), compressao="gzip", tamanho_lote=2) as gravador:
+            for _ in range(5):
+                gravador.gravar(BRIEFING)
+
+        caminho, = listar_segmentos(str(tmp_path))
+        assert caminho.endswith(".jsonl.gz")
+        with gzip.open(caminho, "rt", encoding="utf-8") as f:
+            assert len(f.readlines()) == 5
+        assert list(ler_briefings(str(tmp_path))) == [BRIEFING] * 5
+
+    def test_ida_e_volta_zstd(self, tmp_path):
+        """Testa a compressão zstd, quando o pacote está instalado."""
+        pytest.importorskip("zstandard")
+
+        with GravadorJsonl(str(tmp_path), compressao="zstd", tamanho_lote=2) as gravador:
+            for _ in range(5):
+                gravador.gravar(BRIEFING)
+
+        assert listar_segmentos(str(tmp_path))[0].endswith(".jsonl.zst")
+        assert len(list(ler_briefings(str(tmp_path)))) == 5
+
+    def test_segmento_gzip_aberto(self, tmp_path):
+        """Testa que lotes já descarregados de um segmento aberto podem ser lidos."""
+        gravador = GravadorJsonl(str(tmp_path), compressao="gzip", tamanho_lote=2, intervalo_descarga=3600)
+        for _ in range(5):
+            gravador.gravar(BRIEFING)
+
+        assert len(list(ler_registros(str(tmp_path)))) == 4
+        gravador.fechar()
+        assert len(list(ler_registros(str(tmp_path)))) == 5
+
+    def test_linha_truncada_descartada(self, tmp_path):
+        """Testa que uma linha interrompida no fim do segmento é ignorada."""
+        with GravadorJsonl(str(tmp_path)) as gravador:
+            gravador.gravar(BRIEFING)
+        caminho, = listar_segmentos(str(tmp_path))
+        with open(caminho, "a", encoding="utf-8") as f:
+            f.write('{"gravado_em": 1, "briefing": {"topico')
+
+        assert len(list(ler_registros(str(tmp_path)))) == 1
+
+    def test_metadados_no_registro(self, tmp_path):
+        """Testa o formato de cada linha."""
+        with GravadorJsonl(str(tmp_path)) as gravador:
+            gravador.gravar(BRIEFING.model_dump(), topico="IA", modelo="m")
+
+        registro, = ler_registros(str(tmp_path))
+        assert registro["topico"] == "IA"
+        assert registro["modelo"] == "m"
+        assert registro["briefing"] == json.loads(BRIEFING.model_dump_json())
+        assert "gravado_em" in registro
+
+
+class TestSalvarBriefingEmArquivo:
+    """Testes da gravação em arquivos avulsos de exemplos_uso."""
+
+    def test_sem_sobrescrever(self, tmp_path, monkeypatch):
+        """Testa que briefings salvos no mesmo instante não se sobrescrevem."""
+        from exemplos_uso import salvar_briefing_em_arquivo
+
+        monkeypatch.chdir(tmp_path)
+        with patch('datetime.datetime') as mock_datetime:
+            mock_datetime.now.return_value.strftime.return_value = "20240101_000000_000000"
+            salvar_briefing_em_arquivo(BRIEFING, formato='json')
+            salvar_briefing_em_arquivo(BRIEFING, formato='json')
+
+        assert sorted(os.listdir(tmp_path)) == [
+            "briefing_20240101_000000_000000.json",
+            "briefing_20240101_000000_000000_2.json",
+        ]
+
+    def test_formato_jsonl(self, tmp_path, monkeypatch):
+        """Testa que formato='jsonl' usa o gravador configurado."""
+        from exemplos_uso import salvar_briefing_em_arquivo
+
+        monkeypatch.setattr(armazenamento_jsonl, '_gravador_padrao', None)
+        monkeypatch.setenv('BRIEFING_JSONL_DIR', str(tmp_path))
+        salvar_briefing_em_arquivo(BRIEFING, formato='jsonl')
+        armazenamento_jsonl.obter_gravador_jsonl().fechar()
+
+        registro, = ler_registros(str(tmp_path))
+        assert registro["topico"] == "Teste"
+
+
+if __name__ == "__main__":
+    pytest.main([__file__, "-v", "--tb=short"])
@@ -0,0 +1,104 @@
+"""
+Testes para o backend falso e o benchmark offline
+=================================================
+
+Execute com: pytest tests/test_benchmark_briefing.py -v
+"""
+
+import json
+import pytest
+import sys
+import os
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from gemini_falso import BackendGeminiFalso, ConfiguracaoFalsa, ServiceUnavailable, carregar_respostas
+from benchmark_briefing import executar_benchmark, percentil, registrar_resultado
+
+
+class TestBackendGeminiFalso:
+    """Testes do modelo falso."""
+
+    def test_resposta_sintetica_valida(self):
+        """Testa que a resposta sintética é um briefing válido sobre o tópico do prompt."""
+        from criar_briefing_noticias_v2 import TEMPLATE_BRIEFING, interpretar_resposta
+
+        modelo = BackendGeminiFalso(ConfiguracaoFalsa(artigos=3))("falso")
+        resposta = modelo.generate_content(contents=TEMPLATE_BRIEFING.renderizar(topico="energia solar"))
+        briefing = interpretar_resposta(resposta.text)
+
+        assert briefing.topico_central == "Energia Solar"
+        assert len(briefing.artigos) == 3
+
+    def test_deterministico_pela_semente(self):
+        """Testa que a mesma semente produz os mesmos erros."""
+        def sequencia():
+            backend = BackendGeminiFalso(ConfiguracaoFalsa(taxa_erro=0.5, semente=42))
+            resultado = []
+            for _ in range(20):
+                try:
+                    backend("m").generate_content(contents="x")
+                    resultado.append(True)
+                except ServiceUnavailable:
+                    resultado.append(False)
+            return resultado
+
+        assert sequencia() == sequencia()
+        assert False in sequencia()
+
+    def test_respostas_gravadas_e_stream(self, tmp_path):
+        """Testa o rodízio de respostas gravadas e a iteração em trechos."""
+        arquivo = tmp_path / "gravadas.jsonl"
+        arquivo.write_text('"primeira"\n{"topico_central": "x"}\n', encoding="utf-8")
+        backend = BackendGeminiFalso(ConfiguracaoFalsa(respostas=carregar_respostas(str(arquivo))))
+
+        textos = [backend("m").generate_content(contents="x").text for _ in range(3)]
+        trechos = list(backend("m").generate_content(contents="x", stream=True))
+
+        assert textos == ["primeira", '{"topico_central": "x"}', "primeira"]
+        assert "".join(t.text for t in trechos) == '{"topico_central": "x"}'
+
+
+class TestBenchmark:
+    """Testes do benchmark."""
+
+    def test_percentil(self):
+        """Testa o percentil interpolado."""
+        valores = list(range(1, 101))
+        assert percentil(valores, 50) == pytest.approx(50.5)
+        assert percentil(valores, 99) == pytest.approx(99.01)
+        assert percentil([], 50) == 0.0
+
+    def test_executar_benchmark(self):
+        """Testa uma execução curta sem rede nem API key."""
+        resultado = executar_benchmark(briefings=5, concorrencia=2)
+
+        assert resultado["falhas"] == 0
+        assert resultado["chamadas_modelo"] == 5
+        assert resultado["briefings_por_s"] > 0
+        assert resultado["p50_ms"] <= resultado["p99_ms"]
+
+    def test_modo_agrupado_reduz_chamadas(self):
+        """Testa que o modo agrupado usa menos chamadas e tokens de entrada por briefing."""
+        individual = executar_benchmark(briefings=12)
+        agrupado = executar_benchmark(briefings=12, agrupado=4)
+
+        assert agrupado["falhas"] == 0
+        assert agrupado["chamadas_por_briefing"] == pytest.approx(0.25)
+        assert agrupado["tokens_entrada_por_briefing"] < individual["tokens_entrada_por_briefing"]
+
+    def test_historico_compara_mesmos_parametros(self, tmp_path):
+        """Testa que a comparação usa a última execução com a mesma configuração."""
+        caminho = str(tmp_path / "resultados.jsonl")
+
+        assert registrar_resultado({"p50_ms": 1}, {"briefings": 10}, caminho) is None
+        registrar_resultado({"p50_ms": 2}, {"briefings": 20}, caminho)
+        anterior = registrar_resultado({"p50_ms": 3}, {"briefings": 10}, caminho)
+
+        assert anterior["resultado"] == {"p50_ms": 1}
+        with open(caminho, encoding="utf-8") as f:
+            assert len([json.loads(linha) for linha in f]) == 3
+
+
+if __name__ == "__main__":
+    pytest.main([__file__, "-v", "--tb=short"])
@@ -0,0 +1,158 @@
+"""
+Testes para o modo agrupado de briefings
+========================================
+
+Execute com: pytest tests/test_briefing_agrupado.py -v
+"""
+
+import json
+import pytest
+import sys
+import os
+from unittest.mock import patch
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from briefing_agrupado import EmpacotadorDeTopicos, montar_prompt_agrupado, separar_resposta
+from gemini_falso import BackendGeminiFalso, ConfiguracaoFalsa
+
+
+def item(indice, topico="X"):
+    """Item válido de uma resposta agrupada."""
+    return {
+        "indice": indice,
+        "topico_central": topico,
+        "artigos": [{"titulo": "T", "fonte": "F", "resumo_curto": "R"}],
+        "analise_sintetizada": "A",
+        "prompt_para_imagem": "P",
+    }
+
+
+@pytest.fixture
+def backend():
+    """Backend falso instalado no cliente da v2, sem cache nem roteador real."""
+    import criar_briefing_noticias_v2 as v2
+
+    falso = BackendGeminiFalso(ConfiguracaoFalsa(tamanho_analise=400))
+    with patch.object(v2.client, '_fabrica_modelo', falso), \
+            patch('briefing_agrupado.obter_cache_padrao', return_value=None), \
+            patch('roteador_modelos.obter_roteador') as mock_roteador:
+        mock_roteador.return_value.ordenar.return_value = list(v2.MODELOS_DISPONIVEIS)
+        yield falso
+
+
+class TestSepararResposta:
+    """Testes da divisão da resposta em briefings."""
+
+    def test_itens_validos_por_indice(self):
+        """Testa que os itens são associados pelo índice, não pela ordem."""
+        texto = "```json\n" + json.dumps([item(2, "B"), item(1, "A")]) + "\n```"
+
+        briefings, completa = separar_resposta(texto, 2)
+
+        assert completa
+        assert briefings[0].topico_central == "A"
+        assert briefings[1].topico_central == "B"
+
+    def test_item_invalido_e_ignorado(self):
+        """Testa que um item sem campos obrigatórios não derruba os demais."""
+        invalido = {"indice": 2, "topico_central": "B"}
+        briefings, completa = separar_resposta(json.dumps([item(1), invalido]), 2)
+
+        assert completa
+        assert list(briefings) == [0]
+
+    def test_resposta_truncada(self):
+        """Testa que JSON cortado é sinalizado como incompleto, aproveitando os itens que fecharam."""
+        texto = json.dumps([item(1), item(2)])[:-40]
+
+        briefings, completa = separar_resposta(texto, 2)
+
+        assert completa is False
+        assert list(briefings) == [0]
+
+    def test_resposta_ilegivel(self):
+        """Testa que texto sem array JSON não aproveita nada."""
+        assert separar_resposta("desculpe, não consegui", 2) == ({}, False)
+
+    def test_prompt_lista_topicos_numerados(self):
+        """Testa que o prompt numera os tópicos."""
+        prompt = montar_prompt_agrupado(["IA", "energia"])
+
+        assert "1. tópico: 'IA'" in prompt
+        assert "2. tópico: 'energia'" in prompt
+
+
+class TestEmpacotadorDeTopicos:
+    """Testes do empacotador."""
+
+    def test_agrupa_chamadas(self, backend):
+        """Testa que K tópicos usam uma única chamada."""
+        topicos = [f"tópico {i}" for i in range(6)]
+
+        resultados = EmpacotadorDeTopicos(k_maximo=3).gerar(topicos)
+
+        assert backend.chamadas == 2
+        assert [resultados[t].topico_central for t in topicos] == [t.title() for t in topicos]
+
+    def test_fallback_individual_para_itens_ausentes(self, backend):
+        """Testa que tópicos sem item válido são gerados individualmente."""
+        backend.config.respostas = [json.dumps([item(1, "A")])]
+        individuais = []
+
+        empacotador = EmpacotadorDeTopicos(k_maximo=3, individual=lambda t: individuais.append(t) or t)
+        resultados = empacotador.gerar(["a", "b", "c"])
+
+        assert resultados["a"].topico_central == "A"
+        assert individuais == ["b", "c"]
+        assert empacotador.estatisticas()["fallbacks_individuais"] == 2
+
+    def test_truncamento_reduz_k(self, backend):
+        """Testa que respostas truncadas reduzem K e o grupo é refeito menor."""
+        backend.config.max_caracteres_saida = 4000
+        empacotador = EmpacotadorDeTopicos(k_maximo=8)
+
+        resultados = empacotador.gerar([f"tópico {i}" for i in range(8)])
+
+        assert all(b is not None for b in resultados.values())
+        estatisticas = empacotador.estatisticas()
+        assert estatisticas["truncamentos"] >= 1
+        assert estatisticas["k_atual"] < 8
+
+    def test_k_se_adapta_ao_tamanho_observado(self):
+        """Testa que briefings maiores reduzem quantos cabem na resposta."""
+        empacotador = EmpacotadorDeTopicos(k_maximo=20, limite_tokens_saida=8192)
+        k_inicial = empacotador.calcular_k()
+
+        empacotador._registrar_resposta("x" * 4 * 3000 * 2, validos=2, completa=True)
+
+        assert empacotador.calcular_k() < k_inicial
+
+    def test_topicos_repetidos_sao_pedidos_uma_vez(self, backend):
+        """Testa que variações de caixa/espaço do mesmo tópico compartilham o item."""
+        resultados = EmpacotadorDeTopicos(k_maximo=4).gerar(["Energia Solar", "energia  solar", "IA"])
+
+        assert resultados["Energia Solar"] is resultados["energia  solar"]
+        assert backend.chamadas == 1
+
+    def test_briefing_agrupado_serve_ao_pedido_individual(self, backend, tmp_path):
+        """Testa que um tópico gerado em grupo não é gerado de novo por criar_briefing_avancado."""
+        import criar_briefing_noticias_v2 as v2
+        from cache_briefing import CacheDeBriefings
+
+        cache = CacheDeBriefings(str(tmp_path / "cache.sqlite3"))
+        try:
+            EmpacotadorDeTopicos(k_maximo=3).gerar(["energia solar", "IA"], cache=cache)
+            assert backend.chamadas == 1
+
+            with patch.object(v2, 'obter_executor_hedge', return_value=None):
+                briefing = v2.criar_briefing_avancado("Energia Solar", cache=cache)
+        finally:
+            cache.fechar()
+
+        assert briefing.topico_central == "Energia Solar"
+        assert backend.chamadas == 1
+
+
+if __name__ == "__main__":
+    pytest.main([__file__, "-v", "--tb=short"])
@@ -0,0 +1,185 @@
+"""
+Testes para os briefings incrementais
+=====================================
+
+Execute com: pytest tests/test_briefing_incremental.py -v
+"""
+
+import json
+import pytest
+import sys
+import os
+from unittest.mock import Mock, patch
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from armazem_briefings import ArmazemDeBriefings
+from briefing_incremental import criar_briefing_incremental, mesclar_atualizacao
+import criar_briefing_noticias_v2 as v2
+from criar_briefing_noticias_v2 import AtualizacaoDeBriefing, BriefingDeNoticias
+
+
+def criar_briefing(titulos, analise="Análise inicial", prompt="Solar panels"):
+    return BriefingDeNoticias(
+        topico_central="Energia solar",
+        artigos=[{"titulo": titulo, "fonte": "G1", "resumo_curto": f"Resumo de {titulo}"} for titulo in titulos],
+        analise_sintetizada=analise,
+        prompt_para_imagem=prompt
+    )
+
+
+def novo_artigo(titulo, fonte="G1"):
+    return {"titulo": titulo, "fonte": fonte, "resumo_curto": "Novo"}
+
+
+@pytest.fixture
+def armazem(tmp_path):
+    armazem = ArmazemDeBriefings(str(tmp_path / "armazem.sqlite3"))
+    yield armazem
+    armazem.fechar()
+
+
+@pytest.fixture
+def modelo():
+    """Modelo falso do Gemini; respostas em `modelo.respostas`, na ordem."""
+    import armazem_briefings
+    import criar_briefing_noticias_v2 as v2
+
+    modelo = Mock()
+    modelo.respostas = []
+    modelo.generate_content.side_effect = lambda **kwargs: Mock(text=modelo.respostas.pop(0), parsed=None)
+    with patch.dict(os.environ, {"GOOGLE_API_KEY": "teste"}), \
+            patch.object(armazem_briefings, "_armazem_padrao", None), \
+            patch.dict(os.environ, {"BRIEFING_ARMAZEM_PATH": ""}), \
+            patch.object(v2, "obter_roteador") as mock_roteador, \
+            patch.object(v2, "obter_cache_padrao", return_value=None), \
+            patch.object(v2, "obter_executor_hedge", return_value=None), \
+            patch.object(v2.client, "_fabrica_modelo", lambda nome: modelo):
+        mock_roteador.return_value.ordenar.return_value = list(v2.MODELOS_DISPONIVEIS)
+        yield modelo
+
+
+class TestMesclarAtualizacao:
+    """Testes da mescla da resposta incremental."""
+
+    def test_novos_na_frente_sem_repetidos(self):
+        """Testa a deduplicação por título e fonte e o limite de artigos."""
+        anterior = criar_briefing(["A", "B", "C"])
+        atualizacao = AtualizacaoDeBriefing(
+            novos_artigos=[novo_artigo("a "), novo_artigo("D"), novo_artigo("D"), novo_artigo("A", "BBC")],
+            analise_sintetizada="Análise nova",
+        )
+
+        briefing, novos = mesclar_atualizacao(anterior, atualizacao, max_artigos=4)
+
+        assert novos == 2
+        assert [(a.titulo, a.fonte) for a in briefing.artigos] == [("D", "G1"), ("A", "BBC"), ("A", "G1"), ("B", "G1")]
+        assert briefing.analise_sintetizada == "Análise nova"
+        assert briefing.prompt_para_imagem == "Solar panels"
+
+    def test_atualizacao_vazia_mantem_o_briefing(self):
+        """Testa que campos omitidos preservam a versão anterior."""
+        anterior = criar_briefing(["A"])
+
+        briefing, novos = mesclar_atualizacao(anterior, AtualizacaoDeBriefing())
+
+        assert novos == 0
+        assert briefing == anterior
+
+
+class TestCriarBriefingIncremental:
+    """Testes do ciclo completo → incremental → completo."""
+
+    def test_primeira_versao_e_atualizacao(self, armazem, modelo):
+        """Testa que a segunda chamada envia só títulos e fontes e grava a versão 2."""
+        modelo.respostas = [
+            criar_briefing(["A", "B"]).model_dump_json(),
+            json.dumps({"novos_artigos": [novo_artigo("C")], "analise_sintetizada": "Análise nova"}),
+        ]
+
+        primeiro = criar_briefing_incremental("energia solar", armazem=armazem)
+        segundo = criar_briefing_incremental("Energia Solar", armazem=armazem)
+
+        prompt = modelo.generate_content.call_args.kwargs["contents"]
+        assert "- A (G1)" in prompt
+        assert "Resumo de A" not in prompt
+        assert [a.titulo for a in primeiro.artigos] == ["A", "B"]
+        assert [a.titulo for a in segundo.artigos] == ["C", "A", "B"]
+        assert [(v.versao, v.incrementos) for v in armazem.versoes("energia solar")] == [(2, 1), (1, 0)]
+        roteador = v2.obter_roteador.return_value
+        assert roteador.registrar_sucesso.call_count == 2
+
+    def test_falha_da_atualizacao_vai_ao_roteador(self, armazem, modelo):
+        """Testa que o disjuntor também enxerga as chamadas incrementais."""
+        armazem.adicionar(criar_briefing(["A"]), topico_pedido="energia solar")
+        modelo.respostas = ["lixo", '{"novos_artigos": []}']
+
+        criar_briefing_incremental("energia solar", armazem=armazem)
+
+        roteador = v2.obter_roteador.return_value
+        roteador.registrar_falha.assert_called_once_with(v2.MODELOS_DISPONIVEIS[0])
+        assert roteador.registrar_sucesso.call_args.args[0] == v2.MODELOS_DISPONIVEIS[1]
+
+    def test_geracao_completa_ignora_o_cache(self, armazem, modelo, tmp_path):
+        """Testa que um briefing antigo do cache não vira uma versão com data de agora."""
+        from cache_briefing import CacheDeBriefings
+
+        cache = CacheDeBriefings(str(tmp_path / "cache.sqlite3"))
+        chave = v2._chave_cache("energia solar", v2.TEMPLATE_BRIEFING_JSON, v2.MODELOS_DISPONIVEIS[0])
+        cache.definir(chave, criar_briefing(["Do cache"]).model_dump_json())
+        armazem.adicionar(criar_briefing(["A"]), topico_pedido="energia solar", incrementos=3)
+        modelo.respostas = [criar_briefing(["Novo"]).model_dump_json()]
+
+        with patch.object(v2, "obter_cache_padrao", return_value=cache):
+            briefing = criar_briefing_incremental("energia solar", armazem=armazem, max_incrementos=3)
+        cache.fechar()
+
+        assert [a.titulo for a in briefing.artigos] == ["Novo"]
+        assert modelo.generate_content.call_count == 1
+
+    def test_sem_novidades_nao_grava_versao(self, armazem, modelo):
+        """Testa que uma resposta vazia devolve a versão anterior."""
+        armazem.adicionar(criar_briefing(["A"]), topico_pedido="energia solar")
+        modelo.respostas = ['{"novos_artigos": []}']
+
+        briefing = criar_briefing_incremental("energia solar", armazem=armazem)
+
+        assert briefing == criar_briefing(["A"])
+        assert len(armazem.versoes("energia solar")) == 1
+
+    def test_geracao_completa_apos_muitos_incrementos(self, armazem, modelo):
+        """Testa que o limite de atualizações seguidas força uma geração limpa."""
+        armazem.adicionar(criar_briefing(["A"]), topico_pedido="energia solar", incrementos=3)
+        modelo.respostas = [criar_briefing(["Z"]).model_dump_json()]
+
+        briefing = criar_briefing_incremental("energia solar", armazem=armazem, max_incrementos=3)
+
+        assert [a.titulo for a in briefing.artigos] == ["Z"]
+        assert armazem.ultima_versao("energia solar").incrementos == 0
+
+    def test_geracao_completa_apos_idade_maxima(self, armazem, modelo):
+        """Testa que uma versão antiga não é atualizada."""
+        armazem.adicionar(criar_briefing(["A"]), gerado_em=1.0, topico_pedido="energia solar")
+        modelo.respostas = [criar_briefing(["Z"]).model_dump_json()]
+
+        briefing = criar_briefing_incremental("energia solar", armazem=armazem, idade_maxima=3600)
+
+        assert [a.titulo for a in briefing.artigos] == ["Z"]
+        assert armazem.ultima_versao("energia solar").versao == 2
+
+    def test_falha_na_atualizacao(self, armazem, modelo):
+        """Testa que respostas inválidas de todos os modelos resultam em None."""
+        armazem.adicionar(criar_briefing(["A"]), topico_pedido="energia solar")
+        modelo.respostas = ["lixo"] * 3
+
+        assert criar_briefing_incremental("energia solar", armazem=armazem) is None
+        assert len(armazem.versoes("energia solar")) == 1
+
+    def test_topico_vazio(self, armazem):
+        """Testa a validação do tópico."""
+        with pytest.raises(ValueError):
+            criar_briefing_incremental("  ", armazem=armazem)
+
+
+if __name__ == "__main__":
+    pytest.main([__file__, "-v", "--tb=short"])
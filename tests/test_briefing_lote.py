@@ -0,0 +1,103 @@
+"""
+Testes para a geração de briefings em lote
+==========================================
+
+Execute com: pytest tests/test_briefing_lote.py -v
+"""
+
+import asyncio
+import threading
+import time
+import pytest
+import sys
+import os
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from briefing_lote import criar_briefings_em_lote, executar_lote, ResultadoLote
+
+
+class TestCriarBriefingsEmLote:
+    """Testes para o gerador assíncrono de lotes."""
+
+    def test_concorrencia_reduz_tempo_total(self):
+        """Testa que o lote leva aproximadamente o tempo da chamada mais lenta."""
+        def gerador(topico):
+            time.sleep(0.2)
+            return f"briefing de {topico}"
+
+        inicio = time.perf_counter()
+        resultados = executar_lote([f"t{i}" for i in range(10)], max_concorrencia=10, gerador=gerador)
+        duracao = time.perf_counter() - inicio
+
+        assert len(resultados) == 10
+        assert all(r.sucesso for r in resultados)
+        assert duracao < 1.0
+
+    def test_respeita_limite_de_concorrencia(self):
+        """Testa que o semáforo limita as gerações simultâneas."""
+        ativos = 0
+        pico = 0
+        trava = threading.Lock()
+
+        def gerador(topico):
+            nonlocal ativos, pico
+            with trava:
+                ativos += 1
+                pico = max(pico, ativos)
+            time.sleep(0.05)
+            with trava:
+                ativos -= 1
+            return topico
+
+        executar_lote([f"t{i}" for i in range(12)], max_concorrencia=3, gerador=gerador)
+        assert pico <= 3
+
+    def test_falhas_nao_interrompem_lote(self):
+        """Testa que exceções e None viram resultados de erro."""
+        def gerador(topico):
+            if topico == "explode":
+                raise RuntimeError("API Error")
+            if topico == "vazio":
+                return None
+            return topico.upper()
+
+        resultados = {r.topico: r for r in executar_lote(["ok", "explode", "vazio"], gerador=gerador)}
+
+        assert resultados["ok"].briefing == "OK"
+        assert "API Error" in resultados["explode"].erro
+        assert resultados["vazio"].erro == "Falha ao criar briefing"
+        assert not resultados["vazio"].sucesso
+
+    def test_resultados_entregues_por_ordem_de_conclusao(self):
+        """Testa que o tópico mais rápido é entregue primeiro."""
+        async def gerador(topico):
+            await asyncio.sleep(0.2 if topico == "lento" else 0.01)
+            return topico
+
+        async def coletar():
+            return [r.topico async for r in criar_briefings_em_lote(["lento", "rapido"], gerador=gerador)]
+
+        assert asyncio.run(coletar()) == ["rapido", "lento"]
+
+    def test_concorrencia_invalida(self):
+        """Testa que max_concorrencia menor que 1 é rejeitado."""
+        with pytest.raises(ValueError):
+            executar_lote(["t"], max_concorrencia=0, gerador=lambda t: t)
+
+    def test_lote_vazio(self):
+        """Testa que um lote sem tópicos não gera resultados."""
+        assert executar_lote([], gerador=lambda t: t) == []
+
+
+class TestResultadoLote:
+    """Testes para o modelo ResultadoLote."""
+
+    def test_sucesso(self):
+        """Testa a propriedade sucesso."""
+        assert ResultadoLote(topico="a", briefing=object()).sucesso
+        assert not ResultadoLote(topico="a", erro="falhou").sucesso
+
+
+if __name__ == "__main__":
+    pytest.main([__file__, "-v", "--tb=short"])
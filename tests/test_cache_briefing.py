@@ -0,0 +1,135 @@
+"""
+Testes para o cache persistente de briefings
+============================================
+
+Execute com: pytest tests/test_cache_briefing.py -v
+"""
+
+import sqlite3
+import time
+import pytest
+import sys
+import os
+from unittest.mock import patch
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+import cache_briefing
+from cache_briefing import CacheDeBriefings, gerar_chave_cache, normalizar_topico, obter_cache_padrao
+
+
+@pytest.fixture
+def cache(tmp_path):
+    """Cache temporário para cada teste."""
+    instancia = CacheDeBriefings(str(tmp_path / "cache.sqlite3"), ttl=60, max_entradas=3)
+    yield instancia
+    instancia.fechar()
+
+
+class TestChaveCache:
+    """Testes para a geração de chaves."""
+
+    def test_topico_normalizado(self):
+        """Testa que caixa e espaços não alteram a chave."""
+        assert normalizar_topico("  IA   na Saúde ") == "ia na saúde"
+        assert gerar_chave_cache("IA na Saúde", "t", "m", 0.5) == gerar_chave_cache("ia  na saúde", "t", "m", 0.5)
+
+    def test_componentes_alteram_chave(self):
+        """Testa que template, modelo e temperatura fazem parte da chave."""
+        base = gerar_chave_cache("ia", "t", "m", 0.5)
+        assert base != gerar_chave_cache("ia", "outro", "m", 0.5)
+        assert base != gerar_chave_cache("ia", "t", "outro", 0.5)
+        assert base != gerar_chave_cache("ia", "t", "m", 0.7)
+
+
+class TestCacheDeBriefings:
+    """Testes para o cache SQLite."""
+
+    def test_acerto_e_falta(self, cache):
+        """Testa contadores de acerto e falta."""
+        assert cache.obter("a") is None
+        cache.definir("a", '{"x": 1}')
+        assert cache.obter("a") == '{"x": 1}'
+
+        stats = cache.estatisticas()
+        assert stats["acertos"] == 1
+        assert stats["faltas"] == 1
+        assert stats["entradas"] == 1
+
+    def test_busca_por_variantes_conta_uma_vez(self, cache):
+        """Testa que várias chaves de uma mesma busca contam um único acerto ou falta."""
+        assert cache.obter_primeira(["m1", "m2", "m3"]) is None
+        cache.definir("m2", "{}")
+        cache.definir("m3", '{"x": 1}')
+
+        assert cache.obter_primeira(["m1", "m2", "m3"]) == ("m2", "{}")
+        stats = cache.estatisticas()
+        assert (stats["acertos"], stats["faltas"]) == (1, 1)
+
+    def test_ttl_expira_entrada(self, tmp_path):
+        """Testa que entradas expiradas são descartadas."""
+        cache = CacheDeBriefings(str(tmp_path / "ttl.sqlite3"), ttl=0.05)
+        cache.definir("a", "{}")
+        time.sleep(0.1)
+
+        assert cache.obter("a") is None
+        assert cache.estatisticas()["expirados"] == 1
+        cache.fechar()
+
+    def test_despejo_lru_por_quantidade(self, cache):
+        """Testa que a entrada menos usada é despejada primeiro."""
+        for chave in ("a", "b", "c"):
+            cache.definir(chave, "{}")
+            time.sleep(0.01)
+        cache.obter("a")  # "b" passa a ser a menos usada
+        cache.definir("d", "{}")
+
+        assert cache.obter("b") is None
+        assert cache.obter("a") is not None
+        assert cache.estatisticas()["despejos"] == 1
+
+    def test_despejo_por_tamanho(self, tmp_path):
+        """Testa o limite de tamanho total."""
+        cache = CacheDeBriefings(str(tmp_path / "bytes.sqlite3"), max_bytes=25)
+        cache.definir("a", "x" * 10)
+        time.sleep(0.01)
+        cache.definir("b", "x" * 10)
+        time.sleep(0.01)
+        cache.definir("c", "x" * 10)
+
+        assert cache.obter("a") is None
+        assert cache.estatisticas()["entradas"] == 2
+        cache.fechar()
+
+    def test_persistencia_entre_instancias(self, tmp_path):
+        """Testa que o conteúdo sobrevive a uma nova conexão."""
+        caminho = str(tmp_path / "persistente.sqlite3")
+        primeiro = CacheDeBriefings(caminho)
+        primeiro.definir("a", "{}")
+        primeiro.fechar()
+
+        segundo = CacheDeBriefings(caminho)
+        assert segundo.obter("a") == "{}"
+        segundo.fechar()
+
+
+class TestCachePadrao:
+    """Testes do cache compartilhado configurado pelo ambiente."""
+
+    def test_troca_de_caminho_fecha_o_cache_anterior(self, tmp_path):
+        """Testa que mudar BRIEFING_CACHE_PATH fecha a conexão do cache substituído."""
+        with patch.object(cache_briefing, "_cache_padrao", None):
+            with patch.dict(os.environ, {"BRIEFING_CACHE_PATH": str(tmp_path / "a.sqlite3")}):
+                anterior = obter_cache_padrao()
+            with patch.dict(os.environ, {"BRIEFING_CACHE_PATH": str(tmp_path / "b.sqlite3")}):
+                atual = obter_cache_padrao()
+
+            assert atual is not anterior
+            with pytest.raises(sqlite3.ProgrammingError):
+                anterior._conexao.execute("SELECT 1")
+            assert atual.obter("a") is None
+            atual.fechar()
+
+
+if __name__ == "__main__":
+    pytest.main([__file__, "-v", "--tb=short"])
@@ -0,0 +1,214 @@
+"""
+Testes para o cache de imagens renderizadas
+===========================================
+
+Execute com: pytest tests/test_cache_imagens.py -v
+"""
+
+import threading
+import time
+import pytest
+import sys
+import os
+from unittest.mock import Mock, patch
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+import cache_imagens
+from cache_imagens import CacheDeImagens, copiar_atomico, gerar_chave_imagem, gravar_atomico
+from deduplicacao_topicos import similaridade
+
+MODELO = "imagen"
+PROMPT = "Foto de painéis solares no telhado ao pôr do sol"
+
+
+class TestChaveImagem:
+    """Testes da chave de conteúdo."""
+
+    def test_prompt_normalizado(self):
+        """Testa que maiúsculas e espaços não mudam a chave."""
+        assert gerar_chave_imagem(PROMPT, "16:9", MODELO) == gerar_chave_imagem(f"  {PROMPT.upper()} ", "16:9", MODELO)
+
+    def test_proporcao_e_modelo_na_chave(self):
+        """Testa que proporção e modelo distinguem as imagens."""
+        chaves = {
+            gerar_chave_imagem(PROMPT, "16:9", MODELO),
+            gerar_chave_imagem(PROMPT, "1:1", MODELO),
+            gerar_chave_imagem(PROMPT, "16:9", "outro"),
+        }
+        assert len(chaves) == 3
+
+    def test_gravacao_atomica_concorrente(self, tmp_path):
+        """Testa que gravações simultâneas deixam um arquivo inteiro e nenhum temporário."""
+        caminho = str(tmp_path / "imagem.png")
+        conteudos = [bytes([i]) * 200_000 for i in range(8)]
+
+        threads = [threading.Thread(target=gravar_atomico, args=(caminho, c)) for c in conteudos]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        assert open(caminho, "rb").read() in conteudos
+        assert os.listdir(tmp_path) == ["imagem.png"]
+
+    def test_gravacao_em_blocos_de_memoryview(self, tmp_path):
+        """Testa a escrita de um buffer maior que o bloco, sem cópia para bytes."""
+        caminho = str(tmp_path / "imagem.png")
+        dados = bytearray(os.urandom(1000))
+
+        with patch.object(cache_imagens, "TAMANHO_BLOCO_ESCRITA", 64):
+            gravar_atomico(caminho, memoryview(dados))
+
+        assert open(caminho, "rb").read() == dados
+
+    def test_falha_na_gravacao_preserva_o_destino(self, tmp_path):
+        """Testa que um erro antes de publicar não deixa arquivo parcial nem temporário."""
+        caminho = str(tmp_path / "imagem.png")
+        gravar_atomico(caminho, b"antigo")
+
+        with patch.object(cache_imagens.os, "replace", side_effect=OSError("disco cheio")):
+            with pytest.raises(OSError):
+                gravar_atomico(caminho, b"novo")
+
+        assert open(caminho, "rb").read() == b"antigo"
+        assert os.listdir(tmp_path) == ["imagem.png"]
+
+    def test_copia_por_link(self, tmp_path):
+        """Testa a publicação por hard link e a cópia repetida do mesmo arquivo."""
+        origem, destino = str(tmp_path / "origem.png"), str(tmp_path / "destino.png")
+        gravar_atomico(origem, b"png")
+
+        copiar_atomico(origem, destino)
+        copiar_atomico(origem, destino)
+
+        assert os.path.samefile(origem, destino)
+        assert sorted(os.listdir(tmp_path)) == ["destino.png", "origem.png"]
+
+
+class TestCacheDeImagens:
+    """Testes do armazenamento e do despejo."""
+
+    def test_guardar_e_obter(self, tmp_path):
+        """Testa o acerto exato e a falta em outra proporção."""
+        cache = CacheDeImagens(str(tmp_path))
+        caminho = cache.guardar(PROMPT, "16:9", MODELO, b"png")
+
+        assert cache.obter(PROMPT.lower(), "16:9", MODELO) == caminho
+        assert open(caminho, "rb").read() == b"png"
+        assert cache.obter(PROMPT, "1:1", MODELO) is None
+        assert cache.estatisticas()["acertos"] == 1
+        assert cache.estatisticas()["faltas"] == 1
+        cache.fechar()
+
+    def test_prompt_parecido(self, tmp_path):
+        """Testa o reaproveitamento de prompts quase idênticos só com limiar."""
+        parecido = "Foto dos painéis solares no telhado, ao pôr-do-sol"
+        cache = CacheDeImagens(str(tmp_path), limiar=0.8)
+        caminho = cache.guardar(PROMPT, "16:9", MODELO, b"png")
+
+        assert cache.obter(parecido, "16:9", MODELO) == caminho
+        assert cache.obter(parecido, "1:1", MODELO) is None
+        assert cache.obter("Gráfico de juros em alta", "16:9", MODELO) is None
+        assert cache.estatisticas()["aproximados"] == 1
+        cache.fechar()
+
+        exato = CacheDeImagens(str(tmp_path))
+        assert exato.obter(parecido, "16:9", MODELO) is None
+        exato.fechar()
+
+    def test_despejo_por_tamanho(self, tmp_path):
+        """Testa que as imagens usadas há mais tempo saem primeiro."""
+        cache = CacheDeImagens(str(tmp_path), max_bytes=250)
+        antiga = cache.guardar("antiga", "16:9", MODELO, b"a" * 100)
+        usada = cache.guardar("usada", "16:9", MODELO, b"u" * 100)
+        time.sleep(0.01)
+        cache.obter("antiga", "16:9", MODELO)
+        time.sleep(0.01)
+        cache.guardar("nova", "16:9", MODELO, b"n" * 100)
+
+        assert os.path.exists(antiga)
+        assert not os.path.exists(usada)
+        assert cache.obter("usada", "16:9", MODELO) is None
+        assert cache.estatisticas()["bytes"] == 200
+        cache.fechar()
+
+    def test_imagem_maior_que_o_limite(self, tmp_path):
+        """Testa que a imagem recém-guardada não é despejada, mesmo acima do limite."""
+        cache = CacheDeImagens(str(tmp_path), max_bytes=150)
+        antiga = cache.guardar("antiga", "16:9", MODELO, b"a" * 100)
+        grande = cache.guardar("grande", "16:9", MODELO, b"g" * 200)
+
+        assert os.path.exists(grande)
+        assert not os.path.exists(antiga)
+        assert cache.obter("grande", "16:9", MODELO) == grande
+
+        copia = tmp_path / "externa.png"
+        copia.write_bytes(b"e" * 300)
+        externa = cache.guardar_arquivo("externa", "16:9", MODELO, str(copia))
+        assert os.path.exists(externa)
+        assert not os.path.exists(grande)
+        assert cache.estatisticas()["entradas"] == 1
+        cache.fechar()
+
+    def test_comparacao_fora_da_trava(self, tmp_path):
+        """Testa que a varredura de prompts parecidos não segura a trava do cache."""
+        cache = CacheDeImagens(str(tmp_path), limiar=0.8)
+        cache.guardar(PROMPT, "16:9", MODELO, b"png")
+        travada = []
+
+        def similaridade_espiao(a, b):
+            travada.append(cache._trava.locked())
+            return similaridade(a, b)
+
+        with patch("cache_imagens.similaridade", side_effect=similaridade_espiao):
+            assert cache.obter("Foto dos painéis solares no telhado, ao pôr-do-sol", "16:9", MODELO)
+
+        assert travada == [False]
+        cache.fechar()
+
+    def test_arquivo_removido_por_fora(self, tmp_path):
+        """Testa que uma entrada sem arquivo vira falta."""
+        cache = CacheDeImagens(str(tmp_path))
+        os.unlink(cache.guardar(PROMPT, "16:9", MODELO, b"png"))
+
+        assert cache.obter(PROMPT, "16:9", MODELO) is None
+        assert cache.estatisticas()["entradas"] == 0
+        cache.fechar()
+
+
+class TestCacheNaGeracaoDeImagens:
+    """Testes da integração com a v2."""
+
+    def test_prompt_repetido_nao_chama_a_api(self, tmp_path):
+        """Testa que o segundo briefing com o mesmo prompt usa o cache e o mesmo arquivo."""
+        import criar_briefing_noticias_v2 as v2
+
+        resultado = Mock()
+        resultado.generated_images = [Mock()]
+        resultado.generated_images[0].image.image_bytes = b"png"
+        briefings = [
+            v2.BriefingDeNoticias(topico_central=topico, artigos=[], analise_sintetizada="A",
+                                  prompt_para_imagem="Painéis solares")
+            for topico in ("Energia solar", "energia/solar")
+        ]
+
+        ambiente = {"IMAGEM_CACHE_DIR": str(tmp_path / "cache"), "OUTPUT_DIR": str(tmp_path / "saida")}
+        with patch.dict(os.environ, ambiente), \
+                patch.object(cache_imagens, "_cache_padrao", None), \
+                patch.object(v2, "obter_pool_derivados") as mock_derivados, \
+                patch.object(v2, "client") as mock_client:
+            mock_client.models.generate_images.return_value = resultado
+            caminhos = [v2.salvar_imagem_do_briefing(b) for b in briefings]
+            cache_imagens.obter_cache_imagens().fechar()
+
+        assert mock_client.models.generate_images.call_count == 1
+        assert caminhos[0] == caminhos[1]
+        assert open(caminhos[0], "rb").read() == b"png"
+        assert os.path.basename(caminhos[0]).startswith("briefing_")
+        assert os.listdir(tmp_path / "saida") == [os.path.basename(caminhos[0])]
+        mock_derivados.return_value.agendar.assert_called_with(caminhos[0])
+
+
+if __name__ == "__main__":
+    pytest.main([__file__, "-v", "--tb=short"])
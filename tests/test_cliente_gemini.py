@@ -0,0 +1,78 @@
+"""
+Testes para o cliente Gemini preguiçoso
+=======================================
+
+Execute com: pytest tests/test_cliente_gemini.py -v
+"""
+
+import subprocess
+import pytest
+import sys
+import os
+from unittest.mock import Mock, patch
+
+RAIZ = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
+sys.path.insert(0, RAIZ)
+
+from cliente_gemini import ClienteGemini
+
+
+class TestImportacaoSemEfeitos:
+    """Testes de importação leve da v2."""
+
+    def test_importa_sem_api_key_e_sem_sdk(self):
+        """Testa que importar a v2 não exige API key nem carrega o SDK ou o Pillow."""
+        codigo = (
+            "import sys, criar_briefing_noticias_v2\n"
+            "assert 'google.generativeai' not in sys.modules\n"
+            "assert 'PIL' not in sys.modules\n"
+            "assert not criar_briefing_noticias_v2.client.configurado\n"
+        )
+        ambiente = {k: v for k, v in os.environ.items() if k != 'GOOGLE_API_KEY'}
+        resultado = subprocess.run([sys.executable, "-c", codigo], cwd=RAIZ, env=ambiente,
+                                   capture_output=True, text=True)
+        assert resultado.returncode == 0, resultado.stderr
+
+
+class TestClienteGemini:
+    """Testes do cliente."""
+
+    @patch.dict(os.environ, {}, clear=True)
+    @patch('dotenv.load_dotenv')
+    def test_configurar_sem_api_key(self, mock_load_dotenv):
+        """Testa que a ausência da API key só é detectada na configuração."""
+        cliente = ClienteGemini()
+        with pytest.raises(ValueError, match="API Key não configurada"):
+            cliente.configurar()
+        assert not cliente.configurado
+
+    def test_fabrica_de_modelo_dispensa_sdk(self):
+        """Testa que uma fábrica de modelos substitui o SDK."""
+        modelo = Mock()
+        modelo.generate_content.return_value = "resposta"
+        cliente = ClienteGemini(fabrica_modelo=lambda nome: modelo)
+
+        resposta = cliente.models.generate_content(model="falso", contents="oi", config={'temperature': 0.1})
+
+        assert resposta == "resposta"
+        modelo.generate_content.assert_called_once_with(
+            contents="oi", generation_config={'temperature': 0.1}, stream=False
+        )
+
+    @patch.dict(os.environ, {'GOOGLE_API_KEY': 'test-key'})
+    def test_configura_uma_unica_vez(self):
+        """Testa que genai.configure é chamado apenas na primeira geração."""
+        import google.generativeai as genai
+
+        cliente = ClienteGemini()
+        with patch.object(genai, 'configure') as mock_configure, \
+                patch.object(genai, 'GenerativeModel') as mock_modelo:
+            cliente.modelo("a")
+            cliente.modelo("b")
+
+        mock_configure.assert_called_once_with(api_key='test-key')
+        assert mock_modelo.call_count == 2
+
+
+if __name__ == "__main__":
+    pytest.main([__file__, "-v", "--tb=short"])
@@ -0,0 +1,167 @@
+"""
+Testes para a deduplicação semântica de tópicos
+===============================================
+
+Execute com: pytest tests/test_deduplicacao_topicos.py -v
+"""
+
+import threading
+import time
+import pytest
+import sys
+import os
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from deduplicacao_topicos import (
+    GeradorDeduplicado, IndiceDeTopicos, assinatura_topico, similaridade
+)
+
+
+class TestAssinatura:
+    """Testes de normalização e similaridade."""
+
+    def test_acentos_caixa_e_stopwords(self):
+        """Testa que a ordem, acentos, caixa e stopwords não importam."""
+        assert assinatura_topico("Apple Vision Pro lançamento") == \
+            assinatura_topico("lançamento do APPLE Vision Pro")
+
+    def test_plural_simples(self):
+        """Testa que plurais simples são reduzidos."""
+        assert assinatura_topico("carros elétricos") == assinatura_topico("carro elétrico")
+
+    def test_similaridade_jaccard(self):
+        """Testa a similaridade entre conjuntos de tokens."""
+        a = assinatura_topico("recepção do Apple Vision Pro")
+        b = assinatura_topico("lançamento do Apple Vision Pro")
+
+        assert similaridade(a, b) == pytest.approx(3 / 5)
+        assert similaridade(a, frozenset()) == 0.0
+
+
+class TestIndiceDeTopicos:
+    """Testes do índice de tópicos canônicos."""
+
+    def test_topicos_similares_compartilham_canonico(self):
+        """Testa que variações do mesmo tópico usam o primeiro como canônico."""
+        indice = IndiceDeTopicos(limiar=0.75)
+
+        primeiro = indice.canonico("Apple Vision Pro lançamento")
+        assert indice.canonico("lançamento do Apple Vision Pro") == primeiro
+        assert indice.canonico("IA na saúde") != primeiro
+        assert len(indice) == 2
+
+    def test_limiar_configuravel(self):
+        """Testa que o limiar controla a agressividade."""
+        indice = IndiceDeTopicos(limiar=0.6)
+        primeiro = indice.canonico("lançamento do Apple Vision Pro")
+        assert indice.canonico("recepção do Apple Vision Pro") == primeiro
+
+        estrito = IndiceDeTopicos(limiar=0.9)
+        primeiro = estrito.canonico("lançamento do Apple Vision Pro")
+        assert estrito.canonico("recepção do Apple Vision Pro") != primeiro
+
+    def test_ttl_expira_canonico(self):
+        """Testa que tópicos expirados deixam de ser reaproveitados."""
+        agora = [0.0]
+        indice = IndiceDeTopicos(ttl=10, relogio=lambda: agora[0])
+        indice.canonico("Apple Vision Pro")
+
+        agora[0] = 11
+        assert indice.canonico("apple vision pro!") == "apple vision pro!"
+
+    def test_limite_de_topicos(self):
+        """Testa que o índice descarta os tópicos mais antigos."""
+        indice = IndiceDeTopicos(max_topicos=2)
+        for topico in ("alfa beta", "gama delta", "epsilon zeta"):
+            indice.canonico(topico)
+
+        assert len(indice) == 2
+        assert indice.canonico("alfa beta") == "alfa beta"
+
+
+class TestGeradorDeduplicado:
+    """Testes do gerador com deduplicação."""
+
+    def test_gerador_recebe_topico_canonico(self):
+        """Testa que tópicos similares chegam ao gerador como o canônico, no texto original."""
+        recebidos = []
+        gerar = GeradorDeduplicado(lambda topico: recebidos.append(topico) or topico)
+
+        gerar("Apple Vision Pro lançamento")
+        gerar("lançamento do Apple Vision Pro")
+
+        assert recebidos == ["Apple Vision Pro lançamento"] * 2
+        assert gerar.estatisticas()["redirecionados"] == 1
+
+    def test_falha_nao_indexa_o_topico(self):
+        """Testa que um tópico cuja geração falhou não atrai os pedidos similares seguintes."""
+        respostas = iter([None, ZeroDivisionError(), "briefing"])
+        recebidos = []
+
+        def gerador(topico):
+            recebidos.append(topico)
+            resposta = next(respostas)
+            if isinstance(resposta, Exception):
+                raise resposta
+            return resposta
+
+        gerar = GeradorDeduplicado(gerador)
+        assert gerar("Apple Vision Pro lançamento") is None
+        assert len(gerar.indice) == 0
+        with pytest.raises(ZeroDivisionError):
+            gerar("lançamento do Apple Vision Pro")
+        assert gerar("o lançamento do apple vision pro") == "briefing"
+
+        assert recebidos == ["Apple Vision Pro lançamento", "lançamento do Apple Vision Pro",
+                             "o lançamento do apple vision pro"]
+        assert gerar.estatisticas()["redirecionados"] == 0
+        assert gerar.indice.original("o lançamento do apple vision pro") == "o lançamento do apple vision pro"
+
+    def test_geracao_em_andamento_e_reaproveitada(self):
+        """Testa que pedidos similares simultâneos aguardam a mesma geração."""
+        chamadas = []
+        liberar = threading.Event()
+
+        def lento(topico):
+            chamadas.append(topico)
+            liberar.wait(2)
+            return f"briefing de {topico}"
+
+        gerar = GeradorDeduplicado(lento)
+        resultados = []
+        threads = [
+            threading.Thread(target=lambda t=t: resultados.append(gerar(t)))
+            for t in ("Apple Vision Pro lançamento", "lançamento do Apple Vision Pro",
+                      "o lançamento do apple vision pro")
+        ]
+        threads[0].start()
+        time.sleep(0.05)
+        for thread in threads[1:]:
+            thread.start()
+        time.sleep(0.05)
+        liberar.set()
+        for thread in threads:
+            thread.join()
+
+        assert len(chamadas) == 1
+        assert len(set(resultados)) == 1 and len(resultados) == 3
+        assert gerar.estatisticas()["coalescidos"] == 2
+
+    def test_erro_propaga_para_quem_aguarda(self):
+        """Testa que uma falha na geração chega a todos os pedidos e libera o tópico."""
+        gerar = GeradorDeduplicado(lambda topico: 1 / 0)
+
+        with pytest.raises(ZeroDivisionError):
+            gerar("tópico")
+        with pytest.raises(ZeroDivisionError):
+            gerar("tópico")
+
+    def test_topico_vazio(self):
+        """Testa que tópico vazio é rejeitado."""
+        with pytest.raises(ValueError):
+            GeradorDeduplicado(lambda topico: topico)("  ")
+
+
+if __name__ == "__main__":
+    pytest.main([__file__, "-v", "--tb=short"])
@@ -0,0 +1,137 @@
+"""
+Testes para os derivados de imagens
+===================================
+
+Execute com: pytest tests/test_derivados_imagem.py -v
+"""
+
+import pytest
+import sys
+import os
+from unittest.mock import patch
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+import derivados_imagem
+from derivados_imagem import PoolDeDerivados, caminho_derivado, gerar_derivados, obter_pool_derivados
+
+
+def criar_png(caminho, largura=640, altura=360):
+    Image = pytest.importorskip("PIL.Image")
+    Image.new("RGB", (largura, altura), (200, 120, 40)).save(caminho, format="PNG")
+    return caminho
+
+
+class TestDerivados:
+    """Testes da geração de miniatura e WebP."""
+
+    def test_nomes_dos_derivados(self):
+        """Testa que os derivados herdam o nome (hash) do PNG."""
+        assert caminho_derivado("saida/briefing_abc.png", "miniatura") == "saida/briefing_abc_miniatura.webp"
+        assert caminho_derivado("saida/briefing_abc.png", "webp") == "saida/briefing_abc.webp"
+
+    def test_miniatura_e_webp(self, tmp_path):
+        """Testa os tamanhos e o formato dos derivados."""
+        Image = pytest.importorskip("PIL.Image")
+        origem = criar_png(str(tmp_path / "briefing_abc.png"))
+
+        miniatura, webp = gerar_derivados(origem, largura_miniatura=160)
+
+        with Image.open(miniatura) as imagem:
+            assert imagem.format == "WEBP"
+            assert imagem.size == (160, 90)
+        with Image.open(webp) as imagem:
+            assert imagem.size == (640, 360)
+        assert sorted(os.listdir(tmp_path)) == ["briefing_abc.png", "briefing_abc.webp", "briefing_abc_miniatura.webp"]
+
+    def test_derivado_existente_nao_e_refeito(self, tmp_path):
+        """Testa que um derivado já gerado não decodifica a imagem de novo."""
+        pytest.importorskip("PIL.Image")
+        origem = criar_png(str(tmp_path / "briefing_abc.png"))
+        gerar_derivados(origem, derivados=("webp",))
+
+        with patch("PIL.Image.open") as mock_abrir:
+            gerar_derivados(origem, derivados=("webp",))
+
+        mock_abrir.assert_not_called()
+
+    def test_sem_pillow(self, tmp_path):
+        """Testa o erro claro e o pool desativado sem o Pillow."""
+        with patch.object(derivados_imagem, "_carregar_pillow", return_value=None):
+            with pytest.raises(RuntimeError, match="Pillow"):
+                gerar_derivados(str(tmp_path / "briefing.png"))
+            with patch.dict(os.environ, {"IMAGEM_DERIVADOS": "miniatura"}), \
+                    patch.object(derivados_imagem, "_pool_padrao", None):
+                assert obter_pool_derivados() is None
+
+    def test_derivado_desconhecido(self, tmp_path):
+        """Testa a validação dos derivados pedidos."""
+        with pytest.raises(ValueError):
+            gerar_derivados(str(tmp_path / "briefing.png"), derivados=("gif",))
+
+
+class TestPoolDeDerivados:
+    """Testes do pool em segundo plano."""
+
+    def test_falha_contada_sem_propagar(self, tmp_path):
+        """Testa que um PNG inválido vira falha no pool, não exceção para quem agendou."""
+        origem = tmp_path / "briefing.png"
+        origem.write_bytes(b"nao e png")
+
+        with PoolDeDerivados() as pool:
+            futuro = pool.agendar(str(origem))
+            assert futuro.exception(timeout=5) is not None
+
+        assert pool.estatisticas() == {"gerados": 0, "falhas": 1}
+
+    def test_derivados_em_segundo_plano(self, tmp_path):
+        """Testa que o pool devolve os caminhos gerados."""
+        pytest.importorskip("PIL.Image")
+        origem = criar_png(str(tmp_path / "briefing.png"))
+
+        with PoolDeDerivados(derivados=("miniatura",)) as pool:
+            assert pool.agendar(origem).result(timeout=5) == [caminho_derivado(origem, "miniatura")]
+
+        assert pool.estatisticas()["gerados"] == 1
+
+
+class TestPoolPadrao:
+    """Testes do pool compartilhado configurado pelo ambiente."""
+
+    def test_troca_de_configuracao_fecha_o_pool_anterior(self):
+        """Testa que o pool substituído é encerrado e o atexit é registrado uma única vez."""
+        with patch.object(derivados_imagem, "_carregar_pillow", return_value=object()), \
+                patch.object(derivados_imagem, "_pool_padrao", None), \
+                patch.object(derivados_imagem.atexit, "register") as mock_register:
+            with patch.dict(os.environ, {"IMAGEM_DERIVADOS": "miniatura"}):
+                primeiro = obter_pool_derivados()
+                assert obter_pool_derivados() is primeiro
+            with patch.dict(os.environ, {"IMAGEM_DERIVADOS": "webp"}):
+                segundo = obter_pool_derivados()
+
+            assert segundo is not primeiro
+            assert primeiro._executor._shutdown
+            assert not segundo._executor._shutdown
+            mock_register.assert_called_once_with(derivados_imagem._fechar_pool_padrao)
+            segundo.fechar()
+
+    def test_configuracao_invalida_nao_derruba_a_imagem(self, tmp_path):
+        """Testa que IMAGEM_DERIVADOS inválida só gera aviso na gravação da imagem."""
+        import criar_briefing_noticias_v2 as v2
+
+        briefing = v2.BriefingDeNoticias(topico_central="IA", artigos=[], analise_sintetizada="A",
+                                         prompt_para_imagem="Chips")
+        ambiente = {"IMAGEM_DERIVADOS": "gif", "OUTPUT_DIR": str(tmp_path), "IMAGEM_CACHE_DIR": ""}
+        with patch.dict(os.environ, ambiente), \
+                patch.object(derivados_imagem, "_carregar_pillow", return_value=object()), \
+                patch.object(derivados_imagem, "_pool_padrao", None), \
+                patch.object(v2, "_renderizar_imagem") as mock_renderizar:
+            with pytest.raises(ValueError):
+                obter_pool_derivados()
+            caminho = v2.salvar_imagem_do_briefing(briefing)
+
+        mock_renderizar.assert_called_once_with("Chips", caminho)
+
+
+if __name__ == "__main__":
+    pytest.main([__file__, "-v", "--tb=short"])
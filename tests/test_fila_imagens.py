@@ -0,0 +1,181 @@
+"""
+Testes para a fila de geração de imagens
+========================================
+
+Execute com: pytest tests/test_fila_imagens.py -v
+"""
+
+import asyncio
+import threading
+import time
+import pytest
+import sys
+import os
+from unittest.mock import patch
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from fila_imagens import FilaDeImagens
+from limitador_taxa import LimitadorDeTaxa, LimiteModelo
+from politica_retry import PoliticaDeRetry
+from criar_briefing_noticias_v2 import BriefingDeNoticias
+
+
+def criar_briefing(topico="IA", prompt="Prompt"):
+    return BriefingDeNoticias(
+        topico_central=topico,
+        artigos=[{"titulo": "Título", "fonte": "Fonte", "resumo_curto": "Resumo"}],
+        analise_sintetizada="Análise",
+        prompt_para_imagem=prompt
+    )
+
+
+class RelogioFalso:
+    """Relógio controlado pelo teste."""
+
+    def __init__(self):
+        self.agora = 0.0
+
+    def __call__(self):
+        return self.agora
+
+
+class TestFilaDeImagens:
+    """Testes da geração em segundo plano."""
+
+    def test_enfileirar_nao_espera_a_imagem(self):
+        """Testa que o briefing é liberado antes de a imagem ficar pronta."""
+        liberar = threading.Event()
+
+        def gerador(briefing):
+            liberar.wait(2)
+            return f"{briefing.topico_central}.png"
+
+        with FilaDeImagens(gerador=gerador) as fila:
+            inicio = time.perf_counter()
+            imagem = fila.enfileirar(criar_briefing("Chips"))
+            assert time.perf_counter() - inicio < 0.5
+            assert not imagem.pronta()
+
+            liberar.set()
+            assert imagem.resultado(timeout=2) == "Chips.png"
+            assert imagem.erro is None
+
+    def test_falha_nao_propaga(self):
+        """Testa que um erro da API vira None e fica registrado no vale."""
+        def gerador(briefing):
+            raise RuntimeError("API fora do ar")
+
+        with FilaDeImagens(gerador=gerador) as fila:
+            imagem = fila.enfileirar(criar_briefing())
+
+            assert imagem.resultado(timeout=2) is None
+            assert imagem.erro == "RuntimeError: API fora do ar"
+            assert fila.estatisticas()["falhas"] == 1
+
+    def test_concorrencia_limitada(self):
+        """Testa que nunca há mais imagens em geração que o limite."""
+        trava = threading.Lock()
+        simultaneas = [0, 0]
+
+        def gerador(briefing):
+            with trava:
+                simultaneas[0] += 1
+                simultaneas[1] = max(simultaneas[1], simultaneas[0])
+            time.sleep(0.02)
+            with trava:
+                simultaneas[0] -= 1
+            return "imagem.png"
+
+        with FilaDeImagens(max_concorrencia=2, gerador=gerador) as fila:
+            imagens = [fila.enfileirar(criar_briefing()) for _ in range(6)]
+            assert all(i.resultado(timeout=2) == "imagem.png" for i in imagens)
+
+        assert simultaneas[1] == 2
+
+    def test_fila_cheia_recusa_sem_bloquear(self):
+        """Testa que pedidos além do limite falham na hora."""
+        liberar = threading.Event()
+
+        def gerador(briefing):
+            liberar.wait(2)
+            return "imagem.png"
+
+        with FilaDeImagens(max_concorrencia=1, max_fila=2, gerador=gerador) as fila:
+            aceitas = [fila.enfileirar(criar_briefing()) for _ in range(2)]
+            recusada = fila.enfileirar(criar_briefing())
+
+            assert recusada.pronta()
+            assert recusada.resultado() is None
+            assert "cheia" in recusada.erro
+            liberar.set()
+            assert all(i.resultado(timeout=2) for i in aceitas)
+            assert fila.estatisticas()["recusadas"] == 1
+            assert fila.enfileirar(criar_briefing()).resultado(timeout=2) == "imagem.png"
+
+    def test_sem_prompt(self):
+        """Testa que um briefing sem prompt não ocupa o pool."""
+        chamadas = []
+
+        with FilaDeImagens(gerador=chamadas.append) as fila:
+            assert fila.enfileirar(criar_briefing(prompt="")).resultado() is None
+
+        assert chamadas == []
+
+    def test_limite_de_taxa_proprio(self):
+        """Testa que a cota de imagens é consumida no limitador da fila."""
+        relogio = RelogioFalso()
+        limitador = LimitadorDeTaxa(padrao=LimiteModelo(rpm=1), relogio=relogio)
+
+        with FilaDeImagens(gerador=lambda b: "imagem.png", limitador=limitador) as fila:
+            assert fila.enfileirar(criar_briefing()).resultado(timeout=2) == "imagem.png"
+            segunda = fila.enfileirar(criar_briefing())
+            time.sleep(0.1)
+            assert not segunda.pronta()
+
+            relogio.agora = 60.0
+            assert segunda.resultado(timeout=5) == "imagem.png"
+
+    def test_politica_repete_falhas_transitorias(self):
+        """Testa que a política de retry é aplicada a cada imagem."""
+        tentativas = []
+
+        def gerador(briefing):
+            tentativas.append(1)
+            if len(tentativas) == 1:
+                raise ConnectionError("instável")
+            return "imagem.png"
+
+        politica = PoliticaDeRetry(max_tentativas=2, espera_base=0.0)
+        with FilaDeImagens(gerador=gerador, politica=politica) as fila:
+            assert fila.enfileirar(criar_briefing()).resultado(timeout=2) == "imagem.png"
+
+        assert len(tentativas) == 2
+
+    def test_gerador_padrao_repete_a_gravacao(self):
+        """Testa que o retry da fila envolve salvar_imagem_do_briefing, que propaga os erros."""
+        politica = PoliticaDeRetry(max_tentativas=2, espera_base=0.0)
+
+        with patch("criar_briefing_noticias_v2.salvar_imagem_do_briefing",
+                   side_effect=[ConnectionError("instável"), "imagem.png"]) as mock_salvar:
+            with FilaDeImagens(politica=politica) as fila:
+                assert fila.enfileirar(criar_briefing()).resultado(timeout=2) == "imagem.png"
+
+        assert mock_salvar.call_count == 2
+
+    def test_resultado_async(self):
+        """Testa a espera pela imagem dentro do event loop."""
+        with FilaDeImagens(gerador=lambda b: "imagem.png") as fila:
+            imagem = fila.enfileirar(criar_briefing())
+            assert asyncio.run(imagem.resultado_async()) == "imagem.png"
+
+    def test_fechada(self):
+        """Testa que uma fila fechada recusa pedidos sem lançar erro."""
+        fila = FilaDeImagens(gerador=lambda b: "imagem.png")
+        fila.fechar()
+
+        assert fila.enfileirar(criar_briefing()).erro == "RuntimeError: fila de imagens fechada"
+
+
+if __name__ == "__main__":
+    pytest.main([__file__, "-v", "--tb=short"])
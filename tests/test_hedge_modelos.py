@@ -0,0 +1,179 @@
+"""
+Testes para o hedge entre modelos
+=================================
+
+Execute com: pytest tests/test_hedge_modelos.py -v
+"""
+
+import threading
+import time
+import pytest
+import sys
+import os
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from hedge_modelos import ConfiguracaoHedge, ExecutorDeHedge, OrcamentoHedge, marcar_inicio
+from roteador_modelos import RoteadorDeModelos
+
+
+def criar_executor(**kwargs):
+    """Cria um executor com roteador isolado e atraso curto."""
+    parametros = {"atraso_padrao": 0.05, "orcamento": 0.5}
+    parametros.update(kwargs)
+    return ExecutorDeHedge(ConfiguracaoHedge(**parametros), roteador=RoteadorDeModelos())
+
+
+def chamada_com_latencias(latencias, falhas=()):
+    """Cria uma chamada falsa com latência por modelo."""
+    def chamar(modelo):
+        time.sleep(latencias[modelo])
+        if modelo in falhas:
+            raise RuntimeError(f"{modelo} indisponível")
+        return f"briefing de {modelo}"
+    return chamar
+
+
+class TestExecutorDeHedge:
+    """Testes do executor de hedge."""
+
+    def test_primario_rapido_sem_hedge(self):
+        """Testa que um primário rápido não dispara hedge."""
+        executor = criar_executor(atraso_padrao=0.5)
+        resultado, modelo = executor.executar(["a", "b"], chamada_com_latencias({"a": 0.01, "b": 0.01}))
+
+        assert modelo == "a"
+        assert executor.estatisticas()["hedges"] == 0
+
+    def test_hedge_vence_primario_lento(self):
+        """Testa que o hedge responde antes de um primário lento."""
+        executor = criar_executor()
+        inicio = time.perf_counter()
+        resultado, modelo = executor.executar(["a", "b"], chamada_com_latencias({"a": 1.0, "b": 0.05}))
+
+        assert modelo == "b"
+        assert resultado == "briefing de b"
+        assert time.perf_counter() - inicio < 0.5
+        assert executor.estatisticas()["vitorias_hedge"] == 1
+
+    def test_orcamento_esgotado_espera_primario(self):
+        """Testa que sem orçamento o hedge não é disparado."""
+        executor = criar_executor(orcamento=0.0, rajada=0.0)
+        resultado, modelo = executor.executar(["a", "b"], chamada_com_latencias({"a": 0.2, "b": 0.01}))
+
+        assert modelo == "a"
+        assert executor.estatisticas()["hedges_negados"] == 1
+
+    def test_falha_segue_para_proximo(self):
+        """Testa que falhas seguem a cadeia de fallback."""
+        executor = criar_executor(atraso_padrao=1.0)
+        latencias = {"a": 0.01, "b": 0.01, "c": 0.01}
+        resultado, modelo = executor.executar(["a", "b", "c"], chamada_com_latencias(latencias, falhas={"a", "b"}))
+
+        assert modelo == "c"
+
+    def test_todos_falham(self):
+        """Testa que ValueError é lançado se nenhum modelo funcionar."""
+        executor = criar_executor()
+        with pytest.raises(ValueError, match="Nenhum modelo"):
+            executor.executar(["a", "b"], chamada_com_latencias({"a": 0.01, "b": 0.01}, falhas={"a", "b"}))
+
+    def test_atraso_usa_percentil(self):
+        """Testa que o atraso segue o percentil das latências observadas."""
+        executor = criar_executor()
+        for _ in range(20):
+            executor.roteador.registrar_sucesso("a", 0.4)
+
+        assert executor.calcular_atraso("a") == pytest.approx(0.4)
+        assert executor.calcular_atraso("desconhecido") == pytest.approx(0.05)
+
+    def test_falhas_nao_contam_como_amostras(self):
+        """Testa que o percentil só vale com sucessos suficientes, não chamadas."""
+        executor = criar_executor()
+        executor.roteador.registrar_sucesso("a", 0.4)
+        for _ in range(20):
+            executor.roteador.registrar_falha("a")
+
+        assert executor.calcular_atraso("a") == pytest.approx(0.05)
+
+    def test_espera_na_fila_nao_dispara_hedge(self):
+        """Testa que o prazo do hedge conta a partir do início do primário."""
+        executor = criar_executor(atraso_padrao=0.15, max_workers=1)
+        liberar = threading.Event()
+        ocupante = executor._executor.submit(liberar.wait, 2)
+        threading.Timer(0.3, liberar.set).start()
+
+        resultado, modelo = executor.executar(["a", "b"], chamada_com_latencias({"a": 0.01, "b": 0.01}))
+        ocupante.result()
+
+        assert modelo == "a"
+        assert executor.estatisticas()["hedges"] == 0
+
+    def test_novo_primario_tem_prazo_proprio(self):
+        """Testa que, após a falha do primário, o prazo do hedge recomeça para o seguinte."""
+        executor = criar_executor(atraso_padrao=0.2)
+        chamados = []
+
+        def chamar(modelo):
+            chamados.append(modelo)
+            return chamada_com_latencias({"a": 0.15, "b": 0.1, "c": 0.01}, falhas={"a"})(modelo)
+
+        resultado, modelo = executor.executar(["a", "b", "c"], chamar)
+
+        assert modelo == "b"
+        assert chamados == ["a", "b"]
+        assert executor.estatisticas()["hedges"] == 0
+
+    def test_espera_por_cota_nao_dispara_hedge(self):
+        """Testa que, com aguardar_inicio, o prazo só conta após `marcar_inicio`."""
+        executor = criar_executor(atraso_padrao=0.1)
+
+        def chamar(modelo):
+            time.sleep(0.3)  # espera no limitador de taxa
+            marcar_inicio()
+            time.sleep(0.05)
+            return f"briefing de {modelo}"
+
+        resultado, modelo = executor.executar(["a", "b"], chamar, aguardar_inicio=True)
+
+        assert modelo == "a"
+        assert executor.estatisticas()["hedges"] == 0
+
+        sem_sinal = criar_executor(atraso_padrao=0.1)
+        sem_sinal.executar(["a", "b"], chamar)
+        assert sem_sinal.estatisticas()["hedges"] == 1
+
+    def test_garantir_concorrencia(self):
+        """Testa que o pool cresce para duas threads por requisição simultânea."""
+        executor = criar_executor(atraso_padrao=0.3, max_workers=2)
+        executor.garantir_concorrencia(8)
+        inicio = time.perf_counter()
+
+        chamadas = [threading.Thread(target=executor.executar,
+                                     args=(["a", "b"], chamada_com_latencias({"a": 0.2, "b": 0.2})))
+                    for _ in range(8)]
+        for thread in chamadas:
+            thread.start()
+        for thread in chamadas:
+            thread.join()
+
+        assert time.perf_counter() - inicio < 0.5
+        assert executor.estatisticas()["hedges"] == 0
+
+
+class TestOrcamentoHedge:
+    """Testes do orçamento de hedge."""
+
+    def test_fracao_limita_hedges(self):
+        """Testa que o orçamento acumula uma fração por requisição."""
+        orcamento = OrcamentoHedge(0.25, rajada=1.0)
+        assert orcamento.consumir()
+        assert not orcamento.consumir()
+
+        for _ in range(4):
+            orcamento.registrar_requisicao()
+        assert orcamento.consumir()
+
+
+if __name__ == "__main__":
+    pytest.main([__file__, "-v", "--tb=short"])
@@ -0,0 +1,151 @@
+"""
+Testes para a instrumentação do pipeline
+========================================
+
+Execute com: pytest tests/test_instrumentacao.py -v
+"""
+
+import json
+import threading
+import urllib.request
+import pytest
+import sys
+import os
+from unittest.mock import Mock, patch
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from instrumentacao import BALDES_TAMANHO, Metricas
+
+
+BRIEFING_JSON = json.dumps({
+    "topico_central": "Teste",
+    "artigos": [{"titulo": "T", "fonte": "F", "resumo_curto": "R"}],
+    "analise_sintetizada": "Análise",
+    "prompt_para_imagem": "Prompt"
+})
+
+
+class TestMetricas:
+    """Testes do registro de métricas."""
+
+    def test_contadores_por_rotulo(self):
+        """Testa que cada combinação de rótulos é uma série."""
+        metricas = Metricas()
+        metricas.incrementar("tentativas_total", modelo="a")
+        metricas.incrementar("tentativas_total", modelo="a")
+        metricas.incrementar("tentativas_total", modelo="b")
+
+        series = metricas.snapshot()["contadores"]["tentativas_total"]
+        assert {s["rotulos"]["modelo"]: s["valor"] for s in series} == {"a": 2, "b": 1}
+
+    def test_histograma_e_span(self):
+        """Testa que o span registra a duração no histograma."""
+        metricas = Metricas()
+        with metricas.medir("etapa_segundos", etapa="validacao"):
+            pass
+        metricas.observar("resposta_bytes", 3000, baldes=BALDES_TAMANHO)
+
+        histogramas = metricas.snapshot()["histogramas"]
+        assert histogramas["etapa_segundos"][0]["contagem"] == 1
+        assert histogramas["resposta_bytes"][0]["baldes"]["4096"] == 1
+        assert histogramas["resposta_bytes"][0]["baldes"]["1024"] == 0
+
+    def test_span_registra_mesmo_com_erro(self):
+        """Testa que a duração é registrada quando o bloco falha."""
+        metricas = Metricas()
+        with pytest.raises(ValueError):
+            with metricas.medir("etapa_segundos"):
+                raise ValueError()
+
+        assert metricas.snapshot()["histogramas"]["etapa_segundos"][0]["contagem"] == 1
+
+    def test_formato_prometheus(self):
+        """Testa a exportação em texto Prometheus."""
+        metricas = Metricas()
+        metricas.incrementar("fallbacks_total")
+        metricas.observar("etapa_segundos", 0.3, etapa="chamada_modelo")
+
+        texto = metricas.formato_prometheus()
+
+        assert "# TYPE fallbacks_total counter\nfallbacks_total 1\n" in texto
+        assert "# TYPE etapa_segundos histogram" in texto
+        assert 'etapa_segundos_bucket{etapa="chamada_modelo",le="0.25"} 0' in texto
+        assert 'etapa_segundos_bucket{etapa="chamada_modelo",le="0.5"} 1' in texto
+        assert 'etapa_segundos_bucket{etapa="chamada_modelo",le="+Inf"} 1' in texto
+        assert 'etapa_segundos_count{etapa="chamada_modelo"} 1' in texto
+
+    def test_desabilitado_nao_registra(self):
+        """Testa que métricas desabilitadas ignoram tudo."""
+        metricas = Metricas(habilitado=False)
+        metricas.incrementar("x")
+        with metricas.medir("y"):
+            pass
+
+        assert metricas.snapshot() == {"contadores": {}, "histogramas": {}}
+        assert metricas.formato_prometheus() == ""
+
+
+class TestInstrumentacaoDoPipeline:
+    """Testes das métricas emitidas pela v2."""
+
+    def test_etapas_e_fallback(self):
+        """Testa spans por etapa, tentativas e fallback."""
+        import criar_briefing_noticias_v2 as v2
+
+        metricas = Metricas()
+        modelo_ruim = Mock()
+        modelo_ruim.generate_content.side_effect = Exception("indisponível")
+        modelo_bom = Mock()
+        modelo_bom.generate_content.return_value = Mock(text=f"```json\n{BRIEFING_JSON}\n```", parsed=None)
+        fabrica = lambda nome: modelo_ruim if nome == v2.MODELOS_DISPONIVEIS[0] else modelo_bom
+
+        with patch.object(v2, 'obter_metricas', return_value=metricas), \
+                patch.object(v2, 'obter_roteador') as mock_roteador, \
+                patch.object(v2, 'obter_cache_padrao', return_value=None), \
+                patch.object(v2, 'obter_executor_hedge', return_value=None), \
+                patch.object(v2.client, '_fabrica_modelo', fabrica), \
+                patch.dict(os.environ, {'GEMINI_MODO_JSON': '0'}):
+            # Caminho de texto: inclui a etapa de extração do JSON
+            mock_roteador.return_value.ordenar.return_value = list(v2.MODELOS_DISPONIVEIS)
+            briefing = v2.criar_briefing_avancado("teste")
+
+        assert briefing is not None
+        snapshot = metricas.snapshot()
+        etapas = {s["rotulos"]["etapa"] for s in snapshot["histogramas"]["briefing_etapa_segundos"]}
+        assert {"chamada_modelo", "extracao_json", "validacao", "geracao"} <= etapas
+        assert snapshot["contadores"]["briefing_fallbacks_total"][0]["valor"] == 1
+        assert len(snapshot["contadores"]["briefing_tentativas_modelo_total"]) == 2
+        assert snapshot["contadores"]["briefings_total"][0]["rotulos"] == {"resultado": "sucesso"}
+
+
+class TestEndpointMetricas:
+    """Testes do endpoint /metricas do serviço."""
+
+    def test_prometheus_e_json(self):
+        """Testa os dois formatos de exportação."""
+        from servico_briefing import criar_servidor
+
+        metricas = Metricas()
+        metricas.incrementar("briefings_total", resultado="sucesso")
+        servidor = criar_servidor("127.0.0.1", 0, gerador=lambda topico: None)
+        threading.Thread(target=servidor.serve_forever, daemon=True).start()
+        url = f"http://127.0.0.1:{servidor.server_address[1]}/metricas"
+        try:
+            with patch('instrumentacao.obter_metricas', return_value=metricas):
+                with urllib.request.urlopen(url) as resposta:
+                    texto = resposta.read().decode()
+                    tipo = resposta.headers["Content-Type"]
+                with urllib.request.urlopen(url + "?formato=json") as resposta:
+                    snapshot = json.loads(resposta.read())
+        finally:
+            servidor.shutdown()
+            servidor.server_close()
+
+        assert tipo.startswith("text/plain")
+        assert 'briefings_total{resultado="sucesso"} 1' in texto
+        assert snapshot["contadores"]["briefings_total"][0]["valor"] == 1
+
+
+if __name__ == "__main__":
+    pytest.main([__file__, "-v", "--tb=short"])
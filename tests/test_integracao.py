@@ -62,9 +62,9 @@ class TestIntegracaoCompleta:
         assert len(resultado.prompt_para_imagem) > 0
     
     @patch('criar_briefing_noticias_v2.client')
-    @patch('criar_briefing_noticias_v2.pathlib.Path')
+    @patch('criar_briefing_noticias_v2.gravar_atomico')
     @patch.dict(os.environ, {'GOOGLE_API_KEY': 'test-key'})
-    def test_pipeline_com_geracao_imagem(self, mock_path, mock_client):
+    def test_pipeline_com_geracao_imagem(self, mock_gravar, mock_client):
         """Testa pipeline incluindo geração de imagem."""
         from criar_briefing_noticias_v2 import criar_briefing_avancado, gerar_imagem_do_briefing
         from criar_briefing_noticias_v2 import BriefingDeNoticias, ArtigoEncontrado
@@ -0,0 +1,166 @@
+"""
+Testes para o limitador de taxa
+===============================
+
+Execute com: pytest tests/test_limitador_taxa.py -v
+"""
+
+import asyncio
+import time
+import pytest
+import sys
+import os
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from limitador_taxa import (
+    LimitadorDeTaxa, LimitadorDeTaxaCompartilhado, LimiteModelo, _LimitadorBase,
+    erro_de_cota, estimar_tokens, extrair_retry_after
+)
+
+
+class RelogioFalso:
+    """Relógio controlado manualmente."""
+
+    def __init__(self):
+        self.agora = 0.0
+
+    def __call__(self):
+        return self.agora
+
+
+class ResourceExhausted(Exception):
+    """Imita a exceção 429 do SDK."""
+
+
+class ErroHttp(Exception):
+    """Erro com código de status, como os de urllib, httpx e google-genai."""
+
+    def __init__(self, **atributos):
+        super().__init__("erro da API")
+        self.__dict__.update(atributos)
+
+
+class TestLimitadorDeTaxa:
+    """Testes do limitador em memória."""
+
+    def test_rpm_limita_requisicoes(self):
+        """Testa que o balde de requisições esvazia e reabastece."""
+        relogio = RelogioFalso()
+        limitador = LimitadorDeTaxa(padrao=LimiteModelo(rpm=2, tpm=10_000), relogio=relogio)
+
+        assert limitador.tentar_adquirir("m") == 0
+        assert limitador.tentar_adquirir("m") == 0
+        assert limitador.tentar_adquirir("m") == pytest.approx(30.0)
+
+        relogio.agora = 30.0
+        assert limitador.tentar_adquirir("m") == 0
+
+    def test_tpm_limita_tokens(self):
+        """Testa que o balde de tokens limita chamadas grandes."""
+        relogio = RelogioFalso()
+        limitador = LimitadorDeTaxa(padrao=LimiteModelo(rpm=100, tpm=1000), relogio=relogio)
+
+        assert limitador.tentar_adquirir("m", 800) == 0
+        assert limitador.tentar_adquirir("m", 800) == pytest.approx(36.0)
+
+    def test_limites_por_modelo(self):
+        """Testa que cada modelo tem seus próprios baldes."""
+        relogio = RelogioFalso()
+        limitador = LimitadorDeTaxa({"lento": LimiteModelo(rpm=1)}, relogio=relogio)
+
+        assert limitador.tentar_adquirir("lento") == 0
+        assert limitador.tentar_adquirir("lento") > 0
+        assert limitador.tentar_adquirir("outro") == 0
+
+    def test_penalizar_bloqueia_modelo(self):
+        """Testa que um 429 bloqueia o modelo pelo retry-after."""
+        relogio = RelogioFalso()
+        limitador = LimitadorDeTaxa(relogio=relogio)
+        limitador.penalizar("m", 5.0)
+
+        assert limitador.tentar_adquirir("m") == pytest.approx(5.0)
+        relogio.agora = 5.0
+        assert limitador.tentar_adquirir("m") == 0
+        assert limitador.estatisticas()["penalidades"] == 1
+
+    def test_adquirir_espera_em_vez_de_falhar(self):
+        """Testa que adquirir bloqueia até haver cota."""
+        limitador = LimitadorDeTaxa(padrao=LimiteModelo(rpm=600))  # 1 requisição a cada 0.1s
+        for _ in range(600):
+            limitador.tentar_adquirir("m")
+
+        inicio = time.monotonic()
+        limitador.adquirir("m")
+        assert 0.05 < time.monotonic() - inicio < 1.0
+
+    def test_adquirir_timeout(self):
+        """Testa que o timeout é respeitado."""
+        limitador = LimitadorDeTaxa()
+        limitador.penalizar("m", 60)
+
+        with pytest.raises(TimeoutError):
+            limitador.adquirir("m", timeout=0.1)
+
+    def test_adquirir_async(self):
+        """Testa a espera assíncrona."""
+        limitador = LimitadorDeTaxa()
+        limitador.penalizar("m", 0.1)
+
+        esperado = asyncio.run(limitador.adquirir_async("m"))
+        assert esperado >= 0.05
+
+
+class TestLimitadorDeTaxaCompartilhado:
+    """Testes da variante em arquivo."""
+
+    def test_estado_compartilhado_entre_instancias(self, tmp_path):
+        """Testa que duas instâncias (processos) dividem a mesma cota."""
+        caminho = str(tmp_path / "limitador.json")
+        padrao = LimiteModelo(rpm=2, tpm=10_000)
+        primeiro = LimitadorDeTaxaCompartilhado(caminho, padrao=padrao)
+        segundo = LimitadorDeTaxaCompartilhado(caminho, padrao=padrao)
+
+        assert primeiro.tentar_adquirir("m") == 0
+        assert segundo.tentar_adquirir("m") == 0
+        assert primeiro.tentar_adquirir("m") > 0
+
+    def test_penalidade_compartilhada(self, tmp_path):
+        """Testa que um 429 em um processo pausa os demais."""
+        caminho = str(tmp_path / "limitador.json")
+        LimitadorDeTaxaCompartilhado(caminho).penalizar("m", 30)
+
+        assert LimitadorDeTaxaCompartilhado(caminho).tentar_adquirir("m") > 25
+
+
+class TestErrosDeCota:
+    """Testes de classificação de erros 429."""
+
+    def test_erro_de_cota(self):
+        """Testa a detecção de cota excedida."""
+        assert erro_de_cota(ResourceExhausted("quota"))
+        assert erro_de_cota(ErroHttp(code=429))
+        assert erro_de_cota(ErroHttp(status_code=429))
+        assert erro_de_cota(ErroHttp(status="RESOURCE_EXHAUSTED"))
+        assert not erro_de_cota(ErroHttp(code=503))
+        assert not erro_de_cota(ValueError("JSON inválido"))
+        assert not erro_de_cota(ValueError("artigo 429 do código civil"))
+
+    def test_base_abstrata(self):
+        """Testa que a base do limitador não pode ser instanciada sem as operações."""
+        with pytest.raises(TypeError):
+            _LimitadorBase()
+
+    def test_extrair_retry_after(self):
+        """Testa a leitura do tempo sugerido."""
+        assert extrair_retry_after(Exception("Please retry in 7.5s.")) == 7.5
+        assert extrair_retry_after(Exception("retry_delay {\n  seconds: 12\n}")) == 12.0
+        assert extrair_retry_after(Exception("sem dica")) is None
+
+    def test_estimar_tokens(self):
+        """Testa a estimativa de tokens."""
+        assert estimar_tokens("x" * 400, tokens_saida=100) == 200
+
+
+if __name__ == "__main__":
+    pytest.main([__file__, "-v", "--tb=short"])
@@ -0,0 +1,164 @@
+"""
+Testes para o modo JSON nativo (saída estruturada)
+==================================================
+
+Execute com: pytest tests/test_modo_json.py -v
+"""
+
+import json
+import pytest
+import sys
+import os
+from unittest.mock import Mock, patch
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+import criar_briefing_noticias_v2 as v2
+from criar_briefing_noticias_v2 import BriefingDeNoticias
+
+
+BRIEFING = {
+    "topico_central": "Teste",
+    "artigos": [{"titulo": "T", "fonte": "F", "resumo_curto": "R"}],
+    "analise_sintetizada": "Análise",
+    "prompt_para_imagem": "Prompt"
+}
+
+
+class InvalidArgument(Exception):
+    """Mesmo nome da exceção 400 do google.api_core."""
+
+
+@pytest.fixture(autouse=True)
+def isolar_modelos_sem_modo_json():
+    """Cada teste começa com todos os modelos aceitando o modo JSON."""
+    v2._modelos_sem_modo_json.clear()
+    yield
+    v2._modelos_sem_modo_json.clear()
+
+
+def gerar(fabrica, topico="teste"):
+    """Gera um briefing sem cache, hedge ou roteador reais."""
+    with patch.object(v2, 'obter_roteador') as mock_roteador, \
+            patch.object(v2, 'obter_cache_padrao', return_value=None), \
+            patch.object(v2, 'obter_executor_hedge', return_value=None), \
+            patch.object(v2.client, '_fabrica_modelo', fabrica):
+        mock_roteador.return_value.ordenar.return_value = list(v2.MODELOS_DISPONIVEIS)
+        return v2.criar_briefing_avancado(topico)
+
+
+class TestChamadaNoModoJson:
+    """Testes da configuração enviada ao modelo."""
+
+    def test_config_com_esquema(self):
+        """Testa que a chamada pede JSON validado pelo esquema do briefing."""
+        modelo = Mock()
+        modelo.generate_content.return_value = Mock(text=json.dumps(BRIEFING), parsed=None)
+
+        briefing = gerar(lambda nome: modelo)
+
+        assert briefing.topico_central == "Teste"
+        config = modelo.generate_content.call_args.kwargs['generation_config']
+        assert config['response_mime_type'] == 'application/json'
+        assert config['response_schema'] is BriefingDeNoticias
+
+    def test_prompt_sem_esqueleto(self):
+        """Testa que o prompt do modo JSON é menor e não repete a estrutura."""
+        modelo = Mock()
+        modelo.generate_content.return_value = Mock(text=json.dumps(BRIEFING), parsed=None)
+
+        gerar(lambda nome: modelo, "carros elétricos")
+
+        prompt = modelo.generate_content.call_args.kwargs['contents']
+        assert "carros elétricos" in prompt
+        assert '"topico_central"' not in prompt
+        texto = v2.TEMPLATE_BRIEFING.renderizar(topico="x")
+        assert len(v2.TEMPLATE_BRIEFING_JSON.renderizar(topico="x")) < len(texto)
+
+    def test_desligado_por_variavel(self):
+        """Testa que GEMINI_MODO_JSON=0 volta ao prompt de texto."""
+        modelo = Mock()
+        modelo.generate_content.return_value = Mock(text=f"```json\n{json.dumps(BRIEFING)}\n```", parsed=None)
+
+        with patch.dict(os.environ, {'GEMINI_MODO_JSON': '0'}):
+            briefing = gerar(lambda nome: modelo)
+
+        assert briefing is not None
+        config = modelo.generate_content.call_args.kwargs['generation_config']
+        assert 'response_schema' not in config
+
+
+class TestFallbackParaTexto:
+    """Testes do fallback quando o modelo recusa o modo JSON."""
+
+    def test_recusa_usa_prompt_de_texto(self):
+        """Testa que a recusa cai para o prompt de texto e é lembrada."""
+        def responder(contents, generation_config=None, stream=False):
+            if 'response_schema' in generation_config:
+                raise InvalidArgument("response_schema não suportado")
+            return Mock(text=f"Aqui está:\n```json\n{json.dumps(BRIEFING)}\n```", parsed=None)
+
+        modelo = Mock()
+        modelo.generate_content.side_effect = responder
+
+        assert gerar(lambda nome: modelo) is not None
+        assert modelo.generate_content.call_count == 2
+        assert v2.MODELOS_DISPONIVEIS[0] in v2._modelos_sem_modo_json
+
+        # O modelo já conhecido vai direto para o texto
+        assert gerar(lambda nome: modelo) is not None
+        assert modelo.generate_content.call_count == 3
+
+    def test_outros_erros_nao_desligam_modo_json(self):
+        """Testa que erros transitórios seguem para o próximo modelo sem desligar o modo JSON."""
+        modelo_ruim = Mock()
+        modelo_ruim.generate_content.side_effect = Exception("indisponível")
+        modelo_bom = Mock()
+        modelo_bom.generate_content.return_value = Mock(text=json.dumps(BRIEFING), parsed=None)
+        fabrica = lambda nome: modelo_ruim if nome == v2.MODELOS_DISPONIVEIS[0] else modelo_bom
+
+        assert gerar(fabrica) is not None
+        assert not v2._modelos_sem_modo_json
+        assert modelo_ruim.generate_content.call_count == 1
+
+
+class TestBriefingDaResposta:
+    """Testes da leitura da resposta estruturada."""
+
+    def test_usa_parsed(self):
+        """Testa que um objeto já validado pelo SDK é usado sem ler o texto."""
+        briefing = BriefingDeNoticias(**BRIEFING)
+        resposta = Mock(parsed=briefing)
+
+        assert v2._briefing_da_resposta(resposta, "modelo") is briefing
+
+    def test_json_puro(self):
+        """Testa a validação direta do JSON."""
+        resposta = Mock(text=json.dumps(BRIEFING), parsed=None)
+
+        assert v2._briefing_da_resposta(resposta, "modelo").artigos[0].titulo == "T"
+
+    def test_texto_livre_ainda_funciona(self):
+        """Testa que texto com markdown passa pela extração."""
+        resposta = Mock(text=f"Segue:\n```json\n{json.dumps(BRIEFING)}\n```", parsed=None)
+
+        assert v2._briefing_da_resposta(resposta, "modelo").topico_central == "Teste"
+
+    def test_resposta_vazia(self):
+        """Testa que resposta vazia é erro de validação."""
+        with pytest.raises(ValueError):
+            v2._briefing_da_resposta(Mock(text="", parsed=None), "modelo")
+
+
+class TestErroModoJson:
+    """Testes da detecção de recusa do modo JSON."""
+
+    def test_deteccao(self):
+        """Testa os erros reconhecidos como recusa."""
+        assert v2._erro_modo_json(InvalidArgument("400"))
+        assert v2._erro_modo_json(Exception("Unknown field response_mime_type"))
+        assert not v2._erro_modo_json(Exception("503 indisponível"))
+
+
+if __name__ == "__main__":
+    pytest.main([__file__, "-v", "--tb=short"])
@@ -0,0 +1,95 @@
+"""
+Testes para o parser JSON incremental
+=====================================
+
+Execute com: pytest tests/test_parser_json_incremental.py -v
+"""
+
+import json
+import pytest
+import sys
+import os
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from parser_json_incremental import ParserIncrementalDeBriefing, EVENTO_ARTIGO
+
+BRIEFING = {
+    "topico_central": "Carros \"Elétricos\"",
+    "artigos": [
+        {"titulo": "Vendas {recorde}", "fonte": "Reuters", "resumo_curto": "Alta de 30%."},
+        {"titulo": "Baterias", "fonte": "G1", "resumo_curto": "Novas químicas \\ avanços."},
+    ],
+    "analise_sintetizada": "Primeiro parágrafo.\n\nSegundo parágrafo.",
+    "prompt_para_imagem": "An electric car, cinematic",
+}
+
+
+def alimentar_em_trechos(parser, texto, tamanho):
+    """Alimenta o parser em trechos de tamanho fixo, coletando eventos."""
+    eventos = []
+    for i in range(0, len(texto), tamanho):
+        eventos.extend(parser.alimentar(texto[i:i + tamanho]))
+    return eventos
+
+
+class TestParserIncrementalDeBriefing:
+    """Testes da máquina de estados."""
+
+    @pytest.mark.parametrize("tamanho", [1, 7, 10_000])
+    def test_eventos_em_ordem(self, tamanho):
+        """Testa que os eventos seguem a ordem do JSON para qualquer fatiamento."""
+        parser = ParserIncrementalDeBriefing()
+        eventos = alimentar_em_trechos(parser, json.dumps(BRIEFING, ensure_ascii=False, indent=2), tamanho)
+
+        assert [e.tipo for e in eventos] == [
+            "topico_central", EVENTO_ARTIGO, EVENTO_ARTIGO, "analise_sintetizada", "prompt_para_imagem"
+        ]
+        assert eventos[0].valor == BRIEFING["topico_central"]
+        assert eventos[1].valor == BRIEFING["artigos"][0]
+        assert parser.finalizar() == BRIEFING
+
+    def test_artigo_emitido_antes_do_fim_da_lista(self):
+        """Testa que um artigo é emitido assim que seu objeto fecha."""
+        texto = json.dumps(BRIEFING)
+        fim_primeiro = texto.index("30%.\"}") + len("30%.\"}")
+        parser = ParserIncrementalDeBriefing()
+
+        eventos = parser.alimentar(texto[:fim_primeiro])
+        assert [e.tipo for e in eventos] == ["topico_central", EVENTO_ARTIGO]
+        assert not parser.concluido
+
+    def test_ignora_cercas_de_codigo(self):
+        """Testa que texto antes e depois do objeto é ignorado."""
+        texto = "```json\n" + json.dumps(BRIEFING) + "\n```\nPronto!"
+        parser = ParserIncrementalDeBriefing()
+        parser.alimentar(texto)
+
+        assert parser.concluido
+        assert parser.finalizar()["prompt_para_imagem"] == BRIEFING["prompt_para_imagem"]
+
+    def test_fabrica_de_artigo(self):
+        """Testa que a fábrica converte cada artigo."""
+        parser = ParserIncrementalDeBriefing(fabrica_artigo=lambda d: d["fonte"])
+        eventos = parser.alimentar(json.dumps(BRIEFING))
+
+        assert [e.valor for e in eventos if e.tipo == EVENTO_ARTIGO] == ["Reuters", "G1"]
+
+    def test_valores_escalares(self):
+        """Testa campos numéricos e booleanos no nível superior."""
+        parser = ParserIncrementalDeBriefing()
+        eventos = parser.alimentar('{"versao": 3, "ok": true , "artigos": []}')
+
+        assert [(e.tipo, e.valor) for e in eventos] == [("versao", 3), ("ok", True)]
+
+    def test_json_incompleto(self):
+        """Testa que finalizar falha com a resposta truncada."""
+        parser = ParserIncrementalDeBriefing()
+        parser.alimentar(json.dumps(BRIEFING)[:80])
+
+        with pytest.raises(ValueError, match="incompleta"):
+            parser.finalizar()
+
+
+if __name__ == "__main__":
+    pytest.main([__file__, "-v", "--tb=short"])
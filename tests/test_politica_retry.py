@@ -0,0 +1,171 @@
+"""
+Testes para a política de retry
+===============================
+
+Execute com: pytest tests/test_politica_retry.py -v
+"""
+
+import asyncio
+import json
+import pytest
+import sys
+import os
+from unittest.mock import Mock, patch
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from politica_retry import PoliticaDeRetry, erro_retentavel
+
+
+class ServiceUnavailable(Exception):
+    """Imita a exceção 503 do SDK."""
+
+
+class ResourceExhausted(Exception):
+    """Imita a exceção 429 do SDK."""
+
+
+def politica_sem_espera(**kwargs):
+    """Cria uma política cujas esperas são sempre zero."""
+    politica = PoliticaDeRetry(**kwargs)
+    politica.aleatorio = Mock(uniform=Mock(return_value=0.0))
+    return politica
+
+
+class TestClassificacao:
+    """Testes de classificação de erros."""
+
+    def test_erros_transitorios_sao_retentaveis(self):
+        """Testa que indisponibilidade, cota e E/S são repetidos."""
+        assert erro_retentavel(ServiceUnavailable("503"))
+        assert erro_retentavel(ResourceExhausted("quota"))
+        assert erro_retentavel(ConnectionError())
+        assert erro_retentavel(OSError("disco cheio"))
+
+    def test_erros_de_validacao_nao_sao_retentaveis(self):
+        """Testa que erros determinísticos não são repetidos."""
+        from pydantic import BaseModel, ValidationError
+
+        class Modelo(BaseModel):
+            campo: int
+
+        with pytest.raises(ValidationError) as info:
+            Modelo(campo="x")
+
+        assert not erro_retentavel(info.value)
+        assert not erro_retentavel(json.JSONDecodeError("erro", "{", 0))
+        assert not erro_retentavel(ValueError("tópico vazio"))
+        assert not erro_retentavel(KeyError("artigos"))
+        assert not erro_retentavel(FileNotFoundError("saida/briefing.png"))
+        assert not erro_retentavel(PermissionError("saida"))
+
+
+class TestPoliticaDeRetry:
+    """Testes da execução com retry."""
+
+    def test_repete_ate_sucesso(self):
+        """Testa que erros transitórios são repetidos até funcionar."""
+        funcao = Mock(side_effect=[ServiceUnavailable(), ServiceUnavailable(), "ok"])
+        funcao.__name__ = "geracao"
+
+        assert politica_sem_espera(max_tentativas=3).executar(funcao, 1, x=2) == "ok"
+        assert funcao.call_count == 3
+        funcao.assert_called_with(1, x=2)
+
+    def test_erro_nao_retentavel_propaga_imediatamente(self):
+        """Testa que erros de validação não são repetidos."""
+        funcao = Mock(side_effect=ValueError("JSON inválido"))
+
+        with pytest.raises(ValueError):
+            politica_sem_espera(max_tentativas=5).executar(funcao)
+        assert funcao.call_count == 1
+
+    def test_tentativas_esgotadas_propagam_ultimo_erro(self):
+        """Testa que o último erro é relançado."""
+        funcao = Mock(side_effect=ServiceUnavailable("fora"))
+
+        with pytest.raises(ServiceUnavailable):
+            politica_sem_espera(max_tentativas=2).executar(funcao)
+        assert funcao.call_count == 2
+
+    def test_full_jitter_respeita_teto(self):
+        """Testa que a espera fica entre zero e o teto exponencial."""
+        politica = PoliticaDeRetry(espera_base=1.0, espera_maxima=5.0)
+
+        for tentativa, teto in [(1, 1.0), (2, 2.0), (3, 4.0), (6, 5.0)]:
+            esperas = [politica.calcular_espera(tentativa) for _ in range(200)]
+            assert all(0 <= espera <= teto for espera in esperas)
+            assert max(esperas) > teto / 2
+
+    def test_prazo_total(self):
+        """Testa que o prazo interrompe as tentativas."""
+        politica = PoliticaDeRetry(max_tentativas=10, espera_base=10.0, prazo_total=1.0)
+        politica.aleatorio = Mock(uniform=Mock(return_value=5.0))
+        funcao = Mock(side_effect=ServiceUnavailable())
+
+        with patch('politica_retry.time.sleep') as mock_sleep:
+            with pytest.raises(TimeoutError):
+                politica.executar(funcao)
+        mock_sleep.assert_not_called()
+
+    def test_executar_async(self):
+        """Testa a variante assíncrona com corrotinas."""
+        chamadas = []
+
+        async def etapa():
+            chamadas.append(1)
+            if len(chamadas) < 2:
+                raise ServiceUnavailable()
+            return "ok"
+
+        resultado = asyncio.run(politica_sem_espera().executar_async(etapa))
+
+        assert resultado == "ok"
+        assert len(chamadas) == 2
+
+
+class TestPipelineRobusto:
+    """Testes do retry por etapa em exemplos_uso."""
+
+    @patch('exemplos_uso.obter_fila_imagens')
+    @patch('exemplos_uso.salvar_briefing_em_arquivo')
+    @patch('criar_briefing_noticias_v2.interpretar_resposta')
+    @patch('criar_briefing_noticias_v2.gerar_resposta_bruta')
+    def test_falha_ao_salvar_nao_refaz_geracao(self, mock_gerar, mock_interpretar, mock_salvar, mock_fila):
+        """Testa que uma falha de disco repete só a persistência."""
+        import exemplos_uso
+
+        mock_gerar.return_value = ("{}", "modelo")
+        mock_gerar.__name__ = "gerar_resposta_bruta"
+        mock_salvar.side_effect = [OSError("disco"), None, None]
+        mock_salvar.__name__ = "salvar_briefing_em_arquivo"
+
+        with patch('politica_retry.time.sleep'):
+            briefing = exemplos_uso.pipeline_robusto("teste")
+
+        assert briefing is mock_interpretar.return_value
+        assert mock_gerar.call_count == 1
+        assert mock_salvar.call_count == 3
+        mock_fila.return_value.enfileirar.assert_called_once_with(briefing)
+
+    @patch('exemplos_uso.obter_fila_imagens')
+    @patch('exemplos_uso.salvar_briefing_em_arquivo')
+    @patch('criar_briefing_noticias_v2.interpretar_resposta')
+    @patch('criar_briefing_noticias_v2.gerar_resposta_bruta')
+    def test_json_invalido_refaz_apenas_geracao(self, mock_gerar, mock_interpretar, mock_salvar, mock_fila):
+        """Testa que uma resposta inválida gera de novo sem repetir a interpretação no mesmo texto."""
+        import exemplos_uso
+
+        mock_gerar.side_effect = [("lixo", "m"), ("{}", "m")]
+        mock_gerar.__name__ = "gerar_resposta_bruta"
+        briefing = Mock(artigos=[], analise_sintetizada="")
+        mock_interpretar.side_effect = [ValueError("inválido"), briefing]
+        mock_salvar.__name__ = "salvar_briefing_em_arquivo"
+
+        assert exemplos_uso.pipeline_robusto("teste") is briefing
+        assert mock_gerar.call_count == 2
+        assert mock_interpretar.call_count == 2
+
+
+if __name__ == "__main__":
+    pytest.main([__file__, "-v", "--tb=short"])
@@ -0,0 +1,224 @@
+"""
+Testes para o estágio de pós-processamento
+==========================================
+
+Execute com: pytest tests/test_pos_processamento.py -v
+"""
+
+import asyncio
+import json
+import queue
+import threading
+import time
+import pytest
+import sys
+import os
+from unittest.mock import Mock
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from pos_processamento import (
+    EstagioPosProcessamento,
+    gravar_sem_sobrescrever,
+    processar_briefing,
+    renderizar_html,
+    renderizar_markdown,
+)
+from criar_briefing_noticias_v2 import BriefingDeNoticias
+
+
+BRIEFING = BriefingDeNoticias(
+    topico_central="IA <na> saúde",
+    artigos=[{"titulo": "Título", "fonte": "Fonte", "resumo_curto": "Resumo"}],
+    analise_sintetizada="Primeiro parágrafo.\nSegundo parágrafo.",
+    prompt_para_imagem="Prompt"
+)
+
+
+class TestRenderizacao:
+    """Testes dos formatos gerados."""
+
+    def test_markdown(self):
+        """Testa o título e a lista de fontes em Markdown."""
+        texto = renderizar_markdown(BRIEFING)
+
+        assert texto.startswith("# IA <na> saúde\n")
+        assert "- **Título** (Fonte): Resumo" in texto
+
+    def test_html_escapado(self):
+        """Testa que o HTML escapa o texto do modelo e separa os parágrafos."""
+        texto = renderizar_html(BRIEFING)
+
+        assert "<h1>IA &lt;na&gt; saúde</h1>" in texto
+        assert "<p>Primeiro parágrafo.</p><p>Segundo parágrafo.</p>" in texto
+
+    def test_processar_aceita_dict_e_json(self):
+        """Testa a validação das formas que chegam ao processo."""
+        for dados in (BRIEFING.model_dump(), BRIEFING.model_dump_json(), BRIEFING):
+            resultado = processar_briefing(dados, formatos=("json",))
+            assert resultado.sucesso
+            assert json.loads(resultado.conteudos["json"])["topico_central"] == "IA <na> saúde"
+
+    def test_processar_invalido(self):
+        """Testa que um briefing inválido vira erro no resultado."""
+        resultado = processar_briefing({"topico_central": "X"})
+
+        assert not resultado.sucesso
+        assert "ValidationError" in resultado.erro
+
+    def test_gravar_sem_sobrescrever(self, tmp_path):
+        """Testa os sufixos para nomes já usados."""
+        base = str(tmp_path / "briefing")
+
+        assert gravar_sem_sobrescrever(base, ".md", "a").endswith("briefing.md")
+        assert gravar_sem_sobrescrever(base, ".md", "b").endswith("briefing_2.md")
+        assert (tmp_path / "briefing.md").read_text(encoding="utf-8") == "a"
+
+
+class TestEstagioPosProcessamento:
+    """Testes do estágio com pool de processos."""
+
+    def test_pool_de_processos_grava_arquivos(self, tmp_path):
+        """Testa a renderização em outros processos e a coleta dos resultados."""
+        with EstagioPosProcessamento(formatos=("txt", "md", "html", "json"), diretorio=str(tmp_path),
+                                     workers=2) as estagio:
+            for _ in range(4):
+                assert estagio.enviar(BRIEFING)
+            resultados = list(estagio.resultados())
+
+        assert len(resultados) == 4
+        assert all(r.sucesso for r in resultados)
+        assert len(os.listdir(tmp_path)) == 16
+        assert estagio.estatisticas()["pendentes"] == 0
+
+    def test_limite_de_pendentes(self):
+        """Testa que enviar espera quando o estágio está cheio e libera ao coletar."""
+        estagio = EstagioPosProcessamento(workers=0, max_pendentes=2)
+
+        assert estagio.enviar(BRIEFING)
+        assert estagio.enviar(BRIEFING)
+        assert not estagio.enviar(BRIEFING, timeout=0.05)
+
+        assert estagio.obter().sucesso
+        assert estagio.enviar(BRIEFING, timeout=0.05)
+        assert len(list(estagio.resultados())) == 2
+        with pytest.raises(queue.Empty):
+            estagio.obter(timeout=0.01)
+        estagio.fechar()
+
+    def test_callback_libera_vagas(self):
+        """Testa que com ao_concluir os resultados não ocupam a fila."""
+        recebidos = []
+        estagio = EstagioPosProcessamento(workers=0, max_pendentes=1, ao_concluir=recebidos.append)
+
+        for _ in range(3):
+            assert estagio.enviar(BRIEFING, timeout=0.05)
+
+        assert len(recebidos) == 3
+        with pytest.raises(ValueError):
+            list(estagio.resultados())
+        estagio.fechar()
+
+    def test_enviar_async_nao_bloqueia_o_loop(self):
+        """Testa que a espera por vaga suspende só a corrotina que enviou."""
+        estagio = EstagioPosProcessamento(workers=0, max_pendentes=1)
+        batidas = []
+
+        async def cenario():
+            await estagio.enviar_async(BRIEFING)
+            espera = asyncio.ensure_future(estagio.enviar_async(BRIEFING))
+            for _ in range(3):
+                await asyncio.sleep(0.01)
+                batidas.append(time.perf_counter())
+            assert not espera.done()
+            threading.Timer(0.02, estagio.obter).start()
+            await asyncio.wait_for(espera, timeout=2)
+
+        asyncio.run(cenario())
+
+        assert len(batidas) == 3
+        assert estagio.estatisticas()["enviados"] == 2
+        estagio.fechar()
+
+    def test_envio_cancelado_devolve_a_vaga(self):
+        """Testa que cancelar um envio em espera não consome vagas."""
+        estagio = EstagioPosProcessamento(workers=0, max_pendentes=1)
+
+        async def cenario():
+            await estagio.enviar_async(BRIEFING)
+            espera = asyncio.ensure_future(estagio.enviar_async(BRIEFING))
+            await asyncio.sleep(0.01)
+            espera.cancel()
+            await asyncio.sleep(0)
+            estagio.obter()
+
+        asyncio.run(cenario())
+        time.sleep(0.05)
+
+        assert estagio.enviar(BRIEFING, timeout=1)
+        assert estagio.estatisticas()["enviados"] == 2
+        estagio.fechar()
+
+    def test_formato_desconhecido(self):
+        """Testa a validação dos formatos."""
+        with pytest.raises(ValueError):
+            EstagioPosProcessamento(formatos=("pdf",), workers=0)
+
+    def test_fechado(self):
+        """Testa que não se envia a um estágio fechado."""
+        estagio = EstagioPosProcessamento(workers=0)
+        estagio.fechar()
+
+        with pytest.raises(ValueError):
+            estagio.enviar(BRIEFING)
+
+
+class TestPosProcessamentoNoLote:
+    """Testes da integração com o lote."""
+
+    def test_lote_entrega_briefings_ao_estagio(self):
+        """Testa que cada briefing gerado no lote chega ao estágio."""
+        from briefing_lote import executar_lote
+
+        recebidos = []
+        estagio = EstagioPosProcessamento(formatos=("md",), workers=0, ao_concluir=recebidos.append)
+
+        resultados = executar_lote(["a", "b", "c"], max_concorrencia=2,
+                                   gerador=lambda topico: BRIEFING if topico != "b" else None,
+                                   pos_processamento=estagio)
+        estagio.fechar()
+
+        assert sum(r.sucesso for r in resultados) == 2
+        assert len(recebidos) == 2
+
+    def test_lote_maior_que_o_estagio(self):
+        """Testa um lote com mais tópicos que vagas no estágio."""
+        from briefing_lote import executar_lote
+
+        recebidos = []
+        estagio = EstagioPosProcessamento(formatos=("md",), workers=0, max_pendentes=2,
+                                          ao_concluir=recebidos.append)
+
+        resultados = executar_lote([f"t{i}" for i in range(6)], max_concorrencia=3,
+                                   gerador=lambda topico: BRIEFING, pos_processamento=estagio)
+        estagio.fechar()
+
+        assert len(resultados) == 6
+        assert len(recebidos) == 6
+
+    def test_lote_exige_callback(self):
+        """Testa que um estágio sem ao_concluir é recusado em vez de travar o lote."""
+        from briefing_lote import executar_lote
+
+        estagio = EstagioPosProcessamento(workers=0, max_pendentes=2)
+        gerador = Mock(return_value=BRIEFING)
+
+        with pytest.raises(ValueError):
+            executar_lote(["a", "b", "c", "d"], gerador=gerador, pos_processamento=estagio)
+        estagio.fechar()
+
+        gerador.assert_not_called()
+
+
+if __name__ == "__main__":
+    pytest.main([__file__, "-v", "--tb=short"])
@@ -0,0 +1,195 @@
+"""
+Testes para o reparo de JSON malformado
+=======================================
+
+Execute com: pytest tests/test_reparo_json.py -v
+"""
+
+import json
+import pytest
+import sys
+import os
+from unittest.mock import Mock, patch
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from reparo_json import (
+    BriefingIncompleto,
+    carregar_json_tolerante,
+    mesclar_complemento,
+    recuperar_briefing,
+    reparar_json,
+)
+
+
+ARTIGO = {"titulo": "T", "fonte": "F", "resumo_curto": "R"}
+BRIEFING = {
+    "topico_central": "Teste",
+    "artigos": [ARTIGO, dict(ARTIGO, titulo="T2")],
+    "analise_sintetizada": "Análise",
+    "prompt_para_imagem": "Prompt"
+}
+
+
+class TestRepararJson:
+    """Testes dos defeitos corrigidos em uma passada."""
+
+    def test_json_valido_nao_e_alterado(self):
+        """Testa que JSON válido passa intacto (ignorando texto ao redor)."""
+        texto = json.dumps(BRIEFING)
+        resultado = reparar_json(f"```json\n{texto}\n```")
+
+        assert json.loads(resultado.texto) == BRIEFING
+        assert not resultado.truncado
+        assert not resultado.alterado
+
+    def test_virgula_sobrando(self):
+        """Testa a remoção de vírgulas antes de } e ]."""
+        assert carregar_json_tolerante('{"a": [1, 2, ], "b": {"c": 1,},}') == {"a": [1, 2], "b": {"c": 1}}
+
+    def test_aspas_tipograficas_como_delimitador(self):
+        """Testa que aspas tipográficas delimitando chaves e valores viram retas."""
+        assert carregar_json_tolerante('{“titulo”: “Alta do dólar”}') == {"titulo": "Alta do dólar"}
+
+    def test_aspas_tipograficas_dentro_de_string_sao_preservadas(self):
+        """Testa que citações dentro de valores não são alteradas."""
+        assert carregar_json_tolerante('{"resumo": "Ele disse “basta”", }') == {"resumo": "Ele disse “basta”"}
+
+    def test_quebra_de_linha_crua(self):
+        """Testa o escape de quebras de linha dentro de strings."""
+        assert carregar_json_tolerante('{"analise": "parágrafo 1\n\nparágrafo 2"}') == {
+            "analise": "parágrafo 1\n\nparágrafo 2"
+        }
+
+    def test_truncado_no_meio_de_uma_string(self):
+        """Testa que o valor cortado é descartado e os containers são fechados."""
+        texto = json.dumps(BRIEFING)
+        cortado = texto[:texto.index('"T2"') + 2]
+
+        resultado = reparar_json(cortado)
+        dados = json.loads(resultado.texto)
+
+        assert resultado.truncado
+        assert dados["topico_central"] == "Teste"
+        assert dados["artigos"][0] == ARTIGO
+
+    def test_truncado_depois_de_numero(self):
+        """Testa que números completos antes do corte são mantidos."""
+        assert carregar_json_tolerante('[{"indice": 1, "a": "b"}, {"indice": 2, "a": "c') == [
+            {"indice": 1, "a": "b"}, {"indice": 2}
+        ]
+
+    def test_sem_json(self):
+        """Testa que texto sem objeto JSON é erro."""
+        with pytest.raises(ValueError):
+            reparar_json("não foi possível gerar o briefing")
+
+
+class TestRecuperarBriefing:
+    """Testes do aproveitamento de briefings parciais."""
+
+    def validar(self, artigo):
+        if set(artigo) != set(ARTIGO):
+            raise ValueError("artigo incompleto")
+
+    def test_completo(self):
+        """Testa que um briefing reparado e completo não tem campos faltando."""
+        dados, faltando = recuperar_briefing(json.dumps(BRIEFING) + "\n```", self.validar)
+
+        assert dados == BRIEFING
+        assert faltando == []
+
+    def test_descarta_artigo_truncado(self):
+        """Testa que só os artigos completos são aproveitados."""
+        texto = json.dumps(BRIEFING)
+        cortado = texto[:texto.index('"fonte"', texto.index('"T2"'))]
+
+        dados, faltando = recuperar_briefing(cortado, self.validar)
+
+        assert dados["artigos"] == [ARTIGO]
+        assert faltando == ["analise_sintetizada", "prompt_para_imagem"]
+
+    def test_lista_nao_e_briefing(self):
+        """Testa que um array não é aceito como briefing."""
+        with pytest.raises(ValueError):
+            recuperar_briefing("[1, 2]")
+
+    def test_mesclar_complemento(self):
+        """Testa que só os campos faltantes vêm do complemento."""
+        dados = {"topico_central": "Original", "artigos": [ARTIGO]}
+        complemento = {"topico_central": "Outro", "analise_sintetizada": "A", "prompt_para_imagem": "P"}
+
+        mesclado = mesclar_complemento(dados, complemento, ["analise_sintetizada", "prompt_para_imagem"])
+
+        assert mesclado["topico_central"] == "Original"
+        assert mesclado["analise_sintetizada"] == "A"
+
+
+class TestReparoNoPipeline:
+    """Testes do reparo integrado à v2."""
+
+    def gerar(self, respostas, roteador=None):
+        import criar_briefing_noticias_v2 as v2
+
+        modelo = Mock()
+        modelo.generate_content.side_effect = [Mock(text=texto, parsed=None) for texto in respostas]
+        roteador = roteador or Mock()
+        roteador.ordenar.return_value = list(v2.MODELOS_DISPONIVEIS)
+        with patch.object(v2, 'obter_roteador', return_value=roteador), \
+                patch.object(v2, 'obter_cache_padrao', return_value=None), \
+                patch.object(v2, 'obter_executor_hedge', return_value=None), \
+                patch.object(v2.client, '_fabrica_modelo', lambda nome: modelo):
+            return v2.criar_briefing_avancado("teste"), modelo
+
+    def test_reparo_local_sem_nova_chamada(self):
+        """Testa que defeitos simples são corrigidos sem chamar o modelo de novo."""
+        texto = json.dumps(BRIEFING, ensure_ascii=False).replace('"Prompt"', '“Prompt”,')
+
+        briefing, modelo = self.gerar([texto])
+
+        assert briefing.prompt_para_imagem == "Prompt"
+        assert modelo.generate_content.call_count == 1
+
+    def test_complemento_dos_campos_faltantes(self):
+        """Testa que uma resposta truncada pede só os campos que faltaram."""
+        texto = json.dumps(BRIEFING)
+        cortado = texto[:texto.index('"analise_sintetizada"') + 30]
+        complemento = json.dumps({"analise_sintetizada": "Completa", "prompt_para_imagem": "Img"})
+
+        briefing, modelo = self.gerar([cortado, complemento])
+
+        assert briefing.analise_sintetizada == "Completa"
+        assert len(briefing.artigos) == 2
+        assert modelo.generate_content.call_count == 2
+        prompt_complemento = modelo.generate_content.call_args.kwargs['contents']
+        assert "analise_sintetizada" in prompt_complemento
+        assert '"T2"' in prompt_complemento
+
+    def test_complemento_informa_o_roteador(self):
+        """Testa que cada tentativa de complemento registra sucesso ou falha no roteador."""
+        import criar_briefing_noticias_v2 as v2
+
+        texto = json.dumps(BRIEFING)
+        cortado = texto[:texto.index('"analise_sintetizada"') + 30]
+        complemento = json.dumps({"analise_sintetizada": "Completa", "prompt_para_imagem": "Img"})
+        roteador = Mock()
+
+        briefing, modelo = self.gerar([cortado, "[]", complemento], roteador)
+
+        assert briefing.analise_sintetizada == "Completa"
+        primeiro, segundo = v2.MODELOS_DISPONIVEIS[:2]
+        roteador.registrar_falha.assert_called_once_with(primeiro)
+        assert segundo in [chamada.args[0] for chamada in roteador.registrar_sucesso.call_args_list]
+
+    def test_interpretar_resposta_sinaliza_incompleto(self):
+        """Testa que a etapa de interpretação expõe os campos faltantes."""
+        from criar_briefing_noticias_v2 import interpretar_resposta
+
+        with pytest.raises(BriefingIncompleto) as erro:
+            interpretar_resposta('{"topico_central": "X", "artigos": [')
+
+        assert erro.value.campos_faltando == ["artigos", "analise_sintetizada", "prompt_para_imagem"]
+
+
+if __name__ == "__main__":
+    pytest.main([__file__, "-v", "--tb=short"])
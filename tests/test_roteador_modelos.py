@@ -0,0 +1,125 @@
+"""
+Testes para o roteador de modelos
+=================================
+
+Execute com: pytest tests/test_roteador_modelos.py -v
+"""
+
+import pytest
+import sys
+import os
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from roteador_modelos import RoteadorDeModelos, ABERTO, FECHADO, MEIO_ABERTO
+
+MODELOS = ['gemini-2.0-flash-exp', 'gemini-1.5-flash', 'gemini-1.5-pro']
+
+
+class RelogioFalso:
+    """Relógio controlado manualmente."""
+
+    def __init__(self):
+        self.agora = 0.0
+
+    def __call__(self):
+        return self.agora
+
+
+@pytest.fixture
+def relogio():
+    return RelogioFalso()
+
+
+@pytest.fixture
+def roteador(relogio):
+    return RoteadorDeModelos(limiar_falhas=2, tempo_reabertura=10.0, relogio=relogio)
+
+
+class TestOrdenacao:
+    """Testes de ordenação dos candidatos."""
+
+    def test_ordem_inicial_preservada(self, roteador):
+        """Testa que, sem histórico, a ordem de preferência é mantida."""
+        assert roteador.ordenar(MODELOS) == MODELOS
+
+    def test_modelo_com_falha_perde_prioridade(self, roteador):
+        """Testa que um modelo que falhou deixa de ser o primeiro."""
+        roteador.registrar_falha(MODELOS[0])
+        assert roteador.ordenar(MODELOS)[0] == MODELOS[1]
+
+    def test_menor_latencia_primeiro(self, roteador):
+        """Testa que, com a mesma taxa de sucesso, o modelo mais rápido vem antes."""
+        roteador.registrar_sucesso(MODELOS[0], 2.0)
+        roteador.registrar_sucesso(MODELOS[1], 0.5)
+        assert roteador.ordenar(MODELOS[:2]) == [MODELOS[1], MODELOS[0]]
+
+    def test_modelo_comprovado_antes_de_nao_testado(self, roteador):
+        """Testa que um modelo saudável conhecido vem antes de um nunca usado."""
+        roteador.registrar_falha(MODELOS[0])
+        roteador.registrar_sucesso(MODELOS[1], 0.8)
+        assert roteador.ordenar(MODELOS) == [MODELOS[1], MODELOS[2], MODELOS[0]]
+
+
+class TestDisjuntor:
+    """Testes do circuit breaker."""
+
+    def test_abre_apos_limiar(self, roteador):
+        """Testa que falhas consecutivas abrem o disjuntor."""
+        roteador.registrar_falha(MODELOS[0])
+        roteador.registrar_falha(MODELOS[0])
+
+        assert roteador.estatisticas()[MODELOS[0]]["estado"] == ABERTO
+        assert roteador.ordenar(MODELOS)[-1] == MODELOS[0]
+
+    def test_sondagem_meio_aberta(self, roteador, relogio):
+        """Testa que, após o tempo de espera, apenas uma sondagem é liberada."""
+        roteador.registrar_falha(MODELOS[0])
+        roteador.registrar_falha(MODELOS[0])
+        relogio.agora = 11.0
+
+        assert roteador.ordenar(MODELOS)[0] == MODELOS[0]
+        assert roteador.estatisticas()[MODELOS[0]]["estado"] == MEIO_ABERTO
+        # Uma segunda requisição concorrente não repete a sondagem
+        assert roteador.ordenar(MODELOS)[-1] == MODELOS[0]
+
+    def test_sondagem_com_sucesso_fecha(self, roteador, relogio):
+        """Testa que uma sondagem bem-sucedida fecha o disjuntor."""
+        roteador.registrar_falha(MODELOS[0])
+        roteador.registrar_falha(MODELOS[0])
+        relogio.agora = 11.0
+        roteador.ordenar(MODELOS)
+        roteador.registrar_sucesso(MODELOS[0], 0.3)
+
+        assert roteador.estatisticas()[MODELOS[0]]["estado"] == FECHADO
+
+    def test_sondagem_com_falha_reabre(self, roteador, relogio):
+        """Testa que uma sondagem com falha reabre o disjuntor."""
+        roteador.registrar_falha(MODELOS[0])
+        roteador.registrar_falha(MODELOS[0])
+        relogio.agora = 11.0
+        roteador.ordenar(MODELOS)
+        roteador.registrar_falha(MODELOS[0])
+
+        assert roteador.estatisticas()[MODELOS[0]]["estado"] == ABERTO
+        relogio.agora = 15.0
+        assert roteador.ordenar(MODELOS)[-1] == MODELOS[0]
+
+
+class TestPercentilLatencia:
+    """Testes do cálculo de percentis."""
+
+    def test_sem_amostras(self, roteador):
+        """Testa que sem amostras o percentil é None."""
+        assert roteador.percentil_latencia(MODELOS[0], 95) is None
+
+    def test_percentil(self, roteador):
+        """Testa o percentil sobre as latências registradas."""
+        for latencia in range(1, 101):
+            roteador.registrar_sucesso(MODELOS[0], float(latencia))
+        assert roteador.percentil_latencia(MODELOS[0], 95) == 95.0
+        assert roteador.percentil_latencia(MODELOS[0], 50) == 50.0
+
+
+if __name__ == "__main__":
+    pytest.main([__file__, "-v", "--tb=short"])
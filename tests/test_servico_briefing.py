@@ -0,0 +1,90 @@
+"""
+Testes para o serviço persistente de briefings
+==============================================
+
+Execute com: pytest tests/test_servico_briefing.py -v
+"""
+
+import http.client
+import threading
+import urllib.parse
+import pytest
+import sys
+import os
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from criar_briefing_noticias_v2 import BriefingDeNoticias, ArtigoEncontrado
+from servico_briefing import criar_servidor, servico_disponivel, solicitar_briefing
+
+
+def gerador_falso(topico):
+    """Gera briefings sem chamar a API."""
+    if topico == "falha":
+        return None
+    return BriefingDeNoticias(
+        topico_central=topico.title(),
+        artigos=[ArtigoEncontrado(titulo="T1", fonte="F1", resumo_curto="R1")],
+        analise_sintetizada="Análise",
+        prompt_para_imagem="Prompt"
+    )
+
+
+@pytest.fixture
+def url():
+    """Servidor em uma porta livre, atendendo em segundo plano."""
+    servidor = criar_servidor("127.0.0.1", 0, gerador=gerador_falso)
+    thread = threading.Thread(target=servidor.serve_forever, daemon=True)
+    thread.start()
+    yield f"http://127.0.0.1:{servidor.server_address[1]}"
+    servidor.shutdown()
+    servidor.server_close()
+
+
+class TestServicoBriefing:
+    """Testes do servidor e do cliente HTTP."""
+
+    def test_briefing_com_sucesso(self, url):
+        """Testa que o serviço devolve o briefing em JSON."""
+        briefing = solicitar_briefing("carros elétricos", url=url)
+
+        assert briefing["topico_central"] == "Carros Elétricos"
+        assert briefing["artigos"][0]["fonte"] == "F1"
+
+    def test_topico_vazio(self, url):
+        """Testa que tópico vazio é rejeitado com 400."""
+        with pytest.raises(RuntimeError, match="400"):
+            solicitar_briefing("   ", url=url)
+
+    def test_falha_na_geracao(self, url):
+        """Testa que falha na geração vira 502."""
+        with pytest.raises(RuntimeError, match="502"):
+            solicitar_briefing("falha", url=url)
+
+    def test_content_length_invalido(self, url):
+        """Testa que Content-Length negativo ou não numérico vira 400."""
+        endereco = urllib.parse.urlsplit(url)
+        for valor in ("abc", "-5"):
+            conexao = http.client.HTTPConnection(endereco.hostname, endereco.port, timeout=2)
+            conexao.putrequest("POST", "/briefing")
+            conexao.putheader("Content-Length", valor)
+            conexao.endheaders()
+            assert conexao.getresponse().status == 400
+            conexao.close()
+
+    def test_servico_inacessivel(self):
+        """Testa que conexão recusada vira RuntimeError, e não um traceback de rede."""
+        with pytest.raises(RuntimeError, match="indisponível"):
+            solicitar_briefing("IA", url="http://127.0.0.1:1", timeout=0.5)
+
+    def test_servico_disponivel(self, url):
+        """Testa a verificação de saúde."""
+        assert servico_disponivel(url)
+
+    def test_servico_indisponivel(self):
+        """Testa que uma porta sem serviço é detectada."""
+        assert not servico_disponivel("http://127.0.0.1:1", timeout=0.2)
+
+
+if __name__ == "__main__":
+    pytest.main([__file__, "-v", "--tb=short"])
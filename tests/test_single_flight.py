@@ -0,0 +1,177 @@
+"""
+Testes para a coalescência single-flight
+========================================
+
+Execute com: pytest tests/test_single_flight.py -v
+"""
+
+import asyncio
+import threading
+import time
+import pytest
+import sys
+import os
+from unittest.mock import patch
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from single_flight import GrupoSingleFlight
+
+
+def executar_em_threads(quantidade, alvo):
+    """Inicia `quantidade` threads com o alvo e aguarda todas."""
+    resultados = []
+    threads = [threading.Thread(target=lambda: resultados.append(alvo())) for _ in range(quantidade)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    return resultados
+
+
+class TestGrupoSingleFlight:
+    """Testes do grupo single-flight."""
+
+    def test_threads_compartilham_execucao(self):
+        """Testa que chamadas simultâneas executam a função uma única vez."""
+        grupo = GrupoSingleFlight()
+        chamadas = []
+
+        def lenta():
+            chamadas.append(1)
+            time.sleep(0.2)
+            return "resultado"
+
+        resultados = executar_em_threads(5, lambda: grupo.executar("chave", lenta))
+
+        assert resultados == ["resultado"] * 5
+        assert len(chamadas) == 1
+        assert grupo.estatisticas() == {"executados": 1, "coalescidos": 4, "em_andamento": 0}
+
+    def test_chaves_diferentes_nao_coalescem(self):
+        """Testa que cada chave tem sua própria execução."""
+        grupo = GrupoSingleFlight()
+
+        assert grupo.executar("a", lambda: 1) == 1
+        assert grupo.executar("b", lambda: 2) == 2
+        assert grupo.estatisticas()["coalescidos"] == 0
+
+    def test_execucoes_sequenciais_nao_sao_guardadas(self):
+        """Testa que a chave é liberada ao final (sem cache de resultados)."""
+        grupo = GrupoSingleFlight()
+        contador = iter(range(10))
+
+        assert grupo.executar("a", lambda: next(contador)) == 0
+        assert grupo.executar("a", lambda: next(contador)) == 1
+
+    def test_excecao_compartilhada(self):
+        """Testa que todos os chamadores recebem a exceção da execução."""
+        grupo = GrupoSingleFlight()
+
+        def falha():
+            time.sleep(0.1)
+            raise RuntimeError("falhou")
+
+        def chamar():
+            try:
+                grupo.executar("chave", falha)
+            except RuntimeError as e:
+                return str(e)
+
+        assert executar_em_threads(3, chamar) == ["falhou"] * 3
+        assert grupo.estatisticas()["em_andamento"] == 0
+
+    def test_asyncio(self):
+        """Testa a coalescência entre corrotinas."""
+        grupo = GrupoSingleFlight()
+        chamadas = []
+
+        async def lenta(valor):
+            chamadas.append(valor)
+            await asyncio.sleep(0.1)
+            return valor * 2
+
+        async def principal():
+            return await asyncio.gather(*(grupo.executar_async("k", lenta, 21) for _ in range(4)))
+
+        assert asyncio.run(principal()) == [42] * 4
+        assert len(chamadas) == 1
+
+    def test_cancelamento_do_dono_nao_afeta_quem_aguarda(self):
+        """Testa que cancelar quem iniciou a execução não cancela os demais chamadores."""
+        grupo = GrupoSingleFlight()
+        chamadas = []
+
+        async def lenta():
+            chamadas.append(1)
+            await asyncio.sleep(0.1)
+            return "briefing"
+
+        async def principal():
+            dono = asyncio.ensure_future(grupo.executar_async("k", lenta))
+            await asyncio.sleep(0.01)
+            espera = asyncio.ensure_future(grupo.executar_async("k", lenta))
+            await asyncio.sleep(0.01)
+            dono.cancel()
+            with pytest.raises(asyncio.CancelledError):
+                await dono
+            return await espera
+
+        assert asyncio.run(principal()) == "briefing"
+        assert len(chamadas) == 1
+
+    def test_cancelamento_de_quem_aguarda(self):
+        """Testa que um chamador que desiste não cancela a execução compartilhada."""
+        grupo = GrupoSingleFlight()
+
+        async def lenta():
+            await asyncio.sleep(0.1)
+            return "briefing"
+
+        async def principal():
+            dono = asyncio.ensure_future(grupo.executar_async("k", lenta))
+            await asyncio.sleep(0.01)
+            with pytest.raises(asyncio.TimeoutError):
+                await asyncio.wait_for(grupo.executar_async("k", lenta), 0.01)
+            return await dono
+
+        assert asyncio.run(principal()) == "briefing"
+
+    def test_asyncio_aguarda_execucao_de_thread(self):
+        """Testa que uma corrotina aguarda uma execução iniciada por uma thread."""
+        grupo = GrupoSingleFlight()
+        liberar = threading.Event()
+        thread = threading.Thread(target=grupo.executar, args=("k", lambda: liberar.wait(2) and "thread"))
+        thread.start()
+        time.sleep(0.05)
+
+        async def principal():
+            tarefa = asyncio.ensure_future(grupo.executar_async("k", lambda: "corrotina"))
+            await asyncio.sleep(0.05)
+            liberar.set()
+            return await tarefa
+
+        assert asyncio.run(principal()) == "thread"
+        thread.join()
+
+
+class TestSingleFlightNoPipeline:
+    """Testes da coalescência em criar_briefing_avancado."""
+
+    def test_pedidos_simultaneos_chamam_o_modelo_uma_vez(self):
+        """Testa que o mesmo tópico pedido por várias threads gera uma chamada."""
+        import criar_briefing_noticias_v2 as v2
+        from gemini_falso import BackendGeminiFalso, ConfiguracaoFalsa
+
+        backend = BackendGeminiFalso(ConfiguracaoFalsa(latencia=0.2))
+        with patch.object(v2, 'obter_cache_padrao', return_value=None), \
+                patch.object(v2, 'obter_executor_hedge', return_value=None), \
+                patch.object(v2.client, '_fabrica_modelo', backend):
+            resultados = executar_em_threads(4, lambda: v2.criar_briefing_avancado("Energia Solar"))
+
+        assert backend.chamadas == 1
+        assert all(r is resultados[0] for r in resultados)
+
+
+if __name__ == "__main__":
+    pytest.main([__file__, "-v", "--tb=short"])
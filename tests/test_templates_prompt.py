@@ -0,0 +1,218 @@
+"""
+Testes para o registro de templates de prompt
+=============================================
+
+Execute com: pytest tests/test_templates_prompt.py -v
+"""
+
+import json
+import pytest
+import sys
+import os
+from unittest.mock import Mock, patch
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from templates_prompt import (
+    TEMPLATE_BRIEFING,
+    TEMPLATE_BRIEFING_JSON,
+    RegistroDeTemplates,
+    TemplateDePrompt,
+    obter_registro,
+)
+
+
+BRIEFING = {
+    "topico_central": "Teste",
+    "artigos": [{"titulo": "T", "fonte": "F", "resumo_curto": "R"}],
+    "analise_sintetizada": "Análise",
+    "prompt_para_imagem": "Prompt"
+}
+
+
+class TestTemplateDePrompt:
+    """Testes de um template isolado."""
+
+    def test_renderizar_com_padroes(self):
+        """Testa que parâmetros não informados usam o padrão."""
+        template = TemplateDePrompt("t", 1, "Prefixo {fixo}\n", "Tópico: {topico}, {n} artigos", {"n": 3})
+
+        assert template.renderizar(topico="IA") == "Prefixo {fixo}\nTópico: IA, 3 artigos"
+        assert template.renderizar_sufixo(topico="IA", n=5) == "Tópico: IA, 5 artigos"
+        assert template.parametros == {"topico", "n"}
+
+    def test_parametros_invalidos(self):
+        """Testa que parâmetros ausentes ou desconhecidos são erro."""
+        template = TemplateDePrompt("t", 1, "", "{topico}")
+
+        with pytest.raises(ValueError):
+            template.renderizar()
+        with pytest.raises(ValueError):
+            template.renderizar(topico="IA", periodo="hoje")
+
+    def test_sufixo_com_formatacao_e_rejeitado(self):
+        """Testa que só campos simples são aceitos no sufixo."""
+        with pytest.raises(ValueError):
+            TemplateDePrompt("t", 1, "", "{topico.upper}")
+        with pytest.raises(ValueError):
+            TemplateDePrompt("t", 1, "", "{topico}", {"inexistente": 1})
+
+    def test_chave_cache_inclui_versao_e_parametros(self):
+        """Testa que versão e parâmetros (menos o tópico) distinguem a chave."""
+        v1 = TemplateDePrompt("t", 1, "", "{topico} {periodo}", {"periodo": "recentes"})
+        v2 = TemplateDePrompt("t", 2, "", "{topico} {periodo}", {"periodo": "recentes"})
+
+        assert v1.chave_cache(topico="a") == v1.chave_cache(topico="b") == v1.chave_cache()
+        assert v1.chave_cache() != v2.chave_cache()
+        assert v1.chave_cache(periodo="de hoje") != v1.chave_cache()
+        assert v1.chave_cache().startswith("t@v1")
+
+
+class TestRegistroDeTemplates:
+    """Testes do registro por nome e versão."""
+
+    def test_obter_mais_recente(self):
+        """Testa que sem versão o registro devolve a mais recente."""
+        registro = RegistroDeTemplates()
+        registro.registrar(TemplateDePrompt("t", 1, "a", "{x}"))
+        registro.registrar(TemplateDePrompt("t", 2, "b", "{x}"))
+
+        assert registro.obter("t").versao == 2
+        assert registro.obter("t", 1).prefixo == "a"
+        assert registro.versoes("t") == [1, 2]
+
+    def test_mesma_versao_com_outro_texto(self):
+        """Testa que mudar o texto exige nova versão."""
+        registro = RegistroDeTemplates()
+        registro.registrar(TemplateDePrompt("t", 1, "a", "{x}"))
+        registro.registrar(TemplateDePrompt("t", 1, "a", "{x}"))
+
+        with pytest.raises(ValueError):
+            registro.registrar(TemplateDePrompt("t", 1, "outro", "{x}"))
+
+    def test_desconhecido(self):
+        """Testa o erro para nomes e versões inexistentes."""
+        with pytest.raises(KeyError):
+            RegistroDeTemplates().obter("nada")
+        with pytest.raises(KeyError):
+            obter_registro().obter("briefing", 99)
+
+    def test_templates_do_pipeline(self):
+        """Testa que os prompts do pipeline estão registrados."""
+        registro = obter_registro()
+
+        for nome in ("briefing", "briefing_json", "briefing_agrupado", "complemento", "atualizacao"):
+            assert nome in registro
+        assert "{" in TEMPLATE_BRIEFING.prefixo
+        assert TEMPLATE_BRIEFING_JSON.parametros == {"topico", "artigos", "periodo"}
+
+
+class TestParametrosNoPipeline:
+    """Testes dos parâmetros de template em criar_briefing_avancado."""
+
+    def gerar(self, cache=None, **kwargs):
+        import criar_briefing_noticias_v2 as v2
+
+        modelo = Mock()
+        modelo.generate_content.return_value = Mock(text=json.dumps(BRIEFING), parsed=None)
+        with patch.object(v2, 'obter_roteador') as mock_roteador, \
+                patch.object(v2, 'obter_executor_hedge', return_value=None), \
+                patch.object(v2.client, '_fabrica_modelo', lambda nome: modelo):
+            mock_roteador.return_value.ordenar.return_value = list(v2.MODELOS_DISPONIVEIS)
+            briefing = v2.criar_briefing_avancado("energia solar", cache=cache, **kwargs)
+        return briefing, modelo
+
+    def test_periodo_no_prompt_e_no_cache(self, tmp_path):
+        """Testa que o período chega ao prompt e separa as entradas de cache."""
+        from cache_briefing import CacheDeBriefings
+
+        cache = CacheDeBriefings(str(tmp_path / "cache.sqlite3"))
+        try:
+            _, modelo = self.gerar(cache, parametros={"periodo": "da última semana"})
+            assert "da última semana" in modelo.generate_content.call_args.kwargs['contents']
+
+            _, modelo = self.gerar(cache, parametros={"periodo": "da última semana"})
+            assert modelo.generate_content.call_count == 0
+            assert (cache.estatisticas()["acertos"], cache.estatisticas()["faltas"]) == (1, 1)
+
+            _, modelo = self.gerar(cache)
+            assert modelo.generate_content.call_count == 1
+        finally:
+            cache.fechar()
+
+    def test_parametro_desconhecido(self):
+        """Testa que parâmetros inexistentes são rejeitados antes da geração."""
+        with pytest.raises(ValueError):
+            self.gerar(parametros={"idioma": "en"})
+
+
+class TestCacheDeContexto:
+    """Testes do cache de contexto do cliente Gemini."""
+
+    def cliente(self, genai):
+        from cliente_gemini import ClienteGemini
+
+        cliente = ClienteGemini()
+        cliente._genai = genai
+        return cliente
+
+    def test_prefixo_grande_vai_para_o_contexto(self):
+        """Testa que o prefixo é cacheado uma vez e só o sufixo é enviado."""
+        genai = Mock()
+        cliente = self.cliente(genai)
+
+        with patch.dict(os.environ, {'GEMINI_CACHE_CONTEXTO': '1', 'GEMINI_CACHE_CONTEXTO_MIN_TOKENS': '10'}):
+            cliente.models.generate_content(model="m", contents="sufixo 1", prefixo="p" * 100)
+            cliente.models.generate_content(model="m", contents="sufixo 2", prefixo="p" * 100)
+
+        assert genai.caching.CachedContent.create.call_count == 1
+        assert genai.caching.CachedContent.create.call_args.kwargs['model'] == "models/m-001"
+        modelo = genai.GenerativeModel.from_cached_content.return_value
+        assert modelo.generate_content.call_args.kwargs['contents'] == "sufixo 2"
+        genai.GenerativeModel.assert_not_called()
+
+    def test_prefixo_pequeno_e_concatenado(self):
+        """Testa que prefixos abaixo do mínimo da API seguem no prompt."""
+        genai = Mock()
+        cliente = self.cliente(genai)
+
+        cliente.models.generate_content(model="m", contents="sufixo", prefixo="prefixo ")
+
+        genai.caching.CachedContent.create.assert_not_called()
+        assert genai.GenerativeModel.return_value.generate_content.call_args.kwargs['contents'] == "prefixo sufixo"
+
+    def test_desligado_por_padrao(self):
+        """Testa que, sem GEMINI_CACHE_CONTEXTO=1, o prefixo segue no prompt."""
+        genai = Mock()
+        cliente = self.cliente(genai)
+
+        with patch.dict(os.environ, {'GEMINI_CACHE_CONTEXTO_MIN_TOKENS': '10'}):
+            os.environ.pop('GEMINI_CACHE_CONTEXTO', None)
+            cliente.models.generate_content(model="m", contents="s", prefixo="p" * 100)
+
+        genai.caching.CachedContent.create.assert_not_called()
+
+    def test_nome_versionado(self):
+        """Testa o nome de modelo exigido pelo cache de contexto."""
+        from cliente_gemini import nome_modelo_contexto
+
+        assert nome_modelo_contexto("gemini-1.5-flash") == "models/gemini-1.5-flash-001"
+        assert nome_modelo_contexto("gemini-1.5-pro-002") == "models/gemini-1.5-pro-002"
+        assert nome_modelo_contexto("models/gemini-1.5-flash-001") == "models/gemini-1.5-flash-001"
+
+    def test_recusa_e_lembrada(self):
+        """Testa que uma recusa da API não é repetida a cada chamada."""
+        genai = Mock()
+        genai.caching.CachedContent.create.side_effect = Exception("400 model not supported")
+        cliente = self.cliente(genai)
+
+        with patch.dict(os.environ, {'GEMINI_CACHE_CONTEXTO': '1', 'GEMINI_CACHE_CONTEXTO_MIN_TOKENS': '10'}):
+            for _ in range(3):
+                cliente.models.generate_content(model="m", contents="s", prefixo="p" * 100)
+
+        assert genai.caching.CachedContent.create.call_count == 1
+        assert genai.GenerativeModel.return_value.generate_content.call_count == 3
+
+
+if __name__ == "__main__":
+    pytest.main([__file__, "-v", "--tb=short"])